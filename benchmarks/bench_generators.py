@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark every generator, formatter and exporter in rows per second.
+
+Runs each benchmark a few times with timeit and keeps the best run, so a
+single slow run (a GC pause, another process) does not count as a regression.
+Save a baseline, change the code, then compare a new run against it:
+
+    python benchmarks/bench_generators.py run --output baseline.json
+    python benchmarks/bench_generators.py run --output current.json
+    python benchmarks/bench_generators.py compare baseline.json current.json \\
+        --threshold 0.1
+
+compare exits with status 1 when any benchmark is slower than the baseline
+by more than the threshold, so it can gate CI.
+"""
+
+import argparse
+import inspect
+import io
+import json
+import platform
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generators import client_generators, core_generators
+from generators.log_batch import format_log_batch, generate_log_batch
+from generators.log_entry_factory import (
+    generate_log_entry,
+    generate_log_entries,
+    format_log_entry_as_string,
+)
+from generators.sharding import format_batch, seed_generators
+from exporters.binary_log import (
+    iter_binary_log_batches,
+    open_binary_log,
+    write_binary_log,
+)
+from exporters.csv_exporter import export_to_csv
+from exporters.json_exporter import write_json_lines
+from exporters.postgres_exporter import generate_insert_values, write_postgres_copy
+from exporters.parquet_exporter import export_to_parquet, pa
+from exporters.templates import (
+    TEMPLATE_PRESETS,
+    format_batch_with_template,
+    format_entries_with_template,
+)
+
+# Benchmarked modules whose generate_* functions are discovered automatically
+GENERATOR_MODULES = [core_generators, client_generators]
+
+# Output formats of format_log_entry_as_string
+ENTRY_FORMATS = ["json", "csv", "log"]
+
+DEFAULT_ROWS = 10000
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.10
+
+def _generator_benchmark(function: Callable) -> Callable[[int], Callable[[], None]]:
+    """Return a benchmark producing n values with a generate_*() function.
+
+    Functions taking a count are called once; the others are called n times.
+    """
+    if "count" in inspect.signature(function).parameters:
+        return lambda n: lambda: function(n)
+
+    def setup(n: int) -> Callable[[], None]:
+        def run() -> None:
+            for _ in range(n):
+                function()
+        return run
+    return setup
+
+def _entries_benchmark(
+    consume: Callable[[list], object], entries: Dict[int, list]
+) -> Callable[[int], Callable[[], None]]:
+    """Return a benchmark consuming n pre-generated entries, so only it is timed."""
+    def setup(n: int) -> Callable[[], None]:
+        if n not in entries:
+            entries[n] = generate_log_entries(n)
+        return lambda: consume(entries[n])
+    return setup
+
+def _batch_benchmark(
+    consume: Callable[[object], object], batches: Dict[int, object]
+) -> Callable[[int], Callable[[], None]]:
+    """Return a benchmark consuming a pre-generated columnar batch of n rows."""
+    def setup(n: int) -> Callable[[], None]:
+        if n not in batches:
+            batches[n] = generate_log_batch(n)
+        return lambda: consume(batches[n])
+    return setup
+
+def _binary_log_benchmark(
+    batches: Dict[int, object],
+) -> Callable[[int], Callable[[], None]]:
+    """Return a benchmark reading a binary log of n rows written beforehand."""
+    # Removed when the benchmark is garbage collected
+    directory = tempfile.TemporaryDirectory()
+
+    def setup(n: int) -> Callable[[], None]:
+        path = Path(directory.name) / f"{n}.binlog"
+        if not path.exists():
+            write_binary_log([batches.get(n) or generate_log_batch(n)], path)
+
+        def run() -> None:
+            with open_binary_log(path) as log:
+                for batch in iter_binary_log_batches(log):
+                    del batch
+        return run
+    return setup
+
+def collect_benchmarks() -> Dict[str, Callable[[int], Callable[[], None]]]:
+    """Return every benchmark by name.
+
+    Each benchmark takes a row count n, builds its input for n rows and
+    returns the run to time, which processes those n rows.
+    """
+    benchmarks = {}
+    for module in GENERATOR_MODULES:
+        module_name = module.__name__.rsplit(".", 1)[-1]
+        for name, function in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith("generate_") and function.__module__ == module.__name__:
+                benchmarks[f"{module_name}.{name}"] = _generator_benchmark(function)
+
+    benchmarks["log_entry_factory.generate_log_entry"] = _generator_benchmark(
+        generate_log_entry
+    )
+
+    # Shared by the formatter and exporter benchmarks, generated once per row count
+    entries = {}
+    for format_type in ENTRY_FORMATS:
+        benchmarks[f"format_log_entry_as_string.{format_type}"] = _entries_benchmark(
+            lambda data, format_type=format_type: [
+                format_log_entry_as_string(entry, format_type) for entry in data
+            ],
+            entries,
+        )
+    benchmarks["csv_exporter.export_to_csv"] = _entries_benchmark(
+        lambda data: export_to_csv(data, io.BytesIO()), entries
+    )
+    benchmarks["json_exporter.write_json_lines"] = _entries_benchmark(
+        lambda data: write_json_lines(data, io.BytesIO()), entries
+    )
+    benchmarks["postgres_exporter.generate_insert_values"] = _entries_benchmark(
+        lambda data: generate_insert_values(data, list(data[0])), entries)
+    benchmarks["postgres_exporter.write_postgres_copy"] = _entries_benchmark(
+        lambda data: write_postgres_copy(data, io.BytesIO()), entries
+    )
+    batches = {}
+    for format_type in ENTRY_FORMATS:
+        benchmarks[f"log_batch.format_log_batch.{format_type}"] = _batch_benchmark(
+            lambda batch, format_type=format_type: format_log_batch(batch, format_type),
+            batches,
+        )
+        # The CLI's formatter: bytes, with CSV quoted by the CSV exporter
+        benchmarks[f"sharding.format_batch.{format_type}"] = _batch_benchmark(
+            lambda batch, format_type=format_type: format_batch(batch, format_type),
+            batches,
+        )
+    for preset in TEMPLATE_PRESETS:
+        name = f"templates.format_entries_with_template.{preset}"
+        benchmarks[name] = _entries_benchmark(
+            lambda data, preset=preset: format_entries_with_template(data, preset),
+            entries,
+        )
+        benchmarks[f"templates.format_batch_with_template.{preset}"] = _batch_benchmark(
+            lambda batch, preset=preset: format_batch_with_template(batch, preset),
+            batches,
+        )
+    benchmarks["binary_log.write_binary_log"] = _batch_benchmark(
+        lambda batch: write_binary_log([batch], io.BytesIO()), batches
+    )
+    benchmarks["binary_log.iter_binary_log_batches"] = _binary_log_benchmark(batches)
+    if pa is not None:
+        benchmarks["parquet_exporter.export_to_parquet"] = _entries_benchmark(
+            lambda data: export_to_parquet(data, io.BytesIO()), entries
+        )
+    return benchmarks
+
+def time_benchmark(
+    benchmark: Callable[[int], Callable[[], None]], rows: int, repeat: int
+) -> float:
+    """Return the best wall time in seconds of repeat runs over rows rows, after warmup.
+
+    The input of the timed runs is built before timing starts.
+    """
+    benchmark(min(rows, 100))()
+    run = benchmark(rows)
+    return min(timeit.repeat(run, repeat=repeat, number=1))
+
+def run_benchmarks(
+    rows: int = DEFAULT_ROWS,
+    repeat: int = DEFAULT_REPEAT,
+    name_filter: Optional[str] = None,
+    seed: int = 0,
+    quiet: bool = False,
+) -> dict:
+    """Run the benchmarks and return the results document.
+
+    Args:
+        rows: Rows processed per run (default: 10000)
+        repeat: Runs per benchmark; the fastest one counts (default: 3)
+        name_filter: Only run benchmarks whose name contains this text (default: all)
+        seed: Seed for the generators, so every run sees the same data (default: 0)
+        quiet: Do not print a line per benchmark
+
+    Returns:
+        Dictionary with run metadata and rows per second by benchmark name
+    """
+    if rows <= 0 or repeat <= 0:
+        raise ValueError(f"rows ({rows}) and repeat ({repeat}) must be positive")
+
+    seed_generators(seed)
+    results = {}
+    for name, benchmark in collect_benchmarks().items():
+        if name_filter and name_filter not in name:
+            continue
+        seconds = time_benchmark(benchmark, rows, repeat)
+        results[name] = {
+            "rows": rows,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds,
+        }
+        if not quiet:
+            print(f"{name:<50} {rows / seconds:>14,.0f} rows/s", file=sys.stderr)
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "rows": rows,
+        "repeat": repeat,
+        "results": results
+    }
+
+def compare_results(
+    baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD
+) -> list[tuple[str, float, float, float, bool]]:
+    """Compare two results documents benchmark by benchmark.
+
+    Args:
+        baseline: Results of the reference run
+        current: Results of the run being checked
+        threshold: Allowed slowdown as a fraction, e.g. 0.1 for 10% (default: 0.10)
+
+    Returns:
+        (name, baseline rows/s, current rows/s, change, regressed) for every benchmark
+        in both runs, where change is the relative difference in rows per second
+    """
+    comparisons = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name]["rows_per_second"]
+        after = result["rows_per_second"]
+        change = after / before - 1.0
+        comparisons.append((name, before, after, change, change < -threshold))
+    return comparisons
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Micro-benchmark generators, formatters and exporters"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks")
+    run.add_argument(
+        "--rows",
+        type=int,
+        default=DEFAULT_ROWS,
+        help=f"Rows processed per run (default: {DEFAULT_ROWS})",
+    )
+    run.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"Runs per benchmark, best one counts (default: {DEFAULT_REPEAT})",
+    )
+    run.add_argument(
+        "--filter", help="Only run benchmarks whose name contains this text"
+    )
+    run.add_argument("--output", "-o", help="Save the results as JSON to this file")
+
+    compare = commands.add_parser(
+        "compare", help="Compare two saved runs and flag regressions"
+    )
+    compare.add_argument("baseline", help="Results JSON of the reference run")
+    compare.add_argument("current", help="Results JSON of the run being checked")
+    compare.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=(
+            "Allowed slowdown as a fraction before a benchmark is flagged "
+            f"(default: {DEFAULT_THRESHOLD})"
+        ),
+    )
+    args = parser.parse_args()
+
+    if args.command == "run" and (args.rows <= 0 or args.repeat <= 0):
+        parser.error("--rows and --repeat must be positive integers")
+    return args
+
+def main():
+    """Run or compare benchmarks."""
+    args = parse_args()
+
+    if args.command == "run":
+        results = run_benchmarks(args.rows, args.repeat, args.filter)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    comparisons = compare_results(baseline, current, args.threshold)
+    print(f"{'benchmark':<50} {'baseline/s':>14} {'current/s':>14} {'change':>8}")
+    for name, before, after, change, regressed in comparisons:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<50} {before:>14,.0f} {after:>14,.0f} {change:>+8.1%}{flag}")
+
+    regressions = sum(regressed for *_, regressed in comparisons)
+    if regressions:
+        print(
+            f"{regressions} benchmark(s) slower than the baseline "
+            f"by more than {args.threshold:.0%}",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark how sharded generation scales with the number of worker processes.
+
+Prints rows per second and speedup over one worker for each worker count:
+
+    python benchmarks/bench_workers.py --count 200000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generators.sharding import DEFAULT_SHARD_SIZE, iter_shards
+
+def parse_args():
+    """Parse command line arguments."""
+    cpu_count = os.cpu_count() or 1
+    default_workers = sorted(
+        {
+            1,
+            *(2**i for i in range(1, cpu_count.bit_length()) if 2**i <= cpu_count),
+            cpu_count,
+        }
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark --workers scaling of sharded generation"
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=100000,
+        help="Entries generated per run (default: 100000)",
+    )
+    parser.add_argument(
+        "--format",
+        "-f",
+        choices=["json", "csv", "log"],
+        default="json",
+        help="Output format (default: json)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=default_workers,
+        help="Worker counts to measure (default: powers of two up to the CPU count)",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=DEFAULT_SHARD_SIZE,
+        help=f"Entries per shard (default: {DEFAULT_SHARD_SIZE})",
+    )
+    return parser.parse_args()
+
+def time_run(count: int, format_type: str, workers: int, shard_size: int) -> float:
+    """Return the wall time in seconds to generate and drain count entries."""
+    start = time.perf_counter()
+    for _ in iter_shards(count, format_type, workers, seed=0, shard_size=shard_size):
+        pass
+    return time.perf_counter() - start
+
+def main():
+    """Run the scaling benchmark and print a table."""
+    args = parse_args()
+
+    print(f"{'workers':>8} {'seconds':>10} {'rows/s':>12} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        elapsed = time_run(args.count, args.format, workers, args.shard_size)
+        rate = args.count / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>8} {elapsed:>10.2f} {rate:>12,.0f} {rate / baseline:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
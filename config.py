@@ -16,13 +16,15 @@ DEFAULT_OUTPUT_FILE = None  # stdout by default
 DEFAULT_COUNT = 100
 
 # Supported output formats
-SUPPORTED_FORMATS = ["json", "csv", "log"]
+SUPPORTED_FORMATS = ["json", "csv", "log", "parquet", "binary"]
 
 # File extensions for each format
 FORMAT_EXTENSIONS = {
     "json": ".json",
     "csv": ".csv", 
-    "log": ".log"
+    "log": ".log",
+    "parquet": ".parquet",
+    "binary": ".binlog"
 }
 
 # Default service configuration
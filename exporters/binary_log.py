@@ -0,0 +1,428 @@
+"""
+Compact binary container for generated log entries, read through mmap.
+
+Re-parsing multi-GB JSON for every benchmark run costs minutes. A binary
+log stores the columns of LogBatch objects as they are, one block per
+batch, so a memory-mapped reader hands them back without parsing:
+
+    header   64 bytes: magic, version, row count, block count and the
+             offset and length of the schema
+    blocks   per block, 8-byte aligned column sections:
+               timestamp        int64 epoch microseconds (UTC) per row
+               request_id       16-byte UUID per row
+               category fields  uint16 codes into per-file dictionaries
+               string fields    uint32 offsets (rows + 1), then a UTF-8 heap
+                                of NUL-terminated values
+    schema   JSON: columns and their encodings, category dictionaries,
+             the placeholder constants and the block index
+
+The schema is written last and the header patched when the writer
+finishes, so files are written in one streaming pass with memory bounded
+by one batch. All integers are little-endian.
+
+Timestamps and request IDs of the batches read back are memoryviews into
+the map, shared with the page cache rather than copied. A string column
+is decoded with one str() and one split() at the terminators per block;
+the offsets serve single-row reads and values that contain NUL.
+"""
+
+import json
+import mmap
+import struct
+import sys
+import uuid
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
+from itertools import accumulate, chain
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, NamedTuple, Optional, Union
+
+from exporters.compression import write_compressed
+from generators.core_generators import micros_to_timestamp
+from generators.log_batch import LogBatch, iter_log_batch_rows, log_batch_size
+from generators.log_entry_factory import LOG_ENTRY_FIELDS, LogEntry
+from generators.sharding import csv_header, format_batch
+
+BINARY_LOG_MAGIC = b"FAKELOG\x1a"
+BINARY_LOG_VERSION = 1
+
+# Fixed-size header: magic, version, flags, row count, block count, schema offset and
+# schema length
+_HEADER = struct.Struct("<8sII4Q16x")
+
+# Encoding of every stored column; the remaining fields are per-block constants
+BINARY_LOG_COLUMNS = {
+    "timestamp": "int64",
+    "request_id": "uuid",
+    "log_level": "category",
+    "method": "category",
+    "query_parameters": "category",
+    "protocol": "category",
+    "source_ip": "string",
+    "path": "string",
+    "user_agent": "string",
+    "referer": "string",
+    "user_id": "string",
+    "session_id": "string"
+}
+
+# Position of each column's section offset in a block's index entry
+_COLUMN_INDEX = {field: index for index, field in enumerate(BINARY_LOG_COLUMNS)}
+
+# Distinct values a category column can hold with uint16 codes
+MAX_CATEGORIES = 1 << 16
+
+_ALIGNMENT = 8
+_BIG_ENDIAN = sys.byteorder == "big"
+
+class BinaryLog(NamedTuple):
+    """Memory-mapped binary log opened by open_binary_log()."""
+    path: str
+    buffer: memoryview  # The whole file
+    row_count: int
+    dictionaries: Dict[str, list]  # Category field -> values by code
+    constants: list  # Distinct placeholder constants, referenced by blocks
+    blocks: list  # [rows, constants index, [section offset per column]] per block
+    block_starts: list  # First row of every block, for bisecting row indexes
+
+def _pad(stream: BinaryIO, position: int) -> int:
+    """Write zero bytes up to the next aligned position and return it."""
+    padding = -position % _ALIGNMENT
+    stream.write(bytes(padding))
+    return position + padding
+
+def _little_endian(values: Any, typecode: str) -> Any:
+    """Return a buffer of integers in little-endian byte order."""
+    if not _BIG_ENDIAN:
+        return values
+    swapped = array(typecode, values)
+    swapped.byteswap()
+    return swapped
+
+def _encode_strings(values: list) -> tuple[array, bytes]:
+    """Return the offsets and the value heap of a string column.
+
+    The uint32 start offsets end with the end of the heap, which holds the
+    NUL-terminated UTF-8 values.
+    """
+    joined = "\0".join(values) + "\0"
+    if joined.isascii():
+        heap = joined.encode("ascii")
+        lengths = (len(value) + 1 for value in values)
+    else:
+        encoded = [value.encode("utf-8") + b"\0" for value in values]
+        heap = b"".join(encoded)
+        lengths = map(len, encoded)
+    if len(heap) >= 1 << 32:
+        raise ValueError(
+            f"String column of {len(heap)} bytes exceeds the 4 GiB per block limit; "
+            "use smaller batches"
+        )
+    return array("I", accumulate(lengths, initial=0)), heap
+
+def write_binary_log(
+    batches: Iterable[LogBatch], destination: Union[str, Path, BinaryIO]
+) -> int:
+    """Write columnar batches to a binary log, one block per batch.
+
+    Args:
+        batches: Iterable of LogBatch objects; consumed lazily
+        destination: File name or seekable writable binary file
+
+    Returns:
+        Number of rows written
+    """
+    if isinstance(destination, (str, Path)):
+        with open(destination, "wb") as f:
+            return write_binary_log(batches, f)
+
+    stream = destination
+    base = stream.tell()
+    stream.write(bytes(_HEADER.size))
+    position = _HEADER.size
+    codes = {
+        field: {}
+        for field, encoding in BINARY_LOG_COLUMNS.items()
+        if encoding == "category"
+    }
+    constants = []  # Distinct constants as JSON text, in first-seen order
+    constant_ids = {}
+    blocks = []
+    rows = 0
+
+    for batch in batches:
+        size = log_batch_size(batch)
+        if not size:
+            continue
+        text = json.dumps(batch.constants, sort_keys=True)
+        if text not in constant_ids:
+            constant_ids[text] = len(constants)
+            constants.append(text)
+        sections = []
+        for field, encoding in BINARY_LOG_COLUMNS.items():
+            position = _pad(stream, position)
+            sections.append(position)
+            if encoding == "int64":
+                data = [_little_endian(batch.timestamps, "q")]
+            elif encoding == "uuid":
+                data = [batch.request_ids]
+            elif encoding == "category":
+                values = batch.columns[field]
+                lookup = codes[field]
+                for value in set(values).difference(lookup):
+                    lookup[value] = len(lookup)
+                if len(lookup) > MAX_CATEGORIES:
+                    raise ValueError(
+                        f"Category column {field} has more than {MAX_CATEGORIES} "
+                        "distinct values"
+                    )
+                indices = array("H", map(lookup.__getitem__, values))
+                data = [_little_endian(indices, "H")]
+            else:
+                offsets, heap = _encode_strings(batch.columns[field])
+                data = [_little_endian(offsets, "I"), heap]
+            for buffer in data:
+                view = memoryview(buffer)
+                stream.write(view)
+                position += view.nbytes
+        blocks.append([size, constant_ids[text], sections])
+        rows += size
+
+    schema = json.dumps({
+        "version": BINARY_LOG_VERSION,
+        "columns": BINARY_LOG_COLUMNS,
+        "dictionaries": {field: list(lookup) for field, lookup in codes.items()},
+        "constants": [json.loads(text) for text in constants],
+        "blocks": blocks
+    }, separators=(",", ":")).encode("utf-8")
+    position = _pad(stream, position)
+    stream.write(schema)
+    stream.seek(base)
+    stream.write(
+        _HEADER.pack(
+            BINARY_LOG_MAGIC,
+            BINARY_LOG_VERSION,
+            0,
+            rows,
+            len(blocks),
+            position,
+            len(schema),
+        )
+    )
+    stream.seek(base + position + len(schema))
+    stream.flush()
+    return rows
+
+@contextmanager
+def open_binary_log(path: Union[str, Path]) -> Iterator[BinaryLog]:
+    """Memory-map a binary log and read its header and schema.
+
+    Args:
+        path: Binary log file written by write_binary_log()
+
+    Yields:
+        BinaryLog for read_binary_log_block(), iter_binary_log_batches() and
+            binary_log_row()
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    buffer = memoryview(mapped)
+    try:
+        if len(buffer) < _HEADER.size:
+            raise ValueError(f"{path} is too short to be a binary log")
+        header = _HEADER.unpack_from(buffer)
+        magic, version, _, row_count, block_count, schema_offset, schema_length = header
+        if magic != BINARY_LOG_MAGIC:
+            raise ValueError(f"{path} is not a binary log")
+        if version != BINARY_LOG_VERSION:
+            raise ValueError(
+                f"Unsupported binary log version {version} in {path}; "
+                f"expected {BINARY_LOG_VERSION}"
+            )
+        if not schema_offset or schema_offset + schema_length > len(buffer):
+            raise ValueError(f"{path} is truncated or was not finished")
+
+        schema = json.loads(bytes(buffer[schema_offset:schema_offset + schema_length]))
+        if schema["columns"] != BINARY_LOG_COLUMNS:
+            raise ValueError(f"Unsupported binary log columns in {path}")
+        blocks = schema["blocks"]
+        block_starts = list(accumulate((rows for rows, _, _ in blocks), initial=0))[:-1]
+        yield BinaryLog(
+            str(path),
+            buffer,
+            row_count,
+            schema["dictionaries"],
+            schema["constants"],
+            blocks,
+            block_starts,
+        )
+    finally:
+        buffer.release()
+        try:
+            mapped.close()
+        except BufferError:
+            pass  # Batches still reference the map; it closes once they are gone
+
+def _section(log: BinaryLog, offset: int, count: int, typecode: str) -> Any:
+    """Return count integers at offset as a read-only view into the map.
+
+    Big-endian hosts get a byte-swapped copy instead.
+    """
+    view = log.buffer[offset : offset + count * array(typecode).itemsize].cast(typecode)
+    return _little_endian(view, typecode)
+
+def _fresh_constants(constants: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a block's constants so callers never share a headers dict."""
+    return {
+        field: value.copy() if isinstance(value, dict) else value
+        for field, value in constants.items()
+    }
+
+def _read_column(log: BinaryLog, index: int, field: str) -> Any:
+    """Return one stored column of one block.
+
+    Timestamps and request IDs are views into the map, other columns lists of str.
+    """
+    rows, _, sections = log.blocks[index]
+    offset = sections[_COLUMN_INDEX[field]]
+    encoding = BINARY_LOG_COLUMNS[field]
+    if encoding == "int64":
+        return _section(log, offset, rows, "q")
+    if encoding == "uuid":
+        return log.buffer[offset:offset + rows * 16]
+    if encoding == "category":
+        indices = _section(log, offset, rows, "H")
+        return list(map(log.dictionaries[field].__getitem__, indices))
+
+    offsets = _section(log, offset, rows + 1, "I")
+    start = offset + (rows + 1) * 4
+    heap = log.buffer[start:start + offsets[rows]]
+    values = str(heap, "utf-8").split("\0")
+    values.pop()  # Empty remainder after the last terminator
+    if len(values) != rows:  # Some value holds a NUL itself
+        offsets = offsets.tolist()
+        values = [
+            str(heap[begin : end - 1], "utf-8")
+            for begin, end in zip(offsets, offsets[1:])
+        ]
+    return values
+
+def read_binary_log_block(log: BinaryLog, index: int) -> LogBatch:
+    """Return one block of a binary log as a LogBatch.
+
+    Timestamps and request IDs are views into the map; category and
+    string columns are lists of str.
+    """
+    columns = {
+        field: _read_column(log, index, field)
+        for field, encoding in BINARY_LOG_COLUMNS.items()
+        if encoding in ("category", "string")
+    }
+    return LogBatch(
+        _read_column(log, index, "timestamp"),
+        _read_column(log, index, "request_id"),
+        columns,
+        _fresh_constants(log.constants[log.blocks[index][1]]),
+    )
+
+def iter_binary_log_batches(log: BinaryLog) -> Iterator[LogBatch]:
+    """Yield every block of a binary log as a LogBatch, in order."""
+    for index in range(len(log.blocks)):
+        yield read_binary_log_block(log, index)
+
+def iter_binary_log_column(log: BinaryLog, field: str) -> Iterator[Any]:
+    """Yield one field of every block, decoding nothing else.
+
+    Timestamps come as int64 views of epoch microseconds and request IDs
+    as views of packed 16-byte UUIDs, both without copying; other stored
+    fields as lists of str and placeholder fields as their value repeated.
+    """
+    if field not in LOG_ENTRY_FIELDS:
+        raise ValueError(f"Unknown log entry field: {field}")
+    for index, (rows, constants, _) in enumerate(log.blocks):
+        if field in BINARY_LOG_COLUMNS:
+            yield _read_column(log, index, field)
+        else:
+            yield [log.constants[constants][field]] * rows
+
+def iter_binary_log_rows(
+    log: BinaryLog, as_record: bool = False
+) -> Iterator[Union[Dict[str, Any], LogEntry]]:
+    """Yield every row of a binary log as a log entry dictionary or LogEntry."""
+    for batch in iter_binary_log_batches(log):
+        yield from iter_log_batch_rows(batch, as_record)
+
+def binary_log_row(
+    log: BinaryLog, index: int, as_record: bool = False
+) -> Union[Dict[str, Any], LogEntry]:
+    """Return row index of a binary log, decoding only that row.
+
+    Args:
+        log: Open binary log
+        index: Row number; negative numbers count from the end
+        as_record: If True, return a LogEntry record instead of a dict (default: False)
+
+    Returns:
+        The row as generate_log_entry() returns entries
+    """
+    if index < 0:
+        index += log.row_count
+    if not 0 <= index < log.row_count:
+        raise IndexError(f"Row {index} is out of range for {log.row_count} rows")
+
+    block = bisect_right(log.block_starts, index) - 1
+    rows, constants, sections = log.blocks[block]
+    row = index - log.block_starts[block]
+    values = {}
+    for (field, encoding), offset in zip(BINARY_LOG_COLUMNS.items(), sections):
+        if encoding == "int64":
+            micros = _section(log, offset + row * 8, 1, "q")[0]
+            values[field] = micros_to_timestamp(micros)
+        elif encoding == "uuid":
+            start = offset + row * 16
+            values[field] = uuid.UUID(bytes=bytes(log.buffer[start:start + 16]))
+        elif encoding == "category":
+            code = _section(log, offset + row * 2, 1, "H")[0]
+            values[field] = log.dictionaries[field][code]
+        else:
+            begin, end = _section(log, offset + row * 4, 2, "I")
+            heap = offset + (rows + 1) * 4
+            values[field] = str(log.buffer[heap + begin:heap + end - 1], "utf-8")
+    values.update(_fresh_constants(log.constants[constants]))
+    entry = {field: values[field] for field in LOG_ENTRY_FIELDS}
+    return LogEntry(**entry) if as_record else entry
+
+def convert_binary_log(
+    source: Union[str, Path],
+    destination: BinaryIO,
+    format_type: str = "json",
+    compression: Optional[str] = None,
+    compress_threads: Optional[int] = None,
+) -> int:
+    """Write a binary log as JSON, CSV (with header) or log lines.
+
+    Args:
+        source: Binary log file
+        destination: Writable binary stream
+        format_type: Output format ("json", "csv", "log")
+        compression: Compress the output in parallel blocks: "gzip", "bz2" or "xz"
+            (default: None)
+        compress_threads: Compression threads (default: one per CPU)
+
+    Returns:
+        Number of rows converted
+    """
+    with open_binary_log(source) as log:
+        chunks = (
+            format_batch(batch, format_type) for batch in iter_binary_log_batches(log)
+        )
+        if format_type == "csv":
+            chunks = chain([csv_header()], chunks)
+        if compression:
+            write_compressed(chunks, destination, compression, threads=compress_threads)
+        else:
+            for chunk in chunks:
+                destination.write(chunk)
+            destination.flush()
+        return log.row_count
@@ -0,0 +1,147 @@
+"""
+Parallel block compression of output streams.
+
+Output is cut into fixed-size blocks that a thread pool compresses
+independently, pigz-style. Each block becomes a complete gzip member,
+bzip2 stream or xz stream, and their concatenation is a standard
+multi-member file that gunzip, bunzip2, xz and Python's gzip, bz2 and
+lzma modules read back as one. zlib, bz2 and lzma release the GIL while
+compressing, so blocks compress on other cores while the calling thread
+keeps generating.
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+
+# Supported compression formats and their default levels
+COMPRESSION_LEVELS = {
+    "gzip": 6,
+    "bz2": 9,
+    "xz": 6
+}
+
+# Output file suffixes that select a compression format
+COMPRESSION_SUFFIXES = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz"
+}
+
+# Uncompressed bytes per independently compressed block
+COMPRESSION_BLOCK_SIZE = 1 << 20
+
+def infer_compression(path: Union[str, Path]) -> Optional[str]:
+    """Return the compression format implied by a file name's suffix, or None."""
+    return COMPRESSION_SUFFIXES.get(Path(path).suffix.lower())
+
+def compress_block(data: bytes, compression: str, level: Optional[int] = None) -> bytes:
+    """Compress one block into a self-contained gzip member, bzip2 stream or xz stream.
+
+    Args:
+        data: Uncompressed bytes
+        compression: Compression format ("gzip", "bz2", "xz")
+        level: Compression level (default: the format's default)
+
+    Returns:
+        Compressed bytes
+    """
+    if compression not in COMPRESSION_LEVELS:
+        raise ValueError(f"Unsupported compression: {compression}")
+    if level is None:
+        level = COMPRESSION_LEVELS[compression]
+
+    if compression == "gzip":
+        # mtime=0 keeps seeded output reproducible
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if compression == "bz2":
+        return bz2.compress(data, compresslevel=level)
+    return lzma.compress(data, preset=level)
+
+def iter_compressed_blocks(
+    chunks: Iterable[bytes],
+    compression: str,
+    level: Optional[int] = None,
+    threads: Optional[int] = None,
+    block_size: int = COMPRESSION_BLOCK_SIZE,
+) -> Iterator[bytes]:
+    """Regroup chunks into blocks, compress them in a thread pool, yield them in order.
+
+    At most two blocks per thread are in flight, so memory stays bounded
+    when the consumer is slower than the compressors.
+
+    Args:
+        chunks: Iterable of uncompressed byte chunks; consumed lazily
+        compression: Compression format ("gzip", "bz2", "xz")
+        level: Compression level (default: the format's default)
+        threads: Number of compression threads (default: one per CPU)
+        block_size: Uncompressed bytes per block (default: 1 MiB)
+
+    Yields:
+        Compressed blocks; empty input yields one empty archive
+    """
+    if compression not in COMPRESSION_LEVELS:
+        raise ValueError(f"Unsupported compression: {compression}")
+    if block_size <= 0:
+        raise ValueError(f"block_size ({block_size}) must be positive")
+    if threads is None:
+        threads = os.cpu_count() or 1
+    if threads <= 0:
+        raise ValueError(f"threads ({threads}) must be positive")
+
+    buffer = bytearray()
+    emitted = False
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pending = deque()
+        for chunk in chunks:
+            buffer += chunk
+            while len(buffer) >= block_size:
+                pending.append(
+                    executor.submit(
+                        compress_block, bytes(buffer[:block_size]), compression, level
+                    )
+                )
+                del buffer[:block_size]
+                if len(pending) >= threads * 2:
+                    yield pending.popleft().result()
+                    emitted = True
+        if buffer or not (emitted or pending):
+            pending.append(
+                executor.submit(compress_block, bytes(buffer), compression, level)
+            )
+        while pending:
+            yield pending.popleft().result()
+
+def write_compressed(
+    chunks: Iterable[bytes],
+    stream: BinaryIO,
+    compression: str,
+    level: Optional[int] = None,
+    threads: Optional[int] = None,
+    block_size: int = COMPRESSION_BLOCK_SIZE,
+) -> int:
+    """Compress chunks in parallel blocks and write them to a binary stream in order.
+
+    Args:
+        chunks: Iterable of uncompressed byte chunks; consumed lazily
+        stream: Writable binary stream
+        compression: Compression format ("gzip", "bz2", "xz")
+        level: Compression level (default: the format's default)
+        threads: Number of compression threads (default: one per CPU)
+        block_size: Uncompressed bytes per block (default: 1 MiB)
+
+    Returns:
+        Number of compressed bytes written
+    """
+    written = 0
+    blocks = iter_compressed_blocks(chunks, compression, level, threads, block_size)
+    for block in blocks:
+        stream.write(block)
+        written += len(block)
+    stream.flush()
+    return written
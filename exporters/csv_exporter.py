@@ -3,8 +3,19 @@ CSV exporter for fake log entries.
 """
 
 import csv
+import io
 from datetime import datetime
-from typing import Any, Dict, List
+from itertools import chain, islice
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, TextIO, Union
+
+from config import BATCH_SIZE
+from generators.log_batch import (
+    LogBatch,
+    format_request_ids,
+    log_batch_column,
+    log_batch_size,
+)
+from generators.log_entry_factory import LOG_ENTRY_FIELDS
 
 def convert_to_csv_value(value: Any) -> str:
     """Convert any value to CSV-compatible string."""
@@ -17,19 +28,109 @@ def convert_to_csv_value(value: Any) -> str:
     else:
         return str(value)
 
-def export_to_csv(data: List[Dict[str, Any]], filename: str, fieldnames: List[str] = None) -> None:
-    """Export data to CSV file."""
-    if not data:
-        return
+def export_to_csv(
+    data: Iterable[Dict[str, Any]],
+    destination: Union[str, TextIO, BinaryIO],
+    fieldnames: List[str] = None,
+    chunk_size: int = BATCH_SIZE,
+) -> int:
+    """Export data to a CSV file or stream, one chunk of rows at a time.
+    
+    Args:
+        data: Iterable of row dictionaries; consumed lazily
+        destination: File name, or a writable text or binary stream
+            (e.g. sys.stdout.buffer)
+        fieldnames: Column order (default: keys of the first row)
+        chunk_size: Number of rows formatted per write (default: BATCH_SIZE)
+        
+    Returns:
+        Number of rows written; nothing is written, not even a header, for empty data
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size ({chunk_size}) must be positive")
+    
+    rows = iter(data)
+    first = next(rows, None)
+    if first is None:
+        return 0
     
     if fieldnames is None:
-        fieldnames = list(data[0].keys())
+        fieldnames = list(first.keys())
     
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    if isinstance(destination, str):
+        with open(destination, 'w', newline='', encoding='utf-8') as csvfile:
+            return _write_csv_chunks(
+                chain([first], rows), csvfile, fieldnames, chunk_size
+            )
+    return _write_csv_chunks(chain([first], rows), destination, fieldnames, chunk_size)
+
+def _write_csv_chunks(rows: Iterator[Dict[str, Any]], stream: Union[TextIO, BinaryIO],
+                      fieldnames: List[str], chunk_size: int) -> int:
+    """Write the header and then chunks of rows to a text or binary stream."""
+    is_text = isinstance(stream, io.TextIOBase)
+    written = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        text = format_csv_rows(chunk, fieldnames, header=written == 0)
+        stream.write(text if is_text else text.encode("utf-8"))
+        written += len(chunk)
+    stream.flush()
+    return written
+
+def format_csv_rows(
+    data: Iterable[Dict[str, Any]], fieldnames: List[str], header: bool = False
+) -> str:
+    """Return data formatted as CSV text, optionally preceded by a header row."""
+    buffer = io.StringIO(newline='')
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    if header:
         writer.writeheader()
+    
+    for row in data:
+        writer.writerow(
+            {field: convert_to_csv_value(row.get(field, "")) for field in fieldnames}
+        )
+    return buffer.getvalue()
+
+def format_csv_batch(
+    batch: LogBatch, fieldnames: List[str] = None, header: bool = False
+) -> str:
+    """Return a columnar batch formatted as CSV text, converted column by column.
+    
+    Produces the same text as format_csv_rows() on the batch's rows, but
+    placeholder fields are converted once per batch and no row dicts are built.
+    
+    Args:
+        batch: Batch to format
+        fieldnames: Column order (default: LOG_ENTRY_FIELDS)
+        header: If True, start with a header row (default: False)
         
-        for row in data:
-            # Convert all values to CSV-compatible strings
-            csv_row = {field: convert_to_csv_value(row.get(field, "")) for field in fieldnames}
-            writer.writerow(csv_row) 
\ No newline at end of file
+    Returns:
+        CSV text of the batch
+    """
+    if fieldnames is None:
+        fieldnames = LOG_ENTRY_FIELDS
+    size = log_batch_size(batch)
+    
+    columns = []
+    for field in fieldnames:
+        if field in batch.constants:
+            columns.append([convert_to_csv_value(batch.constants[field])] * size)
+        elif field == "request_id":
+            columns.append(format_request_ids(batch.request_ids))
+        elif field == "timestamp" or field in batch.columns:
+            columns.append(
+                list(map(convert_to_csv_value, log_batch_column(batch, field)))
+            )
+        else:
+            # Like row.get(field, "") for fields a batch does not have
+            columns.append([""] * size)
+    
+    buffer = io.StringIO(newline='')
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fieldnames)
+    writer.writerows(zip(*columns))
+    return buffer.getvalue()
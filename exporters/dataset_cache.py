@@ -0,0 +1,521 @@
+"""
+On-disk cache of seeded datasets, keyed by their generation parameters.
+
+Test suites regenerate the same seeded datasets over and over. A cache
+entry is the finished output of one run, named by a SHA-256 of its
+parameters and of the generator version, so a hit is served without
+generating anything:
+
+    <cache_dir>/<key>.data      the output, read-only
+    <cache_dir>/<key>.meta      size and modification time of the output
+    <cache_dir>/<key>.lock      flock() target; its mtime is the last use
+    <cache_dir>/<key>.partial   an entry being filled
+
+Hits are copied to the destination, with sendfile() where possible, or
+hardlinked on request. A hardlinked destination shares the entry's
+inode, so writing to it in place changes the entry; every hit therefore
+checks the entry's size and modification time against its .meta record
+and regenerates an entry that no longer matches. The generator version
+is a digest of this package's source, the Faker version and the cache
+format, so editing any generator invalidates every entry.
+
+Parallel test workers share a cache safely: an entry is filled under an
+exclusive lock and renamed into place when complete, so concurrent
+misses generate it once, and it is served under a shared lock. When a
+fill takes the cache over its size limit, the least recently used
+entries that no process holds are removed.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from itertools import chain
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+import faker
+
+from config import BATCH_SIZE
+from exporters.binary_log import iter_binary_log_rows, open_binary_log, write_binary_log
+from exporters.compression import write_compressed
+from generators import value_pool
+from generators.log_entry_factory import LogEntry
+from generators.random_access import iter_range
+from generators.sharding import (
+    DEFAULT_SHARD_SIZE,
+    csv_header,
+    generate_shard_batch,
+    iter_formatted_chunks,
+    iter_shards,
+    split_shards,
+)
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: entries are still filled atomically, but eviction does not wait
+    # for readers
+    fcntl = None
+
+# Cache layout and key format version; bump when either changes
+DATASET_CACHE_VERSION = 1
+
+# Default limit on the total size of the entries
+DEFAULT_CACHE_SIZE = 4 << 30  # 4 GiB
+
+# Bytes per read when sendfile() is not available
+COPY_BUFFER_SIZE = 1 << 20
+
+_PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+
+def _intact(path: Path, meta_path: Path) -> bool:
+    """Return True if an entry exists with the size and mtime recorded at its fill."""
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        stat = path.stat()
+    except (OSError, ValueError):
+        return False
+    return meta == {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+class CachedDataset(NamedTuple):
+    """A cache entry, held by open_cached_dataset()."""
+    path: Path
+    key: str
+    hit: bool  # False when the entry was generated by this call
+
+@lru_cache(maxsize=None)
+def generator_version() -> str:
+    """Return a digest of the package source, the Faker version and the cache format."""
+    version = f"{DATASET_CACHE_VERSION}:{faker.VERSION}:{sys.version_info[:2]}"
+    digest = hashlib.sha256(version.encode())
+    sources = [
+        _PACKAGE_ROOT / "config.py",
+        *sorted(_PACKAGE_ROOT.glob("generators/*.py")),
+        *sorted(_PACKAGE_ROOT.glob("exporters/*.py")),
+    ]
+    for path in sources:
+        digest.update(path.relative_to(_PACKAGE_ROOT).as_posix().encode() + b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+def dataset_key(params: Mapping[str, Any]) -> str:
+    """Return the cache key: a SHA-256 of the parameters and the generator version.
+
+    Args:
+        params: JSON-serializable generation parameters; datetimes are keyed by their
+            ISO 8601 form
+
+    Returns:
+        64 hex digits
+    """
+    document = json.dumps(
+        {"generator": generator_version(), "params": params},
+        sort_keys=True,
+        default=lambda value: (
+            value.isoformat() if isinstance(value, datetime) else str(value)
+        ),
+    )
+    return hashlib.sha256(document.encode("utf-8")).hexdigest()
+
+@contextmanager
+def _locked(
+    path: Path, exclusive: bool = False, blocking: bool = True
+) -> Iterator[bool]:
+    """Hold a flock() on path, yielding False if a non-blocking attempt found it taken.
+
+    The lock file may be removed by eviction while another process waits
+    on it, so the lock only counts once it is held on the file still at path.
+    """
+    if fcntl is None:
+        yield True
+        return
+
+    mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+    operation = mode | (0 if blocking else fcntl.LOCK_NB)
+    while True:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, operation)
+        except BlockingIOError:
+            os.close(fd)
+            yield False
+            return
+        try:
+            current = os.stat(path).st_ino == os.fstat(fd).st_ino
+        except FileNotFoundError:
+            current = False
+        if current:
+            break
+        os.close(fd)
+
+    try:
+        yield True
+    finally:
+        os.close(fd)  # Releases the lock
+
+@contextmanager
+def open_cached_dataset(
+    cache_dir: Union[str, Path],
+    params: Mapping[str, Any],
+    write: Callable[[BinaryIO], Any],
+    max_size: Optional[int] = DEFAULT_CACHE_SIZE,
+) -> Iterator[CachedDataset]:
+    """Hold the cache entry for params, generating it with write() on a miss.
+
+    Inside the block the entry file is locked against eviction. A fill
+    holds the entry exclusively, so parallel misses for the same key wait
+    for the first one and then read its result.
+
+    Args:
+        cache_dir: Cache directory, created if missing
+        params: Generation parameters, see dataset_key()
+        write: Writes the dataset to the binary stream it is given
+        max_size: Evict least recently used entries beyond this many bytes after a fill
+            (None: never)
+
+    Yields:
+        The entry; its file is read-only
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    key = dataset_key(params)
+    path = cache_dir / f"{key}.data"
+    meta_path = cache_dir / f"{key}.meta"
+    lock_path = cache_dir / f"{key}.lock"
+
+    with _locked(lock_path):
+        if _intact(path, meta_path):
+            os.utime(lock_path)
+            yield CachedDataset(path, key, True)
+            return
+
+    with _locked(lock_path, exclusive=True):
+        # Filled by another process while this one waited
+        hit = _intact(path, meta_path)
+        if not hit:
+            partial = cache_dir / f"{key}.partial"
+            try:
+                with open(partial, "wb") as f:
+                    write(f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.chmod(partial, 0o444)
+                # A damaged entry keeps its inode, and its content, for the links to it
+                os.replace(partial, path)
+            except BaseException:
+                partial.unlink(missing_ok=True)
+                raise
+            stat = path.stat()
+            staged_meta = cache_dir / f"{key}.tmp"
+            with open(staged_meta, "w", encoding="utf-8") as f:
+                json.dump({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}, f)
+            os.replace(staged_meta, meta_path)
+        os.utime(lock_path)
+        yield CachedDataset(path, key, hit)
+
+    if not hit and max_size is not None:
+        evict_dataset_cache(cache_dir, max_size)
+
+def copy_file_to_stream(path: Union[str, Path], stream: BinaryIO) -> int:
+    """Copy a file to a binary stream.
+
+    The copy runs in the kernel with sendfile() when the stream has a file
+    descriptor.
+
+    Returns:
+        Number of bytes copied
+    """
+    stream.flush()
+    with open(path, "rb") as source:
+        size = os.fstat(source.fileno()).st_size
+        copied = 0
+        try:
+            out_fd = stream.fileno()
+        except OSError:  # io.UnsupportedOperation for in-memory streams
+            out_fd = None
+        if out_fd is not None and hasattr(os, "sendfile"):
+            try:
+                while copied < size:
+                    sent = os.sendfile(out_fd, source.fileno(), copied, size - copied)
+                    if not sent:
+                        break
+                    copied += sent
+            except OSError:
+                if copied:
+                    raise
+        if copied < size:  # No sendfile() for this stream or platform
+            source.seek(copied)
+            shutil.copyfileobj(source, stream, COPY_BUFFER_SIZE)
+            stream.flush()
+    return size
+
+def _serve(path: Path, destination: Union[str, Path, BinaryIO], link: bool) -> None:
+    """Hardlink or copy a cache entry to a path, atomically, or copy it to a stream."""
+    if not isinstance(destination, (str, Path)):
+        copy_file_to_stream(path, destination)
+        return
+
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    staged = destination.with_name(f".{destination.name}.{os.getpid()}.tmp")
+    try:
+        if link:
+            try:
+                os.link(path, staged)
+            except OSError:  # Another file system, or one without hardlinks
+                link = False
+        if not link:
+            with open(staged, "wb") as f:
+                copy_file_to_stream(path, f)
+        os.replace(staged, destination)
+    finally:
+        # Left behind when destination already was a link to the entry
+        staged.unlink(missing_ok=True)
+
+def fetch_dataset(
+    cache_dir: Union[str, Path],
+    params: Mapping[str, Any],
+    write: Callable[[BinaryIO], Any],
+    destination: Union[str, Path, BinaryIO],
+    max_size: Optional[int] = DEFAULT_CACHE_SIZE,
+    link: bool = False,
+) -> bool:
+    """Write the dataset for params to destination, from the cache or generated into it.
+
+    Args:
+        cache_dir: Cache directory, created if missing
+        params: Generation parameters, see dataset_key()
+        write: Writes the dataset to the binary stream it is given
+        destination: File path, replaced atomically, or writable binary stream
+        max_size: Evict least recently used entries beyond this many bytes after a fill
+            (None: never)
+        link: Hardlink the entry to a destination path instead of copying it. The
+            link is read-only and shares the entry's inode: writing to it in place
+            damages the entry, which the next hit then regenerates
+
+    Returns:
+        True on a cache hit
+    """
+    with open_cached_dataset(cache_dir, params, write, max_size) as cached:
+        _serve(cached.path, destination, link)
+        return cached.hit
+
+def evict_dataset_cache(cache_dir: Union[str, Path], max_size: int) -> int:
+    """Remove least recently used entries until the cache holds at most max_size bytes.
+
+    Entries held by another process are skipped, as are the files of
+    fills in progress; files left behind by interrupted fills are removed.
+
+    Returns:
+        Number of bytes freed
+    """
+    cache_dir = Path(cache_dir)
+    freed = 0
+    with _locked(cache_dir / ".evict.lock", exclusive=True):
+        entries = []
+        for path in chain(cache_dir.glob("*.data"), cache_dir.glob("*.partial")):
+            lock_path = path.with_suffix(".lock")
+            try:
+                used = lock_path.stat().st_mtime if path.suffix == ".data" else 0.0
+                entries.append((used, path.stat().st_size, path, lock_path))
+            except FileNotFoundError:
+                continue  # Evicted or renamed meanwhile
+
+        total = sum(size for _, size, path, _ in entries if path.suffix == ".data")
+        for _, size, path, lock_path in sorted(entries, key=lambda entry: entry[0]):
+            if path.suffix == ".data" and total <= max_size:
+                continue
+            with _locked(lock_path, exclusive=True, blocking=False) as held:
+                if not held:
+                    continue
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    continue
+                if path.suffix == ".data":
+                    path.with_suffix(".meta").unlink(missing_ok=True)
+                lock_path.unlink(missing_ok=True)
+            freed += size
+            if path.suffix == ".data":
+                total -= size
+    return freed
+
+def _value_pools_digest() -> Optional[str]:
+    """Return a digest of the active value pools and settings, or None without pools."""
+    if not value_pool.pools_enabled():
+        return None
+    document = json.dumps(value_pool.get_pool_state(), sort_keys=True).encode()
+    return hashlib.sha256(document).hexdigest()
+
+def _log_params(
+    dataset: str,
+    count: int,
+    seed: int,
+    start_date: datetime,
+    end_date: datetime,
+    **params: Any,
+) -> Dict[str, Any]:
+    """Return the cache parameters of a seeded log dataset."""
+    if count <= 0:
+        raise ValueError(f"count ({count}) must be positive")
+    if end_date <= start_date:
+        raise ValueError(
+            f"end_date ({end_date}) must be after start_date ({start_date})"
+        )
+    return {
+        "dataset": dataset,
+        "count": count,
+        "seed": seed,
+        "start_date": start_date,
+        "end_date": end_date,
+        **params,
+    }
+
+def cached_log_file(
+    cache_dir: Union[str, Path],
+    destination: Union[str, Path, BinaryIO],
+    count: int,
+    seed: int,
+    start_date: datetime,
+    end_date: datetime,
+    format_type: str = "json",
+    offset: Optional[int] = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    compression: Optional[str] = None,
+    workers: int = 1,
+    compress_threads: Optional[int] = None,
+    max_size: Optional[int] = DEFAULT_CACHE_SIZE,
+    link: bool = False,
+) -> bool:
+    """Write the output of a seeded run, from the cache if it was generated before.
+
+    The output is the same as generate_logs.py with --seed: sharded
+    generation, or the counter-based dataset with an offset. Dates are
+    required because the default range moves with the clock. The number
+    of workers and compression threads does not change the output, so it
+    is not part of the key; active value pools (see value_pool) are.
+
+    Args:
+        cache_dir: Cache directory, created if missing
+        destination: File path, replaced atomically, or writable binary stream
+        count: Number of log entries
+        seed: Seed of the run
+        start_date: Start of the timestamp range
+        end_date: End of the timestamp range
+        format_type: Output format ("json", "csv", "log")
+        offset: Emit entries offset..offset+count of the counter-based dataset
+            (default: sharded generation)
+        shard_size: Number of entries per shard of sharded generation
+        compression: Compress the output in parallel blocks: "gzip", "bz2" or "xz"
+            (default: None)
+        workers: Worker processes generating shards on a miss
+        compress_threads: Compression threads on a miss (default: one per CPU)
+        max_size: Evict least recently used entries beyond this many bytes after a fill
+            (None: never)
+        link: Hardlink the entry to a destination path instead of copying it, see
+            fetch_dataset()
+
+    Returns:
+        True on a cache hit
+    """
+    params = _log_params(
+        "log_file",
+        count,
+        seed,
+        start_date,
+        end_date,
+        format=format_type,
+        offset=offset,
+        shard_size=shard_size if offset is None else None,
+        compression=compression,
+        value_pools=_value_pools_digest() if offset is None else None,
+    )
+
+    def write(stream: BinaryIO) -> None:
+        if offset is None:
+            chunks = iter_shards(
+                count, format_type, workers, seed, shard_size, start_date, end_date
+            )
+        else:
+            chunks = iter_formatted_chunks(
+                iter_range(offset, offset + count, seed, start_date, end_date),
+                format_type,
+                BATCH_SIZE,
+            )
+        if format_type == "csv":
+            chunks = chain([csv_header()], chunks)
+        if compression:
+            write_compressed(chunks, stream, compression, threads=compress_threads)
+        else:
+            for chunk in chunks:
+                stream.write(chunk)
+
+    return fetch_dataset(cache_dir, params, write, destination, max_size, link)
+
+def cached_log_entries(
+    cache_dir: Union[str, Path],
+    count: int,
+    seed: int,
+    start_date: datetime,
+    end_date: datetime,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    as_record: bool = False,
+    max_size: Optional[int] = DEFAULT_CACHE_SIZE,
+) -> list[Union[Dict[str, Any], LogEntry]]:
+    """Return the entries of a seeded sharded run, kept in the cache as a binary log.
+
+    The entries are those generate_logs.py writes with --seed, drawn from
+    the active value pools if any (they are part of the key). They are
+    read back through a memory map rather than generated again.
+
+    Args:
+        cache_dir: Cache directory, created if missing
+        count: Number of log entries
+        seed: Seed of the run
+        start_date: Start of the timestamp range
+        end_date: End of the timestamp range
+        shard_size: Number of entries per shard
+        as_record: If True, return compact LogEntry records instead of dicts
+            (default: False)
+        max_size: Evict least recently used entries beyond this many bytes after a fill
+            (None: never)
+
+    Returns:
+        List of log entry dictionaries (or LogEntry records)
+    """
+    params = _log_params(
+        "log_entries",
+        count,
+        seed,
+        start_date,
+        end_date,
+        shard_size=shard_size,
+        value_pools=_value_pools_digest(),
+    )
+
+    def write(stream: BinaryIO) -> None:
+        batches = (
+            generate_shard_batch(shard_index, size, seed, start_date, end_date)
+            for shard_index, size in split_shards(count, shard_size)
+        )
+        write_binary_log(batches, stream)
+
+    with open_cached_dataset(cache_dir, params, write, max_size) as cached:
+        with open_binary_log(cached.path) as log:
+            return list(iter_binary_log_rows(log, as_record))
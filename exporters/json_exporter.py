@@ -0,0 +1,136 @@
+"""
+JSON-lines exporter for fake log entries.
+
+Produces exactly the bytes of format_log_entry_as_string(entry, "json"),
+i.e. json.dumps() with its default separators and ensure_ascii, without
+copying each entry first. When orjson is installed it encodes every
+entry it is known to render identically once its indented layout is
+folded onto one line; every other entry goes through one reused stdlib
+encoder.
+"""
+
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, Iterable, Mapping, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional accelerated backend; the stdlib encoder is the fallback
+    orjson = None
+
+# Name of the backend used for entries it can encode byte-identically
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+# Value types orjson renders like json.dumps() once its separators are widened
+_ORJSON_TYPES = frozenset([str, int, bool, type(None), uuid.UUID, datetime, dict])
+_ORJSON_OPTIONS = orjson.OPT_INDENT_2 if orjson is not None else 0
+
+def _json_default(value: Any) -> str:
+    """Render datetimes and UUIDs the way format_log_entry_as_string() does."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+# One encoder for every line instead of a dict copy and json.dumps() per entry
+_STDLIB_ENCODER = json.JSONEncoder(default=_json_default)
+
+def _isoformat_matches(value: datetime) -> bool:
+    """Return True if orjson formats the datetime exactly as isoformat() does.
+
+    The two differ only for UTC offsets that are not whole minutes.
+    """
+    tzinfo = value.tzinfo
+    if tzinfo is None or tzinfo is timezone.utc:
+        return True
+    offset = value.utcoffset()
+    return offset is None or (offset.seconds % 60 == 0 and not offset.microseconds)
+
+def _encode_orjson(log_entry: Dict[str, Any]) -> Optional[bytes]:
+    """Return the entry encoded with orjson, or None if json.dumps() could differ."""
+    if not log_entry:
+        return None
+    for value in log_entry.values():
+        value_type = type(value)
+        if value_type not in _ORJSON_TYPES:
+            return None
+        if value_type is datetime and not _isoformat_matches(value):
+            return None
+        # Nested objects are left to the stdlib encoder
+        if value_type is dict and value:
+            return None
+    try:
+        line = orjson.dumps(log_entry, option=_ORJSON_OPTIONS)
+    except TypeError:
+        # orjson.JSONEncodeError, e.g. non-str keys or ints beyond 64 bits
+        return None
+    # ensure_ascii escapes non-ASCII and DEL, orjson does not. Without escapes
+    # every quote delimits a string and every newline is indentation, so the
+    # indented output folds into the json.dumps() layout by plain replacement.
+    if not line.isascii() or b"\\" in line or b"\x7f" in line:
+        return None
+    return b"{" + line[4:-2].replace(b",\n  ", b", ") + b"}"
+
+def encode_json_line(log_entry: Mapping[str, Any]) -> bytes:
+    """Return a log entry (dict or LogEntry record) as one JSON object, no newline."""
+    if type(log_entry) is not dict:
+        log_entry = dict(log_entry)
+    if orjson is not None:
+        line = _encode_orjson(log_entry)
+        if line is not None:
+            return line
+    return _STDLIB_ENCODER.encode(log_entry).encode("ascii")
+
+def encode_json_lines(
+    log_entries: Iterable[Mapping[str, Any]], buffer: Optional[bytearray] = None
+) -> bytearray:
+    """Encode log entries as newline-terminated JSON lines into a buffer.
+
+    Args:
+        log_entries: Iterable of log entry dictionaries
+        buffer: Buffer to reuse across batches; it is cleared first
+            (default: new buffer)
+
+    Returns:
+        The buffer holding the encoded lines
+    """
+    if buffer is None:
+        buffer = bytearray()
+    else:
+        buffer.clear()
+
+    for log_entry in log_entries:
+        buffer += encode_json_line(log_entry)
+        buffer += b"\n"
+    return buffer
+
+def write_json_lines(
+    log_entries: Iterable[Mapping[str, Any]], stream: BinaryIO, chunk_size: int = 1000
+) -> int:
+    """Stream log entries to a binary stream as JSON lines, chunk_size lines per write.
+
+    Returns:
+        Number of lines written
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size ({chunk_size}) must be positive")
+
+    buffer = bytearray()
+    pending = 0
+    written = 0
+    for log_entry in log_entries:
+        buffer += encode_json_line(log_entry)
+        buffer += b"\n"
+        pending += 1
+        if pending == chunk_size:
+            stream.write(buffer)
+            buffer.clear()
+            written += pending
+            pending = 0
+    if pending:
+        stream.write(buffer)
+        written += pending
+    stream.flush()
+    return written
@@ -0,0 +1,412 @@
+"""
+Asynchronous network sinks for pushing log lines into collectors.
+
+Log lines are sent to a URL instead of a file:
+
+    syslog+udp://host:514    RFC 5424 syslog, one message per datagram
+    syslog+tcp://host:514    RFC 5424 syslog with octet-counted framing (RFC 6587)
+    tcp://host:port          Newline-delimited lines over TCP
+    unix:///path/to.sock     Newline-delimited lines over a Unix domain socket
+    http://host:port/path    HTTP POST of NDJSON batches (https:// too)
+
+Messages are grouped into batches of up to batch_size messages. A batch
+is sent when it is full, or once linger seconds have passed since its
+first message. Up to in_flight batches are sent concurrently over a pool
+of at most connections reused connections. A failed batch is resent on a
+fresh connection after an exponential backoff with jitter, so every
+failure that is detected (a connection error, HTTP 429 or 5xx) leads to
+redelivery. Over raw TCP and UDP, data already handed to the kernel when
+a connection resets can still be lost. Batches sent concurrently can
+arrive out of order.
+The event loop only does I/O. Messages are generated on a worker thread,
+so generation and sending overlap.
+"""
+
+import asyncio
+import random
+import time
+from typing import AsyncIterable, AsyncIterator, Iterable, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from generators.log_batch import LogBatch
+from generators.sharding import format_batch
+
+# Supported URL schemes and their default ports
+SINK_SCHEMES = {
+    "syslog+udp": 514,
+    "syslog+tcp": 514,
+    "tcp": None,
+    "unix": None,
+    "http": 80,
+    "https": 443
+}
+
+# Default batching, concurrency and retry settings
+SINK_BATCH_SIZE = 500  # Messages per batch
+SINK_LINGER = 0.05  # Seconds a partial batch waits for more messages
+SINK_IN_FLIGHT = 4  # Batches being sent at once
+SINK_CONNECTIONS = 2  # Open connections per sink
+SINK_RETRIES = 5  # Resends of a failed batch before giving up
+SINK_BACKOFF = 0.1  # Seconds before the first resend; doubles every attempt
+SINK_MAX_BACKOFF = 5.0
+SINK_TIMEOUT = 10.0  # Seconds allowed to connect or to send one batch
+
+# RFC 5424 severities by log level, and the default facility (local0)
+SYSLOG_SEVERITIES = {"ERROR": 3, "WARN": 4, "INFO": 6, "DEBUG": 7}
+SYSLOG_FACILITY = 16
+
+# Failures that are retried on a fresh connection
+_RETRYABLE_ERRORS = (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError)
+
+# Private RNG for backoff jitter, so sending never disturbs seeded generation
+_jitter = random.Random()
+
+class SinkTarget(NamedTuple):
+    """Parsed sink URL."""
+    scheme: str  # One of SINK_SCHEMES
+    host: Optional[str]
+    port: Optional[int]
+    path: str  # Socket path for unix://, request path for http(s)://
+
+def parse_sink_url(url: str) -> SinkTarget:
+    """Parse and validate a sink URL such as syslog+tcp://collector:514."""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in SINK_SCHEMES:
+        schemes = ", ".join(SINK_SCHEMES)
+        raise ValueError(
+            f"Unsupported sink URL scheme in {url!r}; use one of {schemes}"
+        )
+
+    if scheme == "unix":
+        if not parts.path:
+            raise ValueError(f"A unix:// sink needs a socket path, got {url!r}")
+        return SinkTarget(scheme, None, None, parts.path)
+
+    port = parts.port or SINK_SCHEMES[scheme]
+    if not parts.hostname or port is None:
+        raise ValueError(f"A {scheme}:// sink needs a host and port, got {url!r}")
+    path = parts.path or "/"
+    if parts.query:
+        path += f"?{parts.query}"
+    return SinkTarget(scheme, parts.hostname, port, path)
+
+def format_syslog_message(
+    message: bytes,
+    timestamp: str,
+    log_level: str,
+    hostname: str = "-",
+    app_name: str = "-",
+    facility: int = SYSLOG_FACILITY,
+) -> bytes:
+    """Return an RFC 5424 syslog message carrying one log line.
+
+    Args:
+        message: Log line used as the MSG part
+        timestamp: RFC 3339 UTC timestamp, e.g. 2024-01-01T12:00:00.000000Z
+        log_level: Log level, mapped to the syslog severity (unknown levels are notice)
+        hostname: HOSTNAME field (default: "-", nil)
+        app_name: APP-NAME field (default: "-", nil)
+        facility: Syslog facility (default: 16, local0)
+
+    Returns:
+        "<PRI>1 TIMESTAMP HOSTNAME APP-NAME - - - MSG" as bytes
+    """
+    priority = facility * 8 + SYSLOG_SEVERITIES.get(log_level, 5)
+    return b"<%d>1 %s %s %s - - - %s" % (
+        priority,
+        timestamp.encode(),
+        hostname.encode(),
+        app_name.encode(),
+        message,
+    )
+
+def syslog_messages(
+    batch: LogBatch,
+    format_type: str = "json",
+    hostname: str = "-",
+    app_name: Optional[str] = None,
+    facility: int = SYSLOG_FACILITY,
+) -> list[bytes]:
+    """Return one RFC 5424 message per batch row, with the row's timestamp and level.
+
+    app_name defaults to the batch's service_name.
+    """
+    lines = format_batch(batch, format_type).splitlines()
+    app_name = app_name or str(batch.constants.get("service_name", "-"))
+    seconds_cache = {}
+    messages = []
+    levels = batch.columns["log_level"]
+    for line, micros, log_level in zip(lines, batch.timestamps, levels):
+        seconds, fraction = divmod(micros, 1000000)
+        prefix = seconds_cache.get(seconds)
+        if prefix is None:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+            seconds_cache[seconds] = prefix
+        timestamp = f"{prefix}.{fraction:06d}Z"
+        messages.append(
+            format_syslog_message(
+                line, timestamp, log_level, hostname, app_name, facility
+            )
+        )
+    return messages
+
+def sink_messages(
+    batch: LogBatch, target: SinkTarget, format_type: str = "json"
+) -> list[bytes]:
+    """Return the messages for one batch: syslog for syslog sinks, else plain lines."""
+    if target.scheme.startswith("syslog"):
+        return syslog_messages(batch, format_type)
+    return format_batch(batch, format_type).splitlines()
+
+def frame_messages(messages: list[bytes], target: SinkTarget) -> bytes:
+    """Frame a batch for a stream sink: octet counting for syslog, else newlines."""
+    if target.scheme == "syslog+tcp":
+        return b"".join(b"%d %s" % (len(message), message) for message in messages)
+    return b"".join(message + b"\n" for message in messages)
+
+def _http_request(messages: list[bytes], target: SinkTarget) -> bytes:
+    """Return an HTTP/1.1 POST of a batch as NDJSON."""
+    body = frame_messages(messages, target)
+    default_port = SINK_SCHEMES[target.scheme]
+    host = target.host
+    if target.port != default_port:
+        host = f"{target.host}:{target.port}"
+    head = (
+        f"POST {target.path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/x-ndjson\r\nContent-Length: {len(body)}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+async def _read_http_response(reader: asyncio.StreamReader) -> tuple[int, bool]:
+    """Read one HTTP response; return its status and whether the connection stays up."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed before the HTTP response")
+    status = int(status_line.split(None, 2)[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            # Chunk and its CRLF; the last chunk is empty
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    else:
+        await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers.get("connection", "").lower() != "close"
+
+async def _open_connection(target: SinkTarget, timeout: float) -> tuple:
+    """Open a connection to a sink: (reader, writer), or (None, transport) for UDP."""
+    if target.scheme == "syslog+udp":
+        loop = asyncio.get_running_loop()
+        transport, _ = await asyncio.wait_for(
+            loop.create_datagram_endpoint(
+                asyncio.DatagramProtocol, remote_addr=(target.host, target.port)
+            ),
+            timeout,
+        )
+        return None, transport
+    if target.scheme == "unix":
+        return await asyncio.wait_for(
+            asyncio.open_unix_connection(target.path), timeout
+        )
+    https = target.scheme == "https"
+    connect = asyncio.open_connection(target.host, target.port, ssl=https)
+    return await asyncio.wait_for(connect, timeout)
+
+def _close_connection(connection: tuple) -> None:
+    """Close a connection without waiting for it."""
+    connection[1].close()
+
+async def _send_on_connection(
+    connection: tuple, messages: list[bytes], target: SinkTarget, timeout: float
+) -> bool:
+    """Send one batch on an open connection; return whether it can be reused."""
+    reader, writer = connection
+    if target.scheme == "syslog+udp":
+        for message in messages:
+            writer.sendto(message)
+        return True
+
+    if target.scheme in ("http", "https"):
+        writer.write(_http_request(messages, target))
+        await asyncio.wait_for(writer.drain(), timeout)
+        status, keep_alive = await asyncio.wait_for(
+            _read_http_response(reader), timeout
+        )
+        if status == 429 or status >= 500:
+            raise ConnectionError(f"HTTP {status} from the sink")
+        if status >= 300:
+            raise ValueError(f"HTTP {status} from the sink; the batch was rejected")
+        return keep_alive
+
+    writer.write(frame_messages(messages, target))
+    await asyncio.wait_for(writer.drain(), timeout)
+    return True
+
+def _backoff(
+    attempt: int, base: float = SINK_BACKOFF, limit: float = SINK_MAX_BACKOFF
+) -> float:
+    """Return the jittered delay before resend number attempt (1-based)."""
+    return min(limit, base * 2 ** (attempt - 1)) * _jitter.uniform(0.5, 1.0)
+
+async def _send_batch(
+    messages: list[bytes],
+    target: SinkTarget,
+    idle: list,
+    slots: asyncio.Semaphore,
+    retries: int,
+    backoff: float,
+    timeout: float,
+) -> None:
+    """Send a batch on a pooled connection, reconnecting with backoff when it fails."""
+    async with slots:
+        connection = idle.pop() if idle else None
+        attempt = 0
+        while True:
+            try:
+                if connection is None:
+                    connection = await _open_connection(target, timeout)
+                if await _send_on_connection(connection, messages, target, timeout):
+                    idle.append(connection)
+                else:
+                    _close_connection(connection)
+                return
+            except _RETRYABLE_ERRORS:
+                if connection is not None:
+                    _close_connection(connection)
+                    connection = None
+                attempt += 1
+                if attempt > retries:
+                    raise
+                await asyncio.sleep(_backoff(attempt, backoff))
+            except BaseException:
+                if connection is not None:
+                    _close_connection(connection)
+                raise
+
+async def send_message_chunks_async(
+    chunks: AsyncIterable[list[bytes]],
+    target: SinkTarget,
+    batch_size: int = SINK_BATCH_SIZE,
+    linger: float = SINK_LINGER,
+    in_flight: int = SINK_IN_FLIGHT,
+    connections: int = SINK_CONNECTIONS,
+    retries: int = SINK_RETRIES,
+    backoff: float = SINK_BACKOFF,
+    timeout: float = SINK_TIMEOUT,
+) -> int:
+    """Send chunks of messages to a sink in batches.
+
+    Args:
+        chunks: Async iterable of message lists, e.g. one list per LogBatch
+        target: Parsed sink URL
+        batch_size: Maximum messages per batch (default: 500)
+        linger: Seconds a partial batch waits for more messages before it is sent
+            (default: 0.05)
+        in_flight: Maximum batches being sent concurrently (default: 4)
+        connections: Maximum open connections (default: 2)
+        retries: Resends of a failed batch before the error is raised (default: 5)
+        backoff: Seconds before the first resend, doubling per attempt with jitter
+            (default: 0.1)
+        timeout: Seconds allowed to connect or to send one batch (default: 10)
+
+    Returns:
+        Number of messages sent
+    """
+    if batch_size <= 0 or in_flight <= 0 or connections <= 0:
+        raise ValueError(
+            f"batch_size ({batch_size}), in_flight ({in_flight}) "
+            f"and connections ({connections}) must be positive"
+        )
+    if linger < 0 or retries < 0:
+        raise ValueError(
+            f"linger ({linger}) and retries ({retries}) cannot be negative"
+        )
+
+    idle = []
+    slots = asyncio.Semaphore(connections)
+    flights = asyncio.Semaphore(in_flight)
+    tasks = set()
+    sent = 0
+
+    async def dispatch(batch: list[bytes]) -> None:
+        nonlocal sent
+        await flights.acquire()
+        for task in [task for task in tasks if task.done()]:
+            tasks.discard(task)
+            task.result()  # Raises the error of a batch that failed for good
+        task = asyncio.ensure_future(
+            _send_batch(batch, target, idle, slots, retries, backoff, timeout)
+        )
+        task.add_done_callback(lambda _: flights.release())
+        tasks.add(task)
+        sent += len(batch)
+
+    source = chunks.__aiter__()
+    batch = []
+    deadline = None
+    next_chunk = asyncio.ensure_future(source.__anext__())
+    try:
+        while True:
+            wait = None
+            if deadline is not None:
+                wait = max(0.0, deadline - asyncio.get_running_loop().time())
+            done, _ = await asyncio.wait({next_chunk}, timeout=wait)
+            if not done:
+                await dispatch(batch)  # Lingered long enough
+                batch, deadline = [], None
+                continue
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                break
+            next_chunk = asyncio.ensure_future(source.__anext__())
+
+            for message in chunk:
+                if not batch:
+                    deadline = asyncio.get_running_loop().time() + linger
+                batch.append(message)
+                if len(batch) >= batch_size:
+                    await dispatch(batch)
+                    batch, deadline = [], None
+        if batch:
+            await dispatch(batch)
+        await asyncio.gather(*tasks)
+    finally:
+        next_chunk.cancel()
+        for task in tasks:
+            task.cancel()
+        for connection in idle:
+            _close_connection(connection)
+    return sent
+
+async def _iter_in_thread(chunks: Iterable[list[bytes]]) -> AsyncIterator[list[bytes]]:
+    """Pull chunks from a blocking iterable on a worker thread, so sending goes on."""
+    iterator = iter(chunks)
+    done = object()
+    while True:
+        chunk = await asyncio.to_thread(next, iterator, done)
+        if chunk is done:
+            return
+        yield chunk
+
+def send_message_chunks(chunks: Iterable[list[bytes]], url: str, **options) -> int:
+    """Send chunks of messages to the sink at url and return the number sent.
+
+    Chunks are produced on a worker thread while earlier batches are being
+    sent. options are those of send_message_chunks_async().
+    """
+    target = parse_sink_url(url)
+    return asyncio.run(
+        send_message_chunks_async(_iter_in_thread(chunks), target, **options)
+    )
@@ -0,0 +1,279 @@
+"""
+Apache Parquet exporter for fake log entries.
+
+Entries are converted to Arrow record batches and written as fixed-size
+row groups while they stream in, so memory is bounded by one row group.
+Timestamps keep their native type (microseconds, UTC), request IDs are
+stored as 16-byte UUIDs, header dicts as JSON and low-cardinality columns
+are dictionary encoded. Requires pyarrow.
+"""
+
+import json
+import uuid
+from itertools import islice
+from typing import Any, BinaryIO, Iterable, List, Mapping, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency; only Parquet export needs it
+    pa = None
+    pq = None
+
+from generators.core_generators import API_PATHS
+from generators.log_batch import LogBatch, log_batch_size
+from generators.log_entry_factory import LOG_ENTRY_FIELDS
+
+# Rows per Parquet row group, the unit of buffering and of parallel reads
+PARQUET_ROW_GROUP_SIZE = 100000
+
+# Page compression codec
+PARQUET_COMPRESSION = "zstd"
+
+# Columns of a Parquet file: every log entry field plus the path's template
+PARQUET_COLUMNS = (
+    LOG_ENTRY_FIELDS[: LOG_ENTRY_FIELDS.index("path") + 1]
+    + ["path_template"]
+    + LOG_ENTRY_FIELDS[LOG_ENTRY_FIELDS.index("path") + 1 :]
+)
+
+# Low-cardinality columns, stored dictionary encoded
+DICTIONARY_COLUMNS = [
+    "log_level",
+    "method",
+    "path_template",
+    "protocol",
+    "service_name",
+    "env",
+]
+
+# Dict-valued columns, stored as JSON text
+JSON_COLUMNS = ["request_headers", "response_headers"]
+
+# Integer columns
+INTEGER_COLUMNS = ["status_code", "response_time_ms"]
+
+# API paths without an ID, and the parents of the /{id} paths whose {id}
+# generate_path() fills with a number, a UUID or a slug
+_STATIC_PATHS = frozenset(path for path in API_PATHS if "{id}" not in path)
+_ID_PATH_PARENTS = frozenset(
+    path[: -len("/{id}")] for path in API_PATHS if path.endswith("/{id}")
+)
+
+def require_pyarrow() -> None:
+    """Raise ImportError with install instructions if pyarrow is missing."""
+    if pa is None:
+        raise ImportError(
+            "Parquet export requires pyarrow; install it with: pip install pyarrow"
+        )
+
+def get_parquet_schema() -> "pa.Schema":
+    """Return the Arrow schema of exported log entries."""
+    require_pyarrow()
+    # Older pyarrow versions lack the UUID and JSON extension types
+    uuid_type = pa.uuid() if hasattr(pa, "uuid") else pa.binary(16)
+    json_type = pa.json_() if hasattr(pa, "json_") else pa.string()
+
+    types = {"timestamp": pa.timestamp("us", tz="UTC"), "request_id": uuid_type}
+    types.update((column, json_type) for column in JSON_COLUMNS)
+    types.update((column, pa.int32()) for column in INTEGER_COLUMNS)
+    types.update(
+        (column, pa.dictionary(pa.int32(), pa.string()))
+        for column in DICTIONARY_COLUMNS
+    )
+    return pa.schema(
+        [(column, types.get(column, pa.string())) for column in PARQUET_COLUMNS]
+    )
+
+def path_template(path: str) -> str:
+    """Return the API_PATHS template of a path, e.g. /api/v1/users/{id}.
+
+    Paths matching no template are returned unchanged.
+    """
+    if path in _STATIC_PATHS:
+        return path
+    parent, _, _ = path.rpartition("/")
+    if parent in _ID_PATH_PARENTS:
+        return f"{parent}/{{id}}"
+    return path
+
+def _to_arrow(values: list, arrow_type: "pa.DataType") -> "pa.Array":
+    """Convert a column of plain Python values to an Arrow array of the given type."""
+    if isinstance(arrow_type, pa.DictionaryType):
+        return pa.array(values, arrow_type.value_type).dictionary_encode()
+    if isinstance(arrow_type, pa.ExtensionType):
+        return pa.ExtensionArray.from_storage(
+            arrow_type, pa.array(values, arrow_type.storage_type)
+        )
+    return pa.array(values, arrow_type)
+
+def _uuid_bytes(value: Union[uuid.UUID, str, None]) -> Union[bytes, None]:
+    """Return a UUID (object or string) as 16 bytes."""
+    if value is None:
+        return None
+    if isinstance(value, uuid.UUID):
+        return value.bytes
+    return uuid.UUID(value).bytes
+
+def _json_text(value: Any) -> Union[str, None]:
+    """Return a JSON column value as JSON text."""
+    return None if value is None else json.dumps(value, default=str)
+
+def entries_to_record_batch(entries: List[Mapping[str, Any]]) -> "pa.RecordBatch":
+    """Convert log entry dictionaries (or LogEntry records) to one Arrow record batch.
+
+    Fields an entry does not have are null.
+    """
+    schema = get_parquet_schema()
+    paths = [entry.get("path") for entry in entries]
+    arrays = []
+    for field in schema:
+        if field.name == "path_template":
+            values = [None if path is None else path_template(path) for path in paths]
+        elif field.name == "path":
+            values = paths
+        elif field.name == "request_id":
+            values = [_uuid_bytes(entry.get("request_id")) for entry in entries]
+        elif field.name in JSON_COLUMNS:
+            values = [_json_text(entry.get(field.name)) for entry in entries]
+        else:
+            values = [entry.get(field.name) for entry in entries]
+        arrays.append(_to_arrow(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def log_batch_to_record_batch(batch: LogBatch) -> "pa.RecordBatch":
+    """Convert a columnar batch to an Arrow record batch.
+
+    Timestamps and request IDs are wrapped without copying, and placeholder
+    fields are converted once per batch.
+    """
+    schema = get_parquet_schema()
+    size = log_batch_size(batch)
+    arrays = []
+    for field in schema:
+        if field.name == "timestamp":
+            arrays.append(
+                pa.Array.from_buffers(
+                    field.type, size, [None, pa.py_buffer(batch.timestamps)]
+                )
+            )
+            continue
+        if field.name == "request_id":
+            storage = pa.Array.from_buffers(
+                pa.binary(16), size, [None, pa.py_buffer(batch.request_ids)]
+            )
+            if isinstance(field.type, pa.ExtensionType):
+                storage = pa.ExtensionArray.from_storage(field.type, storage)
+            arrays.append(storage)
+            continue
+
+        if field.name == "path_template":
+            values = [path_template(path) for path in batch.columns["path"]]
+        elif field.name in batch.columns:
+            values = batch.columns[field.name]
+        else:
+            value = batch.constants[field.name]
+            values = [_json_text(value) if field.name in JSON_COLUMNS else value] * size
+        arrays.append(_to_arrow(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def write_parquet_record_batches(
+    record_batches: Iterable["pa.RecordBatch"],
+    destination: Union[str, BinaryIO],
+    row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+    compression: str = PARQUET_COMPRESSION,
+) -> int:
+    """Write Arrow record batches to Parquet in row groups of row_group_size rows.
+
+    Incoming batches of any size are regrouped; only the last row group
+    may be smaller. At most one row group is buffered at a time.
+
+    Args:
+        record_batches: Iterable of record batches with the get_parquet_schema() schema
+        destination: File name or writable binary file
+        row_group_size: Rows per row group (default: PARQUET_ROW_GROUP_SIZE)
+        compression: Parquet compression codec (default: "zstd")
+
+    Returns:
+        Number of rows written
+    """
+    if row_group_size <= 0:
+        raise ValueError(f"row_group_size ({row_group_size}) must be positive")
+
+    schema = get_parquet_schema()
+    written = 0
+    pending = []
+    pending_rows = 0
+    with pq.ParquetWriter(
+        destination, schema, compression=compression, use_dictionary=DICTIONARY_COLUMNS
+    ) as writer:
+        for record_batch in record_batches:
+            pending.append(record_batch)
+            pending_rows += record_batch.num_rows
+            while pending_rows >= row_group_size:
+                table = pa.Table.from_batches(pending, schema)
+                writer.write_table(
+                    table.slice(0, row_group_size), row_group_size=row_group_size
+                )
+                rest = table.slice(row_group_size)
+                pending = rest.to_batches()
+                pending_rows = rest.num_rows
+                written += row_group_size
+        if pending_rows:
+            writer.write_table(
+                pa.Table.from_batches(pending, schema), row_group_size=row_group_size
+            )
+            written += pending_rows
+    return written
+
+def export_to_parquet(
+    data: Iterable[Mapping[str, Any]],
+    destination: Union[str, BinaryIO],
+    row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+    compression: str = PARQUET_COMPRESSION,
+) -> int:
+    """Export log entries to a Parquet file, one row group at a time.
+
+    Args:
+        data: Iterable of log entry dictionaries or LogEntry records; consumed lazily
+        destination: File name or writable binary file
+        row_group_size: Rows per row group (default: PARQUET_ROW_GROUP_SIZE)
+        compression: Parquet compression codec (default: "zstd")
+
+    Returns:
+        Number of rows written
+    """
+    require_pyarrow()
+    if row_group_size <= 0:
+        raise ValueError(f"row_group_size ({row_group_size}) must be positive")
+
+    entries = iter(data)
+    chunks = iter(lambda: list(islice(entries, row_group_size)), [])
+    return write_parquet_record_batches(
+        map(entries_to_record_batch, chunks), destination, row_group_size, compression
+    )
+
+def write_parquet_batches(
+    batches: Iterable[LogBatch],
+    destination: Union[str, BinaryIO],
+    row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+    compression: str = PARQUET_COMPRESSION,
+) -> int:
+    """Export columnar batches to a Parquet file, regrouped into fixed-size row groups.
+
+    Args:
+        batches: Iterable of LogBatch objects
+        destination: File name or writable binary file
+        row_group_size: Rows per row group (default: PARQUET_ROW_GROUP_SIZE)
+        compression: Parquet compression codec (default: "zstd")
+
+    Returns:
+        Number of rows written
+    """
+    require_pyarrow()
+    return write_parquet_record_batches(
+        map(log_batch_to_record_batch, batches),
+        destination,
+        row_group_size,
+        compression,
+    )
@@ -2,9 +2,66 @@
 PostgreSQL exporter for fake log entries.
 """
 
+import ipaddress
+import json
+import struct
 import uuid
-from datetime import datetime
-from typing import Any, Dict, List
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Union
+
+from generators.core_generators import EPOCH
+from generators.log_batch import LogBatch, log_batch_column, log_batch_size
+
+# Columns of the log_entries table and their PostgreSQL types, in table order
+POSTGRES_COLUMNS = {
+    "timestamp": "TIMESTAMPTZ",
+    "request_id": "UUID",
+    "method": "VARCHAR",
+    "path": "TEXT",
+    "query_parameters": "JSONB",
+    "protocol": "VARCHAR",
+    "source_ip": "INET",
+    "user_agent": "TEXT",
+    "referer": "TEXT",
+    "user_id": "VARCHAR",
+    "session_id": "VARCHAR",
+    "request_headers": "JSONB",
+    "request_body": "TEXT",
+    "content_length": "INTEGER",
+    "status_code": "INTEGER",
+    "response_time_ms": "INTEGER",
+    "response_headers": "JSONB",
+    "response_body": "TEXT",
+    "log_level": "VARCHAR",
+    "service_name": "VARCHAR",
+    "env": "VARCHAR",
+    "error_message": "TEXT",
+    "stack_trace": "TEXT"
+}
+
+# Binary COPY framing: signature, flags and header extension length, then a
+# -1 field count trailer
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+PGCOPY_TRAILER = struct.pack(">h", -1)
+
+# PostgreSQL timestamps count microseconds from 2000-01-01 UTC
+POSTGRES_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+# Address families as encoded by the INET binary format (PGSQL_AF_INET, PGSQL_AF_INET6)
+PGSQL_AF_INET = 2
+PGSQL_AF_INET6 = 3
+
+# Bytes buffered before a write to the destination stream
+COPY_BUFFER_SIZE = 1 << 16
+
+_NULL_FIELD = struct.pack(">i", -1)
+_pack_length = struct.Struct(">i").pack
+_pack_int16 = struct.Struct(">h").pack
+_pack_int64 = struct.Struct(">q").pack
+
+# Microseconds between the Unix epoch of LogBatch timestamps and the PostgreSQL epoch
+_POSTGRES_EPOCH_OFFSET = (POSTGRES_EPOCH - EPOCH) // timedelta(microseconds=1)
 
 def get_postgres_create_table_sql() -> str:
     """Return SQL to create the log_entries table."""
@@ -80,4 +137,223 @@ def generate_insert_values(data: List[Dict[str, Any]], fieldnames: List[str]) ->
             values.append(convert_to_postgres_value(value))
         values_list.append(tuple(values))
     
-    return values_list 
\ No newline at end of file
+    return values_list
+
+def convert_to_postgres_inet(
+    value: Union[int, str],
+) -> Union[ipaddress.IPv4Address, ipaddress.IPv6Address]:
+    """Convert an IP string or compact integer to an INET-compatible address.
+
+    Compact integers are those produced by generate_source_ips.
+    """
+    return ipaddress.ip_address(value)
+
+def encode_timestamptz(value: datetime) -> bytes:
+    """Encode a datetime (naive values are taken as UTC) as binary TIMESTAMPTZ."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - POSTGRES_EPOCH
+    return struct.pack(
+        ">q", (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+    )
+
+def encode_uuid(value: Union[uuid.UUID, str]) -> bytes:
+    """Encode a UUID or UUID string as binary UUID."""
+    if not isinstance(value, uuid.UUID):
+        value = uuid.UUID(value)
+    return value.bytes
+
+def encode_inet(value: Union[int, str]) -> bytes:
+    """Encode an IP string or compact integer as a binary INET host address."""
+    address = convert_to_postgres_inet(value)
+    packed = address.packed
+    family = PGSQL_AF_INET if address.version == 4 else PGSQL_AF_INET6
+    return bytes((family, len(packed) * 8, 0, len(packed))) + packed
+
+def encode_jsonb(value: Any) -> bytes:
+    """Encode a value as binary JSONB (format version 1 followed by JSON text)."""
+    return b"\x01" + json.dumps(value, default=str).encode("utf-8")
+
+def encode_integer(value: int) -> bytes:
+    """Encode an int as binary INTEGER."""
+    return struct.pack(">i", value)
+
+def encode_text(value: Any) -> bytes:
+    """Encode a value as binary TEXT/VARCHAR (UTF-8)."""
+    return str(value).encode("utf-8")
+
+# Binary encoder for each column type
+COPY_ENCODERS: Dict[str, Callable[[Any], bytes]] = {
+    "TIMESTAMPTZ": encode_timestamptz,
+    "UUID": encode_uuid,
+    "INET": encode_inet,
+    "JSONB": encode_jsonb,
+    "INTEGER": encode_integer,
+    "VARCHAR": encode_text,
+    "TEXT": encode_text
+}
+
+def get_postgres_copy_sql(columns: Optional[List[str]] = None) -> str:
+    """Return the COPY statement that loads a binary COPY stream into log_entries."""
+    if columns is None:
+        columns = list(POSTGRES_COLUMNS)
+    return f"COPY log_entries ({', '.join(columns)}) FROM STDIN WITH (FORMAT binary)"
+
+def _column_encoders(columns: List[str]) -> List[tuple]:
+    """Return (column, encoder) pairs, rejecting columns log_entries does not have."""
+    unknown = [column for column in columns if column not in POSTGRES_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown log_entries columns: {', '.join(unknown)}")
+    return [(column, COPY_ENCODERS[POSTGRES_COLUMNS[column]]) for column in columns]
+
+def _encode_row(
+    row: Dict[str, Any], encoders: List[tuple], field_count: bytes
+) -> bytes:
+    """Return one binary COPY tuple; missing and None values become NULL."""
+    parts = [field_count]
+    for column, encode in encoders:
+        value = row.get(column)
+        if value is None:
+            parts.append(_NULL_FIELD)
+        else:
+            data = encode(value)
+            parts.append(_pack_length(len(data)))
+            parts.append(data)
+    return b"".join(parts)
+
+def encode_copy_row(row: Dict[str, Any], columns: Optional[List[str]] = None) -> bytes:
+    """Return one log entry encoded as a binary COPY tuple.
+    
+    Args:
+        row: Log entry dictionary
+        columns: Columns to encode, in COPY order (default: every log_entries column)
+        
+    Returns:
+        The tuple's field count followed by each length-prefixed field
+    """
+    if columns is None:
+        columns = list(POSTGRES_COLUMNS)
+    return _encode_row(row, _column_encoders(columns), _pack_int16(len(columns)))
+
+def write_postgres_copy(
+    data: Iterable[Dict[str, Any]],
+    stream: BinaryIO,
+    columns: Optional[List[str]] = None,
+) -> int:
+    """Stream log entries to a writable binary stream in PostgreSQL binary COPY format.
+    
+    Rows are encoded as they are consumed from data and written in buffered
+    blocks, so the dataset is never held in memory.
+    
+    Args:
+        data: Iterable of log entry dictionaries
+        stream: Writable binary stream (file, socket file, psycopg copy object, ...)
+        columns: Columns to write, in COPY order (default: every log_entries column)
+        
+    Returns:
+        Number of rows written
+    """
+    if columns is None:
+        columns = list(POSTGRES_COLUMNS)
+    encoders = _column_encoders(columns)
+    field_count = _pack_int16(len(columns))
+    
+    buffer = bytearray(PGCOPY_HEADER)
+    rows = 0
+    for row in data:
+        buffer += _encode_row(row, encoders, field_count)
+        rows += 1
+        if len(buffer) >= COPY_BUFFER_SIZE:
+            stream.write(buffer)
+            buffer.clear()
+    buffer += PGCOPY_TRAILER
+    stream.write(buffer)
+    return rows
+
+def export_to_postgres_copy(
+    data: Iterable[Dict[str, Any]], filename: str, columns: Optional[List[str]] = None
+) -> int:
+    """Export log entries to a binary COPY file, loadable with get_postgres_copy_sql().
+    
+    Returns:
+        Number of rows written
+    """
+    with open(filename, 'wb') as f:
+        return write_postgres_copy(data, f, columns)
+
+def _encode_field(value: Any, encode: Callable[[Any], bytes]) -> bytes:
+    """Return one length-prefixed field, or the NULL marker for None."""
+    if value is None:
+        return _NULL_FIELD
+    data = encode(value)
+    return _pack_length(len(data)) + data
+
+def encode_copy_batch(batch: LogBatch, columns: Optional[List[str]] = None) -> bytes:
+    """Return every row of a columnar batch as binary COPY tuples, column by column.
+    
+    Produces the same bytes as encode_copy_row() on each row, but
+    placeholder fields are encoded once per batch and timestamps and
+    request IDs are packed straight from the batch's arrays.
+    
+    Args:
+        batch: Batch to encode
+        columns: Columns to encode, in COPY order (default: every log_entries column)
+        
+    Returns:
+        Concatenated binary COPY tuples, without header or trailer
+    """
+    if columns is None:
+        columns = list(POSTGRES_COLUMNS)
+    encoders = _column_encoders(columns)
+    size = log_batch_size(batch)
+    
+    fields = [[_pack_int16(len(columns))] * size]
+    for column, encode in encoders:
+        if column in batch.constants:
+            fields.append([_encode_field(batch.constants[column], encode)] * size)
+        elif column == "timestamp":
+            prefix = _pack_length(8)
+            fields.append(
+                [
+                    prefix + _pack_int64(micros - _POSTGRES_EPOCH_OFFSET)
+                    for micros in batch.timestamps
+                ]
+            )
+        elif column == "request_id":
+            prefix = _pack_length(16)
+            packed = batch.request_ids
+            fields.append(
+                [prefix + packed[i : i + 16] for i in range(0, len(packed), 16)]
+            )
+        elif column in batch.columns:
+            fields.append(
+                [
+                    _encode_field(value, encode)
+                    for value in log_batch_column(batch, column)
+                ]
+            )
+        else:
+            # Columns a log entry does not have, e.g. content_length
+            fields.append([_NULL_FIELD] * size)
+    return b"".join(chain.from_iterable(zip(*fields)))
+
+def write_postgres_copy_batches(
+    batches: Iterable[LogBatch], stream: BinaryIO, columns: Optional[List[str]] = None
+) -> int:
+    """Stream columnar batches to a binary stream in PostgreSQL binary COPY format.
+    
+    Args:
+        batches: Iterable of LogBatch objects
+        stream: Writable binary stream
+        columns: Columns to write, in COPY order (default: every log_entries column)
+        
+    Returns:
+        Number of rows written
+    """
+    stream.write(PGCOPY_HEADER)
+    rows = 0
+    for batch in batches:
+        stream.write(encode_copy_batch(batch, columns))
+        rows += log_batch_size(batch)
+    stream.write(PGCOPY_TRAILER)
+    return rows
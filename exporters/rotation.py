@@ -0,0 +1,338 @@
+"""
+Size-targeted output and rotation into numbered files.
+
+Formatted chunks travel with the timestamps of their rows, one line per
+row, so output can be cut at any line. limit_size() ends a stream once it
+reaches a byte budget, and write_rotated() rolls over to a new numbered
+file whenever the current one reaches a size, a line count or an age:
+
+    logs.json -> logs.00000.json, logs.00001.json, ...
+
+A finished file is flushed and closed before the next one opens. With
+compression it is then compressed on a background thread, in the same
+self-contained blocks as exporters.compression, while generation
+continues into the next file; the uncompressed file is removed once its
+compressed copy is complete. The manifest lists every file with its size,
+line count and first and last timestamp.
+"""
+
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Sequence, Union
+
+from exporters.compression import (
+    COMPRESSION_BLOCK_SIZE,
+    COMPRESSION_LEVELS,
+    COMPRESSION_SUFFIXES,
+    compress_block,
+)
+from generators.core_generators import micros_to_timestamp
+from generators.sharding import shard_file_path
+
+# Size suffixes as in GNU split and dd: K, M, G, T (and KiB, ...) are powers of 1024,
+# KB, MB, GB, TB powers of 1000
+SIZE_UNITS = {
+    "": 1, "b": 1,
+    "k": 1 << 10, "kib": 1 << 10, "kb": 10 ** 3,
+    "m": 1 << 20, "mib": 1 << 20, "mb": 10 ** 6,
+    "g": 1 << 30, "gib": 1 << 30, "gb": 10 ** 9,
+    "t": 1 << 40, "tib": 1 << 40, "tb": 10 ** 12
+}
+
+# Duration suffixes in seconds
+DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# File name suffix of each compression format
+COMPRESSION_EXTENSIONS = {
+    compression: suffix for suffix, compression in COMPRESSION_SUFFIXES.items()
+}
+
+_QUANTITY = re.compile(r"\s*(\d+(?:\.\d*)?|\.\d+)\s*([a-zA-Z]*)\s*")
+
+class RotatedFile(NamedTuple):
+    """One finished output file, as listed in the manifest."""
+    path: str
+    bytes: int  # Size on disk, after compression
+    uncompressed_bytes: int
+    lines: int
+    # ISO 8601 timestamp of the first line, None without rows
+    first_timestamp: Optional[str]
+    last_timestamp: Optional[str]  # ISO 8601 timestamp of the last line
+
+def parse_size(text: str) -> int:
+    """Parse a byte size such as 4096, 256M, 1.5GiB or 20GB into bytes.
+
+    Args:
+        text: Number with an optional unit suffix (case-insensitive): B, K, KiB,
+            KB, M, MiB, MB, G, GiB, GB, T, TiB, TB
+
+    Returns:
+        Size in bytes, rounded down
+    """
+    match = _QUANTITY.fullmatch(text)
+    if not match or match.group(2).lower() not in SIZE_UNITS:
+        raise ValueError(
+            f"Invalid size: {text!r}. Use a number of bytes with an optional unit "
+            "such as 512K, 256M or 20GB"
+        )
+    size = int(float(match.group(1)) * SIZE_UNITS[match.group(2).lower()])
+    if size <= 0:
+        raise ValueError(f"Size must be positive, got {text!r}")
+    return size
+
+def parse_duration(text: str) -> float:
+    """Parse a duration such as 30, 30s, 5m, 1.5h or 1d into seconds."""
+    match = _QUANTITY.fullmatch(text)
+    if not match or match.group(2).lower() not in DURATION_UNITS:
+        raise ValueError(
+            f"Invalid duration: {text!r}. Use a number of seconds with an optional "
+            "unit: s, m, h or d"
+        )
+    seconds = float(match.group(1)) * DURATION_UNITS[match.group(2).lower()]
+    if seconds <= 0:
+        raise ValueError(f"Duration must be positive, got {text!r}")
+    return seconds
+
+def _line_end(data: bytes, start: int, lines: int) -> int:
+    """Return the offset just past the given number of lines from start."""
+    end = start
+    for _ in range(lines):
+        end = data.index(b"\n", end) + 1
+    return end
+
+def limit_size(
+    chunks: Iterable[tuple[bytes, Sequence[int]]], size: int
+) -> Iterator[tuple[bytes, Sequence[int]]]:
+    """Pass (chunk, timestamps) pairs through until size bytes, cutting at a line end.
+
+    The lines passed through total at most size bytes, and less than one
+    more line would exceed it. The last chunk is cut at a line boundary,
+    and the input is not read past the last chunk needed.
+
+    Args:
+        chunks: Newline-terminated chunks with the epoch-microsecond timestamps of
+            their lines
+        size: Maximum total bytes
+
+    Yields:
+        (chunk, timestamps) pairs; the last one may be truncated
+    """
+    if size <= 0:
+        raise ValueError(f"size ({size}) must be positive")
+
+    remaining = size
+    for data, timestamps in chunks:
+        if len(data) <= remaining:
+            remaining -= len(data)
+            yield data, timestamps
+            if not remaining:
+                return
+            continue
+        end = data.rfind(b"\n", 0, remaining) + 1
+        if end:
+            yield data[:end], timestamps[:data.count(b"\n", 0, end)]
+        return
+
+def rotated_file_path(output_path: Union[str, Path], index: int) -> Path:
+    """Return the uncompressed path of the index-th rotated file.
+
+    For example, file 3 of logs.json.gz is logs.00003.json.
+    """
+    output_path = Path(output_path)
+    if output_path.suffix.lower() in COMPRESSION_SUFFIXES:
+        output_path = output_path.with_suffix("")
+    return shard_file_path(output_path, index)
+
+def manifest_path(output_path: Union[str, Path]) -> Path:
+    """Return the default manifest path next to the rotated files.
+
+    For example, the manifest of logs.json.gz is logs.manifest.json.
+    """
+    output_path = Path(output_path)
+    if output_path.suffix.lower() in COMPRESSION_SUFFIXES:
+        output_path = output_path.with_suffix("")
+    return output_path.with_name(f"{output_path.stem}.manifest.json")
+
+def _compress_file(path: Path, compression: str, level: Optional[int] = None) -> Path:
+    """Compress a finished file block by block next to it and remove the original.
+
+    Returns:
+        Path of the compressed file
+    """
+    target = path.with_name(path.name + COMPRESSION_EXTENSIONS[compression])
+    with open(path, "rb") as source, open(target, "wb") as f:
+        for block in iter(partial(source.read, COMPRESSION_BLOCK_SIZE), b""):
+            f.write(compress_block(block, compression, level))
+        f.flush()
+        os.fsync(f.fileno())
+    path.unlink()
+    return target
+
+def write_rotated(
+    chunks: Iterable[tuple[bytes, Sequence[int]]],
+    output_path: Union[str, Path],
+    rotate_size: Optional[int] = None,
+    rotate_lines: Optional[int] = None,
+    rotate_time: Optional[float] = None,
+    header: bytes = b"",
+    compression: Optional[str] = None,
+    level: Optional[int] = None,
+    compress_threads: int = 1,
+    clock: Callable[[], float] = time.monotonic,
+) -> list[RotatedFile]:
+    """Write (chunk, timestamps) pairs to numbered files, rolled by size, lines or age.
+
+    A file is never empty: a line longer than rotate_size gets a file to
+    itself. Age is checked between chunks, so with rotate_time a file
+    closes at the first chunk boundary after it gets that old. Every chunk
+    is flushed as it is written.
+
+    Args:
+        chunks: Newline-terminated chunks with the epoch-microsecond timestamps of
+            their lines
+        output_path: Base path; files are named like shard files
+            (logs.json -> logs.00000.json)
+        rotate_size: Maximum uncompressed bytes per file, header included
+            (default: no limit)
+        rotate_lines: Maximum lines per file, header excluded (default: no limit)
+        rotate_time: Maximum seconds a file stays open (default: no limit)
+        header: Bytes starting every file, such as a CSV header (default: none)
+        compression: Compress finished files in the background: "gzip", "bz2" or "xz"
+            (default: None)
+        level: Compression level (default: the format's default)
+        compress_threads: Threads compressing finished files (default: 1)
+        clock: Monotonic clock in seconds, for rotate_time (default: time.monotonic)
+
+    Returns:
+        The files written, in order
+    """
+    limits = (rotate_size, rotate_lines, rotate_time)
+    if any(limit is not None and limit <= 0 for limit in limits):
+        raise ValueError(
+            f"Rotation limits must be positive, got size={rotate_size}, "
+            f"lines={rotate_lines}, time={rotate_time}"
+        )
+    if compression is not None and compression not in COMPRESSION_LEVELS:
+        raise ValueError(f"Unsupported compression: {compression}")
+    if compress_threads <= 0:
+        raise ValueError(f"compress_threads ({compress_threads}) must be positive")
+
+    # [path, uncompressed bytes, lines, first micros, last micros] per file, finished
+    # or open
+    files = []
+    pending = deque()  # (file index, compression future)
+    f = None
+    opened = 0.0
+
+    def finish() -> None:
+        """Flush and close the open file, then queue it for compression."""
+        nonlocal f
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        f = None
+        if compression:
+            future = executor.submit(_compress_file, files[-1][0], compression, level)
+            pending.append((len(files) - 1, future))
+            # Bound the uncompressed files waiting on disk
+            while len(pending) > compress_threads * 2:
+                index, future = pending.popleft()
+                files[index][0] = future.result()
+
+    with ThreadPoolExecutor(max_workers=compress_threads) as executor:
+        try:
+            for data, timestamps in chunks:
+                chunk_lines = data.count(b"\n")
+                if chunk_lines != len(timestamps):
+                    raise ValueError(
+                        f"Chunk has {chunk_lines} lines for {len(timestamps)} "
+                        "timestamps; rotation needs one line per row"
+                    )
+                if (
+                    f is not None
+                    and rotate_time is not None
+                    and clock() - opened >= rotate_time
+                ):
+                    finish()
+                start = line = 0
+                while start < len(data):
+                    if f is None:
+                        path = rotated_file_path(output_path, len(files))
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        f = open(path, "wb")
+                        f.write(header)
+                        files.append([path, len(header), 0, None, None])
+                        opened = clock()
+                    current = files[-1]
+
+                    end = len(data)
+                    if (
+                        rotate_size is not None
+                        and current[1] + end - start > rotate_size
+                    ):
+                        limit = start + rotate_size - current[1]
+                        end = data.rfind(b"\n", start, limit) + 1
+                    if (
+                        rotate_lines is not None
+                        and current[2] + data.count(b"\n", start, end) > rotate_lines
+                    ):
+                        end = _line_end(data, start, rotate_lines - current[2])
+                    if end <= start:
+                        if current[2]:
+                            finish()
+                            continue
+                        # An oversized line in a file of its own
+                        end = data.index(b"\n", start) + 1
+
+                    f.write(data[start:end] if start or end < len(data) else data)
+                    # Followers of a live run see every chunk as it is written
+                    f.flush()
+                    lines = data.count(b"\n", start, end)
+                    if current[3] is None:
+                        current[3] = timestamps[line]
+                    current[1] += end - start
+                    current[2] += lines
+                    current[4] = timestamps[line + lines - 1]
+                    start, line = end, line + lines
+                    if (rotate_size is not None and current[1] >= rotate_size) or \
+                            (rotate_lines is not None and current[2] >= rotate_lines):
+                        finish()
+        finally:
+            if f is not None:
+                finish()
+            while pending:
+                index, future = pending.popleft()
+                files[index][0] = future.result()
+
+    return [
+        RotatedFile(
+            str(path),
+            os.path.getsize(path),
+            size,
+            lines,
+            micros_to_timestamp(first).isoformat() if first is not None else None,
+            micros_to_timestamp(last).isoformat() if last is not None else None,
+        )
+        for path, size, lines, first, last in files
+    ]
+
+def write_manifest(files: Sequence[RotatedFile], path: Union[str, Path]) -> None:
+    """Write a JSON manifest of rotated files with their totals."""
+    manifest = {
+        "files": [rotated._asdict() for rotated in files],
+        "total_files": len(files),
+        "total_bytes": sum(rotated.bytes for rotated in files),
+        "total_uncompressed_bytes": sum(
+            rotated.uncompressed_bytes for rotated in files
+        ),
+        "total_lines": sum(rotated.lines for rotated in files),
+    }
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
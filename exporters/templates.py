@@ -0,0 +1,450 @@
+"""
+Compiled line templates: Apache, nginx and {field} log formats.
+
+A template is parsed once and compiled with exec() into two specialized
+functions: one formatting a single entry and one formatting the columns
+of a LogBatch in a single list comprehension. Each placeholder becomes
+an inline expression, and only the fields the template uses are read.
+Timestamps skip strftime. The date part is rendered once per UTC day and
+cached, and the time of day is plain integer arithmetic. Timestamps are
+rendered as UTC, which is what the generators produce.
+
+Three syntaxes are supported:
+
+    apache   %h %l %u %t "%r" %>s %b "%{Referer}i" "%{User-Agent}i"  (mod_log_config)
+    nginx    $remote_addr - $remote_user [$time_local] "$request" $status  (log_format)
+    fields   {timestamp:%Y-%m-%d %H:%M:%S} [{log_level}] {path}  (LOG_ENTRY_FIELDS)
+
+Values are inserted as they are; quotes inside them are not escaped.
+"""
+
+import json
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import repeat
+from string import Formatter
+from typing import Any, Callable, Iterable, Mapping, NamedTuple
+
+from generators.core_generators import _epoch_micros, micros_to_timestamp
+from generators.log_batch import LogBatch, format_request_ids, log_batch_size
+from generators.log_entry_factory import LOG_ENTRY_FIELDS
+
+# Built-in templates by name: (template, syntax)
+TEMPLATE_PRESETS = {
+    "common": ('%h %l %u %t "%r" %>s %b', "apache"),
+    "combined": ('%h %l %u %t "%r" %>s %b "%{Referer}i" "%{User-Agent}i"', "apache"),
+    "nginx": (
+        '$remote_addr - $remote_user [$time_local] "$request" $status $body_bytes_sent '
+        '"$http_referer" "$http_user_agent"',
+        "nginx",
+    ),
+    "log": (
+        "{timestamp:%Y-%m-%d %H:%M:%S} [{log_level}] {request_id} {source_ip} "
+        "{method} {path} {status_code}",
+        "fields",
+    ),
+}
+
+TEMPLATE_SYNTAXES = ("apache", "nginx", "fields")
+
+# Expressions of the request line and friends, shared by the Apache and nginx variables
+_REQUEST_LINE = "method + ' ' + path + query_parameters + ' ' + protocol"
+_USER = "(user_id or '-')"
+_BODY_BYTES = "str(len(response_body))"
+
+# Apache %-directives: expression over the entry's fields
+APACHE_DIRECTIVES = {
+    "h": "source_ip",
+    "a": "source_ip",
+    "l": "'-'",
+    "u": _USER,
+    "t": "'[' + _clf(timestamp) + ']'",
+    "r": _REQUEST_LINE,
+    "s": "str(status_code)",
+    "b": "(str(len(response_body)) if response_body else '-')",
+    "B": _BODY_BYTES,
+    "D": "str(response_time_ms * 1000)",
+    "T": "str(response_time_ms // 1000)",
+    "m": "method",
+    "U": "path",
+    "q": "query_parameters",
+    "H": "protocol",
+    "v": "service_name",
+    "L": "str(request_id)",
+    "%": "'%'"
+}
+
+# Apache %{NAME}i request headers with a field of their own
+APACHE_REQUEST_HEADERS = {
+    "referer": "(referer or '-')",
+    "user-agent": "(user_agent or '-')",
+}
+
+# nginx variables: expression over the entry's fields
+NGINX_VARIABLES = {
+    "remote_addr": "source_ip",
+    "remote_user": _USER,
+    "time_local": "_clf(timestamp)",
+    "time_iso8601": "_iso_seconds(timestamp)",
+    "msec": "_msec(timestamp)",
+    "request": _REQUEST_LINE,
+    "request_method": "method",
+    "request_uri": "path + query_parameters",
+    "uri": "path",
+    "args": "(query_parameters[1:] or '-')",
+    "query_string": "(query_parameters[1:] or '-')",
+    "server_protocol": "protocol",
+    "status": "str(status_code)",
+    "body_bytes_sent": _BODY_BYTES,
+    "bytes_sent": _BODY_BYTES,
+    "request_time": "'%.3f' % (response_time_ms / 1000)",
+    "request_id": "str(request_id).replace('-', '')",
+    "http_referer": "(referer or '-')",
+    "http_user_agent": "(user_agent or '-')",
+    "host": "service_name",
+    "server_name": "service_name"
+}
+
+# Fields rendered as they are in {field} templates; the rest go through a converter
+_TEXT_FIELDS = frozenset(
+    [
+        "log_level",
+        "source_ip",
+        "method",
+        "path",
+        "query_parameters",
+        "protocol",
+        "user_agent",
+        "referer",
+        "user_id",
+        "session_id",
+        "request_body",
+        "response_body",
+        "service_name",
+        "env",
+        "error_message",
+        "stack_trace",
+    ]
+)
+
+# strftime directives that depend only on the date, and the time-of-day ones rendered
+# arithmetically
+_DATE_DIRECTIVES = frozenset("aAbBdjmyYuwGVgUWCDFhe%")
+_TIME_DIRECTIVES = {
+    "H": "{H:02d}",
+    "M": "{M:02d}",
+    "S": "{S:02d}",
+    "f": "{f:06d}",
+    "T": "{H:02d}:{M:02d}:{S:02d}",
+    "R": "{H:02d}:{M:02d}",
+}
+
+# Proleptic Gregorian ordinal of 1970-01-01, turning date.toordinal() into days since
+# the epoch
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+class CompiledTemplate(NamedTuple):
+    """Template compiled into specialized formatter functions."""
+    template: str
+    syntax: str
+    fields: tuple  # Log entry fields the template reads, in argument order
+    format_entry: Callable[[Mapping[str, Any]], str]  # Formats one log entry
+    format_rows: Callable[..., list]  # Formats columns given in fields order
+    source: str  # Generated Python source, for inspection
+
+def _time_renderers(fmt: str) -> tuple[Callable[[int], str], Callable[[datetime], str]]:
+    """Return renderers of epoch microseconds and UTC datetimes for a strftime format.
+
+    The format is split at its time-of-day directives. The date-only
+    segments between them are rendered once per UTC day with time.strftime
+    and cached, and a generated f-string interleaves them with the hour,
+    minute, second and microsecond. Formats with other time-dependent
+    directives (%I, %p, %s, ...) fall back to datetime.strftime.
+    """
+    segments, directives = [""], []
+    index = 0
+    while index < len(fmt):
+        if fmt[index] != "%":
+            segments[-1] += fmt[index]
+            index += 1
+            continue
+        directive = fmt[index + 1:index + 2]
+        if directive in _TIME_DIRECTIVES:
+            directives.append(directive)
+            segments.append("")
+        elif directive and directive in _DATE_DIRECTIVES:
+            segments[-1] += "%" + directive
+        else:
+            def render_micros(micros: int) -> str:
+                return micros_to_timestamp(micros).strftime(fmt)
+
+            return render_micros, lambda value: value.strftime(fmt)
+        index += 2
+
+    pieces = []
+    for position, segment in enumerate(segments):
+        if segment:
+            pieces.append(f"{{d[{position}]}}")
+        if position < len(directives):
+            pieces.append(_TIME_DIRECTIVES[directives[position]])
+    rendered = "".join(pieces)
+    source = f"""
+def from_micros(micros):
+    seconds, f = divmod(micros, 1000000)
+    day, clock = divmod(seconds, 86400)
+    d = days.get(day) or day_segments(day)
+    H, clock = divmod(clock, 3600)
+    M, S = divmod(clock, 60)
+    return f"{rendered}"
+
+def from_datetime(value):
+    day = value.toordinal() - {_EPOCH_ORDINAL}
+    d = days.get(day) or day_segments(day)
+    H, M, S, f = value.hour, value.minute, value.second, value.microsecond
+    return f"{rendered}"
+"""
+    days = {}
+
+    def day_segments(day: int) -> tuple:
+        midnight = time.gmtime(day * 86400)
+        days[day] = tuple(
+            time.strftime(segment, midnight) if "%" in segment else segment
+            for segment in segments
+        )
+        return days[day]
+
+    namespace = {"days": days, "day_segments": day_segments}
+    exec(compile(source, f"<strftime {fmt!r}>", "exec"), namespace)
+    return namespace["from_micros"], namespace["from_datetime"]
+
+def _iso_micros(micros: int) -> str:
+    """Render epoch microseconds like datetime.isoformat() on a UTC datetime."""
+    return micros_to_timestamp(micros).isoformat()
+
+def _msec(micros: int) -> str:
+    """Render epoch microseconds as seconds with milliseconds, like nginx $msec."""
+    return f"{micros // 1000000}.{micros // 1000 % 1000:03d}"
+
+def _text(value: Any) -> str:
+    """Render a non-text field value; dicts as JSON."""
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return str(value)
+
+def _parse_apache(template: str) -> list[tuple[str, str]]:
+    """Split an Apache template into literal, code and time parts.
+
+    Parts are ("literal", text), ("code", expression) and
+    ("time", strftime format) tuples.
+    """
+    parts = []
+    index = 0
+    while index < len(template):
+        start = template.find("%", index)
+        if start < 0:
+            parts.append(("literal", template[index:]))
+            break
+        parts.append(("literal", template[index:start]))
+        index = start + 1
+        while index < len(template) and template[index] in "<>":
+            index += 1  # Original/final request modifiers make no difference here
+        argument = None
+        if template.startswith("{", index):
+            end = template.find("}", index)
+            if end < 0:
+                raise ValueError(f"Unclosed %{{ in Apache template {template!r}")
+            argument = template[index + 1:end]
+            index = end + 1
+        directive = template[index:index + 1]
+        index += 1
+        if argument is not None and directive == "i":
+            name = argument.lower()
+            header = f"_header(request_headers, {argument!r})"
+            parts.append(("code", APACHE_REQUEST_HEADERS.get(name, header)))
+        elif argument is not None and directive == "o":
+            parts.append(("code", f"_header(response_headers, {argument!r})"))
+        elif argument is not None and directive == "t":
+            parts.append(("time", argument))
+        elif argument is None and directive in APACHE_DIRECTIVES:
+            parts.append(("code", APACHE_DIRECTIVES[directive]))
+        else:
+            spelled = f"%{{{argument}}}{directive}" if argument else f"%{directive}"
+            raise ValueError(f"Unsupported Apache directive {spelled} in {template!r}")
+    return parts
+
+def _parse_nginx(template: str) -> list[tuple[str, str]]:
+    """Split an nginx log_format template into literal and code parts."""
+    parts = []
+    index = 0
+    while index < len(template):
+        start = template.find("$", index)
+        if start < 0:
+            parts.append(("literal", template[index:]))
+            break
+        parts.append(("literal", template[index:start]))
+        if template.startswith("{", start + 1):
+            end = template.find("}", start)
+            if end < 0:
+                raise ValueError(f"Unclosed ${{ in nginx template {template!r}")
+            name, index = template[start + 2:end], end + 1
+        else:
+            end = start + 1
+            while end < len(template) and (
+                template[end].isalnum() or template[end] == "_"
+            ):
+                end += 1
+            name, index = template[start + 1:end], end
+        if name in NGINX_VARIABLES:
+            parts.append(("code", NGINX_VARIABLES[name]))
+        elif name.startswith("http_"):
+            header = name[5:].replace("_", "-")
+            parts.append(("code", f"_header(request_headers, {header!r})"))
+        else:
+            raise ValueError(f"Unsupported nginx variable ${name} in {template!r}")
+    return parts
+
+def _parse_fields(template: str) -> list[tuple[str, str]]:
+    """Split a {field} template into literal and code parts.
+
+    Timestamps take a strftime spec.
+    """
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        parts.append(("literal", literal))
+        if field is None:
+            continue
+        if field not in LOG_ENTRY_FIELDS or conversion:
+            raise ValueError(f"Unknown field {{{field}}} in template {template!r}")
+        if field == "timestamp":
+            parts.append(("time", spec) if spec else ("code", "_iso(timestamp)"))
+        elif spec:
+            parts.append(("code", f"format({field}, {spec!r})"))
+        elif field in _TEXT_FIELDS:
+            parts.append(("code", field))
+        else:
+            parts.append(("code", f"_text({field})"))
+    return parts
+
+_PARSERS = {"apache": _parse_apache, "nginx": _parse_nginx, "fields": _parse_fields}
+
+@lru_cache(maxsize=64)
+def compile_template(template: str, syntax: str = "fields") -> CompiledTemplate:
+    """Compile a line template into specialized formatter functions.
+
+    Args:
+        template: Template string, or the name of one of TEMPLATE_PRESETS
+        syntax: "apache", "nginx" or "fields"; ignored for presets (default: "fields")
+
+    Returns:
+        CompiledTemplate whose format_entry() formats one entry
+    """
+    if template in TEMPLATE_PRESETS:
+        template, syntax = TEMPLATE_PRESETS[template]
+    if syntax not in _PARSERS:
+        syntaxes = ", ".join(TEMPLATE_SYNTAXES)
+        raise ValueError(
+            f"Unsupported template syntax: {syntax}; use one of {syntaxes}"
+        )
+
+    clf = _time_renderers("%d/%b/%Y:%H:%M:%S +0000")
+    iso_seconds = _time_renderers("%Y-%m-%dT%H:%M:%S+00:00")
+    header = lambda headers, name: str(headers.get(name, "-"))
+    # Batch columns hold timestamps as epoch microseconds, entries as datetimes
+    rows_namespace = {
+        "_clf": clf[0],
+        "_iso_seconds": iso_seconds[0],
+        "_iso": _iso_micros,
+        "_msec": _msec,
+        "_text": _text,
+        "_header": header,
+    }
+    entry_namespace = {
+        "_clf": clf[1],
+        "_iso_seconds": iso_seconds[1],
+        "_iso": datetime.isoformat,
+        "_msec": lambda value: _msec(_epoch_micros(value)),
+        "_text": _text,
+        "_header": header,
+    }
+    time_formats = {}  # strftime format -> name of its renderer in the namespace
+    expressions = []
+    for kind, value in _PARSERS[syntax](template):
+        if kind == "literal":
+            if value:
+                expressions.append(repr(value))
+        elif kind == "time":
+            if value not in time_formats:
+                renderer = time_formats[value] = f"_time{len(time_formats)}"
+                renderers = _time_renderers(value)
+                rows_namespace[renderer], entry_namespace[renderer] = renderers
+            expressions.append(f"{time_formats[value]}(timestamp)")
+        else:
+            expressions.append(f"({value})")
+
+    body = " + ".join(expressions) or "''"
+    names = set(compile(body, "<template>", "eval").co_names)
+    fields = tuple(field for field in LOG_ENTRY_FIELDS if field in names)
+    unpack = "".join(f"    {field} = entry[{field!r}]\n" for field in fields)
+    arguments = ", ".join(fields)
+    entry_source = f"def format_entry(entry):\n{unpack}    return {body}\n"
+    if fields:
+        rows_source = (
+            f"def format_rows({arguments}):\n"
+            f"    return [{body} for {arguments}, in zip({arguments})]\n"
+        )
+    else:
+        rows_source = f"def format_rows(count):\n    return [{body}] * count\n"
+
+    exec(compile(entry_source, f"<template {template!r}>", "exec"), entry_namespace)
+    exec(compile(rows_source, f"<template {template!r}>", "exec"), rows_namespace)
+    return CompiledTemplate(
+        template,
+        syntax,
+        fields,
+        entry_namespace["format_entry"],
+        rows_namespace["format_rows"],
+        entry_source + "\n" + rows_source,
+    )
+
+def format_entries_with_template(
+    entries: Iterable[Mapping[str, Any]], template: str, syntax: str = "fields"
+) -> list[str]:
+    """Format log entries (dicts or LogEntry records) with a template or preset name."""
+    format_entry = compile_template(template, syntax).format_entry
+    return [format_entry(entry) for entry in entries]
+
+def _template_column(batch: LogBatch, field: str) -> Iterable:
+    """Return one field of every row in the representation compiled templates expect."""
+    if field == "timestamp":
+        return batch.timestamps
+    if field == "request_id":
+        return format_request_ids(batch.request_ids)
+    if field in batch.columns:
+        return batch.columns[field]
+    return repeat(batch.constants[field], log_batch_size(batch))
+
+def format_batch_with_template(
+    batch: LogBatch, template: str, syntax: str = "fields"
+) -> list[str]:
+    """Format every row of a batch with a template or preset name, column by column.
+
+    Produces the same lines as format_entries_with_template() on the batch's
+    rows without building a dict, datetime or UUID per row.
+    """
+    compiled = compile_template(template, syntax)
+    if not compiled.fields:
+        return compiled.format_rows(log_batch_size(batch))
+    return compiled.format_rows(
+        *(_template_column(batch, field) for field in compiled.fields)
+    )
+
+def format_template_chunk(
+    batch: LogBatch, template: str, syntax: str = "fields"
+) -> bytes:
+    """Format a batch with a template as newline-terminated UTF-8 lines.
+
+    This is the template counterpart of sharding.format_batch().
+    """
+    lines = format_batch_with_template(batch, template, syntax)
+    return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
@@ -4,12 +4,75 @@ CLI script to generate fake log entries.
 """
 
 import argparse
+import json
+import os
 import sys
+import time
+from contextlib import nullcontext
 from datetime import datetime, timezone
+from functools import partial
+from itertools import chain
 from pathlib import Path
 
-from generators.log_entry_factory import generate_log_lines, generate_log_entries
-from exporters.csv_exporter import export_to_csv
+from config import BATCH_SIZE
+from exporters.binary_log import (
+    iter_binary_log_batches,
+    open_binary_log,
+    write_binary_log,
+)
+from exporters.dataset_cache import DEFAULT_CACHE_SIZE, cached_log_file
+from exporters.compression import (
+    COMPRESSION_LEVELS,
+    compress_block,
+    infer_compression,
+    write_compressed,
+)
+from exporters.network import (
+    SINK_BATCH_SIZE,
+    SINK_CONNECTIONS,
+    SINK_IN_FLIGHT,
+    SINK_LINGER,
+    parse_sink_url,
+    send_message_chunks,
+    sink_messages,
+)
+from exporters.parquet_exporter import write_parquet_batches
+from exporters.rotation import (
+    limit_size,
+    manifest_path,
+    parse_duration,
+    parse_size,
+    write_manifest,
+    write_rotated,
+)
+from exporters.templates import (
+    TEMPLATE_PRESETS,
+    TEMPLATE_SYNTAXES,
+    compile_template,
+    format_template_chunk,
+)
+from generators.live import iter_live_batches
+from generators.pipeline import iter_pipelined_chunks
+from generators.log_batch import iter_log_batches
+from generators.profiling import (
+    format_profile,
+    profile_generation,
+    profile_iter,
+    profile_stage,
+    profile_summary,
+)
+from generators.sharding import (
+    DEFAULT_SHARD_SIZE,
+    iter_shards,
+    csv_header,
+    write_shard_files,
+    iter_formatted_chunks,
+    format_batch,
+    seed_generators,
+)
+from generators.random_access import iter_range
+from generators.traffic_model import TRAFFIC_MODELS
+from generators.value_pool import DEFAULT_POOL_SKEW, configure_value_pools
 
 def parse_args():
     """Parse command line arguments."""
@@ -27,22 +90,113 @@ Examples:
   # Generate 500 log entries in traditional format
   python generate_logs.py 500 --format log
 
+  # Apache combined access log lines, or any Apache, nginx or {field} template
+  python generate_logs.py 1000 --template combined
+  python generate_logs.py 1000 --template '{timestamp:%H:%M:%S} {status_code} {path}'
+
+  # Exactly 20 GB of logs in 256 MB files gzipped in the background, plus a manifest
+  python generate_logs.py --size 20GB --rotate-size 256MB --output logs/access.json.gz
+
   # Generate logs with custom date range
   python generate_logs.py 100 --start-date 2024-01-01 --end-date 2024-01-31
+
+  # Generate 100M entries on 32 cores into one file per worker
+  python generate_logs.py 100000000 --workers 32 --output logs.json --shard-files
+
+  # Counter-based dataset of seed 7 (other entries than --seed 7 alone): start it
+  # with --offset 0, then resume at entry 73,000,000 without generating the ones
+  # before it
+  python generate_logs.py 73000000 --seed 7 --offset 0 \\
+      --start-date 2024-01-01 --end-date 2024-12-31
+  python generate_logs.py 1000 --seed 7 --offset 73000000 \\
+      --start-date 2024-01-01 --end-date 2024-12-31
+
+  # Reuse a seeded dataset across test jobs: generated once, then copied from the cache
+  python generate_logs.py 100000 --seed 7 --start-date 2024-01-01 \\
+      --end-date 2024-12-31 --cache-dir ~/.cache/fake-logs -o logs.json
+
+  # Stream 50M entries in chunks of 10000 lines with flat memory use
+  python generate_logs.py 50000000 --chunk-size 10000 | gzip > logs.json.gz
+
+  # Same, gzip-compressed in parallel blocks on every core while generating
+  python generate_logs.py 50000000 --output logs.json.gz
+
+  # Overlap generation, formatting and gzip compression on separate threads
+  python generate_logs.py 10000000 --pipeline --output logs.json.gz
+
+  # Push 5000 entries/s of RFC 5424 syslog into rsyslog or Vector for 10 minutes
+  python generate_logs.py --rate 5000 --duration 600 --sink syslog+tcp://localhost:514
+
+  # See which field generators and stages a run spends its time in
+  python generate_logs.py 100000 --output logs.json --profile
+
+  # Generate 10M entries once into a memory-mappable binary log, then replay it as JSON
+  python generate_logs.py 10000000 --format binary --output logs.binlog
+  python generate_logs.py --from-binary logs.binlog --output logs.json.gz
+
+  # Write 10M entries to Parquet in row groups of 100000, typed for DuckDB and Spark
+  python generate_logs.py 10000000 --format parquet --output logs.parquet
+
+  # Feed a log shipper 5000 entries per second with current timestamps for 10 minutes
+  python generate_logs.py --rate 5000 --duration 600 | vector --config shipper.toml
+
+  # 100M entries over 2024 with realistic hour-of-day and weekday traffic, in time order
+  python generate_logs.py 100000000 --traffic diurnal --start-date 2024-01-01 \\
+    --end-date 2024-12-31 -o logs.parquet -f parquet
+
+  # Pipe 10M CSV rows straight into PostgreSQL with constant memory
+  python generate_logs.py 10000000 -f csv -q | psql -c "COPY log_entries \\
+      (timestamp, log_level, ...) FROM STDIN WITH (FORMAT csv, HEADER true)"
         """
     )
     
     parser.add_argument(
         "count",
         type=int,
-        help="Number of log entries to generate"
+        nargs="?",
+        help=(
+            "Number of log entries to generate "
+            "(optional with --rate; replaced by --size)"
+        )
     )
     
     parser.add_argument(
-        "--format", "-f",
-        choices=["json", "csv", "log"],
+        "--format",
+        "-f",
+        choices=["json", "csv", "log", "parquet", "binary"],
         default="json",
-        help="Output format (default: json)"
+        help=(
+            "Output format (default: json); parquet (needs pyarrow) and binary "
+            "require --output"
+        ),
+    )
+    
+    parser.add_argument(
+        "--from-binary",
+        type=str,
+        help=(
+            "Read the entries of a --format binary file instead of generating new "
+            "ones, e.g. to convert it to JSON"
+        ),
+    )
+    
+    parser.add_argument(
+        "--template",
+        type=str,
+        help=(
+            "Format lines with a compiled template instead of --format: "
+            f"a preset ({', '.join(TEMPLATE_PRESETS)}) or a template string"
+        )
+    )
+    
+    parser.add_argument(
+        "--template-syntax",
+        choices=list(TEMPLATE_SYNTAXES),
+        default="fields",
+        help=(
+            "Syntax of a --template string: Apache LogFormat, nginx log_format "
+            "or {field} (default: fields)"
+        )
     )
     
     parser.add_argument(
@@ -63,6 +217,283 @@ Examples:
         help="End date for log entries (YYYY-MM-DD format, default: now)"
     )
     
+    parser.add_argument(
+        "--sort",
+        action="store_true",
+        help="Emit entries in chronological order, streamed without sorting in memory"
+    )
+    
+    parser.add_argument(
+        "--traffic",
+        choices=list(TRAFFIC_MODELS),
+        help=(
+            "Draw timestamps from a traffic curve (diurnal: hour-of-day and weekday) "
+            "instead of uniformly; implies --sort"
+        )
+    )
+    
+    parser.add_argument(
+        "--size",
+        type=str,
+        help=(
+            "Generate this many bytes of log lines instead of COUNT entries, "
+            "e.g. 500M or 20GB (K/M/G are powers of 1024, KB/MB/GB powers of 1000)"
+        )
+    )
+    
+    parser.add_argument(
+        "--rotate-size",
+        type=str,
+        help=(
+            "Roll --output over to numbered files (logs.00000.json, ...) "
+            "of at most this many bytes before compression"
+        )
+    )
+    
+    parser.add_argument(
+        "--rotate-lines",
+        type=int,
+        help="Roll --output over to numbered files of at most this many lines"
+    )
+    
+    parser.add_argument(
+        "--rotate-time",
+        type=str,
+        help=(
+            "Roll --output over to a new numbered file after this long, "
+            "e.g. 90s, 5m or 1h"
+        )
+    )
+    
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        help=(
+            "Path of the JSON manifest of rotated files "
+            "(default: next to them, e.g. logs.manifest.json)"
+        )
+    )
+    
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=BATCH_SIZE,
+        help=f"Number of lines generated and written per chunk (default: {BATCH_SIZE})"
+    )
+    
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=1,
+        help="Number of worker processes generating shards in parallel (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help=(
+            "Seed for reproducible output; the same seed gives the same shards "
+            "for any --workers"
+        )
+    )
+    
+    parser.add_argument(
+        "--offset",
+        type=int,
+        help=(
+            "Emit entries OFFSET..OFFSET+COUNT of the counter-based dataset for "
+            "--seed, computed directly; this is a different dataset from --seed "
+            "without --offset, so resume runs started with --offset 0"
+        )
+    )
+    
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help=(
+            "Serve a --seed run with --start-date and --end-date from this dataset "
+            "cache, generating it there on a miss"
+        ),
+    )
+    
+    parser.add_argument(
+        "--cache-link",
+        action="store_true",
+        help=(
+            "Hardlink cache hits to --output instead of copying them; the file is "
+            "read-only, and writing to it in place makes the next run regenerate "
+            "the dataset"
+        ),
+    )
+    
+    parser.add_argument(
+        "--cache-size",
+        type=str,
+        help=(
+            "Evict least recently used datasets beyond this total size, e.g. 500M "
+            "or 20GB (default: 4G)"
+        ),
+    )
+    
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=DEFAULT_SHARD_SIZE,
+        help=(
+            "Number of entries per shard with --workers or --seed "
+            f"(default: {DEFAULT_SHARD_SIZE})"
+        )
+    )
+    
+    parser.add_argument(
+        "--shard-files",
+        action="store_true",
+        help=(
+            "Write one file per worker (e.g. logs.00000.json) instead of a single "
+            "--output file"
+        )
+    )
+    
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=0,
+        help=(
+            "Sample user agents, URLs, usernames and emails from pools of this "
+            "many values instead of calling Faker per entry (default: 0, off)"
+        )
+    )
+    
+    parser.add_argument(
+        "--pool-skew",
+        type=float,
+        default=DEFAULT_POOL_SKEW,
+        help=(
+            "Zipf exponent of the pooled values' "
+            f"popularity (default: {DEFAULT_POOL_SKEW})"
+        )
+    )
+    
+    parser.add_argument(
+        "--pool-refresh",
+        type=int,
+        help="Rebuild a pool after this many draws from it (default: never)"
+    )
+    
+    parser.add_argument(
+        "--pool-cache",
+        type=str,
+        help=(
+            "JSON file to load value pools from and "
+            "save them to, so later runs skip Faker"
+        )
+    )
+    
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Live mode: emit this many entries per second with current timestamps"
+    )
+    
+    parser.add_argument(
+        "--duration",
+        type=float,
+        help=(
+            "Live mode: stop after this many seconds "
+            "(default: run until COUNT or interrupted)"
+        )
+    )
+    
+    parser.add_argument(
+        "--compress",
+        choices=list(COMPRESSION_LEVELS),
+        help=(
+            "Compress the output in parallel blocks "
+            "(default: inferred from a .gz, .bz2 or .xz --output suffix)"
+        )
+    )
+    
+    parser.add_argument(
+        "--compress-threads",
+        type=int,
+        default=os.cpu_count() or 1,
+        help=(
+            "Number of threads compressing blocks while generation continues "
+            "(default: one per CPU)"
+        )
+    )
+    
+    parser.add_argument(
+        "--sink",
+        type=str,
+        help=(
+            "Send entries to a collector instead of a file: "
+            "syslog+udp://, syslog+tcp://, tcp://, unix:// or http(s):// URL"
+        )
+    )
+    
+    parser.add_argument(
+        "--sink-batch-size",
+        type=int,
+        default=SINK_BATCH_SIZE,
+        help=f"Messages per network batch (default: {SINK_BATCH_SIZE})"
+    )
+    
+    parser.add_argument(
+        "--sink-linger",
+        type=float,
+        default=SINK_LINGER,
+        help=(
+            "Seconds a partial batch waits for more messages before it is sent "
+            f"(default: {SINK_LINGER})"
+        )
+    )
+    
+    parser.add_argument(
+        "--sink-in-flight",
+        type=int,
+        default=SINK_IN_FLIGHT,
+        help=f"Batches sent concurrently (default: {SINK_IN_FLIGHT})"
+    )
+    
+    parser.add_argument(
+        "--sink-connections",
+        type=int,
+        default=SINK_CONNECTIONS,
+        help=f"Connections kept open to the sink (default: {SINK_CONNECTIONS})"
+    )
+    
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help=(
+            "Generate, format and write on separate threads, "
+            "so writing and compression overlap with generation"
+        )
+    )
+    
+    parser.add_argument(
+        "--pipeline-workers",
+        type=int,
+        nargs=2,
+        metavar=("GENERATE", "FORMAT"),
+        help=(
+            "Threads generating and formatting batches with --pipeline "
+            "(default: 1 1; implies --pipeline)"
+        )
+    )
+    
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="table",
+        choices=["table", "json"],
+        help=(
+            "Report time per field generator and per stage (generate, format, write) "
+            "on stderr, as a table or JSON"
+        )
+    )
+    
     parser.add_argument(
         "--quiet", "-q",
         action="store_true",
@@ -78,15 +509,135 @@ def parse_date(date_str: str) -> datetime:
     except ValueError:
         raise ValueError(f"Invalid date format: {date_str}. Use YYYY-MM-DD format.")
 
+def write_shards(shards, stream, compression=None, compress_threads=1) -> None:
+    """Write formatted shards or chunks to a stream in order, optionally compressed."""
+    with profile_stage("write"):
+        if compression:
+            write_compressed(shards, stream, compression, threads=compress_threads)
+            return
+        for shard in shards:
+            stream.write(shard)
+        stream.flush()
+
+def until_interrupted(iterable):
+    """Yield from an iterable until Ctrl-C, which ends it quietly."""
+    try:
+        yield from iterable
+    except KeyboardInterrupt:
+        return
+
+def report_rate(emitted: int, elapsed: float, rate: float) -> None:
+    """Print the achieved rate of a live run next to its target."""
+    achieved = emitted / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Emitted {emitted} log entries in {elapsed:.2f}s: "
+        f"{achieved:.1f}/s achieved, {rate:g}/s target ({achieved / rate:.1%})",
+        file=sys.stderr,
+    )
+
+def report_profile(profile, style: str) -> None:
+    """Print a generation profile on stderr as a table or as JSON."""
+    if style == "json":
+        print(json.dumps(profile_summary(profile), indent=2), file=sys.stderr)
+    else:
+        print(format_profile(profile), file=sys.stderr)
+
 def main():
     """Main CLI function."""
     args = parse_args()
     
     # Validate count
-    if args.count <= 0:
+    if (
+        args.count is None
+        and args.rate is None
+        and args.size is None
+        and args.from_binary is None
+    ):
+        print(
+            "Error: Count is required unless --rate, --size or --from-binary is given",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    if args.from_binary is not None and (
+        args.count is not None
+        or args.rate is not None
+        or args.sink
+        or args.workers > 1
+        or args.shard_files
+        or args.seed is not None
+        or args.pipeline
+        or args.pipeline_workers is not None
+        or args.sort
+        or args.traffic
+        or args.start_date
+        or args.end_date
+    ):
+        print(
+            "Error: --from-binary replays a whole file and cannot be combined with "
+            "COUNT, --rate, --sink, --workers, --shard-files, --seed, --offset, "
+            "--pipeline, --sort, --traffic or dates",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    if args.format == "binary" and (
+        not args.output
+        or args.compress
+        or args.rate is not None
+        or args.sink
+        or args.workers > 1
+        or args.shard_files
+        or args.offset is not None
+        or args.pipeline
+        or args.pipeline_workers is not None
+        or args.size
+        or args.rotate_size
+        or args.rotate_lines
+        or args.rotate_time
+    ):
+        print(
+            "Error: --format binary requires --output and cannot be combined with "
+            "--compress, --rate, --sink, --workers, --shard-files, --offset, "
+            "--pipeline, --size or rotation",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    if args.count is not None and args.size is not None:
+        print("Error: --size replaces COUNT; give one or the other", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.count is not None and args.count <= 0:
         print("Error: Count must be a positive integer", file=sys.stderr)
         sys.exit(1)
     
+    if args.rate is not None and (
+        args.rate <= 0 or (args.duration is not None and args.duration <= 0)
+    ):
+        print("Error: Rate and duration must be positive", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.duration is not None and args.rate is None:
+        print("Error: --duration requires --rate", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.rate is not None and (
+        args.start_date
+        or args.end_date
+        or args.sort
+        or args.offset is not None
+        or args.workers > 1
+        or args.shard_files
+        or args.format == "parquet"
+    ):
+        print(
+            "Error: --rate cannot be combined with dates, --sort, --offset, "
+            "--workers, --shard-files or --format parquet",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
     # Parse dates if provided
     start_date = None
     end_date = None
@@ -110,61 +661,652 @@ def main():
         print("Error: End date must be after start date", file=sys.stderr)
         sys.exit(1)
     
+    # Parse sizes and rotation limits if provided
+    try:
+        size = parse_size(args.size) if args.size is not None else None
+        rotate_size = (
+            parse_size(args.rotate_size) if args.rotate_size is not None else None
+        )
+        rotate_time = (
+            parse_duration(args.rotate_time) if args.rotate_time is not None else None
+        )
+        cache_size = DEFAULT_CACHE_SIZE
+        if args.cache_size is not None:
+            cache_size = parse_size(args.cache_size)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    rotate = (
+        rotate_size is not None
+        or args.rotate_lines is not None
+        or rotate_time is not None
+    )
+    
+    if args.rotate_lines is not None and args.rotate_lines <= 0:
+        print("Error: Rotate lines must be a positive integer", file=sys.stderr)
+        sys.exit(1)
+    
+    if rotate and not args.output:
+        print(
+            "Error: --rotate-size, --rotate-lines and --rotate-time require --output",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    if args.manifest and not rotate:
+        print(
+            "Error: --manifest requires --rotate-size, --rotate-lines or --rotate-time",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    if (size is not None or rotate) and (
+        args.format == "parquet"
+        or args.sink
+        or args.workers > 1
+        or args.shard_files
+        or args.seed is not None
+        or args.pipeline
+        or args.pipeline_workers is not None
+    ):
+        print(
+            "Error: --size and rotation cannot be combined with --format parquet, "
+            "--sink, --workers, --shard-files, --seed, --offset or --pipeline",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    if size is not None and (args.sort or args.traffic):
+        print(
+            "Error: --size cannot be combined with --sort or --traffic, "
+            "which need COUNT up front",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    if args.chunk_size <= 0:
+        print("Error: Chunk size must be a positive integer", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.workers <= 0 or args.shard_size <= 0:
+        print(
+            "Error: Workers and shard size must be positive integers", file=sys.stderr
+        )
+        sys.exit(1)
+    
+    if args.shard_files and not args.output:
+        print("Error: --shard-files requires --output", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.offset is not None and (args.seed is None or args.offset < 0):
+        print(
+            "Error: --offset must be non-negative and requires --seed", file=sys.stderr
+        )
+        sys.exit(1)
+    
+    if args.offset is not None and (
+        args.workers > 1 or args.shard_files or args.pool_size
+    ):
+        print(
+            "Error: --offset cannot be combined with --workers, --shard-files or "
+            "--pool-size",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    if args.cache_dir and (args.seed is None or start_date is None or end_date is None):
+        print(
+            "Error: --cache-dir caches reproducible runs and requires --seed, "
+            "--start-date and --end-date",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    if args.cache_dir and (
+        args.format in ("parquet", "binary")
+        or args.shard_files
+        or args.pool_size
+        or args.profile
+    ):
+        print(
+            "Error: --cache-dir cannot be combined with --format parquet or binary, "
+            "--shard-files, --pool-size or --profile",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    if (args.cache_size is not None or args.cache_link) and not args.cache_dir:
+        print(
+            "Error: --cache-size and --cache-link require --cache-dir", file=sys.stderr
+        )
+        sys.exit(1)
+    
+    if args.sort and (args.workers > 1 or args.shard_files or args.seed is not None):
+        print(
+            "Error: --sort cannot be combined with --workers, --shard-files, --seed "
+            "or --offset",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    if args.traffic and (
+        args.workers > 1
+        or args.shard_files
+        or args.seed is not None
+        or args.rate is not None
+    ):
+        print(
+            "Error: --traffic cannot be combined with --workers, --shard-files, "
+            "--seed, --offset or --rate",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    traffic_model = TRAFFIC_MODELS[args.traffic] if args.traffic else None
+    
+    if args.profile and (args.workers > 1 or args.shard_files):
+        print(
+            "Error: --profile cannot be combined with --workers or --shard-files, "
+            "which generate in other processes",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    if args.sink:
+        try:
+            sink_target = parse_sink_url(args.sink)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        if (
+            args.output
+            or args.compress
+            or args.format == "parquet"
+            or args.workers > 1
+            or args.shard_files
+            or args.seed is not None
+            or args.pipeline
+            or args.pipeline_workers is not None
+        ):
+            print(
+                "Error: --sink cannot be combined with --output, --compress, "
+                "--format parquet, --workers, --shard-files, --seed, --offset "
+                "or --pipeline",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        if sink_target.scheme in ("http", "https") and args.format != "json":
+            print("Error: HTTP sinks take NDJSON; use --format json", file=sys.stderr)
+            sys.exit(1)
+        if (
+            min(args.sink_batch_size, args.sink_in_flight, args.sink_connections) <= 0
+            or args.sink_linger < 0
+        ):
+            print(
+                "Error: Sink batch size, in-flight batches and connections "
+                "must be positive and linger non-negative",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+    
+    if args.template is not None:
+        try:
+            compile_template(args.template, args.template_syntax)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        if (
+            args.format != "json"
+            or args.sink
+            or args.workers > 1
+            or args.shard_files
+            or args.seed is not None
+        ):
+            print(
+                "Error: --template replaces --format and cannot be combined "
+                "with --sink, --workers, --shard-files, --seed or --offset",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        format_chunk = partial(
+            format_template_chunk, template=args.template, syntax=args.template_syntax
+        )
+    else:
+        format_chunk = partial(format_batch, format_type=args.format)
+    
+    if args.pipeline_workers is not None:
+        args.pipeline = True
+        if min(args.pipeline_workers) <= 0:
+            print("Error: Pipeline workers must be positive integers", file=sys.stderr)
+            sys.exit(1)
+    
+    if args.pipeline and (
+        args.rate is not None
+        or args.format == "parquet"
+        or args.workers > 1
+        or args.shard_files
+        or args.seed is not None
+        or args.profile
+    ):
+        print(
+            "Error: --pipeline cannot be combined with --rate, --format parquet, "
+            "--workers, --shard-files, --seed, --offset or --profile",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    if args.format == "parquet" and not args.output:
+        print("Error: --format parquet requires --output", file=sys.stderr)
+        sys.exit(1)
+    
+    if (
+        args.compress is None
+        and args.output
+        and args.format not in ("parquet", "binary")
+    ):
+        args.compress = infer_compression(args.output)
+    
+    if args.compress and args.format == "parquet":
+        print(
+            "Error: --compress cannot be combined with --format parquet, "
+            "which compresses internally",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    if args.compress_threads <= 0:
+        print("Error: Compress threads must be a positive integer", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.format == "parquet" and (
+        args.workers > 1 or args.shard_files or args.offset is not None
+    ):
+        print(
+            "Error: --format parquet cannot be combined "
+            "with --workers, --shard-files or --offset",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    date_range = {}
+    if start_date:
+        date_range["start_date"] = start_date
+    if end_date:
+        date_range["end_date"] = end_date
+    
+    if args.pool_size < 0 or (args.pool_refresh is not None and args.pool_refresh <= 0):
+        print(
+            "Error: Pool size cannot be negative and pool refresh must be positive",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    
+    # Seed before building value pools so seeded runs get the same pools
+    if args.seed is not None:
+        seed_generators(args.seed)
+    if args.pool_size:
+        configure_value_pools(
+            args.pool_size, args.pool_skew, args.pool_refresh, args.pool_cache
+        )
+    
     # Show progress
-    if not args.quiet:
-        print(f"Generating {args.count} log entries in {args.format.upper()} format...", file=sys.stderr)
+    format_name = "template" if args.template is not None else args.format.upper()
+    amount = f"{args.size} of" if size is not None else args.count
+    if not args.quiet and args.rate is not None:
+        until = "until interrupted"
+        if args.duration is not None:
+            until = f"for {args.duration:g}s"
+        print(
+            f"Streaming {args.rate:g} log entries/s in {format_name} format {until}...",
+            file=sys.stderr,
+        )
+    elif not args.quiet and args.from_binary:
+        print(
+            f"Converting {args.from_binary} to {format_name} format...", file=sys.stderr
+        )
+    elif not args.quiet:
+        print(
+            f"Generating {amount} log entries in {format_name} format...",
+            file=sys.stderr,
+        )
         if start_date:
             print(f"Start date: {start_date.date()}", file=sys.stderr)
         if end_date:
             print(f"End date: {end_date.date()}", file=sys.stderr)
     
+    def input_batches(source_log):
+        """Return batches of --chunk-size new entries or the --from-binary blocks."""
+        if source_log is not None:
+            return iter_binary_log_batches(source_log)
+        return iter_log_batches(
+            args.count,
+            args.chunk_size,
+            sort=args.sort,
+            traffic_model=traffic_model,
+            **date_range,
+        )
+    
+    profiler = profile_generation() if args.profile else nullcontext()
+    source = open_binary_log(args.from_binary) if args.from_binary else nullcontext()
     try:
-        # Handle CSV format specially to include headers
-        if args.format == "csv":
-            if args.output:
+        with profiler as profile, source as source_log:
+            if source_log is not None:
+                amount = source_log.row_count
+            if args.sink:
+                # Network sink: batches are generated on a worker thread while
+                # earlier ones are sent
+                if args.rate is not None:
+                    batches = iter_live_batches(args.rate, args.duration, args.count)
+                else:
+                    batches = iter_log_batches(
+                        args.count,
+                        args.chunk_size,
+                        sort=args.sort,
+                        traffic_model=traffic_model,
+                        **date_range,
+                    )
+                
+                started = time.monotonic()
+                generated = 0
+                def iter_messages():
+                    nonlocal generated
+                    for batch in profile_iter("generate", batches):
+                        with profile_stage("format"):
+                            messages = sink_messages(batch, sink_target, args.format)
+                        generated += len(messages)
+                        yield messages
+                
+                try:
+                    send_message_chunks(
+                        iter_messages(),
+                        args.sink,
+                        batch_size=args.sink_batch_size,
+                        linger=args.sink_linger,
+                        in_flight=args.sink_in_flight,
+                        connections=args.sink_connections,
+                    )
+                except KeyboardInterrupt:
+                    pass
+                
+                if not args.quiet and args.rate is not None:
+                    report_rate(generated, time.monotonic() - started, args.rate)
+                elif not args.quiet:
+                    print(
+                        f"Sent {generated} log entries to {args.sink}", file=sys.stderr
+                    )
+            elif rotate:
+                # Numbered files rolled over by size, lines or age, compressed in the
+                # background
+                started = time.monotonic()
+                if args.rate is not None:
+                    batches = iter_live_batches(args.rate, args.duration, args.count)
+                    batches = profile_iter("pace", until_interrupted(batches))
+                else:
+                    batches = profile_iter("generate", input_batches(source_log))
+                pairs = ((format_chunk(batch), batch.timestamps) for batch in batches)
+                chunks = profile_iter("format", pairs)
+                if size is not None:
+                    chunks = limit_size(chunks, size)
+                
+                with profile_stage("write"):
+                    files = write_rotated(
+                        chunks,
+                        args.output,
+                        rotate_size,
+                        args.rotate_lines,
+                        rotate_time,
+                        header=csv_header() if args.format == "csv" else b"",
+                        compression=args.compress,
+                        compress_threads=args.compress_threads,
+                    )
+                manifest = (
+                    Path(args.manifest) if args.manifest else manifest_path(args.output)
+                )
+                write_manifest(files, manifest)
+                
+                total_lines = sum(rotated.lines for rotated in files)
+                if not args.quiet and args.rate is not None:
+                    report_rate(total_lines, time.monotonic() - started, args.rate)
+                if not args.quiet:
+                    print(
+                        f"Generated {total_lines} log entries to {len(files)} files, "
+                        f"listed in {manifest}",
+                        file=sys.stderr,
+                    )
+            elif args.rate is not None:
+                # Live mode: paced batches with current timestamps, flushed as they
+                # come due
+                output_path = Path(args.output) if args.output else None
+                if output_path:
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                
+                started = time.monotonic()
+                emitted = 0
+                stream = open(output_path, 'wb') if output_path else sys.stdout.buffer
+                try:
+                    if args.format == "csv":
+                        stream.write(csv_header())
+                    batches = iter_live_batches(args.rate, args.duration, args.count)
+                    batches = profile_iter("pace", batches)
+                    pairs = (
+                        (format_chunk(batch), batch.timestamps) for batch in batches
+                    )
+                    chunks = profile_iter("format", pairs)
+                    if size is not None:
+                        chunks = limit_size(chunks, size)
+                    for data, timestamps in chunks:
+                        with profile_stage("write"):
+                            if args.compress:
+                                # One member per batch keeps output live
+                                data = compress_block(data, args.compress)
+                            stream.write(data)
+                            # Consumers see every batch when it is due,
+                            # not when a buffer fills
+                            stream.flush()
+                        emitted += len(timestamps)
+                except KeyboardInterrupt:
+                    pass
+                finally:
+                    if output_path:
+                        stream.close()
+                
+                if not args.quiet:
+                    report_rate(emitted, time.monotonic() - started, args.rate)
+            elif args.format == "parquet":
+                # Columnar batches regrouped into fixed-size Parquet row groups
                 output_path = Path(args.output)
                 output_path.parent.mkdir(parents=True, exist_ok=True)
                 
-                # Generate log entries and export to CSV with headers
-                log_entries = generate_log_entries(args.count)
-                export_to_csv(log_entries, str(output_path))
+                with profile_stage("write"):
+                    write_parquet_batches(
+                        profile_iter("generate", input_batches(source_log)),
+                        str(output_path),
+                    )
                 
                 if not args.quiet:
-                    print(f"Generated {len(log_entries)} log entries to {output_path}", file=sys.stderr)
-            else:
-                # For CSV to stdout, we need to use the CSV exporter
-                import tempfile
-                with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv') as tmp_file:
-                    log_entries = generate_log_entries(args.count)
-                    export_to_csv(log_entries, tmp_file.name)
-                
-                # Read and output the CSV content
-                with open(tmp_file.name, 'r') as f:
-                    print(f.read(), end='')
-                
-                # Clean up temp file
-                import os
-                os.unlink(tmp_file.name)
-        else:
-            # Generate log lines for other formats
-            log_lines = generate_log_lines(args.count, args.format)
-            
-            # Output to file or stdout
-            if args.output:
+                    print(
+                        f"Generated {amount} log entries to {output_path}",
+                        file=sys.stderr,
+                    )
+            elif args.format == "binary":
+                # Columnar batches stored as they are, memory-mapped by --from-binary
                 output_path = Path(args.output)
                 output_path.parent.mkdir(parents=True, exist_ok=True)
                 
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    for line in log_lines:
-                        f.write(line + '\n')
+                with profile_stage("write"):
+                    write_binary_log(
+                        profile_iter("generate", input_batches(source_log)), output_path
+                    )
                 
                 if not args.quiet:
-                    print(f"Generated {len(log_lines)} log entries to {output_path}", file=sys.stderr)
+                    print(
+                        f"Generated {amount} log entries to {output_path}",
+                        file=sys.stderr,
+                    )
+            elif args.cache_dir:
+                # Seeded output served from the dataset cache, generated on a miss
+                destination = Path(args.output) if args.output else sys.stdout.buffer
+                hit = cached_log_file(
+                    args.cache_dir,
+                    destination,
+                    args.count,
+                    args.seed,
+                    start_date,
+                    end_date,
+                    args.format,
+                    args.offset,
+                    args.shard_size,
+                    args.compress,
+                    args.workers,
+                    args.compress_threads,
+                    max_size=cache_size,
+                    link=args.cache_link,
+                )
+                
+                if not args.quiet and args.output:
+                    status = "cache hit" if hit else "cached"
+                    print(
+                        f"Generated {args.count} log entries to {destination} "
+                        f"({status})",
+                        file=sys.stderr,
+                    )
+            elif args.shard_files:
+                # Every worker writes its own contiguous run of shards to its own file
+                output_path = Path(args.output)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                
+                paths = write_shard_files(
+                    output_path,
+                    args.count,
+                    args.format,
+                    args.workers,
+                    args.seed,
+                    args.shard_size,
+                    compression=args.compress,
+                    **date_range,
+                )
+                
+                if not args.quiet:
+                    print(
+                        f"Generated {args.count} log entries to {len(paths)} files "
+                        f"({paths[0]} ...)",
+                        file=sys.stderr,
+                    )
+            elif args.offset is not None:
+                # Counter-based mode: every entry is computed directly from
+                # (seed, index)
+                stop = args.offset + args.count
+                entries = iter_range(args.offset, stop, args.seed, **date_range)
+                entries = profile_iter("generate", entries)
+                shards = iter_formatted_chunks(entries, args.format, args.chunk_size)
+                shards = profile_iter("format", shards)
+                if args.format == "csv":
+                    shards = chain([csv_header()], shards)
+                
+                if args.output:
+                    output_path = Path(args.output)
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    
+                    with open(output_path, 'wb') as f:
+                        write_shards(shards, f, args.compress, args.compress_threads)
+                    
+                    if not args.quiet:
+                        print(
+                            f"Generated {args.count} log entries to {output_path}",
+                            file=sys.stderr,
+                        )
+                else:
+                    write_shards(
+                        shards, sys.stdout.buffer, args.compress, args.compress_threads
+                    )
+            elif args.workers > 1 or args.seed is not None:
+                # Sharded generation, written in shard order to a single destination
+                shards = profile_iter(
+                    "generate",
+                    iter_shards(
+                        args.count,
+                        args.format,
+                        args.workers,
+                        args.seed,
+                        args.shard_size,
+                        **date_range,
+                    ),
+                )
+                if args.format == "csv":
+                    shards = chain([csv_header()], shards)
+                
+                if args.output:
+                    output_path = Path(args.output)
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    
+                    with open(output_path, 'wb') as f:
+                        write_shards(shards, f, args.compress, args.compress_threads)
+                    
+                    if not args.quiet:
+                        print(
+                            f"Generated {args.count} log entries to {output_path}",
+                            file=sys.stderr,
+                        )
+                else:
+                    write_shards(
+                        shards, sys.stdout.buffer, args.compress, args.compress_threads
+                    )
             else:
-                # Output to stdout
-                for line in log_lines:
-                    print(line)
+                # Generate and format columnar batches of --chunk-size entries
+                if args.pipeline:
+                    generate_workers, format_workers = args.pipeline_workers or (1, 1)
+                    chunks = iter_pipelined_chunks(
+                        args.count,
+                        args.format,
+                        args.chunk_size,
+                        sort=args.sort,
+                        traffic_model=traffic_model,
+                        generate_workers=generate_workers,
+                        format_workers=format_workers,
+                        formatter=format_chunk,
+                        **date_range,
+                    )
+                else:
+                    batches = profile_iter("generate", input_batches(source_log))
+                    if size is not None:
+                        pairs = (
+                            (format_chunk(batch), batch.timestamps) for batch in batches
+                        )
+                        chunks = profile_iter("format", pairs)
+                        chunks = (data for data, _ in limit_size(chunks, size))
+                    else:
+                        chunks = profile_iter(
+                            "format", (format_chunk(batch) for batch in batches)
+                        )
+                if args.format == "csv":
+                    chunks = chain([csv_header()], chunks)
+                
+                # Output to file or stdout
+                if args.output:
+                    output_path = Path(args.output)
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    
+                    with open(output_path, 'wb') as f:
+                        write_shards(chunks, f, args.compress, args.compress_threads)
+                    
+                    if not args.quiet:
+                        print(
+                            f"Generated {amount} log entries to {output_path}",
+                            file=sys.stderr,
+                        )
+                else:
+                    # Output to stdout
+                    write_shards(
+                        chunks, sys.stdout.buffer, args.compress, args.compress_threads
+                    )
+        
+        if args.profile:
+            report_profile(profile, args.profile)
     
+    except BrokenPipeError:
+        # Consumer closed the pipe early (e.g. `| head`); silence the flush at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
     except Exception as e:
         print(f"Error generating log entries: {e}", file=sys.stderr)
         sys.exit(1)
@@ -2,14 +2,37 @@
 Client information generators for fake log entries.
 """
 
+import ipaddress
 import random
-import uuid
+from itertools import accumulate
+from socket import AF_INET6, inet_ntoa, inet_ntop
+from typing import Dict, Optional
 from faker import Faker
 
+from generators import value_pool
+from generators.entropy import random_hex, random_uuid4
+
 # IP types with realistic distribution
 IP_TYPES = ["ipv4", "ipv6", "private_ip"]
 IP_TYPE_WEIGHTS = [70, 20, 10]  # Realistic distribution: mostly IPv4, some IPv6, some private
 
+# CIDR networks each IP type is drawn from, with relative weights
+IP_CIDR_TABLES = {
+    "ipv4": [("0.0.0.0/0", 1)],  # Public IPv4, minus EXCLUDED_IPV4_CIDRS
+    "ipv6": [("2000::/3", 1)],  # Global unicast IPv6
+    "private_ip": [("10.0.0.0/8", 1), ("172.16.0.0/12", 1), ("192.168.0.0/16", 1)]
+}
+
+# Networks never used for public IPv4 addresses: private, reserved, loopback, multicast
+EXCLUDED_IPV4_CIDRS = [
+    "0.0.0.0/8", "10.0.0.0/8", "100.64.0.0/10", "127.0.0.0/8", "169.254.0.0/16",
+    "172.16.0.0/12", "192.0.0.0/24", "192.0.2.0/24", "192.88.99.0/24", "192.168.0.0/16",
+    "198.18.0.0/15", "198.51.100.0/24", "203.0.113.0/24", "224.0.0.0/4", "240.0.0.0/4"
+]
+
+# Integer IP addresses below this are IPv4
+IPV4_LIMIT = 1 << 32
+
 # Referer types with realistic distribution
 REFERER_TYPES = ["url", "none"]
 REFERER_WEIGHTS = [60, 40]  # Realistic distribution: some have referers, some don't
@@ -22,83 +45,210 @@ USER_ID_WEIGHTS = [50, 30, 15, 5]  # Realistic distribution: mostly UUIDs, some
 SESSION_ID_TYPES = ["uuid", "hex", "none"]
 SESSION_ID_WEIGHTS = [70, 20, 10]  # Realistic distribution: mostly UUIDs, some hex, some none
 
+# Cumulative weight tables, precomputed once so random.choices() does not
+# rebuild them on every call
+IP_TYPE_CUM_WEIGHTS = list(accumulate(IP_TYPE_WEIGHTS))
+REFERER_CUM_WEIGHTS = list(accumulate(REFERER_WEIGHTS))
+USER_ID_CUM_WEIGHTS = list(accumulate(USER_ID_WEIGHTS))
+SESSION_ID_CUM_WEIGHTS = list(accumulate(SESSION_ID_WEIGHTS))
+
 fake = Faker()
 
 # Source IP generators
+def _parse_cidr(cidr: str) -> tuple[int, int]:
+    """Return (network address as int, number of host bits) for a CIDR string."""
+    network = ipaddress.ip_network(cidr)
+    return int(network.network_address), network.max_prefixlen - network.prefixlen
+
+def compile_cidr_table(
+    table: list[tuple[str, int]],
+) -> tuple[list[int], list[int], list[int]]:
+    """Return the bases, host bit counts and cumulative weights of a CIDR table."""
+    if not table:
+        raise ValueError("CIDR table cannot be empty")
+    
+    networks = [_parse_cidr(cidr) for cidr, _ in table]
+    bases = [base for base, _ in networks]
+    host_bits = [bits for _, bits in networks]
+    cum_weights = list(accumulate(weight for _, weight in table))
+    return bases, host_bits, cum_weights
+
+_COMPILED_CIDR_TABLES = {
+    ip_type: compile_cidr_table(table) for ip_type, table in IP_CIDR_TABLES.items()
+}
+_EXCLUDED_IPV4 = [
+    (base, ~((1 << host_bits) - 1) & 0xFFFFFFFF)
+    for base, host_bits in map(_parse_cidr, EXCLUDED_IPV4_CIDRS)
+]
+
+def is_usable_ipv4(value: int) -> bool:
+    """Return False for addresses in EXCLUDED_IPV4_CIDRS or ending in .0/.255."""
+    if value & 0xFF in (0, 255):
+        return False
+    return not any(value & mask == base for base, mask in _EXCLUDED_IPV4)
+
+def _draw_addresses(
+    ip_type: str, count: int, compiled: tuple[list[int], list[int], list[int]]
+) -> list[int]:
+    """Draw count addresses of one IP type as integers from its compiled CIDR table."""
+    bases, host_bits, cum_weights = compiled
+    getrandbits = random.getrandbits
+    if len(bases) == 1:
+        networks = [0] * count
+    else:
+        networks = random.choices(range(len(bases)), cum_weights=cum_weights, k=count)
+    
+    values = [bases[i] | getrandbits(host_bits[i]) for i in networks]
+    if ip_type == "ipv6":
+        return values
+    
+    # Redraw the few IPv4 addresses that land in reserved space (default public
+    # table only) or end in .0/.255 (networks with a whole host byte only)
+    public = compiled is _COMPILED_CIDR_TABLES["ipv4"]
+    for position, value in enumerate(values):
+        i = networks[position]
+        if host_bits[i] < 8:
+            continue
+        while not (is_usable_ipv4(value) if public else value & 0xFF not in (0, 255)):
+            value = bases[i] | getrandbits(host_bits[i])
+        values[position] = value
+    return values
+
+def format_ip(value: int) -> str:
+    """Format an integer IP address; values below 2**32 are IPv4.
+
+    This matches the interpretation of ipaddress.ip_address().
+    """
+    if value < IPV4_LIMIT:
+        return inet_ntoa(value.to_bytes(4, "big"))
+    return inet_ntop(AF_INET6, value.to_bytes(16, "big"))
+
 def generate_source_ip() -> str:
     """Return a single source IP address with realistic distribution."""
-    ip_type = random.choices(IP_TYPES, weights=IP_TYPE_WEIGHTS)[0]
+    return generate_source_ips(1)[0]
+
+def generate_source_ips(
+    count: int,
+    compact: bool = False,
+    cidr_tables: Optional[Dict[str, list[tuple[str, int]]]] = None,
+) -> list:
+    """Return a list of source IP addresses with realistic distribution.
+    
+    The IP type of every entry is drawn first, then each type's addresses
+    are drawn in bulk as random integers masked into its CIDR networks.
+    
+    Args:
+        count: Number of addresses to generate
+        compact: If True, return integers instead of strings; values below
+            2**32 are IPv4, so ipaddress.ip_address() maps them back (default: False)
+        cidr_tables: Per-type [(cidr, weight), ...] tables overriding IP_CIDR_TABLES
+    
+    Returns:
+        List of IP address strings, or integers if compact
+    """
+    compiled_tables = _COMPILED_CIDR_TABLES
+    if cidr_tables:
+        overrides = {kind: compile_cidr_table(t) for kind, t in cidr_tables.items()}
+        compiled_tables = {**compiled_tables, **overrides}
     
-    if ip_type == "ipv4":
-        return fake.ipv4()
-    elif ip_type == "ipv6":
-        return fake.ipv6()
-    else:  # private_ip
-        # Generate private IP ranges manually
-        private_ranges = [
-            f"10.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}",
-            f"172.{random.randint(16, 31)}.{random.randint(0, 255)}.{random.randint(1, 254)}",
-            f"192.168.{random.randint(0, 255)}.{random.randint(1, 254)}"
-        ]
-        return random.choice(private_ranges)
-
-def generate_source_ips(count: int) -> list[str]:
-    """Return a list of source IP addresses with realistic distribution."""
-    return [generate_source_ip() for _ in range(count)]
+    ip_types = random.choices(IP_TYPES, cum_weights=IP_TYPE_CUM_WEIGHTS, k=count)
+    draws = {
+        ip_type: iter(
+            _draw_addresses(ip_type, ip_types.count(ip_type), compiled_tables[ip_type])
+        )
+        for ip_type in IP_TYPES
+    }
+    values = [next(draws[ip_type]) for ip_type in ip_types]
+    if compact:
+        return values
+    return [format_ip(value) for value in values]
 
 # User agent generators
 def generate_user_agent() -> str:
     """Return a single user agent string."""
+    if value_pool.pools_enabled():
+        return value_pool.pooled_value("user_agent")
     return fake.user_agent()
 
 def generate_user_agents(count: int) -> list[str]:
     """Return a list of user agent strings."""
-    return [generate_user_agent() for _ in range(count)]
+    if value_pool.pools_enabled():
+        return value_pool.pooled_values("user_agent", count)
+    user_agent = fake.user_agent
+    return [user_agent() for _ in range(count)]
 
 # Referer generators
-def generate_referer() -> str:
-    """Return a single referer URL with realistic distribution."""
-    referer_type = random.choices(REFERER_TYPES, weights=REFERER_WEIGHTS)[0]
-    
+def _referer_for_type(referer_type: str) -> str:
+    """Return a single referer of the given type."""
     if referer_type == "url":
+        if value_pool.pools_enabled():
+            return value_pool.pooled_value("url")
         return fake.url()
     else:  # none
         return ""
 
+def generate_referer() -> str:
+    """Return a single referer URL with realistic distribution."""
+    referer_type = random.choices(REFERER_TYPES, cum_weights=REFERER_CUM_WEIGHTS)[0]
+    return _referer_for_type(referer_type)
+
 def generate_referers(count: int) -> list[str]:
     """Return a list of referer URLs with realistic distribution."""
-    return [generate_referer() for _ in range(count)]
+    referer_types = random.choices(
+        REFERER_TYPES, cum_weights=REFERER_CUM_WEIGHTS, k=count
+    )
+    return [_referer_for_type(referer_type) for referer_type in referer_types]
 
 # User ID generators
-def generate_user_id() -> str:
-    """Return a single user ID with realistic distribution."""
-    user_id_type = random.choices(USER_ID_TYPES, weights=USER_ID_WEIGHTS)[0]
-    
+def _user_id_for_type(user_id_type: str) -> str:
+    """Return a single user ID of the given type."""
     if user_id_type == "uuid":
-        return str(uuid.uuid4())
+        return str(random_uuid4())
     elif user_id_type == "username":
+        if value_pool.pools_enabled():
+            return value_pool.pooled_value("username")
         return fake.user_name()
     elif user_id_type == "email":
+        if value_pool.pools_enabled():
+            return value_pool.pooled_value("email")
         return fake.email()
     else:  # none
         return ""
 
+def generate_user_id() -> str:
+    """Return a single user ID with realistic distribution."""
+    user_id_type = random.choices(USER_ID_TYPES, cum_weights=USER_ID_CUM_WEIGHTS)[0]
+    return _user_id_for_type(user_id_type)
+
 def generate_user_ids(count: int) -> list[str]:
     """Return a list of user IDs with realistic distribution."""
-    return [generate_user_id() for _ in range(count)]
+    user_id_types = random.choices(
+        USER_ID_TYPES, cum_weights=USER_ID_CUM_WEIGHTS, k=count
+    )
+    return [_user_id_for_type(user_id_type) for user_id_type in user_id_types]
 
 # Session ID generators
-def generate_session_id() -> str:
-    """Return a single session ID with realistic distribution."""
-    session_id_type = random.choices(SESSION_ID_TYPES, weights=SESSION_ID_WEIGHTS)[0]
-    
+def _session_id_for_type(session_id_type: str) -> str:
+    """Return a single session ID of the given type."""
     if session_id_type == "uuid":
-        return str(uuid.uuid4())
+        return str(random_uuid4())
     elif session_id_type == "hex":
-        return fake.hex_color().replace("#", "")  # 6-character hex
+        return random_hex(3)  # 6-character hex
     else:  # none
         return ""
 
+def generate_session_id() -> str:
+    """Return a single session ID with realistic distribution."""
+    session_id_type = random.choices(
+        SESSION_ID_TYPES, cum_weights=SESSION_ID_CUM_WEIGHTS
+    )[0]
+    return _session_id_for_type(session_id_type)
+
 def generate_session_ids(count: int) -> list[str]:
     """Return a list of session IDs with realistic distribution."""
-    return [generate_session_id() for _ in range(count)] 
\ No newline at end of file
+    session_id_types = random.choices(
+        SESSION_ID_TYPES, cum_weights=SESSION_ID_CUM_WEIGHTS, k=count
+    )
+    return [
+        _session_id_for_type(session_id_type) for session_id_type in session_id_types
+    ]
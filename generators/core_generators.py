@@ -2,15 +2,24 @@
 Core generators for fake log entries.
 """
 
+import math
 import random
 import uuid
+from array import array
+from itertools import accumulate
 from datetime import datetime, timedelta, timezone
+from typing import Iterator
 from faker import Faker
 
+from generators.entropy import random_uuid4, random_uuid4s
+
 # Default dates: 3 years ago to now
 DEFAULT_START_DATE = datetime.now(timezone.utc) - timedelta(days=3 * 365)
 DEFAULT_END_DATE = datetime.now(timezone.utc)
 
+# Reference point for integer epoch-microsecond timestamps
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
 # Log level constants
 LOG_LEVELS = ["INFO", "WARN", "ERROR", "DEBUG"]
 LOG_LEVEL_WEIGHTS = [70, 15, 10, 5]
@@ -23,6 +32,12 @@ HTTP_METHOD_WEIGHTS = [25, 60, 10, 5]
 HTTP_PROTOCOLS = ["HTTP/1.1", "HTTP/2", "HTTP/3"]
 HTTP_PROTOCOL_WEIGHTS = [60, 35, 5]
 
+# Cumulative weight tables, precomputed once so random.choices() does not
+# rebuild them on every call
+LOG_LEVEL_CUM_WEIGHTS = list(accumulate(LOG_LEVEL_WEIGHTS))
+HTTP_METHOD_CUM_WEIGHTS = list(accumulate(HTTP_METHOD_WEIGHTS))
+HTTP_PROTOCOL_CUM_WEIGHTS = list(accumulate(HTTP_PROTOCOL_WEIGHTS))
+
 # ID types for path generation
 ID_TYPES = ["number", "uuid", "slug"]
 
@@ -70,10 +85,12 @@ API_PATH_WEIGHTS = [
     1,   # /api/v1/admin/users
     1    # /api/v1/admin/settings
 ]
+API_PATH_CUM_WEIGHTS = list(accumulate(API_PATH_WEIGHTS))
 
 # Query parameter types with realistic distribution
 QUERY_PARAM_TYPES = ["none", "pagination", "filtering", "sorting", "search"]
 QUERY_PARAM_WEIGHTS = [40, 25, 20, 10, 5]
+QUERY_PARAM_CUM_WEIGHTS = list(accumulate(QUERY_PARAM_WEIGHTS))
 
 # Common parameter patterns
 PAGINATION_PARAMS = [
@@ -113,6 +130,15 @@ SEARCH_PARAMS = [
     "query=test+data"
 ]
 
+# Query strings for each parameter type, with the leading "?" already applied
+QUERY_PARAM_CHOICES = {
+    "none": [""],
+    "pagination": ["?" + params for params in PAGINATION_PARAMS],
+    "filtering": ["?" + params for params in FILTERING_PARAMS],
+    "sorting": ["?" + params for params in SORTING_PARAMS],
+    "search": ["?" + params for params in SEARCH_PARAMS]
+}
+
 fake = Faker()
 
 # Timestamp generators
@@ -124,6 +150,77 @@ def generate_timestamp(start_date: datetime = DEFAULT_START_DATE, end_date: date
     timestamp = fake.date_time_between(start_date=start_date, end_date=end_date, tzinfo=timezone.utc)
     return timestamp
 
+def _epoch_micros(value: datetime) -> int:
+    """Return a timezone-aware datetime as integer microseconds since the Unix epoch."""
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+def micros_to_timestamp(micros: int) -> datetime:
+    """Return integer epoch microseconds as a UTC datetime object."""
+    return EPOCH + timedelta(microseconds=micros)
+
+def iter_sorted_timestamp_micros(
+    count: int,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+    batch_size: int = 10000,
+) -> Iterator[array]:
+    """Yield ascending uniform timestamps as batches of int64 epoch microseconds.
+    
+    Emits the order statistics of count uniform draws directly, smallest
+    first: with m draws left above position x, the next one is the minimum
+    of m uniforms on [x, 1], i.e. x + (1 - x) * (1 - U ** (1 / m)). One
+    streaming pass, no sort, and memory bounded by batch_size.
+    
+    Args:
+        count: Number of timestamps to generate
+        start_date: Start of date range (default: 3 years ago)
+        end_date: End of date range (default: now)
+        batch_size: Maximum number of timestamps per batch (default: 10000)
+    
+    Yields:
+        array('q') batches of ascending epoch microseconds
+    """
+    if end_date < start_date:
+        raise ValueError(
+            f"end_date ({end_date}) cannot be before start_date ({start_date})"
+        )
+    if batch_size <= 0:
+        raise ValueError(f"batch_size ({batch_size}) must be positive")
+    
+    start_micros = _epoch_micros(start_date)
+    span = _epoch_micros(end_date) - start_micros
+    rand, log, expm1 = random.random, math.log, math.expm1
+    position = 0.0
+    
+    for batch_start in range(0, count, batch_size):
+        batch = array("q")
+        append = batch.append
+        for remaining in range(
+            count - batch_start, max(count - batch_start - batch_size, 0), -1
+        ):
+            # 1 - rand() lies in (0, 1], so log() is always defined
+            position -= (1.0 - position) * expm1(log(1.0 - rand()) / remaining)
+            append(start_micros + min(int(position * span), span))
+        yield batch
+
+def iter_sorted_timestamps(
+    count: int,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+) -> Iterator[datetime]:
+    """Lazily yield count uniform UTC timestamps in chronological order.
+    
+    Args:
+        count: Number of timestamps to generate
+        start_date: Start of date range (default: 3 years ago)
+        end_date: End of date range (default: now)
+    
+    Yields:
+        Ascending datetime objects in UTC timezone
+    """
+    for batch in iter_sorted_timestamp_micros(count, start_date, end_date):
+        yield from map(micros_to_timestamp, batch)
+
 def generate_timestamps(count: int, start_date: datetime = DEFAULT_START_DATE, end_date: datetime = DEFAULT_END_DATE, sort: bool = True) -> list[datetime]:
     """Return a list of UTC timestamps as datetime objects.
     
@@ -139,89 +236,100 @@ def generate_timestamps(count: int, start_date: datetime = DEFAULT_START_DATE, e
     if end_date < start_date:
         raise ValueError(f"end_date ({end_date}) cannot be before start_date ({start_date})")
     
-    timestamps = [generate_timestamp(start_date, end_date) for _ in range(count)]
     if sort:
-        timestamps.sort()
-    return timestamps
+        # Generated already in order; no O(n log n) sort needed
+        return list(iter_sorted_timestamps(count, start_date, end_date))
+    
+    start_micros = _epoch_micros(start_date)
+    span = _epoch_micros(end_date) - start_micros
+    randrange = random.randrange
+    return [
+        micros_to_timestamp(start_micros + randrange(span + 1)) for _ in range(count)
+    ]
 
 # Request ID generators
 def generate_request_id() -> uuid.UUID:
     """Return a single request ID as a UUID object."""
-    return uuid.uuid4()
+    return random_uuid4()
 
 def generate_request_ids(count: int) -> list[uuid.UUID]:
     """Return a list of unique request IDs."""
-    return [generate_request_id() for _ in range(count)]
+    return random_uuid4s(count)
 
 # Log level generators
 def generate_log_level() -> str:
     """Return a single log level with realistic distribution."""
-    return random.choices(LOG_LEVELS, weights=LOG_LEVEL_WEIGHTS)[0]
+    return random.choices(LOG_LEVELS, cum_weights=LOG_LEVEL_CUM_WEIGHTS)[0]
 
 def generate_log_levels(count: int) -> list[str]:
     """Return a list of log levels with realistic distribution."""
-    return [generate_log_level() for _ in range(count)]
+    return random.choices(LOG_LEVELS, cum_weights=LOG_LEVEL_CUM_WEIGHTS, k=count)
 
 # HTTP method generators
 def generate_method() -> str:
     """Return a single HTTP method with realistic distribution."""
-    return random.choices(HTTP_METHODS, weights=HTTP_METHOD_WEIGHTS)[0]
+    return random.choices(HTTP_METHODS, cum_weights=HTTP_METHOD_CUM_WEIGHTS)[0]
 
 def generate_methods(count: int) -> list[str]:
     """Return a list of HTTP methods with realistic distribution."""
-    return [generate_method() for _ in range(count)]
+    return random.choices(HTTP_METHODS, cum_weights=HTTP_METHOD_CUM_WEIGHTS, k=count)
 
 # HTTP protocol generators
 def generate_protocol() -> str:
     """Return a single HTTP protocol with realistic distribution."""
-    return random.choices(HTTP_PROTOCOLS, weights=HTTP_PROTOCOL_WEIGHTS)[0]
+    return random.choices(HTTP_PROTOCOLS, cum_weights=HTTP_PROTOCOL_CUM_WEIGHTS)[0]
 
 def generate_protocols(count: int) -> list[str]:
     """Return a list of HTTP protocols with realistic distribution."""
-    return [generate_protocol() for _ in range(count)]
+    return random.choices(
+        HTTP_PROTOCOLS, cum_weights=HTTP_PROTOCOL_CUM_WEIGHTS, k=count
+    )
 
 # Path generators
+def _generate_path_id() -> str:
+    """Return a realistic ID value for a path {id} placeholder."""
+    # Use realistic ID patterns: numbers, UUIDs, or slugs
+    id_type = random.choice(ID_TYPES)
+    if id_type == "number":
+        return str(random.randint(1, 999999))
+    elif id_type == "uuid":
+        return str(random_uuid4())
+    else:  # slug
+        return fake.slug()
+
+def _fill_path_template(path_template: str) -> str:
+    """Replace the {id} placeholder in a path template, if it has one."""
+    if "{id}" in path_template:
+        return path_template.replace("{id}", _generate_path_id())
+    return path_template
+
 def generate_path() -> str:
     """Return a single API path with realistic distribution."""
-    path_template = random.choices(API_PATHS, weights=API_PATH_WEIGHTS)[0]
+    path_template = random.choices(API_PATHS, cum_weights=API_PATH_CUM_WEIGHTS)[0]
     
     # Replace {id} placeholders with realistic IDs
-    if "{id}" in path_template:
-        # Use realistic ID patterns: numbers, UUIDs, or slugs
-        id_type = random.choice(ID_TYPES)
-        if id_type == "number":
-            id_value = str(random.randint(1, 999999))
-        elif id_type == "uuid":
-            id_value = str(fake.uuid4())
-        else:  # slug
-            id_value = fake.slug()
-        
-        return path_template.replace("{id}", id_value)
-    
-    return path_template
+    return _fill_path_template(path_template)
 
 def generate_paths(count: int) -> list[str]:
     """Return a list of API paths with realistic distribution."""
-    return [generate_path() for _ in range(count)]
+    # Draw the whole template column at once; only {id} templates need more work
+    path_templates = random.choices(
+        API_PATHS, cum_weights=API_PATH_CUM_WEIGHTS, k=count
+    )
+    return [_fill_path_template(template) for template in path_templates]
 
 # Query parameters generators
 def generate_query_parameters() -> str:
     """Return a single query parameter string with realistic distribution."""
-    param_type = random.choices(QUERY_PARAM_TYPES, weights=QUERY_PARAM_WEIGHTS)[0]
-    
-    if param_type == "none":
-        return ""
-    elif param_type == "pagination":
-        return "?" + random.choice(PAGINATION_PARAMS)
-    elif param_type == "filtering":
-        return "?" + random.choice(FILTERING_PARAMS)
-    elif param_type == "sorting":
-        return "?" + random.choice(SORTING_PARAMS)
-    elif param_type == "search":
-        return "?" + random.choice(SEARCH_PARAMS)
-    
-    return ""
+    [param_type] = random.choices(
+        QUERY_PARAM_TYPES, cum_weights=QUERY_PARAM_CUM_WEIGHTS
+    )
+    return random.choice(QUERY_PARAM_CHOICES[param_type])
 
 def generate_query_parameters_list(count: int) -> list[str]:
     """Return a list of query parameter strings with realistic distribution."""
-    return [generate_query_parameters() for _ in range(count)] 
\ No newline at end of file
+    choice = random.choice
+    param_types = random.choices(
+        QUERY_PARAM_TYPES, cum_weights=QUERY_PARAM_CUM_WEIGHTS, k=count
+    )
+    return [choice(QUERY_PARAM_CHOICES[param_type]) for param_type in param_types]
@@ -0,0 +1,89 @@
+"""
+Process-local entropy pool for UUIDs, hex IDs and other random bytes.
+
+uuid.uuid4() and friends make one os.urandom(16) syscall and allocation per
+ID. The pool instead reads random bytes in large blocks and hands out
+zero-copy memoryview slices of them. A seeded backend draws the blocks from
+a random.Random instead, so IDs become reproducible.
+"""
+
+import os
+import random
+import threading
+import uuid
+from typing import Optional
+
+# Number of random bytes fetched per refill
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+# Byte translations stamping the UUID version (high nibble of byte 6) and
+# RFC 4122 variant (top bits of byte 8) onto raw random bytes
+_VERSION_4 = bytes((b & 0x0F) | 0x40 for b in range(256))
+_VARIANT_RFC4122 = bytes((b & 0x3F) | 0x80 for b in range(256))
+
+_lock = threading.Lock()
+_block = memoryview(b"")
+_offset = 0
+_rng: Optional[random.Random] = None  # None reads from os.urandom
+
+def _read_block(size: int) -> bytes:
+    """Return size fresh random bytes from the active backend."""
+    if _rng is None:
+        return os.urandom(size)
+    return _rng.getrandbits(size * 8).to_bytes(size, "little")
+
+def _reset() -> None:
+    """Discard buffered bytes so the next request refills the pool."""
+    global _block, _offset
+    _block = memoryview(b"")
+    _offset = 0
+
+def seed_entropy(seed: Optional[int] = None) -> None:
+    """Switch to a deterministic backend seeded with seed, or to os.urandom for None."""
+    global _rng
+    with _lock:
+        _rng = None if seed is None else random.Random(seed)
+        _reset()
+
+def random_bytes(size: int) -> memoryview:
+    """Return a zero-copy view of size random bytes from the pool."""
+    global _block, _offset
+    with _lock:
+        if _offset + size > len(_block):
+            _block = memoryview(_read_block(max(size, DEFAULT_BLOCK_SIZE)))
+            _offset = 0
+        view = _block[_offset:_offset + size]
+        _offset += size
+    return view
+
+def random_uuid4() -> uuid.UUID:
+    """Return a random version 4 UUID built from pooled bytes."""
+    return uuid.UUID(int=int.from_bytes(random_bytes(16), "big"), version=4)
+
+def random_uuid4s(count: int) -> list[uuid.UUID]:
+    """Return count random version 4 UUIDs from a single pooled slice."""
+    view = random_bytes(16 * count)
+    from_bytes, make_uuid = int.from_bytes, uuid.UUID
+    return [
+        make_uuid(int=from_bytes(view[i : i + 16], "big"), version=4)
+        for i in range(0, 16 * count, 16)
+    ]
+
+def random_uuid4_bytes(count: int) -> bytes:
+    """Return count random version 4 UUIDs packed as 16 big-endian bytes each.
+
+    Equivalent to b"".join(u.bytes for u in random_uuid4s(count)) without
+    creating a UUID object per value.
+    """
+    packed = bytearray(random_bytes(16 * count))
+    packed[6::16] = packed[6::16].translate(_VERSION_4)
+    packed[8::16] = packed[8::16].translate(_VARIANT_RFC4122)
+    return bytes(packed)
+
+def random_hex(size: int) -> str:
+    """Return 2 * size lowercase hex characters from pooled bytes."""
+    return random_bytes(size).hex()
+
+# A forked child must not replay the bytes its parent has buffered
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset)
@@ -0,0 +1,100 @@
+"""
+Rate-controlled live generation of fake log entries.
+
+Entries are emitted at a target rate with current timestamps. Pacing is a
+token bucket over batches: every event has a scheduled time (start + i / rate),
+each wake-up emits every event that has come due as one batch, and the
+generator sleeps until the next batch is due instead of once per line. When
+the consumer applies backpressure, events that fall more than one burst
+behind schedule are skipped rather than flushed in a catch-up flood, so
+timestamps stay current and the output rate never exceeds the target by
+more than one burst.
+"""
+
+import time
+from array import array
+from typing import Iterator, Optional
+
+from generators.log_batch import LogBatch, generate_log_batch
+
+# Target seconds between batches at high rates; low rates emit one event per batch
+LIVE_TICK = 0.01
+
+# Seconds of overdue events that may still be emitted after the consumer stalls
+LIVE_MAX_BURST = 1.0
+
+# Seconds of events generated in one batch at most, bounding latency when behind
+# schedule
+LIVE_MAX_BATCH = 0.1
+
+def iter_live_batches(
+    rate: float,
+    duration: Optional[float] = None,
+    count: Optional[int] = None,
+    tick: float = LIVE_TICK,
+    max_burst: float = LIVE_MAX_BURST,
+) -> Iterator[LogBatch]:
+    """Yield batches of log entries at rate events per second, timestamped when due.
+
+    Args:
+        rate: Target events per second
+        duration: Seconds to run for (default: None, forever or until count)
+        count: Stop after this many events (default: None, no limit)
+        tick: Target seconds between batches (default: 0.01)
+        max_burst: Seconds of overdue events emitted at once; older ones are skipped
+            (default: 1.0)
+
+    Yields:
+        LogBatch objects with ascending timestamps at their scheduled times
+    """
+    if rate <= 0:
+        raise ValueError(f"rate ({rate}) must be positive")
+    if duration is not None and duration < 0:
+        raise ValueError(f"duration ({duration}) cannot be negative")
+    if tick <= 0 or max_burst <= 0:
+        raise ValueError(f"tick ({tick}) and max_burst ({max_burst}) must be positive")
+
+    min_batch = max(1, int(rate * tick))
+    max_batch = max(min_batch, int(rate * LIVE_MAX_BATCH))
+    burst = max(min_batch, int(rate * max_burst))
+    start = time.monotonic()
+    start_micros = time.time_ns() // 1000
+    micros_per_event = 1000000 / rate
+    scheduled = 0  # Events that have come due so far, emitted or skipped
+    emitted = 0
+
+    while count is None or emitted < count:
+        elapsed = time.monotonic() - start
+        final = duration is not None and elapsed >= duration
+        if final:
+            elapsed = duration
+
+        # A batch goes out once a tick's worth of events is due, or the rest of count
+        batch_min = min_batch if count is None else min(min_batch, count - emitted)
+        # Tolerates rounding when waking exactly on schedule
+        due = int(elapsed * rate + 1e-6) - scheduled
+        if due > burst:
+            # Too far behind schedule: skip instead of flooding
+            scheduled += due - burst
+            due = burst
+        if count is not None:
+            due = min(due, count - emitted)
+
+        if due >= batch_min or (final and due > 0):
+            due = min(due, max_batch)
+            offsets = range(scheduled, scheduled + due)
+            timestamps = array(
+                "q", [start_micros + int(i * micros_per_event) for i in offsets]
+            )
+            scheduled += due
+            emitted += due
+            yield generate_log_batch(due, timestamps=timestamps)
+        if final:
+            return  # Events still overdue at the end of the run are skipped
+        if due >= batch_min:
+            continue
+
+        next_due = (scheduled + batch_min) / rate
+        if duration is not None:
+            next_due = min(next_due, duration)
+        time.sleep(max(0.0, next_due - (time.monotonic() - start)))
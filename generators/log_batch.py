@@ -0,0 +1,323 @@
+"""
+Columnar batches of fake log entries.
+
+A LogBatch holds one column per field instead of one dict per entry:
+timestamps as int64 epoch microseconds, request IDs as packed UUID bytes,
+the other generated fields as lists of strings (mostly references to
+shared constants), and the placeholder fields as a single value shared by
+every row. Batches are generated column by column with the batched
+generators and formatted column by column, so no per-row dicts, datetime
+or UUID objects are created unless rows are asked for explicitly.
+"""
+
+import json
+import random
+import uuid
+from array import array
+from datetime import datetime
+from itertools import count as count_from
+from json.encoder import encode_basestring_ascii
+from string import Formatter
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional, Union
+
+from generators.core_generators import (
+    generate_log_levels,
+    generate_methods,
+    generate_paths,
+    generate_query_parameters_list,
+    generate_protocols,
+    iter_sorted_timestamp_micros,
+    micros_to_timestamp,
+    _epoch_micros,
+    DEFAULT_START_DATE,
+    DEFAULT_END_DATE,
+)
+from generators.client_generators import (
+    generate_source_ips,
+    generate_user_agents,
+    generate_referers,
+    generate_user_ids,
+    generate_session_ids,
+)
+from generators.entropy import random_uuid4_bytes
+from generators.traffic_model import TrafficModel, iter_traffic_timestamp_micros
+from generators.log_entry_factory import LOG_ENTRY_FIELDS, LogEntry, placeholder_fields
+
+# Default number of entries per batch
+DEFAULT_BATCH_SIZE = 10000
+
+# Line layouts of the text formats, as in format_log_entry_as_string()
+LINE_LAYOUTS = {
+    "json": "{{"
+    + ", ".join(
+        f"{encode_basestring_ascii(field)}: {{{field}}}" for field in LOG_ENTRY_FIELDS
+    )
+    + "}}",
+    "csv": (
+        "{timestamp},{log_level},{request_id},{source_ip},{method},{path},"
+        "{status_code}"
+    ),
+    "log": (
+        "{timestamp} [{log_level}] {request_id} {source_ip} {method} {path} "
+        "{status_code}"
+    ),
+}
+
+class LogBatch(NamedTuple):
+    """Struct-of-arrays batch of log entries."""
+    # int64 epoch microseconds (UTC), one per row; any int64 buffer, such as a
+    # binary log's view
+    timestamps: array
+    request_ids: bytes  # 16 big-endian bytes per row; any bytes-like object
+    columns: Dict[str, list]  # Remaining generated fields, one list per field
+    constants: Dict[str, Any]  # Placeholder fields, one value shared by every row
+
+def _timestamp_micros(count: int, start_date: datetime, end_date: datetime) -> array:
+    """Return count uniform (unsorted) timestamps as int64 epoch microseconds."""
+    start_micros = _epoch_micros(start_date)
+    span = _epoch_micros(end_date) - start_micros
+    randrange = random.randrange
+    return array("q", [start_micros + randrange(span + 1) for _ in range(count)])
+
+def generate_log_batch(
+    count: int,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+    sort: bool = False,
+    timestamps: Optional[array] = None,
+) -> LogBatch:
+    """Generate count log entries as one columnar batch.
+
+    Args:
+        count: Number of log entries in the batch
+        start_date: Start of the timestamp range (default: 3 years ago)
+        end_date: End of the timestamp range (default: now)
+        sort: If True, timestamps are in chronological order (default: False)
+        timestamps: Use these epoch microseconds instead of drawing them (default: None)
+
+    Returns:
+        LogBatch with count rows
+    """
+    if end_date < start_date:
+        raise ValueError(
+            f"end_date ({end_date}) cannot be before start_date ({start_date})"
+        )
+
+    if timestamps is None:
+        if sort:
+            timestamps = next(
+                iter_sorted_timestamp_micros(
+                    count, start_date, end_date, batch_size=max(count, 1)
+                ),
+                array("q"),
+            )
+        else:
+            timestamps = _timestamp_micros(count, start_date, end_date)
+    elif len(timestamps) != count:
+        raise ValueError(f"got {len(timestamps)} timestamps for {count} entries")
+
+    columns = {
+        "log_level": generate_log_levels(count),
+        "source_ip": generate_source_ips(count),
+        "method": generate_methods(count),
+        "path": generate_paths(count),
+        "query_parameters": generate_query_parameters_list(count),
+        "protocol": generate_protocols(count),
+        "user_agent": generate_user_agents(count),
+        "referer": generate_referers(count),
+        "user_id": generate_user_ids(count),
+        "session_id": generate_session_ids(count)
+    }
+    return LogBatch(
+        timestamps, random_uuid4_bytes(count), columns, placeholder_fields()
+    )
+
+def iter_log_batch_timestamps(
+    count: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+    sort: bool = False,
+    traffic_model: Optional[TrafficModel] = None,
+) -> Iterator[array]:
+    """Lazily yield the timestamps of each iter_log_batches() batch as epoch micros.
+
+    Drawing the timestamps is the only sequential part of generating
+    batches, so callers can hand each array to generate_log_batch() in any
+    order or thread. Arguments are as for iter_log_batches().
+
+    Yields:
+        array('q') of at most batch_size timestamps per batch
+    """
+    if batch_size <= 0:
+        raise ValueError(f"batch_size ({batch_size}) must be positive")
+    if end_date < start_date:
+        raise ValueError(
+            f"end_date ({end_date}) cannot be before start_date ({start_date})"
+        )
+
+    if sort or traffic_model is not None:
+        if count is None:
+            raise ValueError(
+                "sort=True requires a count"
+                if sort
+                else "traffic_model requires a count"
+            )
+        if traffic_model is not None:
+            yield from iter_traffic_timestamp_micros(
+                count, start_date, end_date, traffic_model, batch_size
+            )
+        else:
+            yield from iter_sorted_timestamp_micros(
+                count, start_date, end_date, batch_size
+            )
+        return
+
+    starts = count_from(0, batch_size) if count is None else range(0, count, batch_size)
+    for batch_start in starts:
+        size = batch_size if count is None else min(batch_size, count - batch_start)
+        yield _timestamp_micros(size, start_date, end_date)
+
+def iter_log_batches(
+    count: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+    sort: bool = False,
+    traffic_model: Optional[TrafficModel] = None,
+) -> Iterator[LogBatch]:
+    """Lazily yield log entries as batches of at most batch_size rows.
+
+    Args:
+        count: Total number of log entries (default: None, unbounded)
+        batch_size: Maximum number of rows per batch (default: 10000)
+        start_date: Start of the timestamp range (default: 3 years ago)
+        end_date: End of the timestamp range (default: now)
+        sort: If True, rows are in chronological order across batches; requires a
+            count (default: False)
+        traffic_model: Draw timestamps from this traffic model instead of
+            uniformly; rows are then always in chronological order and a count is
+            required (default: None)
+
+    Yields:
+        LogBatch objects
+    """
+    for timestamps in iter_log_batch_timestamps(
+        count, batch_size, start_date, end_date, sort, traffic_model
+    ):
+        yield generate_log_batch(
+            len(timestamps), start_date, end_date, timestamps=timestamps
+        )
+
+def log_batch_size(batch: LogBatch) -> int:
+    """Return the number of rows in a batch."""
+    return len(batch.timestamps)
+
+def format_request_ids(request_ids: bytes) -> list[str]:
+    """Return packed UUIDs as canonical hyphenated strings."""
+    hex_ids = request_ids.hex()
+    return [
+        f"{hex_ids[i:i + 8]}-{hex_ids[i + 8:i + 12]}-{hex_ids[i + 12:i + 16]}-"
+        f"{hex_ids[i + 16:i + 20]}-{hex_ids[i + 20:i + 32]}"
+        for i in range(0, len(hex_ids), 32)
+    ]
+
+def log_batch_column(batch: LogBatch, field: str) -> list:
+    """Return one field of every row as native values, like the per-entry generators.
+
+    Timestamps come back as UTC datetimes and request IDs as UUID objects;
+    a placeholder field is its shared value repeated once per row.
+    """
+    if field == "timestamp":
+        return list(map(micros_to_timestamp, batch.timestamps))
+    if field == "request_id":
+        packed = bytes(batch.request_ids)  # uuid.UUID takes bytes only, not views
+        return [uuid.UUID(bytes=packed[i:i + 16]) for i in range(0, len(packed), 16)]
+    if field in batch.columns:
+        return batch.columns[field]
+    if field in batch.constants:
+        return [batch.constants[field]] * log_batch_size(batch)
+    raise ValueError(f"Unknown log entry field: {field}")
+
+def iter_log_batch_rows(
+    batch: LogBatch, as_record: bool = False
+) -> Iterator[Union[Dict[str, Any], LogEntry]]:
+    """Yield the rows of a batch as log entry dictionaries (or LogEntry records).
+
+    The rows are those generate_log_entry() would return.
+    """
+    columns = [(field, log_batch_column(batch, field)) for field in LOG_ENTRY_FIELDS]
+    # Mutable placeholders are copied so rows never share a headers dict
+    mutable = [
+        field for field, value in batch.constants.items() if isinstance(value, dict)
+    ]
+    for i in range(log_batch_size(batch)):
+        row = {field: values[i] for field, values in columns}
+        for field in mutable:
+            row[field] = row[field].copy()
+        yield LogEntry(**row) if as_record else row
+
+def _format_timestamps(batch: LogBatch, format_type: str) -> list[str]:
+    """Return the batch's timestamps formatted for a text format."""
+    timestamps = log_batch_column(batch, "timestamp")
+    if format_type == "json":
+        return ['"' + timestamp.isoformat() + '"' for timestamp in timestamps]
+    if format_type == "csv":
+        return [timestamp.isoformat() for timestamp in timestamps]
+    return [timestamp.strftime("%Y-%m-%d %H:%M:%S") for timestamp in timestamps]
+
+def _format_column(batch: LogBatch, field: str, format_type: str) -> list[str]:
+    """Return one generated field of every row formatted for a text format."""
+    if field == "timestamp":
+        return _format_timestamps(batch, format_type)
+    if field == "request_id":
+        request_ids = format_request_ids(batch.request_ids)
+        return (
+            ['"' + request_id + '"' for request_id in request_ids]
+            if format_type == "json"
+            else request_ids
+        )
+    if format_type == "json":
+        return list(map(encode_basestring_ascii, batch.columns[field]))
+    return batch.columns[field]
+
+def _compile_layout(
+    layout: str, constants: Dict[str, Any], encode: Callable[[Any], str]
+) -> tuple[str, list[str]]:
+    """Return a %-template with the constant fields filled in and the per-row fields."""
+    template = []
+    varying = []
+    for literal, field, _, _ in Formatter().parse(layout):
+        template.append(literal.replace("%", "%%"))
+        if field is None:
+            continue
+        if field in constants:
+            template.append(encode(constants[field]).replace("%", "%%"))
+        else:
+            template.append("%s")
+            varying.append(field)
+    return "".join(template), varying
+
+def format_log_batch(batch: LogBatch, format_type: str = "json") -> list[str]:
+    """Format every row of a batch as a log line, column by column.
+
+    Produces the same lines as format_log_entry_as_string() on each row,
+    but every column is converted in one pass and placeholder fields are
+    formatted once per batch.
+
+    Args:
+        batch: Batch to format
+        format_type: Output format ("json", "csv", "log")
+
+    Returns:
+        List of formatted log entry strings
+    """
+    if format_type not in LINE_LAYOUTS:
+        raise ValueError(f"Unsupported format type: {format_type}")
+
+    encode = json.dumps if format_type == "json" else str
+    template, varying = _compile_layout(
+        LINE_LAYOUTS[format_type], batch.constants, encode
+    )
+    columns = [_format_column(batch, field, format_type) for field in varying]
+    return [template % row for row in zip(*columns)]
@@ -3,27 +3,127 @@ Log entry factory for assembling complete fake log entries.
 """
 
 import json
+from collections.abc import Mapping
 from datetime import datetime
-from typing import Dict, Any
+from itertools import count as count_from, islice
+from typing import Dict, Any, Iterator, Optional, Union
 
 from generators.core_generators import (
     generate_timestamp, generate_request_id, generate_log_level,
     generate_method, generate_path, generate_query_parameters,
-    generate_protocol
+    generate_protocol, iter_sorted_timestamps, DEFAULT_START_DATE, DEFAULT_END_DATE
 )
 from generators.client_generators import (
     generate_source_ip, generate_user_agent, generate_referer,
     generate_user_id, generate_session_id
 )
 
-def generate_log_entry() -> Dict[str, Any]:
+# Field names of a complete log entry, in output order
+LOG_ENTRY_FIELDS = [
+    "timestamp", "log_level", "request_id", "source_ip", "method", "path",
+    "query_parameters", "protocol", "user_agent", "referer", "user_id",
+    "session_id", "status_code", "response_time_ms", "request_headers",
+    "request_body", "response_headers", "response_body", "service_name",
+    "env", "error_message", "stack_trace"
+]
+_LOG_ENTRY_FIELD_SET = frozenset(LOG_ENTRY_FIELDS)
+
+class LogEntry(Mapping):
+    """Compact read/write record of one log entry.
+    
+    Stores the fields in __slots__ instead of a per-entry hash table, which
+    makes a record several times smaller than the equivalent dict. It is a
+    read-only Mapping plus item assignment, so code written against log
+    entry dicts (row["path"], row.get(), keys(), dict(row)) keeps working.
+    """
+    __slots__ = tuple(LOG_ENTRY_FIELDS)
+    
+    def __init__(self, **fields: Any):
+        missing = [field for field in LOG_ENTRY_FIELDS if field not in fields]
+        unknown = [field for field in fields if field not in _LOG_ENTRY_FIELD_SET]
+        if missing or unknown:
+            raise TypeError(
+                f"LogEntry fields mismatch (missing: {missing}, unknown: {unknown})"
+            )
+        for field, value in fields.items():
+            setattr(self, field, value)
+    
+    def __getitem__(self, field: str) -> Any:
+        if field not in _LOG_ENTRY_FIELD_SET:
+            raise KeyError(field)
+        return getattr(self, field)
+    
+    def __setitem__(self, field: str, value: Any) -> None:
+        if field not in _LOG_ENTRY_FIELD_SET:
+            raise KeyError(field)
+        setattr(self, field, value)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(LOG_ENTRY_FIELDS)
+    
+    def __len__(self) -> int:
+        return len(LOG_ENTRY_FIELDS)
+    
+    def __contains__(self, field: object) -> bool:
+        return field in _LOG_ENTRY_FIELD_SET
+    
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in LOG_ENTRY_FIELDS
+        )
+        return f"LogEntry({fields})"
+    
+    def get(self, field: str, default: Any = None) -> Any:
+        return getattr(self, field) if field in _LOG_ENTRY_FIELD_SET else default
+    
+    def copy(self) -> "LogEntry":
+        """Return a shallow copy of the record."""
+        return LogEntry(**self.to_dict())
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the entry as a plain dictionary, in field order."""
+        return {field: getattr(self, field) for field in LOG_ENTRY_FIELDS}
+
+def placeholder_fields() -> Dict[str, Any]:
+    """Return the placeholder fields that no generator produces yet.
+    
+    Returns:
+        Dictionary of placeholder field values, with fresh header dicts
+    """
+    return {
+        "status_code": 200,  # TODO: implement status_code_generator
+        "response_time_ms": 150,  # TODO: implement response_time_generator
+        "request_headers": {},  # TODO: implement request_headers_generator
+        "request_body": "",  # TODO: implement request_body_generator
+        "response_headers": {},  # TODO: implement response_headers_generator
+        "response_body": "",  # TODO: implement response_body_generator
+        "service_name": "api-service",  # TODO: implement service_name_generator
+        "env": "production",  # TODO: implement env_generator
+        "error_message": "",  # TODO: implement error_message_generator
+        "stack_trace": ""  # TODO: implement stack_trace_generator
+    }
+
+def generate_log_entry(
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+    timestamp: Optional[datetime] = None,
+    as_record: bool = False,
+) -> Union[Dict[str, Any], LogEntry]:
     """Generate a single complete log entry as a dictionary.
     
+    Args:
+        start_date: Start of the timestamp range (default: 3 years ago)
+        end_date: End of the timestamp range (default: now)
+        timestamp: Use this timestamp instead of drawing one (default: None)
+        as_record: If True, return a compact LogEntry record instead of a dict
+            (default: False)
+        
     Returns:
-        Dictionary containing all log entry fields with realistic values
+        Dictionary (or LogEntry) containing all log entry fields with realistic values
     """
     # Generate core fields
-    timestamp = generate_timestamp()
+    if timestamp is None:
+        timestamp = generate_timestamp(start_date, end_date)
     request_id = generate_request_id()
     log_level = generate_log_level()
     method = generate_method()
@@ -51,38 +151,82 @@ def generate_log_entry() -> Dict[str, Any]:
         "user_agent": user_agent,
         "referer": referer,
         "user_id": user_id,
-        "session_id": session_id,
-        # Placeholder fields for future implementation
-        "status_code": 200,  # TODO: implement status_code_generator
-        "response_time_ms": 150,  # TODO: implement response_time_generator
-        "request_headers": {},  # TODO: implement request_headers_generator
-        "request_body": "",  # TODO: implement request_body_generator
-        "response_headers": {},  # TODO: implement response_headers_generator
-        "response_body": "",  # TODO: implement response_body_generator
-        "service_name": "api-service",  # TODO: implement service_name_generator
-        "env": "production",  # TODO: implement env_generator
-        "error_message": "",  # TODO: implement error_message_generator
-        "stack_trace": ""  # TODO: implement stack_trace_generator
+        "session_id": session_id
     }
+    # Placeholder fields for future implementation
+    log_entry.update(placeholder_fields())
     
+    if as_record:
+        return LogEntry(**log_entry)
     return log_entry
 
-def generate_log_entries(count: int) -> list[Dict[str, Any]]:
+def iter_log_entries(
+    count: Optional[int] = None,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+    sort: bool = False,
+    as_record: bool = False,
+) -> Iterator[Union[Dict[str, Any], LogEntry]]:
+    """Lazily yield complete log entries one at a time.
+    
+    Nothing is built ahead of time, so memory use stays flat regardless of
+    count and the first entry is available immediately.
+    
+    Args:
+        count: Number of log entries to yield (default: None, unbounded)
+        start_date: Start of the timestamp range (default: 3 years ago)
+        end_date: End of the timestamp range (default: now)
+        sort: If True, yield entries in chronological order; requires a count
+            (default: False)
+        as_record: If True, yield compact LogEntry records instead of dicts
+            (default: False)
+        
+    Yields:
+        Log entry dictionaries (or LogEntry records)
+    """
+    if end_date < start_date:
+        raise ValueError(
+            f"end_date ({end_date}) cannot be before start_date ({start_date})"
+        )
+    
+    if sort:
+        if count is None:
+            raise ValueError("sort=True requires a count")
+        for timestamp in iter_sorted_timestamps(count, start_date, end_date):
+            yield generate_log_entry(start_date, end_date, timestamp, as_record)
+        return
+    
+    indices = count_from() if count is None else range(count)
+    for _ in indices:
+        yield generate_log_entry(start_date, end_date, as_record=as_record)
+
+def generate_log_entries(
+    count: int,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+    sort: bool = False,
+    as_record: bool = False,
+) -> list[Union[Dict[str, Any], LogEntry]]:
     """Generate multiple complete log entries.
     
     Args:
         count: Number of log entries to generate
+        start_date: Start of the timestamp range (default: 3 years ago)
+        end_date: End of the timestamp range (default: now)
+        sort: If True, return entries in chronological order (default: False)
+        as_record: If True, return compact LogEntry records instead of dicts
+            (default: False)
         
     Returns:
-        List of log entry dictionaries
+        List of log entry dictionaries (or LogEntry records)
     """
-    return [generate_log_entry() for _ in range(count)]
+    return list(iter_log_entries(count, start_date, end_date, sort, as_record))
 
 def format_log_entry_as_string(log_entry: Dict[str, Any], format_type: str = "json") -> str:
     """Format a log entry as a string.
     
     Args:
-        log_entry: Log entry dictionary
+        log_entry: Log entry dictionary or LogEntry record
         format_type: Output format ("json", "csv", "log")
         
     Returns:
@@ -90,7 +234,7 @@ def format_log_entry_as_string(log_entry: Dict[str, Any], format_type: str = "js
     """
     if format_type == "json":
         # Convert datetime to ISO string for JSON serialization
-        entry_copy = log_entry.copy()
+        entry_copy = dict(log_entry)
         entry_copy["timestamp"] = log_entry["timestamp"].isoformat()
         entry_copy["request_id"] = str(log_entry["request_id"])
         return json.dumps(entry_copy)
@@ -110,15 +254,77 @@ def format_log_entry_as_string(log_entry: Dict[str, Any], format_type: str = "js
     else:
         raise ValueError(f"Unsupported format type: {format_type}")
 
-def generate_log_lines(count: int, format_type: str = "json") -> list[str]:
+def iter_log_lines(
+    count: Optional[int] = None,
+    format_type: str = "json",
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+    sort: bool = False,
+) -> Iterator[str]:
+    """Lazily yield formatted log entry strings one at a time.
+    
+    Args:
+        count: Number of log entries to yield (default: None, unbounded)
+        format_type: Output format ("json", "csv", "log")
+        start_date: Start of the timestamp range (default: 3 years ago)
+        end_date: End of the timestamp range (default: now)
+        sort: If True, yield lines in chronological order (default: False)
+        
+    Yields:
+        Formatted log entry strings
+    """
+    for entry in iter_log_entries(count, start_date, end_date, sort):
+        yield format_log_entry_as_string(entry, format_type)
+
+def iter_log_chunks(
+    count: Optional[int] = None,
+    format_type: str = "json",
+    chunk_size: int = 1000,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+    sort: bool = False,
+) -> Iterator[list[str]]:
+    """Lazily yield formatted log lines in fixed-size chunks.
+    
+    Writing a chunk at a time keeps per-line I/O overhead low while memory
+    stays bounded by chunk_size.
+    
+    Args:
+        count: Number of log entries to yield (default: None, unbounded)
+        format_type: Output format ("json", "csv", "log")
+        chunk_size: Maximum number of lines per chunk (default: 1000)
+        start_date: Start of the timestamp range (default: 3 years ago)
+        end_date: End of the timestamp range (default: now)
+        sort: If True, yield lines in chronological order (default: False)
+        
+    Yields:
+        Lists of at most chunk_size formatted log entry strings
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size ({chunk_size}) must be positive")
+    
+    lines = iter_log_lines(count, format_type, start_date, end_date, sort)
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def generate_log_lines(
+    count: int,
+    format_type: str = "json",
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+) -> list[str]:
     """Generate multiple formatted log entry strings.
     
     Args:
         count: Number of log entries to generate
         format_type: Output format ("json", "csv", "log")
+        start_date: Start of the timestamp range (default: 3 years ago)
+        end_date: End of the timestamp range (default: now)
         
     Returns:
         List of formatted log entry strings
     """
-    log_entries = generate_log_entries(count)
-    return [format_log_entry_as_string(entry, format_type) for entry in log_entries] 
\ No newline at end of file
+    return list(iter_log_lines(count, format_type, start_date, end_date)) 
\ No newline at end of file
@@ -0,0 +1,263 @@
+"""
+Pipelined generation: generate, format and write stages on threads.
+
+Without a pipeline, generate_logs.py generates a batch, formats it and
+writes it strictly in turn, so the disk idles while Python builds strings
+and the reverse. iter_pipeline() runs each stage on its own worker threads
+connected by bounded queues. A feeder thread numbers the input items, and
+results are handed back in that order however the workers interleave.
+The consumer is the writer stage: file writes and compression release the
+GIL, so they overlap with generation and formatting on the other threads.
+
+At most max_in_flight items are between the feeder and the consumer at
+any time, counting the queues, the workers and the reorder buffer, so
+memory stays bounded when the writer is the slow stage.
+"""
+
+import queue
+import threading
+from array import array
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+from generators.core_generators import DEFAULT_START_DATE, DEFAULT_END_DATE
+from generators.log_batch import (
+    DEFAULT_BATCH_SIZE,
+    LogBatch,
+    generate_log_batch,
+    iter_log_batch_timestamps,
+)
+from generators.sharding import format_batch
+from generators.traffic_model import TrafficModel
+
+# Items queued between two stages
+PIPELINE_QUEUE_SIZE = 4
+
+# Seconds between checks for a stopped pipeline while blocked on a queue
+_POLL_INTERVAL = 0.1
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+def _put(target: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Put an item on a bounded queue, giving up once the pipeline stops.
+
+    Returns:
+        True if the item was queued
+    """
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _get(source: queue.Queue, stop: threading.Event) -> Any:
+    """Get an item from a queue, returning _DONE once the pipeline stops."""
+    while not stop.is_set():
+        try:
+            return source.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            pass
+    return _DONE
+
+def _feed(
+    items: Iterable,
+    target: queue.Queue,
+    workers: int,
+    slots: threading.Semaphore,
+    stop: threading.Event,
+    errors: list,
+) -> None:
+    """Number the input items and queue them for the first stage, then end markers."""
+    try:
+        for sequence, item in enumerate(items):
+            while not slots.acquire(timeout=_POLL_INTERVAL):
+                if stop.is_set():
+                    return
+            if not _put(target, (sequence, item), stop):
+                return
+    except BaseException as e:
+        errors.append(e)
+        stop.set()
+        return
+    for _ in range(workers):
+        _put(target, _DONE, stop)
+
+def _work(
+    function: Callable,
+    source: queue.Queue,
+    target: queue.Queue,
+    downstream: int,
+    finished: list,
+    lock: threading.Lock,
+    stop: threading.Event,
+    errors: list,
+) -> None:
+    """Apply a stage's function to numbered items until the end marker.
+
+    The stage's last worker to finish passes the end marker on.
+    """
+    while True:
+        item = _get(source, stop)
+        if item is _DONE:
+            break
+        sequence, value = item
+        try:
+            result = function(value)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+            return
+        if not _put(target, (sequence, result), stop):
+            return
+
+    with lock:
+        finished[0] -= 1
+        last = finished[0] == 0
+    if last:
+        for _ in range(downstream):
+            _put(target, _DONE, stop)
+
+def iter_pipeline(
+    items: Iterable,
+    stages: Sequence[tuple[Callable, int]],
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+    max_in_flight: Optional[int] = None,
+) -> Iterator:
+    """Pass items through stages of worker threads and yield the results in input order.
+
+    Args:
+        items: Input items; iterated on a feeder thread
+        stages: (function, workers) per stage; each function maps one item to the
+            next stage's input
+        queue_size: Maximum items queued between two stages (default: 4)
+        max_in_flight: Maximum items fed but not yet yielded
+            (default: enough to keep every worker busy)
+
+    Yields:
+        The last stage's results, in the order of the input items
+
+    Raises:
+        The first exception raised by the input iterable or a stage function
+    """
+    if not stages:
+        raise ValueError("A pipeline needs at least one stage")
+    worker_counts = [workers for _, workers in stages]
+    if any(workers <= 0 for workers in worker_counts):
+        raise ValueError(f"Stage worker counts must be positive, got {worker_counts}")
+    if queue_size <= 0:
+        raise ValueError(f"queue_size ({queue_size}) must be positive")
+    if max_in_flight is None:
+        max_in_flight = queue_size * (len(stages) + 1) + sum(worker_counts)
+    if max_in_flight <= 0:
+        raise ValueError(f"max_in_flight ({max_in_flight}) must be positive")
+
+    stop = threading.Event()
+    errors = []
+    slots = threading.Semaphore(max_in_flight)
+    queues = [queue.Queue(queue_size) for _ in range(len(stages) + 1)]
+    threads = [
+        threading.Thread(
+            target=_feed,
+            args=(items, queues[0], stages[0][1], slots, stop, errors),
+            name="pipeline-feed",
+            daemon=True,
+        )
+    ]
+    for index, (function, workers) in enumerate(stages):
+        downstream = stages[index + 1][1] if index + 1 < len(stages) else 1
+        finished, lock = [workers], threading.Lock()
+        threads.extend(
+            threading.Thread(
+                target=_work,
+                args=(
+                    function,
+                    queues[index],
+                    queues[index + 1],
+                    downstream,
+                    finished,
+                    lock,
+                    stop,
+                    errors,
+                ),
+                name=f"pipeline-stage{index}-{worker}",
+                daemon=True,
+            )
+            for worker in range(workers)
+        )
+    for thread in threads:
+        thread.start()
+
+    pending = {}  # Results that arrived ahead of their turn, by sequence number
+    expected = 0
+    try:
+        while True:
+            item = _get(queues[-1], stop)
+            if item is _DONE:
+                break
+            sequence, result = item
+            pending[sequence] = result
+            while expected in pending:
+                result = pending.pop(expected)
+                expected += 1
+                slots.release()
+                yield result
+        if errors:
+            raise errors[0]
+    finally:
+        # Unblocks every thread if the consumer stops early or a stage failed
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+def iter_pipelined_chunks(
+    count: Optional[int],
+    format_type: str = "json",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+    sort: bool = False,
+    traffic_model: Optional[TrafficModel] = None,
+    generate_workers: int = 1,
+    format_workers: int = 1,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+    formatter: Optional[Callable[[LogBatch], bytes]] = None,
+) -> Iterator[bytes]:
+    """Yield formatted batches like iter_log_batches() + format_batch(), in parallel.
+
+    Batches are generated and formatted on worker threads. Timestamps are
+    drawn on the feeder thread, so sorted and traffic-model output stays in
+    chronological order with any number of workers.
+
+    Args:
+        count: Total number of log entries (default: None, unbounded)
+        format_type: Output format ("json", "csv", "log"); CSV chunks have no header
+        batch_size: Maximum number of rows per batch (default: 10000)
+        start_date: Start of the timestamp range (default: 3 years ago)
+        end_date: End of the timestamp range (default: now)
+        sort: If True, rows are in chronological order (default: False)
+        traffic_model: Draw timestamps from this traffic model (default: None, uniform)
+        generate_workers: Threads generating batches (default: 1)
+        format_workers: Threads formatting batches (default: 1)
+        queue_size: Maximum batches queued between two stages (default: 4)
+        formatter: Format each batch with this function instead of format_type
+            (default: None)
+
+    Yields:
+        Newline-terminated formatted lines as UTF-8 bytes, one chunk per batch
+    """
+    timestamps = iter_log_batch_timestamps(
+        count, batch_size, start_date, end_date, sort, traffic_model
+    )
+
+    def generate(micros: array) -> LogBatch:
+        return generate_log_batch(len(micros), start_date, end_date, timestamps=micros)
+
+    stages = [
+        (generate, generate_workers),
+        (formatter or partial(format_batch, format_type=format_type), format_workers),
+    ]
+    return iter_pipeline(timestamps, stages, queue_size)
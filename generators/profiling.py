@@ -0,0 +1,228 @@
+"""
+Per-field profiling of log generation.
+
+profile_generation() times every field generator called by the entry, batch
+and random-access (--offset) factories, plus the formatting and writing
+stages, without attaching cProfile. While it is active the generator names in
+log_entry_factory, log_batch and random_access are swapped for timing
+wrappers; outside of it they are the plain functions, so profiling costs
+nothing when it is off. Times are exclusive:
+a stage's time excludes the field generators and stages nested inside it,
+so the shares of all rows add up to at most 100% of the wall time.
+
+    with profile_generation() as profile:
+        with profile_stage("write"):
+            write_json_lines(iter_log_entries(10000), stream)
+    print(format_profile(profile), file=sys.stderr)
+
+Timing uses one stack of open regions, so only the thread that entered
+profile_generation() should call the profiled functions.
+"""
+
+import inspect
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from generators import log_batch, log_entry_factory, random_access
+
+# Functions timed while profiling, by module: attribute -> (section, name)
+PROFILED_FUNCTIONS = {
+    log_entry_factory: {
+        "generate_timestamp": ("fields", "timestamp"),
+        "iter_sorted_timestamps": ("fields", "timestamp"),
+        "generate_request_id": ("fields", "request_id"),
+        "generate_log_level": ("fields", "log_level"),
+        "generate_method": ("fields", "method"),
+        "generate_path": ("fields", "path"),
+        "generate_query_parameters": ("fields", "query_parameters"),
+        "generate_protocol": ("fields", "protocol"),
+        "generate_source_ip": ("fields", "source_ip"),
+        "generate_user_agent": ("fields", "user_agent"),
+        "generate_referer": ("fields", "referer"),
+        "generate_user_id": ("fields", "user_id"),
+        "generate_session_id": ("fields", "session_id"),
+        "placeholder_fields": ("fields", "placeholders"),
+        "format_log_entry_as_string": ("stages", "format")
+    },
+    log_batch: {
+        "_timestamp_micros": ("fields", "timestamp"),
+        "iter_sorted_timestamp_micros": ("fields", "timestamp"),
+        "iter_traffic_timestamp_micros": ("fields", "timestamp"),
+        "random_uuid4_bytes": ("fields", "request_id"),
+        "generate_log_levels": ("fields", "log_level"),
+        "generate_methods": ("fields", "method"),
+        "generate_paths": ("fields", "path"),
+        "generate_query_parameters_list": ("fields", "query_parameters"),
+        "generate_protocols": ("fields", "protocol"),
+        "generate_source_ips": ("fields", "source_ip"),
+        "generate_user_agents": ("fields", "user_agent"),
+        "generate_referers": ("fields", "referer"),
+        "generate_user_ids": ("fields", "user_id"),
+        "generate_session_ids": ("fields", "session_id"),
+        "placeholder_fields": ("fields", "placeholders")
+    },
+    random_access: {
+        "timestamp_at": ("fields", "timestamp"),
+        "request_id_at": ("fields", "request_id"),
+        "log_level_at": ("fields", "log_level"),
+        "method_at": ("fields", "method"),
+        "path_at": ("fields", "path"),
+        "query_parameters_at": ("fields", "query_parameters"),
+        "protocol_at": ("fields", "protocol"),
+        "source_ip_at": ("fields", "source_ip"),
+        "user_agent_at": ("fields", "user_agent"),
+        "referer_at": ("fields", "referer"),
+        "user_id_at": ("fields", "user_id"),
+        "session_id_at": ("fields", "session_id"),
+        "placeholder_fields": ("fields", "placeholders")
+    }
+}
+
+# Active profile, or None when profiling is off
+_profile: Optional[Dict[str, Any]] = None
+
+# Child seconds of each open timed region, innermost last
+_stack: list[list[float]] = []
+
+def _record(section: str, name: str, elapsed: float) -> None:
+    """Charge elapsed seconds, minus the time of nested regions, to a profile row."""
+    child = _stack.pop()[0] if _stack else 0.0
+    if _profile is None:
+        return  # A profiled iterator resumed after profiling ended
+    if _stack:
+        _stack[-1][0] += elapsed
+    stats = _profile[section].setdefault(name, {"calls": 0, "seconds": 0.0})
+    stats["calls"] += 1
+    stats["seconds"] += elapsed - child
+
+def _timed_call(section: str, name: str, function: Callable) -> Callable:
+    """Wrap a function so every call is charged to a profile row."""
+    def timed(*args, **kwargs):
+        _stack.append([0.0])
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _record(section, name, time.perf_counter() - start)
+    return timed
+
+def _timed_iter(section: str, name: str, iterable: Iterable) -> Iterator:
+    """Yield from an iterable, charging the time of every step to a profile row."""
+    iterator = iter(iterable)
+    while True:
+        _stack.append([0.0])
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            _stack.pop()
+            return
+        except BaseException:
+            _record(section, name, time.perf_counter() - start)
+            raise
+        _record(section, name, time.perf_counter() - start)
+        yield item
+
+def _timed_generator(section: str, name: str, function: Callable) -> Callable:
+    """Wrap a generator function, charging every step of its iterators to a row."""
+    def timed(*args, **kwargs):
+        return _timed_iter(section, name, function(*args, **kwargs))
+    return timed
+
+@contextmanager
+def profile_generation() -> Iterator[Dict[str, Any]]:
+    """Profile field generation, formatting and writing inside the with block.
+
+    Yields:
+        Profile dictionary, complete once the block exits: total wall seconds,
+        and calls and exclusive seconds per field generator and per stage
+    """
+    global _profile
+    if _profile is not None:
+        raise RuntimeError("profile_generation() is already active")
+
+    profile = {"total": 0.0, "fields": {}, "stages": {}}
+    originals = []
+    for module, functions in PROFILED_FUNCTIONS.items():
+        for attribute, (section, name) in functions.items():
+            function = getattr(module, attribute)
+            if inspect.isgeneratorfunction(function):
+                wrap = _timed_generator
+            else:
+                wrap = _timed_call
+            originals.append((module, attribute, function))
+            setattr(module, attribute, wrap(section, name, function))
+
+    _profile = profile
+    _stack.clear()
+    start = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile["total"] = time.perf_counter() - start
+        _profile = None
+        _stack.clear()
+        for module, attribute, function in originals:
+            setattr(module, attribute, function)
+
+@contextmanager
+def profile_stage(name: str) -> Iterator[None]:
+    """Charge the time spent in the with block to a stage, e.g. "write".
+
+    This is a no-op when not profiling.
+    """
+    if _profile is None:
+        yield
+        return
+
+    _stack.append([0.0])
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record("stages", name, time.perf_counter() - start)
+
+def profile_iter(name: str, iterable: Iterable) -> Iterable:
+    """Charge the time spent producing each item of an iterable to a stage.
+
+    Returns the iterable itself when not profiling.
+    """
+    if _profile is None:
+        return iterable
+    return _timed_iter("stages", name, iterable)
+
+def profile_summary(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a profile with each row's share of the wall time, slowest rows first."""
+    total = profile["total"]
+    summary = {"total_seconds": total}
+    accounted = 0.0
+    for section in ("fields", "stages"):
+        rows = sorted(
+            profile[section].items(), key=lambda item: item[1]["seconds"], reverse=True
+        )
+        summary[section] = {
+            name: {**stats, "share": stats["seconds"] / total if total else 0.0}
+            for name, stats in rows
+        }
+        accounted += sum(stats["seconds"] for _, stats in rows)
+    summary["other_seconds"] = max(total - accounted, 0.0)
+    return summary
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    """Return a profile as a text table of calls, exclusive seconds and total share."""
+    summary = profile_summary(profile)
+    total = summary["total_seconds"]
+    lines = [f"{'section':<8} {'name':<18} {'calls':>10} {'seconds':>10} {'share':>7}"]
+    for section, label in (("fields", "field"), ("stages", "stage")):
+        for name, stats in summary[section].items():
+            lines.append(
+                f"{label:<8} {name:<18} {stats['calls']:>10} "
+                f"{stats['seconds']:>10.3f} {stats['share']:>7.1%}"
+            )
+    other_share = summary["other_seconds"] / total if total else 0.0
+    other = summary["other_seconds"]
+    lines.append(f"{'':<8} {'other':<18} {'':>10} {other:>10.3f} {other_share:>7.1%}")
+    total_share = 1.0 if total else 0.0
+    lines.append(f"{'':<8} {'total':<18} {'':>10} {total:>10.3f} {total_share:>7.1%}")
+    return "\n".join(lines)
@@ -0,0 +1,271 @@
+"""
+Counter-based random-access generation of fake log entries.
+
+Every field of entry i is derived from a keyed hash of (seed, i, field)
+instead of a sequential RNG stream, so any entry of a seeded dataset can be
+computed directly in O(1), in any order, in any process or machine.
+"""
+
+import hashlib
+import threading
+import uuid
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator
+from faker import Faker
+
+from generators.core_generators import (
+    DEFAULT_START_DATE, DEFAULT_END_DATE,
+    LOG_LEVELS, LOG_LEVEL_CUM_WEIGHTS, HTTP_METHODS, HTTP_METHOD_CUM_WEIGHTS,
+    HTTP_PROTOCOLS, HTTP_PROTOCOL_CUM_WEIGHTS, API_PATHS, API_PATH_CUM_WEIGHTS,
+    ID_TYPES, QUERY_PARAM_TYPES, QUERY_PARAM_CUM_WEIGHTS, QUERY_PARAM_CHOICES
+)
+from generators.client_generators import (
+    IP_CIDR_TABLES, IP_TYPES, IP_TYPE_CUM_WEIGHTS, REFERER_TYPES, REFERER_CUM_WEIGHTS,
+    USER_ID_TYPES, USER_ID_CUM_WEIGHTS, SESSION_ID_TYPES, SESSION_ID_CUM_WEIGHTS,
+    compile_cidr_table, format_ip, is_usable_ipv4
+)
+from generators.log_entry_factory import placeholder_fields
+
+MASK_64 = (1 << 64) - 1
+MASK_128 = (1 << 128) - 1
+
+# Faker instances used only by this module, one per thread; an instance is
+# reseeded before every Faker-backed field so its output depends on
+# (seed, i, field) alone, even with entries computed on several threads
+_local = threading.local()
+
+# The CIDR networks of every IP type, as drawn from by generate_source_ips()
+_CIDR_TABLES = {
+    ip_type: compile_cidr_table(table) for ip_type, table in IP_CIDR_TABLES.items()
+}
+
+def field_bits(seed: int, index: int, field: str) -> int:
+    """Return 256 pseudo-random bits for one field of one entry."""
+    digest = hashlib.blake2b(
+        f"{seed}:{index}:{field}".encode(), digest_size=32
+    ).digest()
+    return int.from_bytes(digest, "big")
+
+def _unit(bits: int, slot: int) -> float:
+    """Return a uniform float in [0, 1) from the 64-bit word at slot (0-3)."""
+    return ((bits >> (64 * slot)) & MASK_64) / 2.0 ** 64
+
+def _weighted(options: list[str], cum_weights: list[int], u: float) -> str:
+    """Pick from options by cumulative weights, like random.choices()."""
+    return options[bisect_right(cum_weights, u * cum_weights[-1])]
+
+def _uniform_index(options: list, u: float) -> Any:
+    """Pick uniformly from options, like random.choice()."""
+    return options[int(u * len(options))]
+
+def _faker(bits: int) -> Faker:
+    """Return this thread's Faker instance seeded from the top word of bits."""
+    fake = getattr(_local, "fake", None)
+    if fake is None:
+        fake = _local.fake = Faker()
+    fake.seed_instance(bits >> 192)
+    return fake
+
+def _uuid4(bits: int) -> uuid.UUID:
+    """Return a version 4 UUID built from the high 128 bits."""
+    return uuid.UUID(int=(bits >> 128) & MASK_128, version=4)
+
+# Field generators
+def timestamp_at(
+    seed: int,
+    index: int,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+) -> datetime:
+    """Return the timestamp of entry index, uniform between start_date and end_date."""
+    if end_date < start_date:
+        raise ValueError(
+            f"end_date ({end_date}) cannot be before start_date ({start_date})"
+        )
+
+    span = (end_date - start_date) // timedelta(microseconds=1)
+    offset = field_bits(seed, index, "timestamp") % (span + 1)
+    return start_date + timedelta(microseconds=offset)
+
+def request_id_at(seed: int, index: int) -> uuid.UUID:
+    """Return the request ID of entry index."""
+    return _uuid4(field_bits(seed, index, "request_id"))
+
+def log_level_at(seed: int, index: int) -> str:
+    """Return the log level of entry index."""
+    return _weighted(
+        LOG_LEVELS,
+        LOG_LEVEL_CUM_WEIGHTS,
+        _unit(field_bits(seed, index, "log_level"), 0),
+    )
+
+def method_at(seed: int, index: int) -> str:
+    """Return the HTTP method of entry index."""
+    return _weighted(
+        HTTP_METHODS,
+        HTTP_METHOD_CUM_WEIGHTS,
+        _unit(field_bits(seed, index, "method"), 0),
+    )
+
+def protocol_at(seed: int, index: int) -> str:
+    """Return the HTTP protocol of entry index."""
+    return _weighted(
+        HTTP_PROTOCOLS,
+        HTTP_PROTOCOL_CUM_WEIGHTS,
+        _unit(field_bits(seed, index, "protocol"), 0),
+    )
+
+def path_at(seed: int, index: int) -> str:
+    """Return the API path of entry index."""
+    bits = field_bits(seed, index, "path")
+    path_template = _weighted(API_PATHS, API_PATH_CUM_WEIGHTS, _unit(bits, 0))
+    if "{id}" not in path_template:
+        return path_template
+
+    id_type = _uniform_index(ID_TYPES, _unit(bits, 1))
+    if id_type == "number":
+        id_value = str(1 + (bits >> 128) % 999999)
+    elif id_type == "uuid":
+        id_value = str(_uuid4(bits))
+    else:  # slug
+        id_value = _faker(bits).slug()
+    return path_template.replace("{id}", id_value)
+
+def query_parameters_at(seed: int, index: int) -> str:
+    """Return the query parameter string of entry index."""
+    bits = field_bits(seed, index, "query_parameters")
+    param_type = _weighted(QUERY_PARAM_TYPES, QUERY_PARAM_CUM_WEIGHTS, _unit(bits, 0))
+    return _uniform_index(QUERY_PARAM_CHOICES[param_type], _unit(bits, 1))
+
+def source_ip_at(seed: int, index: int) -> str:
+    """Return the source IP address of entry index.
+
+    The address is drawn from the IP_CIDR_TABLES networks of its type. Like
+    generate_source_ips(), IPv4 addresses in reserved space or ending in .0
+    or .255 are redrawn, here from the bits of
+    (seed, index, "source_ip:<attempt>").
+    """
+    bits = field_bits(seed, index, "source_ip")
+    ip_type = _weighted(IP_TYPES, IP_TYPE_CUM_WEIGHTS, _unit(bits, 0))
+    bases, host_bits, cum_weights = _CIDR_TABLES[ip_type]
+    network = bisect_right(cum_weights, _unit(bits, 1) * cum_weights[-1])
+    attempt = 0
+    while True:
+        value = bases[network] | ((bits >> 128) & ((1 << host_bits[network]) - 1))
+        if ip_type == "ipv4":
+            usable = is_usable_ipv4(value)
+        else:
+            usable = value & 0xFF not in (0, 255)
+        if ip_type == "ipv6" or host_bits[network] < 8 or usable:
+            return format_ip(value)
+        attempt += 1
+        bits = field_bits(seed, index, f"source_ip:{attempt}")
+
+def user_agent_at(seed: int, index: int) -> str:
+    """Return the user agent of entry index."""
+    return _faker(field_bits(seed, index, "user_agent")).user_agent()
+
+def referer_at(seed: int, index: int) -> str:
+    """Return the referer of entry index."""
+    bits = field_bits(seed, index, "referer")
+    if _weighted(REFERER_TYPES, REFERER_CUM_WEIGHTS, _unit(bits, 0)) == "url":
+        return _faker(bits).url()
+    return ""
+
+def user_id_at(seed: int, index: int) -> str:
+    """Return the user ID of entry index."""
+    bits = field_bits(seed, index, "user_id")
+    user_id_type = _weighted(USER_ID_TYPES, USER_ID_CUM_WEIGHTS, _unit(bits, 0))
+    if user_id_type == "uuid":
+        return str(_uuid4(bits))
+    elif user_id_type == "username":
+        return _faker(bits).user_name()
+    elif user_id_type == "email":
+        return _faker(bits).email()
+    else:  # none
+        return ""
+
+def session_id_at(seed: int, index: int) -> str:
+    """Return the session ID of entry index."""
+    bits = field_bits(seed, index, "session_id")
+    session_id_type = _weighted(
+        SESSION_ID_TYPES, SESSION_ID_CUM_WEIGHTS, _unit(bits, 0)
+    )
+    if session_id_type == "uuid":
+        return str(_uuid4(bits))
+    elif session_id_type == "hex":
+        return f"{(bits >> 128) & 0xFFFFFF:06x}"  # 6-character hex
+    else:  # none
+        return ""
+
+# Log entry generators
+def generate_log_entry_at(
+    index: int,
+    seed: int = 0,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+) -> Dict[str, Any]:
+    """Generate entry number index of the dataset identified by seed.
+
+    The result depends only on (seed, index, start_date, end_date), so pass
+    explicit dates when the entry must match across runs; the defaults move
+    with the current time.
+
+    Args:
+        index: Position of the entry in the dataset (0-based)
+        seed: Seed identifying the dataset (default: 0)
+        start_date: Start of the timestamp range (default: 3 years ago)
+        end_date: End of the timestamp range (default: now)
+
+    Returns:
+        Dictionary containing all log entry fields, like generate_log_entry()
+    """
+    if index < 0:
+        raise ValueError(f"index ({index}) cannot be negative")
+
+    log_entry = {
+        "timestamp": timestamp_at(seed, index, start_date, end_date),
+        "log_level": log_level_at(seed, index),
+        "request_id": request_id_at(seed, index),
+        "source_ip": source_ip_at(seed, index),
+        "method": method_at(seed, index),
+        "path": path_at(seed, index),
+        "query_parameters": query_parameters_at(seed, index),
+        "protocol": protocol_at(seed, index),
+        "user_agent": user_agent_at(seed, index),
+        "referer": referer_at(seed, index),
+        "user_id": user_id_at(seed, index),
+        "session_id": session_id_at(seed, index)
+    }
+    # Placeholder fields for future implementation
+    log_entry.update(placeholder_fields())
+
+    return log_entry
+
+def iter_range(
+    start: int,
+    stop: int,
+    seed: int = 0,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+) -> Iterator[Dict[str, Any]]:
+    """Lazily yield entries start..stop-1 of the dataset identified by seed.
+
+    Args:
+        start: Index of the first entry (inclusive)
+        stop: Index after the last entry (exclusive)
+        seed: Seed identifying the dataset (default: 0)
+        start_date: Start of the timestamp range (default: 3 years ago)
+        end_date: End of the timestamp range (default: now)
+
+    Yields:
+        Log entry dictionaries, in index order
+    """
+    if start < 0 or stop < start:
+        raise ValueError(
+            f"invalid range: start ({start}) must be >= 0 and <= stop ({stop})"
+        )
+
+    for index in range(start, stop):
+        yield generate_log_entry_at(index, seed, start_date, end_date)
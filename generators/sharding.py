@@ -0,0 +1,291 @@
+"""
+Sharded multi-process generation of fake log entries.
+
+A run of `count` entries is split into fixed-size shards. Every shard is
+generated with its own RNG and Faker state, seeded from (seed, shard index),
+so the output for a given seed is identical no matter how many worker
+processes produce it.
+"""
+
+import hashlib
+import random
+import secrets
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from generators import client_generators, core_generators, value_pool
+from generators.core_generators import DEFAULT_START_DATE, DEFAULT_END_DATE
+from generators.entropy import seed_entropy
+from generators.log_batch import LogBatch, generate_log_batch, format_log_batch
+from generators.log_entry_factory import LOG_ENTRY_FIELDS, format_log_entry_as_string
+from exporters.compression import COMPRESSION_SUFFIXES, write_compressed
+from exporters.csv_exporter import format_csv_batch, format_csv_rows
+from exporters.json_exporter import encode_json_lines
+
+# Default number of entries per shard
+DEFAULT_SHARD_SIZE = 10000
+
+def split_shards(
+    count: int, shard_size: int = DEFAULT_SHARD_SIZE
+) -> list[tuple[int, int]]:
+    """Split count entries into (shard_index, size) pairs of at most shard_size."""
+    if shard_size <= 0:
+        raise ValueError(f"shard_size ({shard_size}) must be positive")
+
+    return [
+        (shard_index, min(shard_size, count - start))
+        for shard_index, start in enumerate(range(0, count, shard_size))
+    ]
+
+def shard_seed(seed: int, shard_index: int) -> int:
+    """Return an independent 64-bit seed for one shard of a seeded run."""
+    digest = hashlib.blake2b(f"{seed}:{shard_index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+def seed_generators(seed: int) -> None:
+    """Seed the process-wide RNG, the entropy pool and the generators' Faker instances.
+
+    Configured value pools are restored and their draw counts restarted too,
+    so pool refreshes do not depend on what the process generated before.
+    """
+    random.seed(seed)
+    seed_entropy(seed)
+    core_generators.fake.seed_instance(seed)
+    client_generators.fake.seed_instance(seed)
+    value_pool.restart_value_pools()
+
+def generate_shard_batch(
+    shard_index: int,
+    size: int,
+    seed: int = 0,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+) -> LogBatch:
+    """Generate the entries of one shard of a seeded run as a columnar batch."""
+    seed_generators(shard_seed(seed, shard_index))
+    return generate_log_batch(size, start_date, end_date)
+
+def generate_shard(
+    shard_index: int,
+    size: int,
+    format_type: str = "json",
+    seed: int = 0,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+) -> bytes:
+    """Generate one shard of formatted log lines as UTF-8 bytes.
+
+    CSV shards contain data rows only; the caller writes the header once.
+
+    Args:
+        shard_index: Position of the shard within the run
+        size: Number of log entries in the shard
+        format_type: Output format ("json", "csv", "log")
+        seed: Seed of the whole run; the shard derives its own from it
+        start_date: Start of the timestamp range (default: 3 years ago)
+        end_date: End of the timestamp range (default: now)
+
+    Returns:
+        Newline-terminated formatted log lines
+    """
+    batch = generate_shard_batch(shard_index, size, seed, start_date, end_date)
+    return format_batch(batch, format_type)
+
+def format_batch(batch: LogBatch, format_type: str = "json") -> bytes:
+    """Format a columnar batch as newline-terminated UTF-8 lines (CSV: no header)."""
+    if format_type == "csv":
+        return format_csv_batch(batch).encode("utf-8")
+
+    lines = format_log_batch(batch, format_type)
+    return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+def format_entries(entries: list[Dict[str, Any]], format_type: str = "json") -> bytes:
+    """Format log entries as newline-terminated UTF-8 lines (CSV without header)."""
+    if format_type == "csv":
+        return format_csv_rows(entries, LOG_ENTRY_FIELDS).encode("utf-8")
+    if format_type == "json":
+        return bytes(encode_json_lines(entries))
+
+    lines = [format_log_entry_as_string(entry, format_type) for entry in entries]
+    return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+def iter_formatted_chunks(
+    entries: Iterable[Dict[str, Any]], format_type: str = "json", chunk_size: int = 1000
+) -> Iterator[bytes]:
+    """Lazily format an entry stream as UTF-8 chunks of at most chunk_size lines."""
+    entries = iter(entries)
+    while True:
+        chunk = list(islice(entries, chunk_size))
+        if not chunk:
+            return
+        yield format_entries(chunk, format_type)
+
+def csv_header() -> bytes:
+    """Return the CSV header row written once ahead of the CSV shards."""
+    return format_csv_rows([], LOG_ENTRY_FIELDS, header=True).encode("utf-8")
+
+def _worker_pool(workers: int) -> ProcessPoolExecutor:
+    """Return a process pool whose workers share this process's value pools."""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=value_pool.set_pool_state,
+        initargs=(value_pool.get_pool_state(),),
+    )
+
+def iter_shards(
+    count: int,
+    format_type: str = "json",
+    workers: int = 1,
+    seed: Optional[int] = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+) -> Iterator[bytes]:
+    """Yield generated shards in shard order, using a pool of worker processes.
+
+    At most two shards per worker are in flight at a time, so memory stays
+    bounded even when the consumer is slower than the workers.
+
+    Args:
+        count: Number of log entries to generate
+        format_type: Output format ("json", "csv", "log")
+        workers: Number of worker processes; 1 generates in this process
+        seed: Seed of the run (default: None, a random seed)
+        shard_size: Number of entries per shard
+        start_date: Start of the timestamp range (default: 3 years ago)
+        end_date: End of the timestamp range (default: now)
+
+    Yields:
+        Formatted shards as UTF-8 bytes
+    """
+    if workers <= 0:
+        raise ValueError(f"workers ({workers}) must be positive")
+    if seed is None:
+        seed = secrets.randbits(64)
+
+    shards = split_shards(count, shard_size)
+
+    if workers == 1:
+        for shard_index, size in shards:
+            yield generate_shard(
+                shard_index, size, format_type, seed, start_date, end_date
+            )
+        return
+
+    with _worker_pool(workers) as executor:
+        pending = deque()
+        for shard_index, size in shards:
+            pending.append(
+                executor.submit(
+                    generate_shard,
+                    shard_index,
+                    size,
+                    format_type,
+                    seed,
+                    start_date,
+                    end_date,
+                )
+            )
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def shard_file_path(output_path: Path, worker_index: int) -> Path:
+    """Return the per-worker file path.
+
+    For example logs.json -> logs.00003.json, logs.json.gz -> logs.00003.json.gz.
+    """
+    compressed = output_path.suffix.lower() in COMPRESSION_SUFFIXES
+    suffixes = output_path.suffixes[-2:] if compressed else output_path.suffixes[-1:]
+    suffix = "".join(suffixes)
+    stem = output_path.name[:-len(suffix)] if suffix else output_path.name
+    return output_path.with_name(f"{stem}.{worker_index:05d}{suffix}")
+
+def write_shard_file(
+    path: str,
+    shards: list[tuple[int, int]],
+    format_type: str = "json",
+    seed: int = 0,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+    compression: Optional[str] = None,
+) -> int:
+    """Generate a run of shards into one (optionally compressed) file.
+
+    Returns:
+        Number of entries written
+    """
+    chunks = (
+        generate_shard(shard_index, size, format_type, seed, start_date, end_date)
+        for shard_index, size in shards
+    )
+    if format_type == "csv":
+        chunks = chain([csv_header()], chunks)
+    with open(path, "wb") as f:
+        if compression:
+            # One compression thread per worker process; the processes use every core
+            write_compressed(chunks, f, compression, threads=1)
+        else:
+            for chunk in chunks:
+                f.write(chunk)
+    return sum(size for _, size in shards)
+
+def write_shard_files(
+    output_path: Path,
+    count: int,
+    format_type: str = "json",
+    workers: int = 1,
+    seed: Optional[int] = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+    compression: Optional[str] = None,
+) -> list[Path]:
+    """Generate count entries into one file per worker, each written by that worker.
+
+    Worker files hold contiguous runs of shards, so concatenating them in
+    order gives the same lines as single-file output with the same seed
+    (apart from the header each CSV file starts with). With compression
+    ("gzip", "bz2", "xz") every worker compresses its own file.
+
+    Returns:
+        Paths of the files written, in shard order
+    """
+    if workers <= 0:
+        raise ValueError(f"workers ({workers}) must be positive")
+    if seed is None:
+        seed = secrets.randbits(64)
+
+    shards = split_shards(count, shard_size)
+    per_worker = -(-len(shards) // workers) if shards else 0
+    runs = (
+        [shards[i : i + per_worker] for i in range(0, len(shards), per_worker)]
+        if shards
+        else []
+    )
+    paths = [
+        shard_file_path(output_path, worker_index) for worker_index in range(len(runs))
+    ]
+
+    with _worker_pool(workers) as executor:
+        futures = [
+            executor.submit(
+                write_shard_file,
+                str(path),
+                run,
+                format_type,
+                seed,
+                start_date,
+                end_date,
+                compression,
+            )
+            for path, run in zip(paths, runs)
+        ]
+        for future in futures:
+            future.result()
+    return paths
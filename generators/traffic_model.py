@@ -0,0 +1,280 @@
+"""
+Non-homogeneous traffic model for timestamps.
+
+Real traffic is not flat: it follows the hour of day and the day of week,
+and spikes on particular days. A TrafficModel gives a relative request rate
+for every UTC hour as hourly[hour] * weekly[weekday] * special_days[date].
+Timestamps are drawn from the resulting piecewise-constant intensity: the
+count is split across hour buckets multinomially, and each bucket's share
+is drawn uniformly inside it and sorted. Buckets come out in time order, so
+timestamps stream in ascending order with bounded memory. With numpy
+installed, whole runs of buckets are drawn and sorted as arrays; without
+it, every per-timestamp step still runs in C-level map() and sorted() calls.
+"""
+
+import math
+import random
+from array import array
+from datetime import date, datetime, timezone
+from itertools import repeat
+from operator import add, mod
+from typing import Dict, Iterator, NamedTuple, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # Optional accelerated backend; the stdlib path is the fallback
+    np = None
+
+from generators.core_generators import (
+    DEFAULT_START_DATE,
+    DEFAULT_END_DATE,
+    _epoch_micros,
+    micros_to_timestamp,
+)
+
+# Relative request rate by UTC hour of day: quiet nights, a morning ramp, an afternoon
+# peak
+HOURLY_TRAFFIC = (
+    0.30, 0.22, 0.18, 0.16, 0.17, 0.22,  # 00-05
+    0.35, 0.55, 0.80, 0.95, 1.00, 1.00,  # 06-11
+    0.95, 1.00, 1.00, 0.98, 0.92, 0.85,  # 12-17
+    0.78, 0.72, 0.68, 0.62, 0.50, 0.40   # 18-23
+)
+
+# Relative request rate by day of week, Monday first
+WEEKLY_TRAFFIC = (1.00, 1.02, 1.00, 0.98, 0.92, 0.60, 0.55)
+
+_MICROS_PER_HOUR = 3600 * 1000000
+
+# Timestamps drawn and sorted per numpy array
+_NUMPY_CHUNK_SIZE = 1 << 20
+
+class TrafficModel(NamedTuple):
+    """Relative request rate by UTC hour, weekday and date."""
+    hourly: Sequence[float]  # 24 rates, by UTC hour of day
+    weekly: Sequence[float]  # 7 rates, Monday first
+    # Multipliers for particular UTC dates, e.g. holiday spikes
+    special_days: Dict[date, float] = {}
+
+# Diurnal and weekly curve without special days
+DEFAULT_TRAFFIC_MODEL = TrafficModel(HOURLY_TRAFFIC, WEEKLY_TRAFFIC)
+
+# Constant rate, i.e. uniform timestamps
+FLAT_TRAFFIC_MODEL = TrafficModel((1.0,) * 24, (1.0,) * 7)
+
+# Models selectable by name, e.g. from the CLI
+TRAFFIC_MODELS = {
+    "flat": FLAT_TRAFFIC_MODEL,
+    "diurnal": DEFAULT_TRAFFIC_MODEL
+}
+
+def traffic_intensity(model: TrafficModel, moment: datetime) -> float:
+    """Return the model's relative request rate at a moment."""
+    moment = moment.astimezone(timezone.utc)
+    return (
+        model.hourly[moment.hour]
+        * model.weekly[moment.weekday()]
+        * model.special_days.get(moment.date(), 1.0)
+    )
+
+def iter_traffic_buckets(
+    model: TrafficModel, start_micros: int, end_micros: int
+) -> Iterator[tuple[int, int, float]]:
+    """Yield (start, end, weight) of the hour buckets covering a range of epoch micros.
+
+    The first and last buckets are clipped to the range; weight is the
+    bucket's rate times its length in hours.
+    """
+    if len(model.hourly) != 24 or len(model.weekly) != 7:
+        raise ValueError(
+            "A traffic model needs 24 hourly and 7 weekly rates, "
+            f"got {len(model.hourly)} and {len(model.weekly)}"
+        )
+
+    bucket_start = start_micros
+    while bucket_start < end_micros:
+        bucket_end = min(
+            (bucket_start // _MICROS_PER_HOUR + 1) * _MICROS_PER_HOUR, end_micros
+        )
+        rate = traffic_intensity(model, micros_to_timestamp(bucket_start))
+        if rate < 0:
+            moment = micros_to_timestamp(bucket_start)
+            raise ValueError(
+                f"Traffic rates cannot be negative, got {rate} at {moment}"
+            )
+        weight = rate * (bucket_end - bucket_start) / _MICROS_PER_HOUR
+        yield bucket_start, bucket_end, weight
+        bucket_start = bucket_end
+
+def _binomial(n: int, p: float) -> int:
+    """Return a Binomial(n, p) draw from the random module's generator."""
+    if n <= 0 or p <= 0.0:
+        return 0
+    if p >= 1.0:
+        return n
+    binomialvariate = getattr(random, "binomialvariate", None)  # Python 3.12+
+    if binomialvariate is not None:
+        return binomialvariate(n, p)
+    if p > 0.5:
+        return n - _binomial(n, 1.0 - p)
+
+    mean = n * p
+    if mean < 30:
+        # Inversion: walk the CDF from 0; takes about mean steps
+        q = 1.0 - p
+        ratio = p / q
+        factor = (n + 1) * ratio
+        probability = q ** n
+        u = random.random()
+        successes = 0
+        while u > probability and successes < n:
+            u -= probability
+            successes += 1
+            probability *= factor / successes - ratio
+        return successes
+    # Normal approximation; at this size its error is far below the binomial's own
+    # spread
+    return min(max(round(random.gauss(mean, math.sqrt(mean * (1.0 - p)))), 0), n)
+
+def _iter_bucket_micros(
+    count: int, buckets: list[tuple[int, int, float]], batch_size: int
+) -> Iterator[array]:
+    """Yield sorted timestamps for buckets with the stdlib, in batches of batch_size."""
+    remaining = count
+    remaining_weight = math.fsum(weight for _, _, weight in buckets)
+    pending = array("q")
+    for bucket_start, bucket_end, weight in buckets:
+        # Multinomial split of the count, one conditional binomial per bucket
+        if weight >= remaining_weight:
+            bucket_count = remaining
+        else:
+            bucket_count = _binomial(remaining, weight / remaining_weight)
+        remaining -= bucket_count
+        remaining_weight -= weight
+
+        # Halve oversized buckets (same rate, so binomial by length) to bound memory
+        # by batch_size
+        pieces = [(bucket_start, bucket_end, bucket_count)]
+        while pieces:
+            piece_start, piece_end, piece_count = pieces.pop()
+            if piece_count > batch_size and piece_end - piece_start > 1:
+                middle = (piece_start + piece_end) // 2
+                left = _binomial(
+                    piece_count, (middle - piece_start) / (piece_end - piece_start)
+                )
+                pieces.append((middle, piece_end, piece_count - left))
+                pieces.append((piece_start, middle, left))
+                continue
+            if piece_count:
+                raw = array("Q")
+                raw.frombytes(random.randbytes(8 * piece_count))
+                offsets = sorted(map(mod, raw, repeat(piece_end - piece_start)))
+                pending.extend(map(add, offsets, repeat(piece_start)))
+            while len(pending) >= batch_size:
+                yield pending[:batch_size]
+                del pending[:batch_size]
+        if not remaining:
+            break
+    if pending:
+        yield pending
+
+def _iter_bucket_micros_numpy(
+    count: int, buckets: list[tuple[int, int, float]], batch_size: int
+) -> Iterator[array]:
+    """Yield sorted timestamps for buckets with numpy, in batches of batch_size."""
+    # Seeded from random, like every other generator
+    rng = np.random.default_rng(random.getrandbits(128))
+    starts = np.array([bucket[0] for bucket in buckets], dtype=np.int64)
+    lengths = np.array([bucket[1] - bucket[0] for bucket in buckets], dtype=np.int64)
+    weights = np.array([bucket[2] for bucket in buckets])
+
+    # Split buckets expected to hold more than one chunk into equal pieces
+    expected = weights / weights.sum() * count
+    pieces = np.maximum(np.ceil(expected / _NUMPY_CHUNK_SIZE), 1).astype(np.int64)
+    pieces = np.minimum(pieces, lengths)
+    if pieces.max() > 1:
+        index = np.repeat(np.arange(len(buckets)), pieces)
+        within = np.arange(len(index)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+        piece_starts = starts[index] + lengths[index] * within // pieces[index]
+        piece_ends = starts[index] + lengths[index] * (within + 1) // pieces[index]
+        weights = weights[index] * (piece_ends - piece_starts) / lengths[index]
+        starts, lengths = piece_starts, piece_ends - piece_starts
+
+    counts = rng.multinomial(count, weights / weights.sum())
+    groups = np.cumsum(counts) // _NUMPY_CHUNK_SIZE
+    boundaries = [0, *(np.flatnonzero(np.diff(groups)) + 1).tolist(), len(counts)]
+
+    pending = array("q")
+    for group_start, group_end in zip(boundaries, boundaries[1:]):
+        group_counts = counts[group_start:group_end]
+        total = int(group_counts.sum())
+        if not total:
+            continue
+        group_lengths = np.repeat(lengths[group_start:group_end], group_counts)
+        offsets = rng.random(total) * group_lengths
+        values = np.repeat(starts[group_start:group_end], group_counts)
+        values += offsets.astype(np.int64)
+        values.sort()
+        pending.frombytes(values.tobytes())
+        while len(pending) >= batch_size:
+            yield pending[:batch_size]
+            del pending[:batch_size]
+    if pending:
+        yield pending
+
+def iter_traffic_timestamp_micros(
+    count: int,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+    model: TrafficModel = DEFAULT_TRAFFIC_MODEL,
+    batch_size: int = 10000,
+) -> Iterator[array]:
+    """Yield ascending traffic-model timestamps as batches of int64 epoch microseconds.
+
+    Args:
+        count: Number of timestamps to generate
+        start_date: Start of date range (default: 3 years ago)
+        end_date: End of date range (default: now)
+        model: Traffic model giving the relative rate over time
+            (default: DEFAULT_TRAFFIC_MODEL)
+        batch_size: Maximum number of timestamps per batch (default: 10000)
+
+    Yields:
+        array('q') batches of ascending epoch microseconds
+    """
+    if end_date < start_date:
+        raise ValueError(
+            f"end_date ({end_date}) cannot be before start_date ({start_date})"
+        )
+    if batch_size <= 0:
+        raise ValueError(f"batch_size ({batch_size}) must be positive")
+
+    start_micros = _epoch_micros(start_date)
+    end_micros = _epoch_micros(end_date)
+    if count <= 0:
+        return
+    if end_micros == start_micros:
+        for batch_start in range(0, count, batch_size):
+            yield array("q", [start_micros]) * min(batch_size, count - batch_start)
+        return
+
+    buckets = list(iter_traffic_buckets(model, start_micros, end_micros))
+    if math.fsum(weight for _, _, weight in buckets) <= 0:
+        raise ValueError(
+            "The traffic model has zero intensity over the whole date range"
+        )
+
+    if np is not None:
+        yield from _iter_bucket_micros_numpy(count, buckets, batch_size)
+    else:
+        yield from _iter_bucket_micros(count, buckets, batch_size)
+
+def generate_traffic_timestamps(
+    count: int,
+    start_date: datetime = DEFAULT_START_DATE,
+    end_date: datetime = DEFAULT_END_DATE,
+    model: TrafficModel = DEFAULT_TRAFFIC_MODEL,
+) -> list[datetime]:
+    """Return count ascending timestamps drawn from a traffic model."""
+    batches = iter_traffic_timestamp_micros(count, start_date, end_date, model)
+    return [micros_to_timestamp(micros) for batch in batches for micros in batch]
@@ -0,0 +1,255 @@
+"""
+Pooled value cache for Faker-generated client values.
+
+Faker is slow per call, so instead of calling it for every entry a pool of
+each value type is built once and then sampled in O(1) (with a Walker
+alias table, one random() call per draw) with a Zipf-like popularity skew
+(a few user agents and users account for most traffic, as in real logs).
+Pools can be persisted to a JSON cache file so later runs skip Faker
+entirely; the cache is rebuilt when the Faker version, locale or pool size
+changes. Pooling is off until configure_value_pools() is called.
+"""
+
+import json
+import os
+import random
+from typing import Any, Dict, Optional
+
+import faker
+from faker import Faker
+
+# Value types that can be pooled, and the Faker method producing each
+POOL_KINDS = {
+    "user_agent": "user_agent",
+    "url": "url",
+    "username": "user_name",
+    "email": "email"
+}
+
+# Default pool settings
+DEFAULT_POOL_SIZE = 1000
+DEFAULT_POOL_SKEW = 1.0  # Zipf exponent; 0 samples uniformly
+DEFAULT_LOCALE = "en_US"
+
+# Cache file format version; bump when the layout changes
+POOL_CACHE_VERSION = 1
+
+# Active pool state; empty pools mean pooling is disabled
+_pools: Dict[str, list[str]] = {}
+_configured_pools: Dict[str, list[str]] = {}
+_alias_probs: list[float] = []
+_aliases: list[int] = []
+_settings: Dict[str, Any] = {}
+_draws: Dict[str, int] = {}
+
+def popularity_alias_table(
+    size: int, skew: float = DEFAULT_POOL_SKEW
+) -> tuple[list[float], list[int]]:
+    """Return a Walker alias table of the Zipf weights 1 / rank ** skew, rank 1..size.
+
+    Index i is drawn with probability (probs[i] + the leftover 1 - probs[j] of
+    every j aliased to i) / size, so a draw needs one uniform slot and one
+    comparison whatever the pool size.
+
+    Returns:
+        (probs, aliases): per slot, the chance of keeping its own index and the
+        index used otherwise
+    """
+    weights = [1.0 / rank ** skew for rank in range(1, size + 1)]
+    total = sum(weights)
+    scaled = [weight * size / total for weight in weights]
+    probs = [1.0] * size
+    aliases = list(range(size))
+    small = [index for index, value in enumerate(scaled) if value < 1.0]
+    large = [index for index, value in enumerate(scaled) if value >= 1.0]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        probs[less] = scaled[less]
+        aliases[less] = more
+        scaled[more] -= 1.0 - scaled[less]
+        (small if scaled[more] < 1.0 else large).append(more)
+    return probs, aliases
+
+def build_pool(kind: str, size: int, fake: Faker) -> list[str]:
+    """Return size fresh values of one kind generated with Faker."""
+    generate = getattr(fake, POOL_KINDS[kind])
+    return [generate() for _ in range(size)]
+
+def build_pools(size: int, locale: str = DEFAULT_LOCALE) -> Dict[str, list[str]]:
+    """Return a pool of size values for every kind.
+
+    The Faker instance is seeded from the process RNG, so pools built after
+    seeding (e.g. with --seed) are reproducible.
+    """
+    fake = Faker(locale)
+    fake.seed_instance(random.getrandbits(64))
+    return {kind: build_pool(kind, size, fake) for kind in POOL_KINDS}
+
+def load_pool_cache(
+    path: str, size: int, locale: str = DEFAULT_LOCALE
+) -> Optional[Dict[str, list[str]]]:
+    """Return cached pools, or None if the cache is missing or stale.
+
+    A cache is stale when it was written by another Faker version, for
+    another locale or pool size, or with another cache format.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    expected = {
+        "version": POOL_CACHE_VERSION,
+        "faker_version": faker.VERSION,
+        "locale": locale,
+        "size": size
+    }
+    if not isinstance(cache, dict) or any(
+        cache.get(key) != value for key, value in expected.items()
+    ):
+        return None
+
+    pools = cache.get("pools")
+    if not isinstance(pools, dict) or set(pools) != set(POOL_KINDS):
+        return None
+    if any(len(values) != size for values in pools.values()):
+        return None
+    return pools
+
+def save_pool_cache(
+    path: str, pools: Dict[str, list[str]], locale: str = DEFAULT_LOCALE
+) -> None:
+    """Write pools to a JSON cache file, replacing it atomically."""
+    cache = {
+        "version": POOL_CACHE_VERSION,
+        "faker_version": faker.VERSION,
+        "locale": locale,
+        "size": len(next(iter(pools.values()))),
+        "pools": pools
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+def configure_value_pools(
+    size: int = DEFAULT_POOL_SIZE,
+    skew: float = DEFAULT_POOL_SKEW,
+    refresh_after: Optional[int] = None,
+    cache_path: Optional[str] = None,
+    locale: str = DEFAULT_LOCALE,
+) -> None:
+    """Build (or load) the value pools and turn pooling on.
+
+    Args:
+        size: Number of distinct values per kind; 0 turns pooling off
+        skew: Zipf exponent of the popularity skew (default: 1.0)
+        refresh_after: Rebuild a kind's pool after this many draws
+            (default: None, never)
+        cache_path: JSON file to load pools from and save them to (default: None)
+        locale: Faker locale of the pooled values (default: en_US)
+    """
+    if size < 0:
+        raise ValueError(f"size ({size}) cannot be negative")
+    if refresh_after is not None and refresh_after <= 0:
+        raise ValueError(f"refresh_after ({refresh_after}) must be positive")
+
+    if size == 0:
+        disable_value_pools()
+        return
+
+    pools = load_pool_cache(cache_path, size, locale) if cache_path else None
+    if pools is None:
+        pools = build_pools(size, locale)
+        if cache_path:
+            save_pool_cache(cache_path, pools, locale)
+
+    set_pool_state(
+        {
+            "pools": pools,
+            "settings": {
+                "size": size,
+                "skew": skew,
+                "refresh_after": refresh_after,
+                "locale": locale,
+            },
+        }
+    )
+
+def disable_value_pools() -> None:
+    """Turn pooling off; generators go back to calling Faker per value."""
+    _pools.clear()
+    _configured_pools.clear()
+    _alias_probs.clear()
+    _aliases.clear()
+    _settings.clear()
+    _draws.clear()
+
+def pools_enabled() -> bool:
+    """Return True when pooled values are in use."""
+    return bool(_pools)
+
+def get_pool_state() -> Dict[str, Any]:
+    """Return the configured pools and settings, e.g. to hand to worker processes."""
+    return {"pools": dict(_configured_pools), "settings": dict(_settings)}
+
+def set_pool_state(state: Dict[str, Any]) -> None:
+    """Install pools and settings returned by get_pool_state()."""
+    disable_value_pools()
+    if not state.get("pools"):
+        return
+
+    _configured_pools.update(state["pools"])
+    _settings.update(state["settings"])
+    probs, aliases = popularity_alias_table(_settings["size"], _settings["skew"])
+    _alias_probs.extend(probs)
+    _aliases.extend(aliases)
+    restart_value_pools()
+
+def restart_value_pools() -> None:
+    """Restore the configured pools and restart their draw counts.
+
+    Called whenever the generators are reseeded, so that every shard of a
+    seeded run starts from the same pools and refreshes them at the same
+    entries no matter which worker process generates it.
+    """
+    _pools.update(_configured_pools)
+    _draws.update({kind: 0 for kind in _pools})
+
+def _count_draws(kind: str, count: int) -> None:
+    """Track draws of one kind and rebuild its pool once refresh_after is reached."""
+    refresh_after = _settings["refresh_after"]
+    if refresh_after is None:
+        return
+
+    _draws[kind] += count
+    if _draws[kind] >= refresh_after:
+        fake = Faker(_settings["locale"])
+        fake.seed_instance(random.getrandbits(64))
+        _pools[kind] = build_pool(kind, _settings["size"], fake)
+        _draws[kind] = 0
+
+def pooled_value(kind: str) -> str:
+    """Return one value of the given kind sampled from its pool."""
+    pool = _pools[kind]
+    slot = random.random() * len(pool)
+    index = int(slot)
+    value = pool[index] if slot - index < _alias_probs[index] else pool[_aliases[index]]
+    _count_draws(kind, 1)
+    return value
+
+def pooled_values(kind: str, count: int) -> list[str]:
+    """Return count values of the given kind sampled from its pool."""
+    pool, probs, aliases = _pools[kind], _alias_probs, _aliases
+    size = len(pool)
+    values = []
+    for slot in (random.random() * size for _ in range(count)):
+        index = int(slot)
+        values.append(
+            pool[index] if slot - index < probs[index] else pool[aliases[index]]
+        )
+    _count_draws(kind, count)
+    return values
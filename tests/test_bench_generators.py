@@ -0,0 +1,90 @@
+"""
+Test the micro-benchmark runner and its regression check.
+"""
+
+import pytest
+import sys
+from benchmarks import bench_generators
+from benchmarks.bench_generators import (
+    ENTRY_FORMATS,
+    collect_benchmarks,
+    compare_results,
+    parse_args,
+    run_benchmarks,
+    time_benchmark,
+)
+
+def results(**rows_per_second):
+    """Return a results document with the given rows per second by benchmark name."""
+    rates = {name: {"rows_per_second": rate} for name, rate in rows_per_second.items()}
+    return {"results": rates}
+
+def test_compare_results_threshold():
+    """Test that only slowdowns beyond the threshold are flagged."""
+    baseline = results(a=1000.0, b=1000.0, c=1000.0, d=1000.0)
+    current = results(a=700.0, b=750.0, c=1500.0, d=749.0)
+
+    comparisons = {
+        name: (change, regressed)
+        for name, _, _, change, regressed in compare_results(baseline, current, 0.25)
+    }
+    assert comparisons["a"] == (pytest.approx(-0.3), True)
+    assert comparisons["b"] == (-0.25, False)  # Exactly at the threshold
+    assert comparisons["c"] == (0.5, False)
+    assert comparisons["d"][1] is True
+    lenient = compare_results(baseline, current, 0.5)
+    assert [regressed for *_, regressed in lenient] == [False] * 4
+
+def test_compare_results_new_and_removed():
+    """Test that benchmarks missing from either run are skipped."""
+    comparisons = compare_results(
+        results(old=100.0, kept=100.0), results(kept=50.0, new=10.0)
+    )
+
+    assert [
+        (name, before, after, regressed)
+        for name, before, after, _, regressed in comparisons
+    ] == [("kept", 100.0, 50.0, True)]
+
+def test_batch_formats_benchmarked():
+    """Test that every line format of the batch formatters is benchmarked."""
+    names = set(collect_benchmarks())
+
+    for format_type in ENTRY_FORMATS:
+        assert f"log_batch.format_log_batch.{format_type}" in names
+        assert f"sharding.format_batch.{format_type}" in names
+
+def test_run_benchmarks():
+    """Test a filtered run and its results document."""
+    document = run_benchmarks(
+        rows=20, repeat=1, name_filter="format_batch.csv", quiet=True
+    )
+
+    assert list(document["results"]) == ["sharding.format_batch.csv"]
+    assert document["results"]["sharding.format_batch.csv"]["rows_per_second"] > 0
+
+def test_time_benchmark_builds_input_untimed(monkeypatch):
+    """Test that the input of the timed runs is generated before timing starts."""
+    generated = []
+    timed = []
+    monkeypatch.setattr(
+        bench_generators, "generate_log_batch", lambda n: generated.append(n) or n
+    )
+    benchmark = bench_generators._batch_benchmark(timed.append, {})
+
+    def repeat(run, repeat, number):
+        assert generated == [100, 500]
+        return [run() or 1.0 for _ in range(repeat)]
+    monkeypatch.setattr(bench_generators.timeit, "repeat", repeat)
+
+    assert time_benchmark(benchmark, 500, 2) == 1.0
+    assert timed == [100, 500, 500] and generated == [100, 500]
+
+def test_parse_args_invalid_rows(monkeypatch, capsys):
+    """Test that non-positive row and repeat counts are usage errors."""
+    for option in ("--rows", "--repeat"):
+        monkeypatch.setattr(sys, "argv", ["bench_generators.py", "run", option, "0"])
+        with pytest.raises(SystemExit) as error:
+            parse_args()
+        assert error.value.code == 2
+        assert "must be positive" in capsys.readouterr().err
@@ -0,0 +1,136 @@
+"""
+Test the binary log container and its memory-mapped reader.
+"""
+
+import gzip
+import io
+import pytest
+from exporters.binary_log import (
+    BINARY_LOG_MAGIC,
+    binary_log_row,
+    convert_binary_log,
+    iter_binary_log_batches,
+    iter_binary_log_column,
+    iter_binary_log_rows,
+    open_binary_log,
+    read_binary_log_block,
+    write_binary_log,
+)
+from generators.log_batch import generate_log_batch, iter_log_batch_rows
+from generators.log_entry_factory import LogEntry
+from generators.sharding import csv_header, format_batch
+
+@pytest.fixture
+def batches():
+    """Return batches of different sizes, one empty, with non-ASCII and NUL values."""
+    batches = [generate_log_batch(size) for size in (300, 0, 120, 1)]
+    batches[0].columns["user_agent"][5] = "Mözilla/5.0 ☃"
+    batches[2].columns["path"][7] = "/api/v1/users/a\0b"
+    return batches
+
+@pytest.fixture
+def binary_log(tmp_path, batches):
+    """Write the batches to a binary log and return its path."""
+    path = tmp_path / "logs.binlog"
+    assert write_binary_log(iter(batches), path) == 421
+    return path
+
+def test_round_trip_batches(binary_log, batches):
+    """Test that every block formats exactly like the batch it was written from."""
+    with open_binary_log(binary_log) as log:
+        blocks = list(iter_binary_log_batches(log))
+
+        assert log.row_count == 421 and len(blocks) == 3  # Empty batches are skipped
+        stored = [batch for batch in batches if len(batch.timestamps)]
+        for block, batch in zip(blocks, stored):
+            for format_type in ("json", "csv", "log"):
+                expected = format_batch(batch, format_type)
+                assert format_batch(block, format_type) == expected
+        del blocks
+
+def test_zero_copy_columns(binary_log, batches):
+    """Test that timestamps and request IDs are views into the map."""
+    with open_binary_log(binary_log) as log:
+        block = read_binary_log_block(log, 0)
+
+        assert isinstance(block.timestamps, memoryview)
+        assert isinstance(block.request_ids, memoryview)
+        assert block.timestamps.obj is log.buffer.obj
+        assert list(block.timestamps) == list(batches[0].timestamps)
+        assert bytes(block.request_ids) == batches[0].request_ids
+        del block
+
+def test_rows(binary_log, batches):
+    """Test iterating and randomly indexing rows, as records and by negative index."""
+    expected = [row for batch in batches for row in iter_log_batch_rows(batch)]
+    with open_binary_log(binary_log) as log:
+        assert list(iter_binary_log_rows(log)) == expected
+        for index in (0, 5, 299, 300, 307, 419, 420, -1):
+            assert binary_log_row(log, index) == expected[index]
+        assert isinstance(binary_log_row(log, 3, as_record=True), LogEntry)
+        with pytest.raises(IndexError):
+            binary_log_row(log, 421)
+
+def test_rows_get_fresh_headers(binary_log):
+    """Test that rows never share a headers dict."""
+    with open_binary_log(binary_log) as log:
+        first, second = binary_log_row(log, 0), binary_log_row(log, 1)
+        first["request_headers"]["X-Test"] = "1"
+
+        assert second["request_headers"] == {}
+
+def test_iter_column(binary_log, batches):
+    """Test reading single columns, stored and placeholder."""
+    with open_binary_log(binary_log) as log:
+        stored = iter_binary_log_column(log, "timestamp")
+        timestamps = [list(batch.timestamps) for batch in batches if batch.timestamps]
+        paths = sum((batch.columns["path"] for batch in batches), [])
+
+        assert [list(column) for column in stored] == timestamps
+        assert sum(iter_binary_log_column(log, "path"), []) == paths
+        assert sum(iter_binary_log_column(log, "status_code"), []) == [200] * 421
+        with pytest.raises(ValueError, match="Unknown"):
+            next(iter_binary_log_column(log, "nope"))
+
+def test_convert(binary_log, batches):
+    """Test conversion to CSV with a header and to compressed JSON."""
+    output = io.BytesIO()
+    assert convert_binary_log(binary_log, output, "csv") == 421
+    expected = b"".join(format_batch(batch, "csv") for batch in batches)
+    assert output.getvalue() == csv_header() + expected
+
+    output = io.BytesIO()
+    convert_binary_log(
+        binary_log, output, "json", compression="gzip", compress_threads=2
+    )
+    expected = b"".join(format_batch(batch, "json") for batch in batches)
+    assert gzip.decompress(output.getvalue()) == expected
+
+def test_write_to_stream(batches):
+    """Test writing to a seekable stream and the header it starts with."""
+    stream = io.BytesIO()
+    write_binary_log(batches, stream)
+
+    assert stream.getvalue().startswith(BINARY_LOG_MAGIC)
+    assert stream.tell() == len(stream.getvalue())
+
+def test_empty_log(tmp_path):
+    """Test a binary log without rows."""
+    path = tmp_path / "empty.binlog"
+    assert write_binary_log([], path) == 0
+    with open_binary_log(path) as log:
+        assert log.row_count == 0 and list(iter_binary_log_rows(log)) == []
+
+def test_invalid_files(tmp_path, binary_log):
+    """Test that other files and truncated logs are rejected."""
+    other = tmp_path / "logs.json"
+    other.write_bytes(b'{"timestamp": "2024-01-01T00:00:00+00:00"}\n' * 10)
+    with pytest.raises(ValueError, match="not a binary log"):
+        with open_binary_log(other):
+            pass
+
+    truncated = tmp_path / "truncated.binlog"
+    truncated.write_bytes(binary_log.read_bytes()[:-100])
+    with pytest.raises(ValueError, match="truncated"):
+        with open_binary_log(truncated):
+            pass
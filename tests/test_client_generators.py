@@ -4,20 +4,53 @@ Test client generators for fake log entries.
 
 import pytest
 import re
+import ipaddress
 from collections import Counter
+from itertools import accumulate
 from generators.client_generators import (
+    # Bulk IP engine
+    IP_CIDR_TABLES,
+    EXCLUDED_IPV4_CIDRS,
+    compile_cidr_table,
+    format_ip,
+    # Cumulative weight tables
+    IP_TYPE_CUM_WEIGHTS,
+    REFERER_CUM_WEIGHTS,
+    USER_ID_CUM_WEIGHTS,
+    SESSION_ID_CUM_WEIGHTS,
     # Source IP generators
-    generate_source_ip, generate_source_ips, IP_TYPES, IP_TYPE_WEIGHTS,
+    generate_source_ip,
+    generate_source_ips,
+    IP_TYPES,
+    IP_TYPE_WEIGHTS,
     # User agent generators
-    generate_user_agent, generate_user_agents,
+    generate_user_agent,
+    generate_user_agents,
     # Referer generators
-    generate_referer, generate_referers, REFERER_TYPES, REFERER_WEIGHTS,
+    generate_referer,
+    generate_referers,
+    REFERER_TYPES,
+    REFERER_WEIGHTS,
     # User ID generators
-    generate_user_id, generate_user_ids, USER_ID_TYPES, USER_ID_WEIGHTS,
+    generate_user_id,
+    generate_user_ids,
+    USER_ID_TYPES,
+    USER_ID_WEIGHTS,
     # Session ID generators
-    generate_session_id, generate_session_ids, SESSION_ID_TYPES, SESSION_ID_WEIGHTS
+    generate_session_id,
+    generate_session_ids,
+    SESSION_ID_TYPES,
+    SESSION_ID_WEIGHTS,
 )
 
+# Cumulative weight table tests
+def test_cum_weight_tables():
+    """Test that precomputed cumulative tables match their weight lists."""
+    assert IP_TYPE_CUM_WEIGHTS == list(accumulate(IP_TYPE_WEIGHTS))
+    assert REFERER_CUM_WEIGHTS == list(accumulate(REFERER_WEIGHTS))
+    assert USER_ID_CUM_WEIGHTS == list(accumulate(USER_ID_WEIGHTS))
+    assert SESSION_ID_CUM_WEIGHTS == list(accumulate(SESSION_ID_WEIGHTS))
+
 # Source IP tests
 def test_generate_source_ip():
     """Test single source IP generation."""
@@ -74,6 +107,90 @@ def test_ip_format():
     
     assert is_ipv4 or is_ipv6 or is_private
 
+def test_ip_type_proportions_large():
+    """Test that the bulk engine keeps the 70/20/10 type split at larger counts."""
+    count = 20000
+    ips = [ipaddress.ip_address(ip) for ip in generate_source_ips(count)]
+    
+    ipv6_count = sum(1 for ip in ips if ip.version == 6)
+    private_count = sum(1 for ip in ips if ip.version == 4 and ip.is_private)
+    ipv4_count = count - ipv6_count - private_count
+    
+    assert abs(ipv4_count / count - 0.7) < 0.02
+    assert abs(ipv6_count / count - 0.2) < 0.02
+    assert abs(private_count / count - 0.1) < 0.02
+
+def test_ip_cidr_membership():
+    """Test that every address lies in its type's networks and avoids reserved space."""
+    private_networks = [
+        ipaddress.ip_network(cidr) for cidr, _ in IP_CIDR_TABLES["private_ip"]
+    ]
+    excluded_networks = [ipaddress.ip_network(cidr) for cidr in EXCLUDED_IPV4_CIDRS]
+    global_unicast = ipaddress.ip_network("2000::/3")
+    
+    for ip in map(ipaddress.ip_address, generate_source_ips(2000)):
+        if ip.version == 6:
+            assert ip in global_unicast
+        elif any(ip in network for network in private_networks):
+            assert 1 <= int(ip) & 0xFF <= 254
+        else:
+            assert not any(ip in network for network in excluded_networks)
+            assert 1 <= int(ip) & 0xFF <= 254
+
+def test_private_ip_ranges():
+    """Test that all three private ranges are used."""
+    ips = [
+        ip
+        for ip in generate_source_ips(3000)
+        if ip.startswith(("10.", "172.", "192.168."))
+    ]
+    private = [ip for ip in ips if ipaddress.ip_address(ip).is_private]
+    
+    assert any(ip.startswith("10.") for ip in private)
+    assert any(ip.startswith("172.") for ip in private)
+    assert any(ip.startswith("192.168.") for ip in private)
+
+def test_source_ips_compact():
+    """Test compact integer output for Postgres INET columns."""
+    values = generate_source_ips(500, compact=True)
+    
+    assert all(isinstance(value, int) for value in values)
+    for value in values:
+        ip = ipaddress.ip_address(value)
+        assert format_ip(value) == str(ip)
+
+def test_source_ips_custom_cidr_tables():
+    """Test overriding the CIDR weight tables."""
+    tables = {
+        "ipv4": [("198.51.100.0/24", 1)],
+        "ipv6": [("2001:db8::/32", 1)],
+        "private_ip": [("10.1.0.0/16", 3), ("192.168.7.1/32", 1)]
+    }
+    ips = generate_source_ips(500, cidr_tables=tables)
+    
+    for ip in ips:
+        assert (
+            ip.startswith(("198.51.100.", "2001:db8:", "10.1.")) or ip == "192.168.7.1"
+        )
+
+def test_compile_cidr_table():
+    """Test compiling a CIDR weight table."""
+    bases, host_bits, cum_weights = compile_cidr_table(
+        [("10.0.0.0/8", 2), ("192.168.0.0/16", 1)]
+    )
+    
+    assert bases == [0x0A000000, 0xC0A80000]
+    assert host_bits == [24, 16]
+    assert cum_weights == [2, 3]
+    
+    with pytest.raises(ValueError, match="empty"):
+        compile_cidr_table([])
+
+def test_format_ip():
+    """Test integer to dotted/colon IP formatting."""
+    assert format_ip(0x0A000001) == "10.0.0.1"
+    assert format_ip(int(ipaddress.ip_address("2001:db8::1"))) == "2001:db8::1"
+
 # User agent tests
 def test_generate_user_agent():
     """Test single user agent generation."""
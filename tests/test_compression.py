@@ -0,0 +1,101 @@
+"""
+Test parallel block compression.
+"""
+
+import pytest
+import bz2
+import gzip
+import io
+import lzma
+import zlib
+from exporters.compression import (
+    COMPRESSION_LEVELS,
+    infer_compression,
+    compress_block,
+    iter_compressed_blocks,
+    write_compressed,
+)
+
+DECOMPRESSORS = {"gzip": gzip.decompress, "bz2": bz2.decompress, "xz": lzma.decompress}
+
+# Lines of varying length so blocks split mid-line
+CHUNKS = [
+    b"".join(b"line %d %s\n" % (i, b"x" * (i % 50)) for i in range(start, start + 100))
+    for start in range(0, 2000, 100)
+]
+
+def count_gzip_members(data: bytes) -> int:
+    """Return the number of gzip members in a multi-member stream."""
+    members = 0
+    while data:
+        decompressor = zlib.decompressobj(wbits=31)
+        decompressor.decompress(data)
+        data = decompressor.unused_data
+        members += 1
+    return members
+
+def test_infer_compression():
+    """Test picking the compression format from a file suffix."""
+    assert infer_compression("logs.json.gz") == "gzip"
+    assert infer_compression("out/logs.csv.bz2") == "bz2"
+    assert infer_compression("logs.LOG.XZ") == "xz"
+    assert infer_compression("logs.json") is None
+
+@pytest.mark.parametrize("compression", list(COMPRESSION_LEVELS))
+def test_compress_block(compression):
+    """Test that one block is a complete archive of its format."""
+    decompress = DECOMPRESSORS[compression]
+
+    assert decompress(compress_block(b"hello\n", compression)) == b"hello\n"
+
+def test_compress_block_reproducible():
+    """Test that gzip blocks do not embed the current time."""
+    assert compress_block(b"hello\n", "gzip") == compress_block(b"hello\n", "gzip")
+
+def test_compress_block_invalid():
+    """Test that unsupported formats are rejected."""
+    with pytest.raises(ValueError, match="Unsupported compression"):
+        compress_block(b"", "zip")
+
+@pytest.mark.parametrize("compression", list(COMPRESSION_LEVELS))
+def test_iter_compressed_blocks_round_trip(compression):
+    """Test that the concatenated blocks decompress to the input, in order."""
+    blocks = list(
+        iter_compressed_blocks(iter(CHUNKS), compression, threads=4, block_size=4096)
+    )
+
+    assert len(blocks) > 4
+    assert DECOMPRESSORS[compression](b"".join(blocks)) == b"".join(CHUNKS)
+
+def test_iter_compressed_blocks_are_gzip_members():
+    """Test that every block of a gzip stream is its own member."""
+    data = b"".join(CHUNKS)
+    blocks = list(iter_compressed_blocks(CHUNKS, "gzip", threads=2, block_size=4096))
+
+    assert count_gzip_members(b"".join(blocks)) == len(blocks) == -(-len(data) // 4096)
+
+def test_iter_compressed_blocks_empty():
+    """Test that empty input still gives a valid, empty archive."""
+    blocks = list(iter_compressed_blocks([], "gzip"))
+
+    assert len(blocks) == 1
+    assert gzip.decompress(blocks[0]) == b""
+
+def test_iter_compressed_blocks_invalid():
+    """Test that invalid arguments are rejected."""
+    with pytest.raises(ValueError, match="Unsupported compression"):
+        next(iter_compressed_blocks([b"x"], "zip"))
+    with pytest.raises(ValueError, match="block_size"):
+        next(iter_compressed_blocks([b"x"], "gzip", block_size=0))
+    with pytest.raises(ValueError, match="threads"):
+        next(iter_compressed_blocks([b"x"], "gzip", threads=0))
+
+def test_write_compressed():
+    """Test writing a compressed stream and counting its bytes."""
+    stream = io.BytesIO()
+    written = write_compressed(
+        iter(CHUNKS), stream, "xz", level=1, threads=2, block_size=8192
+    )
+
+    assert written == len(stream.getvalue())
+    assert lzma.decompress(stream.getvalue()) == b"".join(CHUNKS)
@@ -6,10 +6,15 @@ import pytest
 import re
 from collections import Counter
 from datetime import datetime, timedelta, timezone
+from itertools import accumulate
 import uuid
 from generators.core_generators import (
+    # Cumulative weight tables
+    LOG_LEVEL_CUM_WEIGHTS, HTTP_METHOD_CUM_WEIGHTS, HTTP_PROTOCOL_CUM_WEIGHTS,
+    API_PATH_CUM_WEIGHTS, QUERY_PARAM_CUM_WEIGHTS, QUERY_PARAM_CHOICES,
     # Timestamp generators
     generate_timestamp, generate_timestamps, DEFAULT_START_DATE, DEFAULT_END_DATE,
+    iter_sorted_timestamps, iter_sorted_timestamp_micros, micros_to_timestamp, EPOCH,
     # Request ID generators
     generate_request_id, generate_request_ids,
     # Log level generators
@@ -24,6 +29,29 @@ from generators.core_generators import (
     generate_query_parameters, generate_query_parameters_list, QUERY_PARAM_TYPES, QUERY_PARAM_WEIGHTS
 )
 
+# Cumulative weight table tests
+def test_cum_weight_tables():
+    """Test that precomputed cumulative tables match their weight lists."""
+    assert LOG_LEVEL_CUM_WEIGHTS == list(accumulate(LOG_LEVEL_WEIGHTS))
+    assert HTTP_METHOD_CUM_WEIGHTS == list(accumulate(HTTP_METHOD_WEIGHTS))
+    assert HTTP_PROTOCOL_CUM_WEIGHTS == list(accumulate(HTTP_PROTOCOL_WEIGHTS))
+    assert API_PATH_CUM_WEIGHTS == list(accumulate(API_PATH_WEIGHTS))
+    assert QUERY_PARAM_CUM_WEIGHTS == list(accumulate(QUERY_PARAM_WEIGHTS))
+
+def test_query_param_choices_cover_types():
+    """Test that every query parameter type has prebuilt query strings."""
+    assert set(QUERY_PARAM_CHOICES) == set(QUERY_PARAM_TYPES)
+    assert QUERY_PARAM_CHOICES["none"] == [""]
+
+def test_batched_distribution_large():
+    """Test that batched draws keep their distribution at larger counts."""
+    count = 100000
+    counter = Counter(generate_methods(count))
+    
+    for method, weight in zip(HTTP_METHODS, HTTP_METHOD_WEIGHTS):
+        expected = weight / sum(HTTP_METHOD_WEIGHTS)
+        assert abs(counter[method] / count - expected) < 0.01
+
 # Timestamp tests
 def test_generate_timestamp():
     """Test single timestamp generation."""
@@ -110,6 +138,52 @@ def test_invalid_date_range():
     with pytest.raises(ValueError, match="end_date.*cannot be before start_date"):
         generate_timestamps(5, start_date, end_date)
 
+def test_iter_sorted_timestamps_is_lazy():
+    """Test that sorted timestamps are streamed by a generator."""
+    timestamps = iter_sorted_timestamps(5)
+    assert not isinstance(timestamps, list)
+    assert len(list(timestamps)) == 5
+
+def test_iter_sorted_timestamp_micros():
+    """Test that micro batches are bounded int64 arrays, ascending across batches."""
+    start_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end_date = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    batches = list(
+        iter_sorted_timestamp_micros(2500, start_date, end_date, batch_size=1000)
+    )
+    
+    assert [len(batch) for batch in batches] == [1000, 1000, 500]
+    assert all(batch.typecode == "q" for batch in batches)
+    
+    micros = [value for batch in batches for value in batch]
+    assert micros == sorted(micros)
+    assert micros_to_timestamp(micros[0]) >= start_date
+    assert micros_to_timestamp(micros[-1]) <= end_date
+
+def test_sorted_timestamps_uniform():
+    """Test that sorted timestamps are spread uniformly over the range."""
+    count = 20000
+    start_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end_date = datetime(2024, 1, 11, tzinfo=timezone.utc)
+    timestamps = generate_timestamps(count, start_date, end_date)
+    
+    # Each of the ten days should get about a tenth of the timestamps
+    counter = Counter((ts - start_date).days for ts in timestamps)
+    for day in range(10):
+        assert 0.08 < counter[day] / count < 0.12
+
+def test_micros_to_timestamp():
+    """Test converting epoch microseconds to UTC datetimes."""
+    assert micros_to_timestamp(0) == EPOCH
+    assert micros_to_timestamp(1_500_000) == datetime(
+        1970, 1, 1, 0, 0, 1, 500000, tzinfo=timezone.utc
+    )
+
+def test_iter_sorted_timestamp_micros_invalid_batch_size():
+    """Test that a non-positive batch size is rejected."""
+    with pytest.raises(ValueError, match="batch_size"):
+        next(iter_sorted_timestamp_micros(5, batch_size=0))
+
 # Request ID tests
 def test_generate_request_id():
     """Test single request ID generation."""
@@ -3,11 +3,19 @@ Test CSV exporter.
 """
 
 import pytest
+import io
 import tempfile
 import os
 from datetime import datetime, timezone
 import uuid
-from exporters.csv_exporter import convert_to_csv_value, export_to_csv
+from exporters.csv_exporter import (
+    convert_to_csv_value,
+    export_to_csv,
+    format_csv_rows,
+    format_csv_batch,
+)
+from generators.log_batch import generate_log_batch, iter_log_batch_rows
+from generators.log_entry_factory import LOG_ENTRY_FIELDS, generate_log_entries
 
 def test_convert_to_csv_value_datetime():
     """Test datetime conversion to CSV string."""
@@ -109,4 +117,73 @@ def test_export_to_csv_custom_fieldnames():
             assert "2" not in content  # 'b' should not be in output
             assert "5" not in content
     finally:
-        os.unlink(filename) 
\ No newline at end of file
+        os.unlink(filename) 
+
+def test_export_to_csv_text_stream():
+    """Test CSV export to a text stream."""
+    stream = io.StringIO(newline='')
+    written = export_to_csv([{"a": 1, "b": "x"}, {"a": 2, "b": "y"}], stream)
+    
+    assert written == 2
+    assert stream.getvalue() == "a,b\r\n1,x\r\n2,y\r\n"
+
+def test_export_to_csv_binary_stream():
+    """Test CSV export to a binary stream such as sys.stdout.buffer."""
+    stream = io.BytesIO()
+    written = export_to_csv([{"a": "é", "b": None}], stream)
+    
+    assert written == 1
+    assert stream.getvalue() == "a,b\r\né,\r\n".encode("utf-8")
+
+def test_export_to_csv_chunked_iterable():
+    """Test that an iterable is written lazily in chunks with a single header."""
+    class CountingStream(io.StringIO):
+        def __init__(self):
+            super().__init__(newline='')
+            self.writes = 0
+        
+        def write(self, text):
+            self.writes += 1
+            return super().write(text)
+    
+    rows = ({"n": n} for n in range(25))
+    stream = CountingStream()
+    written = export_to_csv(rows, stream, chunk_size=10)
+    
+    lines = stream.getvalue().splitlines()
+    assert written == 25
+    assert stream.writes == 3
+    assert lines[0] == "n"
+    assert lines[1:] == [str(n) for n in range(25)]
+
+def test_export_to_csv_empty_stream():
+    """Test that empty data writes nothing to a stream."""
+    stream = io.StringIO()
+    assert export_to_csv(iter([]), stream) == 0
+    assert stream.getvalue() == ""
+
+def test_export_to_csv_invalid_chunk_size():
+    """Test that a non-positive chunk size is rejected."""
+    with pytest.raises(ValueError, match="chunk_size"):
+        export_to_csv([{"a": 1}], io.StringIO(), chunk_size=0)
+
+def test_export_to_csv_records():
+    """Test that LogEntry records export exactly like dicts."""
+    records = generate_log_entries(10, as_record=True)
+    from_records = io.StringIO()
+    from_dicts = io.StringIO()
+    
+    assert export_to_csv(records, from_records) == 10
+    export_to_csv([record.to_dict() for record in records], from_dicts)
+    assert from_records.getvalue() == from_dicts.getvalue()
+
+def test_format_csv_batch():
+    """Test that a columnar batch formats like its rows."""
+    batch = generate_log_batch(50)
+    rows = list(iter_log_batch_rows(batch))
+    
+    assert format_csv_batch(batch, header=True) == format_csv_rows(
+        rows, LOG_ENTRY_FIELDS, header=True
+    )
+    fields = ["status_code", "missing", "timestamp"]
+    assert format_csv_batch(batch, fields) == format_csv_rows(rows, fields)
@@ -0,0 +1,201 @@
+"""
+Test the on-disk dataset cache.
+"""
+
+import gzip
+import io
+import os
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from exporters import dataset_cache
+from exporters.dataset_cache import (
+    cached_log_entries,
+    cached_log_file,
+    dataset_key,
+    evict_dataset_cache,
+    fetch_dataset,
+    open_cached_dataset,
+)
+from generators.random_access import iter_range
+from generators.sharding import csv_header, format_entries, iter_shards
+from generators.value_pool import configure_value_pools, disable_value_pools
+
+START_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END_DATE = datetime(2024, 12, 31, tzinfo=timezone.utc)
+DATES = {"start_date": START_DATE, "end_date": END_DATE}
+
+def writer(data, calls=None):
+    """Return a write() callback writing data and counting its calls."""
+    def write(stream):
+        if calls is not None:
+            calls.append(1)
+        stream.write(data)
+    return write
+
+def test_dataset_key(monkeypatch):
+    """Test that keys depend on every parameter and the generator version, not order."""
+    key = dataset_key({"count": 10, "seed": 7, "start_date": START_DATE})
+
+    assert key == dataset_key({"start_date": START_DATE, "seed": 7, "count": 10})
+    assert key != dataset_key({"count": 10, "seed": 8, "start_date": START_DATE})
+    monkeypatch.setattr(dataset_cache, "generator_version", lambda: "edited")
+    assert key != dataset_key({"count": 10, "seed": 7, "start_date": START_DATE})
+
+def test_miss_then_hit(tmp_path):
+    """Test that a dataset is generated once, then copied or hardlinked read-only."""
+    calls = []
+    cache, write = tmp_path / "cache", writer(b"data\n", calls)
+    first = tmp_path / "first.log"
+    second = tmp_path / "out" / "second.log"
+    third = tmp_path / "third.log"
+
+    assert not fetch_dataset(cache, {"n": 1}, write, first)
+    assert fetch_dataset(cache, {"n": 1}, write, second, link=True)
+    assert fetch_dataset(cache, {"n": 1}, write, third, link=True)
+
+    assert len(calls) == 1
+    assert first.read_bytes() == second.read_bytes() == b"data\n"
+    assert first.stat().st_ino != second.stat().st_ino and first.stat().st_mode & 0o200
+    assert second.stat().st_ino == third.stat().st_ino
+    assert not second.stat().st_mode & 0o222
+
+def test_damaged_entry_regenerated(tmp_path):
+    """Test that in-place writes to a hardlinked destination do not reach later hits."""
+    calls = []
+    cache, write = tmp_path / "cache", writer(b"line\n" * 100, calls)
+    fetch_dataset(cache, {"n": 5}, write, tmp_path / "logs.json", link=True)
+    os.chmod(tmp_path / "logs.json", 0o644)
+    # Truncates the shared inode, as a later plain run would
+    with open(tmp_path / "logs.json", "wb") as f:
+        f.write(b"other\n")
+
+    output = io.BytesIO()
+    assert not fetch_dataset(cache, {"n": 5}, write, output)
+    assert output.getvalue() == b"line\n" * 100 and len(calls) == 2
+    assert (tmp_path / "logs.json").read_bytes() == b"other\n"
+    assert fetch_dataset(cache, {"n": 5}, write, io.BytesIO())
+
+def test_copies(tmp_path):
+    """Test copying to a path, a memory stream and a file stream, and over a link."""
+    cache, params, write = tmp_path / "cache", {"n": 2}, writer(b"x" * 100000)
+    fetch_dataset(cache, params, write, tmp_path / "linked.log", link=True)
+    fetch_dataset(cache, params, write, tmp_path / "linked.log", link=True)
+    fetch_dataset(cache, params, write, tmp_path / "copy.log")
+    buffer = io.BytesIO()
+    fetch_dataset(cache, params, write, buffer)
+    with open(tmp_path / "stream.log", "wb") as f:
+        f.write(b"head\n")
+        fetch_dataset(cache, params, write, f)
+
+    copied, linked = tmp_path / "copy.log", tmp_path / "linked.log"
+    names = sorted(path.name for path in tmp_path.iterdir())
+
+    assert copied.stat().st_ino != linked.stat().st_ino
+    assert buffer.getvalue() == copied.read_bytes() == b"x" * 100000
+    assert (tmp_path / "stream.log").read_bytes() == b"head\n" + b"x" * 100000
+    assert names == ["cache", "copy.log", "linked.log", "stream.log"]
+
+def test_failed_fill(tmp_path):
+    """Test that a failing write leaves the cache empty and the next call fills it."""
+    def fail(stream):
+        stream.write(b"half")
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        fetch_dataset(tmp_path, {"n": 3}, fail, io.BytesIO())
+    assert not list(tmp_path.glob("*.data")) and not list(tmp_path.glob("*.partial"))
+    assert not fetch_dataset(tmp_path, {"n": 3}, writer(b"whole"), io.BytesIO())
+
+def test_concurrent_misses(tmp_path):
+    """Test that parallel misses for one dataset generate it once."""
+    calls = []
+    def slow(stream):
+        calls.append(1)
+        time.sleep(0.2)
+        stream.write(b"data")
+
+    def fetch(_):
+        return fetch_dataset(tmp_path, {"n": 4}, slow, io.BytesIO())
+
+    with ThreadPoolExecutor(4) as executor:
+        hits = list(executor.map(fetch, range(4)))
+
+    assert len(calls) == 1 and sorted(hits) == [False, True, True, True]
+
+def test_lru_eviction(tmp_path):
+    """Test that the least recently used entries go first and held entries are kept."""
+    write = writer(b"x" * 100)
+
+    def fetch(n):
+        return fetch_dataset(tmp_path, {"n": n}, write, io.BytesIO(), max_size=None)
+
+    for n in range(4):
+        with open_cached_dataset(tmp_path, {"n": n}, write, max_size=None) as cached:
+            os.utime(tmp_path / f"{cached.key}.lock", (1000 + n, 1000 + n))
+    # Entry 0 is used again
+    fetch(0)
+
+    assert evict_dataset_cache(tmp_path, 250) == 200
+    assert [fetch(n) for n in (0, 3)] == [True, True]
+
+    with open_cached_dataset(tmp_path, {"n": 0}, writer(b""), max_size=None):
+        assert evict_dataset_cache(tmp_path, 0) == 100
+    assert len(list(tmp_path.glob("*.data"))) == 1
+
+def test_eviction_after_fill(tmp_path):
+    """Test that fills evict beyond max_size and remove interrupted fills."""
+    write = writer(b"x" * 100)
+    (tmp_path / f"{'0' * 64}.partial").write_bytes(b"leftover")
+    for n in range(3):
+        fetch_dataset(tmp_path, {"n": n}, write, io.BytesIO(), max_size=150)
+
+    assert len(list(tmp_path.glob("*.data"))) == len(list(tmp_path.glob("*.meta"))) == 1
+    assert not list(tmp_path.glob("*.partial"))
+
+def test_cached_log_file(tmp_path):
+    """Test that cached seeded output matches sharded and counter-based generation."""
+    cache, path = tmp_path / "cache", tmp_path / "logs.csv"
+    shards = iter_shards(250, "csv", seed=7, shard_size=100, **DATES)
+    expected = csv_header() + b"".join(shards)
+    for _ in range(2):
+        cached_log_file(cache, path, 250, 7, format_type="csv", shard_size=100, **DATES)
+        assert path.read_bytes() == expected
+
+    output = io.BytesIO()
+    cached_log_file(cache, output, 50, 7, offset=1000, compression="gzip", **DATES)
+    entries = list(iter_range(1000, 1050, 7, START_DATE, END_DATE))
+    assert gzip.decompress(output.getvalue()) == format_entries(entries)
+    assert len(list(cache.glob("*.data"))) == 2
+
+def test_cached_log_entries(tmp_path, monkeypatch):
+    """Test that cached entries match the seeded run and are read back as they are."""
+    entries = cached_log_entries(tmp_path, 150, 7, START_DATE, END_DATE, shard_size=100)
+    expected = b"".join(iter_shards(150, "json", seed=7, shard_size=100, **DATES))
+    assert format_entries(entries, "json") == expected
+
+    monkeypatch.setattr(dataset_cache, "generate_shard_batch", None)
+    cached = cached_log_entries(tmp_path, 150, 7, START_DATE, END_DATE, shard_size=100)
+    assert cached == entries
+    with pytest.raises(ValueError, match="end_date"):
+        cached_log_entries(tmp_path, 150, 7, END_DATE, START_DATE)
+
+def test_value_pools_in_key(tmp_path):
+    """Test that pooled runs are cached apart from each other and from unpooled runs."""
+    def fetch():
+        output = io.BytesIO()
+        hit = cached_log_file(tmp_path, output, 20, 7, START_DATE, END_DATE)
+        return hit, output.getvalue()
+
+    try:
+        configure_value_pools(size=5)
+        assert not fetch()[0]
+        assert fetch()[0]
+        configure_value_pools(size=5, skew=0.0)
+        assert not fetch()[0]
+    finally:
+        disable_value_pools()
+
+    hit, data = fetch()
+    assert not hit and data == b"".join(iter_shards(20, "json", seed=7, **DATES))
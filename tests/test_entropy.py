@@ -0,0 +1,126 @@
+"""
+Test the process-local entropy pool.
+"""
+
+import pytest
+import os
+import re
+import uuid
+from generators import entropy
+from generators.entropy import (
+    DEFAULT_BLOCK_SIZE,
+    seed_entropy,
+    random_bytes,
+    random_uuid4,
+    random_uuid4s,
+    random_uuid4_bytes,
+    random_hex,
+)
+
+UUID_PATTERN = r'^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$'
+
+@pytest.fixture(autouse=True)
+def urandom_backend():
+    """Run every test against the os.urandom backend unless it seeds its own."""
+    seed_entropy(None)
+    yield
+    seed_entropy(None)
+
+def test_random_bytes():
+    """Test that random bytes come back as memoryview slices of the right size."""
+    view = random_bytes(16)
+
+    assert isinstance(view, memoryview)
+    assert len(view) == 16
+    assert bytes(random_bytes(16)) != bytes(view)
+
+def test_random_bytes_larger_than_block():
+    """Test requests larger than one refill block."""
+    assert len(random_bytes(DEFAULT_BLOCK_SIZE + 1)) == DEFAULT_BLOCK_SIZE + 1
+
+def test_random_bytes_few_syscalls(monkeypatch):
+    """Test that many small requests share one os.urandom call per block."""
+    calls = []
+    real_urandom = os.urandom
+
+    def counting_urandom(size):
+        calls.append(size)
+        return real_urandom(size)
+
+    monkeypatch.setattr(entropy.os, "urandom", counting_urandom)
+    seed_entropy(None)
+    for _ in range(1000):
+        random_bytes(16)
+
+    assert len(calls) == 1
+
+def test_random_uuid4():
+    """Test that pooled UUIDs are valid version 4 UUIDs."""
+    value = random_uuid4()
+
+    assert isinstance(value, uuid.UUID)
+    assert value.version == 4
+    assert re.match(UUID_PATTERN, str(value))
+
+def test_random_uuid4s():
+    """Test bulk UUID generation."""
+    values = random_uuid4s(1000)
+
+    assert len(values) == 1000
+    assert len(set(values)) == 1000
+    for value in values:
+        assert re.match(UUID_PATTERN, str(value))
+
+def test_random_uuid4s_empty():
+    """Test generating zero UUIDs."""
+    assert random_uuid4s(0) == []
+
+def test_random_uuid4_bytes():
+    """Test packed UUIDs match the UUID objects drawn from the same bytes."""
+    seed_entropy(5)
+    packed = random_uuid4_bytes(50)
+    seed_entropy(5)
+    values = random_uuid4s(50)
+
+    assert packed == b"".join(value.bytes for value in values)
+    assert all(
+        uuid.UUID(bytes=packed[i : i + 16]).version == 4
+        for i in range(0, len(packed), 16)
+    )
+
+def test_random_hex():
+    """Test hex ID generation."""
+    value = random_hex(3)
+    assert re.match(r'^[0-9a-f]{6}$', value)
+
+def test_seeded_backend_reproducible():
+    """Test that the seeded backend replays the same IDs."""
+    seed_entropy(42)
+    first = [random_uuid4(), random_hex(3), random_uuid4s(3)]
+    seed_entropy(42)
+    second = [random_uuid4(), random_hex(3), random_uuid4s(3)]
+    seed_entropy(43)
+    other = [random_uuid4(), random_hex(3), random_uuid4s(3)]
+
+    assert first == second
+    assert first != other
+
+def test_fork_resets_pool():
+    """Test that a forked child does not replay bytes buffered by its parent."""
+    if not hasattr(os, "fork"):
+        pytest.skip("os.fork is not available")
+
+    random_bytes(16)  # Fill the pool in the parent
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        os.write(write_fd, bytes(random_bytes(16)))
+        os._exit(0)
+
+    os.close(write_fd)
+    child_bytes = os.read(read_fd, 16)
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+
+    assert child_bytes != bytes(random_bytes(16))
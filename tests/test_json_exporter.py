@@ -0,0 +1,156 @@
+"""
+Test JSON-lines exporter.
+"""
+
+import pytest
+import io
+import json
+from datetime import datetime, timedelta, timezone
+import uuid
+from exporters import json_exporter
+from exporters.json_exporter import (
+    encode_json_line,
+    encode_json_lines,
+    write_json_lines,
+)
+from generators.log_entry_factory import (
+    generate_log_entries,
+    generate_log_entry,
+    format_log_entry_as_string,
+)
+
+# Entries orjson would render differently, which must still match json.dumps()
+TRICKY_ENTRIES = [
+    {
+        "timestamp": datetime(2024, 1, 15, 10, 30, 45, tzinfo=timezone.utc),
+        "request_id": uuid.UUID(int=7),
+        "path": "/café",
+    },
+    {
+        "timestamp": datetime(2024, 1, 15),
+        "request_id": uuid.UUID(int=7),
+        "user_agent": 'quote " and \\ backslash',
+    },
+    {
+        "timestamp": datetime(2024, 1, 15, tzinfo=timezone(timedelta(seconds=30))),
+        "request_id": "not-a-uuid",
+    },
+    {
+        "timestamp": datetime(2024, 1, 15, tzinfo=timezone(timedelta(hours=-8))),
+        "request_id": uuid.UUID(int=7),
+        "x": "\x7f\x1f\n\t",
+    },
+    {
+        "timestamp": datetime(2024, 1, 15, tzinfo=timezone.utc),
+        "request_id": uuid.UUID(int=7),
+        "request_headers": {"Accept": "*/*"},
+    },
+    {
+        "timestamp": datetime(2024, 1, 15, tzinfo=timezone.utc),
+        "request_id": uuid.UUID(int=7),
+        "big": 2**70,
+        "ratio": 0.5,
+        "ok": True,
+        "none": None,
+    },
+    {
+        "timestamp": datetime(2024, 1, 15, tzinfo=timezone.utc),
+        "request_id": uuid.UUID(int=7),
+        "items": [1, "a", {}],
+        "emoji": "\U0001f600",
+    },
+]
+
+def json_line(entry):
+    """Return the entry formatted by format_log_entry_as_string() as bytes."""
+    return format_log_entry_as_string(entry, "json").encode("ascii")
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    """Run a test with the orjson backend (when installed) and the stdlib fallback."""
+    if request.param == "orjson":
+        if json_exporter.orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(json_exporter, "orjson", None)
+    return request.param
+
+def test_encode_json_line_matches_format_log_entry(backend):
+    """Test that generated entries encode to exactly the json.dumps() bytes."""
+    for entry in generate_log_entries(200):
+        assert encode_json_line(entry) == json_line(entry)
+
+def test_orjson_fast_path_used(backend):
+    """Test that generated entries take the orjson path and tricky ones fall back."""
+    if backend != "orjson":
+        pytest.skip("fast path needs orjson")
+    assert json_exporter._encode_orjson(generate_log_entry()) is not None
+    assert all(
+        json_exporter._encode_orjson(entry) is None for entry in TRICKY_ENTRIES[:6]
+    )
+
+def test_encode_json_line_tricky_values(backend):
+    """Test escapes, non-ASCII, odd UTC offsets and nested values against json.dumps."""
+    for entry in TRICKY_ENTRIES:
+        assert encode_json_line(entry) == json_line(entry)
+
+def test_encode_json_line_every_ascii_character(backend):
+    """Test that every ASCII character is escaped exactly like json.dumps() does."""
+    entry = generate_log_entry()
+    entry["path"] = "".join(chr(c) for c in range(128))
+    assert encode_json_line(entry) == json_line(entry)
+
+def test_encode_json_line_key_order(backend):
+    """Test that keys keep the entry's order."""
+    entry = generate_log_entry()
+    reordered = dict(reversed(list(entry.items())))
+    assert list(json.loads(encode_json_line(reordered))) == list(reordered)
+
+def test_encode_json_line_record(backend):
+    """Test that LogEntry records encode like the equivalent dict."""
+    record = generate_log_entry(as_record=True)
+    assert encode_json_line(record) == encode_json_line(record.to_dict())
+
+def test_encode_json_line_empty(backend):
+    """Test that an empty entry encodes as an empty object."""
+    assert encode_json_line({}) == b"{}"
+
+def test_encode_json_lines_reuses_buffer():
+    """Test that a passed buffer is cleared and refilled."""
+    entries = generate_log_entries(3)
+    buffer = bytearray(b"stale")
+    result = encode_json_lines(entries, buffer)
+
+    assert result is buffer
+    assert buffer.count(b"\n") == 3
+    assert buffer.endswith(b"\n")
+    assert [json.loads(line)["request_id"] for line in buffer.splitlines()] == [
+        str(e["request_id"]) for e in entries
+    ]
+
+def test_write_json_lines():
+    """Test streaming JSON lines to a binary stream in chunks."""
+    class CountingStream(io.BytesIO):
+        def __init__(self):
+            super().__init__()
+            self.writes = 0
+
+        def write(self, data):
+            self.writes += 1
+            return super().write(data)
+
+    entries = generate_log_entries(25)
+    stream = CountingStream()
+    written = write_json_lines(iter(entries), stream, chunk_size=10)
+
+    assert written == 25
+    assert stream.writes == 3
+    expected = "".join(
+        format_log_entry_as_string(entry, "json") + "\n" for entry in entries
+    )
+    assert stream.getvalue() == expected.encode("ascii")
+
+def test_write_json_lines_invalid_chunk_size():
+    """Test that a non-positive chunk size is rejected."""
+    with pytest.raises(ValueError, match="chunk_size"):
+        write_json_lines([], io.BytesIO(), chunk_size=0)
@@ -0,0 +1,89 @@
+"""
+Test rate-controlled live generation.
+"""
+
+import pytest
+from generators import live
+from generators.live import iter_live_batches
+from generators.log_batch import log_batch_size
+
+START_MICROS = 1700000000 * 1000000
+
+class FakeTime:
+    """Stand-in for the time module whose clock only moves when slept or advanced."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = 0
+
+    def monotonic(self):
+        return self.now
+
+    def time_ns(self):
+        return START_MICROS * 1000 + int(self.now * 1e9)
+
+    def sleep(self, seconds):
+        self.sleeps += 1
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Run a test against a fake clock."""
+    fake = FakeTime()
+    monkeypatch.setattr(live, "time", fake)
+    return fake
+
+def test_iter_live_batches_rate(clock):
+    """Test that a run emits rate * duration events at their scheduled times."""
+    batches = list(iter_live_batches(100, duration=2))
+    timestamps = [ts for batch in batches for ts in batch.timestamps]
+
+    assert len(timestamps) == 200
+    assert timestamps[0] == START_MICROS
+    assert all(
+        later - earlier == 10000 for earlier, later in zip(timestamps, timestamps[1:])
+    )
+
+def test_iter_live_batches_sleeps_per_batch(clock):
+    """Test that pacing sleeps once per batch, not once per event."""
+    batches = list(iter_live_batches(2000, duration=1))
+
+    assert sum(log_batch_size(batch) for batch in batches) == 2000
+    assert all(log_batch_size(batch) >= 20 for batch in batches)
+    assert clock.sleeps <= len(batches) + 1
+
+def test_iter_live_batches_backpressure(clock):
+    """Test that a stalled consumer causes skipped events, not a catch-up flood."""
+    emitted = []
+    for batch in iter_live_batches(200, duration=10):
+        emitted.append(batch)
+        if len(emitted) == 1:
+            clock.now += 5  # Consumer blocks for 5 seconds
+
+    sizes = [log_batch_size(batch) for batch in emitted]
+    timestamps = [ts for batch in emitted for ts in batch.timestamps]
+    assert sum(sizes) < 2000
+    assert max(sizes) <= 200 * live.LIVE_MAX_BATCH
+    assert timestamps == sorted(timestamps)
+    # After the stall, only the last burst of overdue events is emitted
+    resumed = START_MICROS + int((5 - live.LIVE_MAX_BURST) * 1e6)
+    assert emitted[1].timestamps[0] >= resumed
+
+def test_iter_live_batches_count(clock):
+    """Test stopping after a count, even one smaller than a batch."""
+    assert sum(log_batch_size(batch) for batch in iter_live_batches(1000, count=7)) == 7
+    batches = iter_live_batches(1000, duration=5, count=250)
+    assert sum(log_batch_size(batch) for batch in batches) == 250
+
+def test_iter_live_batches_zero_duration(clock):
+    """Test that a zero duration emits nothing."""
+    assert list(iter_live_batches(1000, duration=0)) == []
+
+def test_iter_live_batches_invalid():
+    """Test that invalid arguments are rejected."""
+    with pytest.raises(ValueError, match="rate"):
+        next(iter_live_batches(0))
+    with pytest.raises(ValueError, match="duration"):
+        next(iter_live_batches(10, duration=-1))
+    with pytest.raises(ValueError, match="tick"):
+        next(iter_live_batches(10, tick=0))
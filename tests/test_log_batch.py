@@ -0,0 +1,152 @@
+"""
+Test columnar log batches.
+"""
+
+import pytest
+from array import array
+from datetime import datetime, timezone
+from itertools import islice
+import uuid
+from generators.core_generators import LOG_LEVELS, HTTP_METHODS, HTTP_PROTOCOLS
+from generators.log_entry_factory import (
+    LOG_ENTRY_FIELDS,
+    generate_log_entry,
+    format_log_entry_as_string,
+)
+from generators.log_batch import (
+    LINE_LAYOUTS,
+    generate_log_batch,
+    iter_log_batches,
+    log_batch_size,
+    log_batch_column,
+    iter_log_batch_rows,
+    format_request_ids,
+    format_log_batch,
+)
+
+START_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END_DATE = datetime(2024, 1, 31, tzinfo=timezone.utc)
+
+def test_generate_log_batch():
+    """Test that a batch has one column per field, all of the batch's length."""
+    batch = generate_log_batch(50, START_DATE, END_DATE)
+
+    assert log_batch_size(batch) == 50
+    assert isinstance(batch.timestamps, array)
+    assert batch.timestamps.typecode == "q"
+    assert len(batch.request_ids) == 50 * 16
+    fields = set(batch.columns) | set(batch.constants) | {"timestamp", "request_id"}
+    assert fields == set(LOG_ENTRY_FIELDS)
+    for values in batch.columns.values():
+        assert len(values) == 50
+
+def test_generate_log_batch_values():
+    """Test that batch columns hold the same kinds of values as per-entry generators."""
+    batch = generate_log_batch(200, START_DATE, END_DATE)
+
+    assert all(
+        START_DATE <= ts <= END_DATE for ts in log_batch_column(batch, "timestamp")
+    )
+    assert all(
+        request_id.version == 4 for request_id in log_batch_column(batch, "request_id")
+    )
+    assert set(batch.columns["log_level"]) <= set(LOG_LEVELS)
+    assert set(batch.columns["method"]) <= set(HTTP_METHODS)
+    assert set(batch.columns["protocol"]) <= set(HTTP_PROTOCOLS)
+    assert all(path.startswith("/api/v1/") for path in batch.columns["path"])
+    assert log_batch_column(batch, "status_code") == [200] * 200
+
+def test_generate_log_batch_empty():
+    """Test generating an empty batch."""
+    batch = generate_log_batch(0)
+
+    assert log_batch_size(batch) == 0
+    assert list(iter_log_batch_rows(batch)) == []
+    assert format_log_batch(batch) == []
+
+def test_generate_log_batch_sorted():
+    """Test that a sorted batch has ascending timestamps."""
+    batch = generate_log_batch(500, START_DATE, END_DATE, sort=True)
+    assert list(batch.timestamps) == sorted(batch.timestamps)
+
+def test_generate_log_batch_invalid():
+    """Test that invalid arguments are rejected."""
+    with pytest.raises(ValueError, match="end_date.*cannot be before start_date"):
+        generate_log_batch(5, END_DATE, START_DATE)
+    with pytest.raises(ValueError, match="3 timestamps for 5 entries"):
+        generate_log_batch(5, timestamps=array("q", [0, 1, 2]))
+
+def test_log_batch_column_unknown():
+    """Test that unknown fields are rejected."""
+    with pytest.raises(ValueError, match="Unknown log entry field"):
+        log_batch_column(generate_log_batch(1), "bogus")
+
+def test_iter_log_batch_rows():
+    """Test that rows look exactly like generate_log_entry() output."""
+    batch = generate_log_batch(20, START_DATE, END_DATE)
+    rows = list(iter_log_batch_rows(batch))
+    reference = generate_log_entry(START_DATE, END_DATE)
+
+    assert len(rows) == 20
+    for row in rows:
+        assert list(row) == list(reference)
+        assert [type(value) for value in row.values()] == [
+            type(value) for value in reference.values()
+        ]
+    assert rows[0]["request_headers"] is not rows[1]["request_headers"]
+
+def test_format_request_ids():
+    """Test formatting packed UUIDs as canonical strings."""
+    ids = [uuid.uuid4() for _ in range(3)]
+    assert format_request_ids(b"".join(u.bytes for u in ids)) == [str(u) for u in ids]
+
+@pytest.mark.parametrize("format_type", ["json", "csv", "log"])
+def test_format_log_batch_matches_rows(format_type):
+    """Test that batch formatting gives the same lines as formatting each row."""
+    batch = generate_log_batch(100, START_DATE, END_DATE)
+    expected = [
+        format_log_entry_as_string(row, format_type)
+        for row in iter_log_batch_rows(batch)
+    ]
+    assert format_log_batch(batch, format_type) == expected
+
+def test_format_log_batch_escapes_constants():
+    """Test that constants containing % or quotes are formatted literally."""
+    batch = generate_log_batch(3)
+    batch.constants["service_name"] = 'api "100%" service'
+    expected = [
+        format_log_entry_as_string(row, "json") for row in iter_log_batch_rows(batch)
+    ]
+    assert format_log_batch(batch, "json") == expected
+
+def test_format_log_batch_invalid_format():
+    """Test that unsupported formats are rejected."""
+    with pytest.raises(ValueError, match="Unsupported format type"):
+        format_log_batch(generate_log_batch(1), "xml")
+    assert set(LINE_LAYOUTS) == {"json", "csv", "log"}
+
+def test_iter_log_batches():
+    """Test splitting a count into batches."""
+    batches = list(iter_log_batches(25, batch_size=10))
+    assert [log_batch_size(batch) for batch in batches] == [10, 10, 5]
+
+def test_iter_log_batches_sorted():
+    """Test that sorted batches are in chronological order across batch boundaries."""
+    timestamps = []
+    for batch in iter_log_batches(250, 100, START_DATE, END_DATE, sort=True):
+        timestamps.extend(batch.timestamps)
+
+    assert len(timestamps) == 250
+    assert timestamps == sorted(timestamps)
+
+def test_iter_log_batches_unbounded():
+    """Test that omitting the count gives an endless batch stream."""
+    batches = list(islice(iter_log_batches(batch_size=5), 3))
+    assert [log_batch_size(batch) for batch in batches] == [5, 5, 5]
+
+def test_iter_log_batches_invalid():
+    """Test that invalid arguments are rejected."""
+    with pytest.raises(ValueError, match="batch_size"):
+        next(iter_log_batches(10, batch_size=0))
+    with pytest.raises(ValueError, match="sort=True requires a count"):
+        next(iter_log_batches(sort=True))
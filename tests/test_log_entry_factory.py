@@ -4,11 +4,14 @@ Test log entry factory.
 
 import pytest
 import json
-from datetime import datetime
+import types
+from datetime import datetime, timezone
+from itertools import islice
 import uuid
 from generators.log_entry_factory import (
-    generate_log_entry, generate_log_entries, 
-    format_log_entry_as_string, generate_log_lines
+    LOG_ENTRY_FIELDS, LogEntry, generate_log_entry, generate_log_entries, 
+    format_log_entry_as_string, generate_log_lines,
+    iter_log_entries, iter_log_lines, iter_log_chunks
 )
 
 def test_generate_log_entry():
@@ -60,6 +63,119 @@ def test_empty_log_entries():
     log_entries = generate_log_entries(0)
     assert log_entries == []
 
+def test_generate_log_entry_custom_range():
+    """Test single log entry generation with a custom date range."""
+    start_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end_date = datetime(2024, 1, 31, tzinfo=timezone.utc)
+    
+    log_entry = generate_log_entry(start_date, end_date)
+    assert start_date <= log_entry["timestamp"] <= end_date
+
+def test_iter_log_entries_is_lazy():
+    """Test that iter_log_entries returns a generator, not a list."""
+    entries = iter_log_entries(5)
+    assert isinstance(entries, types.GeneratorType)
+    assert len(list(entries)) == 5
+
+def test_iter_log_entries_unbounded():
+    """Test that iter_log_entries without a count never runs out."""
+    entries = list(islice(iter_log_entries(), 25))
+    assert len(entries) == 25
+    for entry in entries:
+        assert "request_id" in entry
+
+def test_iter_log_entries_invalid_date_range():
+    """Test that an invalid date range is rejected up front."""
+    start_date = datetime(2024, 1, 31, tzinfo=timezone.utc)
+    end_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    
+    with pytest.raises(ValueError, match="end_date.*cannot be before start_date"):
+        next(iter_log_entries(5, start_date, end_date))
+
+def test_iter_log_entries_sorted():
+    """Test that sorted entries come out in chronological order."""
+    timestamps = [entry["timestamp"] for entry in iter_log_entries(50, sort=True)]
+    
+    assert len(timestamps) == 50
+    assert timestamps == sorted(timestamps)
+
+def test_iter_log_entries_sorted_requires_count():
+    """Test that sorting an unbounded stream is rejected."""
+    with pytest.raises(ValueError, match="requires a count"):
+        next(iter_log_entries(sort=True))
+
+def test_generate_log_entry_fixed_timestamp():
+    """Test that a supplied timestamp is used as is."""
+    timestamp = datetime(2024, 1, 15, 10, 30, 45, tzinfo=timezone.utc)
+    assert generate_log_entry(timestamp=timestamp)["timestamp"] == timestamp
+
+def test_generate_log_entry_as_record():
+    """Test that a LogEntry record behaves like the log entry dict."""
+    record = generate_log_entry(as_record=True)
+    
+    assert isinstance(record, LogEntry)
+    assert not hasattr(record, "__dict__")
+    assert list(record) == LOG_ENTRY_FIELDS
+    assert list(record.keys()) == list(record.to_dict())
+    assert record["request_id"] is record.request_id
+    assert record.get("missing", "default") == "default"
+    assert "path" in record and "missing" not in record
+    assert dict(record) == record.to_dict()
+    assert record == record.to_dict()
+
+def test_log_entry_record_item_access():
+    """Test item assignment and unknown fields on a LogEntry record."""
+    record = generate_log_entry(as_record=True)
+    record["path"] = "/api/v1/health"
+    copy = record.copy()
+    copy["path"] = "/api/v1/other"
+    
+    assert record.path == "/api/v1/health"
+    with pytest.raises(KeyError):
+        record["missing"]
+    with pytest.raises(KeyError):
+        record["to_dict"] = None
+    with pytest.raises(TypeError, match="missing"):
+        LogEntry(path="/")
+
+def test_iter_log_entries_as_record():
+    """Test generating records in bulk, sorted, and formatting them like dicts."""
+    records = generate_log_entries(20, sort=True, as_record=True)
+    
+    assert all(isinstance(record, LogEntry) for record in records)
+    assert [record.timestamp for record in records] == sorted(
+        record.timestamp for record in records
+    )
+    for format_type in ("json", "csv", "log"):
+        line = format_log_entry_as_string(records[0], format_type)
+        assert line == format_log_entry_as_string(records[0].to_dict(), format_type)
+
+def test_iter_log_lines():
+    """Test lazily generating formatted log lines."""
+    lines = list(iter_log_lines(3, "json"))
+    
+    assert len(lines) == 3
+    for line in lines:
+        assert "log_level" in json.loads(line)
+
+def test_iter_log_chunks():
+    """Test that chunks are bounded by chunk_size and cover every entry."""
+    chunks = list(iter_log_chunks(25, "log", chunk_size=10))
+    
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    for chunk in chunks:
+        for line in chunk:
+            assert "[" in line and "]" in line
+
+def test_iter_log_chunks_empty():
+    """Test that zero entries produce no chunks."""
+    assert list(iter_log_chunks(0, "json")) == []
+
+def test_iter_log_chunks_invalid_chunk_size():
+    """Test that a non-positive chunk size is rejected."""
+    with pytest.raises(ValueError, match="chunk_size"):
+        next(iter_log_chunks(5, "json", chunk_size=0))
+
 def test_format_log_entry_json():
     """Test JSON formatting."""
     log_entry = generate_log_entry()
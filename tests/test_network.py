@@ -0,0 +1,383 @@
+"""
+Test the asynchronous network sinks against in-process stand-in servers.
+"""
+
+import asyncio
+import re
+import socketserver
+import threading
+import pytest
+from datetime import datetime, timezone
+from exporters.network import (
+    SinkTarget,
+    parse_sink_url,
+    format_syslog_message,
+    syslog_messages,
+    sink_messages,
+    frame_messages,
+    send_message_chunks_async,
+    send_message_chunks,
+)
+from generators.log_batch import generate_log_batch
+
+START_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END_DATE = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+MESSAGES = [b"message %d" % i for i in range(100)]
+SYSLOG_PATTERN = re.compile(
+    rb"<\d+>1 \d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}Z \S+ \S+ - - - "
+)
+
+async def chunked(messages, size=10, delay=0.0):
+    """Yield messages in chunks, optionally pausing between chunks."""
+    for start in range(0, len(messages), size):
+        if delay:
+            await asyncio.sleep(delay)
+        yield messages[start:start + size]
+
+async def start_stream_server(handle, unix_path=None):
+    """Start a TCP (or Unix socket) stand-in server and return it."""
+    if unix_path:
+        return await asyncio.start_unix_server(handle, unix_path)
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+def collecting_handler(received, connections):
+    """Return a stream handler appending everything it reads to received."""
+    async def handle(reader, writer):
+        connections.append(writer)
+        while data := await reader.read(65536):
+            received.extend(data)
+        writer.close()
+    return handle
+
+def parse_octet_counted(data: bytes) -> list[bytes]:
+    """Split an RFC 6587 octet-counted stream into messages."""
+    messages = []
+    while data:
+        length, _, data = data.partition(b" ")
+        messages.append(data[:int(length)])
+        data = data[int(length):]
+    return messages
+
+def http_handler(requests, statuses=None, connection_header=""):
+    """Return a stand-in HTTP/1.1 server recording (path, body, status) per request.
+
+    It answers with statuses in turn, then with 200.
+    """
+    statuses = list(statuses or [])
+    async def handle(reader, writer):
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            headers = {}
+            while (line := await reader.readline()) != b"\r\n":
+                name, _, value = line.decode().partition(":")
+                headers[name.lower()] = value.strip()
+            body = await reader.readexactly(int(headers["content-length"]))
+            status = statuses.pop(0) if statuses else 200
+            requests.append((request_line.split()[1], body, status))
+            response = (
+                f"HTTP/1.1 {status} X\r\nContent-Length: 2\r\n{connection_header}\r\nok"
+            )
+            writer.write(response.encode())
+            await writer.drain()
+        writer.close()
+    return handle
+
+def test_parse_sink_url():
+    """Test parsing every scheme, default ports and invalid URLs."""
+    assert parse_sink_url("syslog+udp://collector") == SinkTarget(
+        "syslog+udp", "collector", 514, "/"
+    )
+    assert parse_sink_url("tcp://127.0.0.1:5170") == SinkTarget(
+        "tcp", "127.0.0.1", 5170, "/"
+    )
+    assert parse_sink_url("unix:///run/vector.sock") == SinkTarget(
+        "unix", None, None, "/run/vector.sock"
+    )
+    assert parse_sink_url("https://logs.example.com/ingest?token=x") == SinkTarget(
+        "https", "logs.example.com", 443, "/ingest?token=x"
+    )
+    for url in ("ftp://host", "tcp://host", "unix://", "http://:80"):
+        with pytest.raises(ValueError):
+            parse_sink_url(url)
+
+def test_format_syslog_message():
+    """Test the RFC 5424 layout and the severity mapping."""
+    message = format_syslog_message(
+        b'{"a": 1}', "2024-01-01T00:00:00.000001Z", "ERROR", "web-1", "api-service"
+    )
+    expected = b'<131>1 2024-01-01T00:00:00.000001Z web-1 api-service - - - {"a": 1}'
+    assert message == expected
+    debug = format_syslog_message(b"x", "2024-01-01T00:00:00.000000Z", "DEBUG")
+    assert debug.startswith(b"<135>1 ")
+
+def test_syslog_messages():
+    """Test one syslog message per row, stamped with the row's timestamp."""
+    batch = generate_log_batch(50, START_DATE, END_DATE, sort=True)
+    messages = syslog_messages(batch)
+
+    assert len(messages) == 50
+    assert all(SYSLOG_PATTERN.match(message) for message in messages)
+    first = datetime.fromtimestamp(batch.timestamps[0] / 1e6, timezone.utc)
+    first = first.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    assert messages[0].split(b" ")[1] == first.encode()
+    lines = sink_messages(batch, parse_sink_url("tcp://h:1"), "log")
+    assert lines[0].startswith(b"2024-01-01 ")
+
+def test_frame_messages():
+    """Test octet counting for syslog over TCP and newlines otherwise."""
+    assert frame_messages([b"ab", b"c"], parse_sink_url("syslog+tcp://h")) == b"2 ab1 c"
+    assert frame_messages([b"ab", b"c"], parse_sink_url("tcp://h:1")) == b"ab\nc\n"
+
+def test_send_syslog_tcp():
+    """Test octet-counted syslog over pooled TCP connections."""
+    async def scenario():
+        received, connections = bytearray(), []
+        server = await start_stream_server(collecting_handler(received, connections))
+        port = server.sockets[0].getsockname()[1]
+        batch = generate_log_batch(200, START_DATE, END_DATE)
+        sent = await send_message_chunks_async(
+            chunked(syslog_messages(batch), 25),
+            parse_sink_url(f"syslog+tcp://127.0.0.1:{port}"),
+            batch_size=20,
+            connections=2,
+        )
+        await asyncio.sleep(0.05)
+        server.close()
+        return sent, parse_octet_counted(bytes(received)), len(connections)
+
+    sent, messages, connections = asyncio.run(scenario())
+    assert sent == len(messages) == 200
+    assert all(SYSLOG_PATTERN.match(message) for message in messages)
+    assert connections <= 2
+
+def test_send_syslog_udp():
+    """Test one datagram per syslog message."""
+    async def scenario():
+        datagrams = []
+        class Collector(asyncio.DatagramProtocol):
+            def datagram_received(self, data, addr):
+                datagrams.append(data)
+        transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            Collector, local_addr=("127.0.0.1", 0)
+        )
+        port = transport.get_extra_info("sockname")[1]
+        sent = await send_message_chunks_async(
+            chunked(MESSAGES[:50]),
+            parse_sink_url(f"syslog+udp://127.0.0.1:{port}"),
+            batch_size=10,
+        )
+        await asyncio.sleep(0.05)
+        transport.close()
+        return sent, datagrams
+
+    sent, datagrams = asyncio.run(scenario())
+    assert sent == 50
+    assert sorted(datagrams) == sorted(MESSAGES[:50])
+
+@pytest.mark.parametrize("scheme", ["tcp", "unix"])
+def test_send_lines(scheme, tmp_path):
+    """Test newline-delimited lines over TCP and a Unix domain socket."""
+    async def scenario():
+        received, connections = bytearray(), []
+        unix_path = str(tmp_path / "sink.sock") if scheme == "unix" else None
+        server = await start_stream_server(
+            collecting_handler(received, connections), unix_path
+        )
+        if unix_path:
+            url = f"unix://{unix_path}"
+        else:
+            url = f"tcp://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        sent = await send_message_chunks_async(
+            chunked(MESSAGES),
+            parse_sink_url(url),
+            batch_size=30,
+            in_flight=3,
+            connections=3,
+        )
+        await asyncio.sleep(0.05)
+        server.close()
+        return sent, bytes(received)
+
+    sent, received = asyncio.run(scenario())
+    assert sent == 100
+    assert sorted(received.splitlines()) == sorted(MESSAGES)
+
+def test_send_http_batches():
+    """Test NDJSON POSTs of at most batch_size lines over kept-alive connections."""
+    async def scenario():
+        requests = []
+        connections = []
+        handle = http_handler(requests)
+        async def counting(reader, writer):
+            connections.append(writer)
+            await handle(reader, writer)
+        server = await start_stream_server(counting)
+        port = server.sockets[0].getsockname()[1]
+        sent = await send_message_chunks_async(
+            chunked(MESSAGES, 7),
+            parse_sink_url(f"http://127.0.0.1:{port}/ingest"),
+            batch_size=25,
+            connections=1,
+        )
+        server.close()
+        return sent, requests, len(connections)
+
+    sent, requests, connections = asyncio.run(scenario())
+    assert sent == 100
+    assert [path for path, _, _ in requests] == [b"/ingest"] * 4
+    assert [body.count(b"\n") for _, body, _ in requests] == [25, 25, 25, 25]
+    assert b"".join(body for _, body, _ in requests).splitlines() == MESSAGES
+    assert connections == 1
+
+def test_send_http_retries_with_backoff():
+    """Test retrying 503 responses and closed connections on a fresh connection."""
+    async def scenario():
+        requests = []
+        close = "Connection: close\r\n"
+        handler = http_handler(requests, statuses=[503, 503], connection_header=close)
+        server = await start_stream_server(handler)
+        port = server.sockets[0].getsockname()[1]
+        sent = await send_message_chunks_async(
+            chunked(MESSAGES[:10]),
+            parse_sink_url(f"http://127.0.0.1:{port}/"),
+            batch_size=10,
+            backoff=0.001,
+        )
+        server.close()
+        return sent, requests
+
+    sent, requests = asyncio.run(scenario())
+    assert sent == 10
+    assert [status for _, _, status in requests] == [503, 503, 200]
+
+def test_send_http_rejected():
+    """Test that a 4xx response is raised without retrying."""
+    async def scenario():
+        requests = []
+        server = await start_stream_server(http_handler(requests, statuses=[400]))
+        port = server.sockets[0].getsockname()[1]
+        try:
+            await send_message_chunks_async(
+                chunked(MESSAGES[:10]),
+                parse_sink_url(f"http://127.0.0.1:{port}/"),
+                backoff=0.001,
+            )
+        finally:
+            server.close()
+        return requests
+
+    with pytest.raises(ValueError, match="HTTP 400"):
+        asyncio.run(scenario())
+
+def test_send_reconnects_after_drop():
+    """Test that a connection dropped by the server is replaced and the batch resent."""
+    async def scenario():
+        received, accepted = bytearray(), []
+        collect = collecting_handler(received, [])
+        async def flaky(reader, writer):
+            accepted.append(writer)
+            if len(accepted) == 1:
+                writer.transport.abort()  # Drop the first connection right away
+                return
+            await collect(reader, writer)
+        server = await start_stream_server(flaky)
+        port = server.sockets[0].getsockname()[1]
+        target = parse_sink_url(f"tcp://127.0.0.1:{port}")
+        # The first batch goes out before the drop is noticed; keep sending until a
+        # write fails
+        sent = await send_message_chunks_async(
+            chunked(MESSAGES, 10, delay=0.02),
+            target,
+            batch_size=10,
+            linger=0,
+            backoff=0.001,
+        )
+        await asyncio.sleep(0.05)
+        server.close()
+        return sent, bytes(received), len(accepted)
+
+    sent, received, accepted = asyncio.run(scenario())
+    assert sent == 100
+    assert accepted >= 2
+    assert set(MESSAGES[-50:]) <= set(received.splitlines())
+
+def test_send_gives_up_after_retries():
+    """Test that an unreachable sink raises once retries are exhausted."""
+    async def scenario():
+        server = await start_stream_server(collecting_handler(bytearray(), []))
+        port = server.sockets[0].getsockname()[1]
+        server.close()
+        await server.wait_closed()
+        await send_message_chunks_async(
+            chunked(MESSAGES[:5]),
+            parse_sink_url(f"tcp://127.0.0.1:{port}"),
+            retries=2,
+            backoff=0.001,
+        )
+
+    with pytest.raises(OSError):
+        asyncio.run(scenario())
+
+def test_send_linger_flushes_partial_batch():
+    """Test that a partial batch is sent after linger seconds, not held until full."""
+    async def scenario():
+        received, arrived = bytearray(), asyncio.Event()
+        async def handle(reader, writer):
+            while data := await reader.read(65536):
+                received.extend(data)
+                arrived.set()
+        server = await start_stream_server(handle)
+        port = server.sockets[0].getsockname()[1]
+
+        async def slow_source():
+            yield [b"first"]
+            # Times out unless the lone message is flushed
+            await asyncio.wait_for(arrived.wait(), 2)
+            yield [b"second"]
+
+        sent = await send_message_chunks_async(
+            slow_source(),
+            parse_sink_url(f"tcp://127.0.0.1:{port}"),
+            batch_size=100,
+            linger=0.01,
+        )
+        await asyncio.sleep(0.05)
+        server.close()
+        return sent, bytes(received)
+
+    assert asyncio.run(scenario()) == (2, b"first\nsecond\n")
+
+def test_send_invalid_options():
+    """Test that invalid batching options are rejected."""
+    target = parse_sink_url("tcp://h:1")
+    with pytest.raises(ValueError, match="batch_size"):
+        asyncio.run(send_message_chunks_async(chunked(MESSAGES), target, batch_size=0))
+    with pytest.raises(ValueError, match="linger"):
+        asyncio.run(send_message_chunks_async(chunked(MESSAGES), target, linger=-1))
+
+def test_send_message_chunks_from_blocking_iterable():
+    """Test the blocking entry point against a threaded TCP server."""
+    received = bytearray()
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            while data := self.request.recv(65536):
+                received.extend(data)
+
+    with socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler) as server:
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        chunks = (MESSAGES[start:start + 10] for start in range(0, 100, 10))
+        url = f"tcp://127.0.0.1:{server.server_address[1]}"
+        sent = send_message_chunks(chunks, url, batch_size=40)
+        for _ in range(100):
+            if len(received.splitlines()) == 100:
+                break
+            threading.Event().wait(0.01)
+        server.shutdown()
+
+    assert sent == 100
+    assert sorted(received.splitlines()) == sorted(MESSAGES)
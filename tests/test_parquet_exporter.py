@@ -0,0 +1,164 @@
+"""
+Test Parquet exporter.
+"""
+
+import pytest
+import io
+from datetime import datetime, timezone
+import uuid
+from exporters import parquet_exporter
+from exporters.parquet_exporter import (
+    PARQUET_COLUMNS, DICTIONARY_COLUMNS, get_parquet_schema, path_template,
+    export_to_parquet, write_parquet_batches
+)
+from generators.core_generators import API_PATHS, generate_paths
+from generators.log_batch import generate_log_batch, iter_log_batch_rows
+from generators.log_entry_factory import LOG_ENTRY_FIELDS, generate_log_entries
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+def read_parquet(data: bytes):
+    """Open Parquet bytes as a ParquetFile."""
+    return pq.ParquetFile(io.BytesIO(data))
+
+def row_group_sizes(parquet_file) -> list:
+    """Return the number of rows in each row group."""
+    return [
+        parquet_file.metadata.row_group(i).num_rows
+        for i in range(parquet_file.num_row_groups)
+    ]
+
+def test_get_parquet_schema():
+    """Test that columns keep native timestamp, UUID and integer types."""
+    schema = get_parquet_schema()
+
+    assert schema.names == PARQUET_COLUMNS
+    assert schema.field("timestamp").type == pa.timestamp("us", tz="UTC")
+    request_id_type = schema.field("request_id").type
+    assert getattr(request_id_type, "storage_type", request_id_type) == pa.binary(16)
+    assert schema.field("status_code").type == pa.int32()
+    for column in DICTIONARY_COLUMNS:
+        assert pa.types.is_dictionary(schema.field(column).type)
+
+def test_path_template():
+    """Test recovering the API path template of a numeric, UUID or slug ID path."""
+    assert path_template("/api/v1/users/981319") == "/api/v1/users/{id}"
+    assert (
+        path_template("/api/v1/comments/0f8fad5b-d9cb-469f-a165-70867728950e")
+        == "/api/v1/comments/{id}"
+    )
+    assert path_template("/api/v1/posts/continue-detail") == "/api/v1/posts/{id}"
+    assert path_template("/api/v1/users") == "/api/v1/users"
+    assert path_template("/api/v1/admin/users") == "/api/v1/admin/users"
+    assert path_template("/other/42") == "/other/42"
+
+def test_generated_path_templates():
+    """Test that generated paths collapse to the API path templates."""
+    assert {path_template(path) for path in generate_paths(5000)} <= set(API_PATHS)
+
+def test_export_to_parquet_round_trip():
+    """Test that entries read back with the same values."""
+    entries = generate_log_entries(30)
+    destination = io.BytesIO()
+
+    assert export_to_parquet(entries, destination) == 30
+    rows = read_parquet(destination.getvalue()).read().to_pylist()
+    assert len(rows) == 30
+    skipped = ("timestamp", "request_id", "request_headers", "response_headers")
+    plain_fields = [field for field in LOG_ENTRY_FIELDS if field not in skipped]
+    for row, entry in zip(rows, entries):
+        assert row["timestamp"] == entry["timestamp"]
+        # UUID, or 16 bytes on pyarrow without the UUID type
+        request_id = row["request_id"]
+        if not isinstance(request_id, uuid.UUID):
+            request_id = uuid.UUID(bytes=request_id)
+        assert request_id == entry["request_id"]
+        assert row["path_template"] == path_template(entry["path"])
+        assert row["request_headers"] == "{}"
+        assert {field: row[field] for field in plain_fields} == {
+            field: entry[field] for field in plain_fields
+        }
+
+def test_export_to_parquet_row_groups():
+    """Test that entries are written in fixed-size row groups."""
+    destination = io.BytesIO()
+    export_to_parquet(iter(generate_log_entries(25)), destination, row_group_size=10)
+    assert row_group_sizes(read_parquet(destination.getvalue())) == [10, 10, 5]
+
+def test_export_to_parquet_dictionary_encoding():
+    """Test that only the low-cardinality columns are dictionary encoded."""
+    destination = io.BytesIO()
+    export_to_parquet(generate_log_entries(50), destination)
+    row_group = read_parquet(destination.getvalue()).metadata.row_group(0)
+    encodings = {
+        row_group.column(i).path_in_schema: row_group.column(i).encodings
+        for i in range(row_group.num_columns)
+    }
+
+    assert "RLE_DICTIONARY" in encodings["log_level"]
+    assert "RLE_DICTIONARY" in encodings["path_template"]
+    assert "RLE_DICTIONARY" not in encodings["user_agent"]
+
+def test_export_to_parquet_records_and_missing_fields():
+    """Test LogEntry records, and that missing fields become nulls."""
+    destination = io.BytesIO()
+    export_to_parquet(
+        generate_log_entries(3, as_record=True) + [{"log_level": "INFO"}], destination
+    )
+    rows = read_parquet(destination.getvalue()).read().to_pylist()
+
+    assert len(rows) == 4
+    assert rows[3]["log_level"] == "INFO"
+    assert rows[3]["timestamp"] is None and rows[3]["request_id"] is None
+
+def test_export_to_parquet_empty():
+    """Test that empty data still gives a valid file with the schema."""
+    destination = io.BytesIO()
+
+    assert export_to_parquet([], destination) == 0
+    parquet_file = read_parquet(destination.getvalue())
+    assert parquet_file.metadata.num_rows == 0
+    assert parquet_file.schema_arrow.names == PARQUET_COLUMNS
+
+def test_export_to_parquet_file(tmp_path):
+    """Test writing to a file name."""
+    path = tmp_path / "logs.parquet"
+    export_to_parquet(generate_log_entries(5), str(path))
+    assert pq.read_metadata(path).num_rows == 5
+
+def test_export_to_parquet_invalid_row_group_size():
+    """Test that a non-positive row group size is rejected."""
+    with pytest.raises(ValueError, match="row_group_size"):
+        export_to_parquet([], io.BytesIO(), row_group_size=0)
+
+def test_write_parquet_batches_matches_entries():
+    """Test that columnar batches give the same rows as their entries."""
+    batch = generate_log_batch(
+        20,
+        datetime(2024, 1, 1, tzinfo=timezone.utc),
+        datetime(2024, 2, 1, tzinfo=timezone.utc),
+    )
+    from_batches = io.BytesIO()
+    from_entries = io.BytesIO()
+
+    assert write_parquet_batches([batch], from_batches) == 20
+    export_to_parquet(iter_log_batch_rows(batch), from_entries)
+    assert (
+        read_parquet(from_batches.getvalue()).read().to_pylist()
+        == read_parquet(from_entries.getvalue()).read().to_pylist()
+    )
+
+def test_write_parquet_batches_regroups_rows():
+    """Test that batches of any size are regrouped into fixed-size row groups."""
+    destination = io.BytesIO()
+    batches = (generate_log_batch(7) for _ in range(4))
+
+    assert write_parquet_batches(batches, destination, row_group_size=10) == 28
+    assert row_group_sizes(read_parquet(destination.getvalue())) == [10, 10, 8]
+
+def test_missing_pyarrow(monkeypatch):
+    """Test that a missing pyarrow fails with install instructions."""
+    monkeypatch.setattr(parquet_exporter, "pa", None)
+    with pytest.raises(ImportError, match="pip install pyarrow"):
+        export_to_parquet([], io.BytesIO())
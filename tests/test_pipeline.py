@@ -0,0 +1,118 @@
+"""
+Test the threaded generate -> format -> write pipeline.
+"""
+
+import json
+import random
+import threading
+import time
+import pytest
+from datetime import datetime, timezone
+from generators.pipeline import iter_pipeline, iter_pipelined_chunks
+from generators.traffic_model import DEFAULT_TRAFFIC_MODEL
+
+START_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END_DATE = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+def jittered(function):
+    """Return a stage function sleeping randomly first, so workers finish unordered."""
+    def stage(value):
+        time.sleep(random.random() * 0.002)
+        return function(value)
+    return stage
+
+def test_iter_pipeline_preserves_order():
+    """Test that results come back in input order with several workers per stage."""
+    stages = [(jittered(lambda x: x * 2), 4), (jittered(lambda x: x + 1), 3)]
+    assert list(iter_pipeline(range(200), stages)) == [x * 2 + 1 for x in range(200)]
+
+def test_iter_pipeline_empty():
+    """Test that an empty input gives no results."""
+    assert list(iter_pipeline([], [(str, 2)])) == []
+
+def test_iter_pipeline_bounds_in_flight():
+    """Test that a slow consumer holds the feeder back to max_in_flight items."""
+    fed = []
+    def items():
+        for x in range(100):
+            fed.append(x)
+            yield x
+
+    results = iter_pipeline(items(), [(lambda x: x, 2)], queue_size=2, max_in_flight=5)
+    assert next(results) == 0
+    time.sleep(0.05)
+    # max_in_flight, plus the one just released, plus the one being fed
+    assert len(fed) <= 7
+    assert list(results) == list(range(1, 100))
+
+def test_iter_pipeline_stage_error():
+    """Test that a stage's exception reaches the consumer and stops every thread."""
+    def fail_on_seven(x):
+        if x == 7:
+            raise KeyError(x)
+        return x
+
+    threads = threading.active_count()
+    with pytest.raises(KeyError):
+        list(iter_pipeline(range(1000), [(fail_on_seven, 3), (str, 2)]))
+    assert threading.active_count() == threads
+
+def test_iter_pipeline_input_error():
+    """Test that an exception from the input iterable reaches the consumer."""
+    def items():
+        yield 1
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError, match="bad input"):
+        list(iter_pipeline(items(), [(str, 1)]))
+
+def test_iter_pipeline_early_close():
+    """Test that abandoning the results shuts the pipeline down."""
+    threads = threading.active_count()
+    results = iter_pipeline(iter(int, 1), [(str, 2)])  # Endless input
+    assert next(results) == "0"
+    results.close()
+    assert threading.active_count() == threads
+
+def test_iter_pipeline_invalid():
+    """Test that invalid stages and sizes are rejected."""
+    with pytest.raises(ValueError, match="at least one stage"):
+        next(iter_pipeline([1], []))
+    with pytest.raises(ValueError, match="worker counts"):
+        next(iter_pipeline([1], [(str, 0)]))
+    with pytest.raises(ValueError, match="queue_size"):
+        next(iter_pipeline([1], [(str, 1)], queue_size=0))
+
+@pytest.mark.parametrize("format_type", ["json", "csv", "log"])
+def test_iter_pipelined_chunks(format_type):
+    """Test the count and chunking of pipelined output."""
+    chunks = iter_pipelined_chunks(
+        250,
+        format_type,
+        100,
+        START_DATE,
+        END_DATE,
+        generate_workers=2,
+        format_workers=2,
+    )
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [100, 100, 50]
+
+def test_iter_pipelined_chunks_sorted():
+    """Test that sorted and traffic-model output stays in order with many workers."""
+    for options in ({"sort": True}, {"traffic_model": DEFAULT_TRAFFIC_MODEL}):
+        chunks = iter_pipelined_chunks(
+            2000,
+            "json",
+            100,
+            START_DATE,
+            END_DATE,
+            generate_workers=3,
+            format_workers=3,
+            **options
+        )
+        lines = (line for chunk in chunks for line in chunk.splitlines())
+        timestamps = [json.loads(line)["timestamp"] for line in lines]
+
+        assert len(timestamps) == 2000
+        assert timestamps == sorted(timestamps)
@@ -3,14 +3,34 @@ Test PostgreSQL exporter.
 """
 
 import pytest
+import io
+import ipaddress
+import struct
 from datetime import datetime, timezone
 import uuid
 from exporters.postgres_exporter import (
     get_postgres_create_table_sql,
     get_postgres_insert_sql,
     convert_to_postgres_value,
-    generate_insert_values
+    convert_to_postgres_inet,
+    generate_insert_values,
+    POSTGRES_COLUMNS,
+    PGCOPY_HEADER,
+    PGCOPY_TRAILER,
+    encode_timestamptz,
+    encode_uuid,
+    encode_inet,
+    encode_jsonb,
+    encode_integer,
+    encode_copy_row,
+    get_postgres_copy_sql,
+    write_postgres_copy,
+    export_to_postgres_copy,
+    encode_copy_batch,
+    write_postgres_copy_batches
 )
+from generators.log_batch import generate_log_batch, iter_log_batch_rows
+from generators.log_entry_factory import generate_log_entries
 
 def test_get_postgres_create_table_sql():
     """Test table creation SQL generation."""
@@ -93,6 +113,14 @@ def test_convert_to_postgres_value_string_types():
         result = convert_to_postgres_value(test_string)
         assert result == test_string  # Should remain unchanged
 
+def test_convert_to_postgres_inet():
+    """Test INET conversion of IP strings and compact integers."""
+    ipv4 = ipaddress.IPv4Address("192.168.1.1")
+    ipv6 = ipaddress.IPv6Address("2001:db8::1")
+    assert convert_to_postgres_inet("192.168.1.1") == ipv4
+    assert convert_to_postgres_inet(0xC0A80101) == ipv4
+    assert convert_to_postgres_inet(int(ipv6)) == ipv6
+
 def test_generate_insert_values():
     """Test generating insert values from data."""
     data = [
@@ -153,4 +181,206 @@ def test_generate_insert_values_missing_fields():
 def test_generate_insert_values_empty_data():
     """Test generating insert values with empty data."""
     values = generate_insert_values([], ["timestamp", "request_id"])
-    assert values == [] 
\ No newline at end of file
+    assert values == [] 
+
+def test_generate_insert_values_records():
+    """Test that LogEntry records give the same insert values and COPY rows as dicts."""
+    records = generate_log_entries(5, as_record=True)
+    dicts = [record.to_dict() for record in records]
+    fieldnames = [
+        "timestamp",
+        "request_id",
+        "source_ip",
+        "request_headers",
+        "content_length",
+    ]
+    
+    assert generate_insert_values(records, fieldnames) == generate_insert_values(
+        dicts, fieldnames
+    )
+    assert [encode_copy_row(record) for record in records] == [
+        encode_copy_row(row) for row in dicts
+    ]
+
+def read_copy_rows(data: bytes) -> list:
+    """Split a binary COPY stream into rows of raw field bytes (None for NULL)."""
+    assert data.startswith(PGCOPY_HEADER)
+    assert data.endswith(PGCOPY_TRAILER)
+    offset = len(PGCOPY_HEADER)
+    rows = []
+    while True:
+        (field_count,) = struct.unpack_from(">h", data, offset)
+        offset += 2
+        if field_count == -1:
+            break
+        row = []
+        for _ in range(field_count):
+            (length,) = struct.unpack_from(">i", data, offset)
+            offset += 4
+            if length == -1:
+                row.append(None)
+            else:
+                row.append(data[offset:offset + length])
+                offset += length
+        rows.append(row)
+    assert offset == len(data)
+    return rows
+
+def test_get_postgres_copy_sql():
+    """Test the binary COPY statement."""
+    sql = get_postgres_copy_sql(["timestamp", "request_id"])
+    assert sql == (
+        "COPY log_entries (timestamp, request_id) FROM STDIN WITH (FORMAT binary)"
+    )
+    assert get_postgres_copy_sql().count(",") == len(POSTGRES_COLUMNS) - 1
+
+def test_postgres_columns_match_table():
+    """Test that the COPY columns are the columns of the CREATE TABLE statement."""
+    sql = get_postgres_create_table_sql()
+    for column in POSTGRES_COLUMNS:
+        assert f"    {column} " in sql
+
+def test_pgcopy_header_and_trailer():
+    """Test the binary COPY signature, header and trailer bytes."""
+    assert PGCOPY_HEADER == b"PGCOPY\n\xff\r\n\x00" + b"\x00" * 8
+    assert PGCOPY_TRAILER == b"\xff\xff"
+
+def test_encode_timestamptz():
+    """Test TIMESTAMPTZ encoding as microseconds since 2000-01-01 UTC."""
+    utc = timezone.utc
+    moment = datetime(2024, 1, 15, 10, 30, 45, tzinfo=utc)
+    assert encode_timestamptz(datetime(2000, 1, 1, tzinfo=utc)) == b"\x00" * 8
+    after = datetime(2000, 1, 1, 0, 0, 1, 5, tzinfo=utc)
+    before = datetime(1999, 12, 31, 23, 59, 59, tzinfo=utc)
+    assert encode_timestamptz(after) == struct.pack(">q", 1000005)
+    assert encode_timestamptz(before) == struct.pack(">q", -1000000)
+    assert encode_timestamptz(moment.replace(tzinfo=None)) == encode_timestamptz(moment)
+    assert encode_timestamptz(moment) == bytes.fromhex("0002b1f8466d5f40")
+
+def test_encode_uuid():
+    """Test UUID encoding as 16 raw bytes."""
+    value = uuid.UUID("550e8400-e29b-41d4-a716-446655440000")
+    assert encode_uuid(value) == bytes.fromhex("550e8400e29b41d4a716446655440000")
+    assert encode_uuid(str(value)) == encode_uuid(value)
+
+def test_encode_inet():
+    """Test INET encoding of IPv4, IPv6 and compact integer addresses."""
+    assert encode_inet("192.168.1.1") == bytes([2, 32, 0, 4, 192, 168, 1, 1])
+    assert encode_inet(0xC0A80101) == encode_inet("192.168.1.1")
+    assert (
+        encode_inet("2001:db8::1")
+        == bytes([3, 128, 0, 16]) + ipaddress.IPv6Address("2001:db8::1").packed
+    )
+
+def test_encode_jsonb():
+    """Test JSONB encoding as version 1 followed by JSON text."""
+    assert encode_jsonb({"a": 1}) == b'\x01{"a": 1}'
+    assert encode_jsonb("?page=2") == b'\x01"?page=2"'
+
+def test_encode_integer():
+    """Test INTEGER encoding as a big-endian int32."""
+    assert encode_integer(200) == b"\x00\x00\x00\xc8"
+    assert encode_integer(-1) == b"\xff\xff\xff\xff"
+
+def test_encode_copy_row_golden():
+    """Test a complete binary COPY tuple against known bytes."""
+    row = {
+        "timestamp": datetime(2000, 1, 1, 0, 0, 1, tzinfo=timezone.utc),
+        "request_id": uuid.UUID(int=1),
+        "status_code": 404,
+        "user_id": None,
+        "method": "GET"
+    }
+    columns = ["timestamp", "request_id", "status_code", "user_id", "method", "env"]
+    expected = (
+        b"\x00\x06"
+        + b"\x00\x00\x00\x08" + struct.pack(">q", 1000000)
+        + b"\x00\x00\x00\x10" + b"\x00" * 15 + b"\x01"
+        + b"\x00\x00\x00\x04" + b"\x00\x00\x01\x94"
+        + b"\xff\xff\xff\xff"
+        + b"\x00\x00\x00\x03GET"
+        + b"\xff\xff\xff\xff"
+    )
+    assert encode_copy_row(row, columns) == expected
+
+def test_encode_copy_row_unknown_column():
+    """Test that columns outside log_entries are rejected."""
+    with pytest.raises(ValueError, match="Unknown log_entries columns: bogus"):
+        encode_copy_row({}, ["timestamp", "bogus"])
+
+def test_write_postgres_copy_golden():
+    """Test a complete binary COPY stream against known bytes."""
+    stream = io.BytesIO()
+    rows = write_postgres_copy(
+        [{"status_code": 200}, {"status_code": 500}], stream, ["status_code"]
+    )
+    
+    assert rows == 2
+    assert stream.getvalue() == (
+        b"PGCOPY\n\xff\r\n\x00" + b"\x00" * 8
+        + b"\x00\x01\x00\x00\x00\x04\x00\x00\x00\xc8"
+        + b"\x00\x01\x00\x00\x00\x04\x00\x00\x01\xf4"
+        + b"\xff\xff"
+    )
+
+def test_write_postgres_copy_empty():
+    """Test that no rows still give a valid header and trailer."""
+    stream = io.BytesIO()
+    assert write_postgres_copy([], stream) == 0
+    assert stream.getvalue() == PGCOPY_HEADER + PGCOPY_TRAILER
+
+def test_write_postgres_copy_streams():
+    """Test that rows are consumed lazily and written in bounded blocks."""
+    class CountingStream(io.BytesIO):
+        def __init__(self):
+            super().__init__()
+            self.writes = []
+        
+        def write(self, data):
+            self.writes.append(len(data))
+            return super().write(data)
+    
+    entries = ({"status_code": 200, "path": "/api/v1/users" * 100} for _ in range(1000))
+    stream = CountingStream()
+    assert write_postgres_copy(entries, stream, ["status_code", "path"]) == 1000
+    
+    assert len(stream.writes) > 1
+    assert max(stream.writes) < 2 * (1 << 16)
+    assert len(read_copy_rows(stream.getvalue())) == 1000
+
+def test_export_to_postgres_copy(tmp_path):
+    """Test exporting generated log entries to a binary COPY file."""
+    entries = generate_log_entries(20)
+    filename = tmp_path / "logs.pgcopy"
+    
+    assert export_to_postgres_copy(iter(entries), str(filename)) == 20
+    rows = read_copy_rows(filename.read_bytes())
+    columns = list(POSTGRES_COLUMNS)
+    
+    assert len(rows) == 20
+    for entry, row in zip(entries, rows):
+        assert len(row) == len(columns)
+        assert row[columns.index("request_id")] == entry["request_id"].bytes
+        assert row[columns.index("timestamp")] == encode_timestamptz(entry["timestamp"])
+        assert row[columns.index("source_ip")] == encode_inet(entry["source_ip"])
+        assert row[columns.index("method")] == entry["method"].encode("utf-8")
+        assert row[columns.index("content_length")] is None
+
+def test_encode_copy_batch():
+    """Test that a columnar batch encodes to the same tuples as its rows."""
+    batch = generate_log_batch(50)
+    rows = list(iter_log_batch_rows(batch))
+    
+    assert encode_copy_batch(batch) == b"".join(encode_copy_row(row) for row in rows)
+    columns = ["request_id", "content_length", "timestamp", "env"]
+    assert encode_copy_batch(batch, columns) == b"".join(
+        encode_copy_row(row, columns) for row in rows
+    )
+
+def test_write_postgres_copy_batches():
+    """Test streaming batches as one binary COPY stream."""
+    batches = [generate_log_batch(10), generate_log_batch(5)]
+    stream = io.BytesIO()
+    
+    assert write_postgres_copy_batches(iter(batches), stream) == 15
+    assert len(read_copy_rows(stream.getvalue())) == 15
@@ -0,0 +1,130 @@
+"""
+Test per-field profiling of log generation.
+"""
+
+import io
+import json
+import pytest
+from generators import log_batch, log_entry_factory
+from generators.log_batch import iter_log_batches
+from generators.log_entry_factory import iter_log_lines
+from generators.random_access import iter_range
+from generators.profiling import (
+    PROFILED_FUNCTIONS,
+    profile_generation,
+    profile_stage,
+    profile_iter,
+    profile_summary,
+    format_profile,
+)
+
+FIELDS = {
+    "timestamp",
+    "request_id",
+    "log_level",
+    "method",
+    "path",
+    "query_parameters",
+    "protocol",
+    "source_ip",
+    "user_agent",
+    "referer",
+    "user_id",
+    "session_id",
+    "placeholders",
+}
+
+def test_profile_generation_entries():
+    """Test that every field generator and the format stage count once per entry."""
+    with profile_generation() as profile:
+        lines = list(iter_log_lines(20, "json"))
+
+    assert len(lines) == 20
+    assert set(profile["fields"]) == FIELDS
+    assert all(stats["calls"] == 20 for stats in profile["fields"].values())
+    assert profile["stages"]["format"]["calls"] == 20
+
+def test_profile_generation_batches():
+    """Test that batched generators count once per batch, sorted timestamps included."""
+    with profile_generation() as profile:
+        batches = list(iter_log_batches(30, 10, sort=True))
+
+    assert len(batches) == 3
+    assert set(profile["fields"]) == FIELDS
+    assert all(stats["calls"] == 3 for stats in profile["fields"].values())
+
+def test_profile_generation_random_access():
+    """Test that counter-based (--offset) generation gets a row per field."""
+    with profile_generation() as profile:
+        entries = list(iter_range(100, 115, seed=7))
+
+    assert len(entries) == 15
+    assert set(profile["fields"]) == FIELDS
+    assert all(stats["calls"] == 15 for stats in profile["fields"].values())
+
+def test_profile_generation_restores_functions():
+    """Test that profiling leaves no wrappers behind, so it costs nothing when off."""
+    originals = {
+        (module, name): getattr(module, name)
+        for module, functions in PROFILED_FUNCTIONS.items()
+        for name in functions
+    }
+    with profile_generation():
+        assert log_batch.generate_paths is not originals[(log_batch, "generate_paths")]
+
+    assert all(
+        getattr(module, name) is function
+        for (module, name), function in originals.items()
+    )
+    assert profile_iter("generate", originals) is originals
+
+def test_profile_generation_not_reentrant():
+    """Test that nested profiling is rejected."""
+    with profile_generation():
+        with pytest.raises(RuntimeError, match="already active"):
+            with profile_generation():
+                pass
+    assert log_entry_factory.generate_path.__name__ == "generate_path"
+
+def test_profile_stages_are_exclusive():
+    """Test that stage times exclude nested stages and fields and fit the wall time."""
+    with profile_generation() as profile:
+        with profile_stage("write"):
+            stream = io.BytesIO()
+            for batch in profile_iter("generate", iter_log_batches(50, 10)):
+                stream.write(repr(batch).encode())
+
+    summary = profile_summary(profile)
+    assert profile["stages"]["generate"]["calls"] == 5
+    assert profile["stages"]["write"]["calls"] == 1
+    accounted = sum(
+        stats["seconds"]
+        for section in ("fields", "stages")
+        for stats in summary[section].values()
+    )
+    assert accounted <= summary["total_seconds"] + 1e-6
+    assert sum(stats["share"] for stats in summary["fields"].values()) <= 1.0
+
+def test_profile_stage_records_on_error():
+    """Test that a failing stage is still recorded and leaves profiling usable."""
+    with profile_generation() as profile:
+        with pytest.raises(ZeroDivisionError):
+            with profile_stage("write"):
+                1 / 0
+        list(profile_iter("generate", range(3)))
+
+    assert profile["stages"]["write"]["calls"] == 1
+    assert profile["stages"]["generate"]["calls"] == 3
+
+def test_format_profile():
+    """Test the text table and that the summary is JSON-serializable."""
+    with profile_generation() as profile:
+        list(iter_log_batches(10, 10))
+    table = format_profile(profile)
+
+    header = table.splitlines()[0].split()
+    assert header == ["section", "name", "calls", "seconds", "share"]
+    assert "field    referer" in table
+    assert table.splitlines()[-1].split()[0] == "total"
+    summary = json.loads(json.dumps(profile_summary(profile)))
+    assert summary["fields"]["path"]["calls"] == 1
@@ -0,0 +1,166 @@
+"""
+Test counter-based random-access generation.
+"""
+
+import ipaddress
+import pytest
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import uuid
+from generators.client_generators import EXCLUDED_IPV4_CIDRS, IP_CIDR_TABLES
+from generators.core_generators import LOG_LEVELS, HTTP_METHODS, HTTP_PROTOCOLS
+from generators.log_entry_factory import LOG_ENTRY_FIELDS, generate_log_entry
+from generators.random_access import (
+    field_bits, timestamp_at, log_level_at, method_at, source_ip_at,
+    session_id_at, generate_log_entry_at, iter_range
+)
+
+START_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END_DATE = datetime(2024, 1, 31, tzinfo=timezone.utc)
+
+def test_field_bits():
+    """Test that field bits depend on seed, index and field."""
+    assert field_bits(1, 5, "method") == field_bits(1, 5, "method")
+    assert field_bits(1, 5, "method") != field_bits(2, 5, "method")
+    assert field_bits(1, 5, "method") != field_bits(1, 6, "method")
+    assert field_bits(1, 5, "method") != field_bits(1, 5, "protocol")
+    assert 0 <= field_bits(1, 5, "method") < 2 ** 256
+
+def test_generate_log_entry_at():
+    """Test that an entry has every field with the usual types."""
+    entry = generate_log_entry_at(
+        73000000, seed=1, start_date=START_DATE, end_date=END_DATE
+    )
+
+    assert list(entry) == LOG_ENTRY_FIELDS
+    assert list(entry) == list(generate_log_entry())
+    assert isinstance(entry["timestamp"], datetime)
+    assert isinstance(entry["request_id"], uuid.UUID)
+    assert entry["request_id"].version == 4
+    assert START_DATE <= entry["timestamp"] <= END_DATE
+    assert entry["log_level"] in LOG_LEVELS
+    assert entry["method"] in HTTP_METHODS
+    assert entry["protocol"] in HTTP_PROTOCOLS
+    assert entry["path"].startswith("/api/v1/")
+    assert entry["user_agent"]
+
+def test_generate_log_entry_at_reproducible():
+    """Test that the same (seed, index) always gives the same entry."""
+    first = generate_log_entry_at(12345, 9, START_DATE, END_DATE)
+    generate_log_entry_at(1, 9, START_DATE, END_DATE)  # Interleave another entry
+    second = generate_log_entry_at(12345, 9, START_DATE, END_DATE)
+
+    assert first == second
+    assert first != generate_log_entry_at(12345, 10, START_DATE, END_DATE)
+
+def test_generate_log_entry_at_threads():
+    """Test that entries computed on concurrent threads match sequential ones."""
+    expected = [generate_log_entry_at(i, 5, START_DATE, END_DATE) for i in range(400)]
+    with ThreadPoolExecutor(8) as executor:
+        entries = list(
+            executor.map(
+                lambda i: generate_log_entry_at(i, 5, START_DATE, END_DATE), range(400)
+            )
+        )
+
+    assert entries == expected
+
+def test_generate_log_entry_at_invalid_index():
+    """Test that a negative index is rejected."""
+    with pytest.raises(ValueError, match="index"):
+        generate_log_entry_at(-1)
+
+def test_iter_range():
+    """Test that a range matches entries computed one by one."""
+    entries = list(iter_range(1000, 1005, 3, START_DATE, END_DATE))
+
+    assert len(entries) == 5
+    assert entries == [
+        generate_log_entry_at(i, 3, START_DATE, END_DATE) for i in range(1000, 1005)
+    ]
+
+def test_iter_range_slices_agree():
+    """Test that overlapping slices agree on their shared entries."""
+    full = list(iter_range(0, 10, 3, START_DATE, END_DATE))
+    tail = list(iter_range(6, 10, 3, START_DATE, END_DATE))
+
+    assert full[6:] == tail
+
+def test_iter_range_invalid():
+    """Test that invalid ranges are rejected."""
+    with pytest.raises(ValueError, match="invalid range"):
+        next(iter_range(5, 4))
+    with pytest.raises(ValueError, match="invalid range"):
+        next(iter_range(-1, 4))
+
+def test_timestamp_at_invalid_date_range():
+    """Test that invalid date ranges raise ValueError."""
+    with pytest.raises(ValueError, match="end_date.*cannot be before start_date"):
+        timestamp_at(0, 0, END_DATE, START_DATE)
+
+def test_log_level_distribution():
+    """Test that counter-based log levels follow the usual distribution."""
+    count = 2000
+    counter = Counter(log_level_at(0, i) for i in range(count))
+
+    assert set(counter) == set(LOG_LEVELS)
+    assert 0.6 < counter["INFO"] / count < 0.8
+    assert counter["DEBUG"] < counter["WARN"]
+
+def test_method_distribution():
+    """Test that counter-based HTTP methods follow the usual distribution."""
+    count = 2000
+    counter = Counter(method_at(0, i) for i in range(count))
+
+    assert 0.5 < counter["POST"] / count < 0.7
+    assert counter["POST"] > counter["GET"] > counter["PUT"]
+
+def test_source_ip_formats():
+    """Test that counter-based source IPs are IPv4, IPv6 or private."""
+    ips = [source_ip_at(0, i) for i in range(300)]
+
+    ipv4_count = sum(
+        1 for ip in ips if re.match(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$", ip)
+    )
+    ipv6_count = sum(1 for ip in ips if ':' in ip)
+    assert ipv4_count + ipv6_count == len(ips)
+    assert ipv4_count > ipv6_count > 0
+
+def test_source_ip_cidr_tables():
+    """Test that counter-based source IPs come from the CIDR tables, never reserved."""
+    networks = [
+        ipaddress.ip_network(cidr)
+        for table in IP_CIDR_TABLES.values()
+        for cidr, _ in table
+    ]
+    excluded = [ipaddress.ip_network(cidr) for cidr in EXCLUDED_IPV4_CIDRS]
+    private = [ipaddress.ip_network(cidr) for cidr, _ in IP_CIDR_TABLES["private_ip"]]
+    ips = [ipaddress.ip_address(source_ip_at(3, i)) for i in range(2000)]
+
+    assert all(
+        any(ip in network for network in networks if network.version == ip.version)
+        for ip in ips
+    )
+    assert all(ip.packed[-1] not in (0, 255) for ip in ips if ip.version == 4)
+    ipv4 = [ip for ip in ips if ip.version == 4]
+    public = [ip for ip in ipv4 if not any(ip in network for network in private)]
+    assert not any(
+        ip in network for ip in public for network in excluded if network not in private
+    )
+    assert 0.05 < (len(ipv4) - len(public)) / len(ips) < 0.15
+
+def test_session_id_formats():
+    """Test that counter-based session IDs are UUIDs, 6-char hex or empty."""
+    for i in range(200):
+        session_id = session_id_at(0, i)
+        if session_id:
+            is_uuid = bool(
+                re.match(
+                    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$",
+                    session_id,
+                )
+            )
+            is_hex = bool(re.match(r'^[0-9a-f]{6}$', session_id))
+            assert is_uuid or is_hex
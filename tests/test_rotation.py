@@ -0,0 +1,148 @@
+"""
+Test size-targeted output and rotation into numbered files.
+"""
+
+import gzip
+import json
+import pytest
+from array import array
+from pathlib import Path
+from exporters.rotation import (
+    limit_size,
+    manifest_path,
+    parse_duration,
+    parse_size,
+    rotated_file_path,
+    write_manifest,
+    write_rotated,
+)
+
+def make_chunks(counts, width=10):
+    """Return (chunk, timestamps) pairs of width-byte lines numbered across chunks.
+
+    Each line is timestamped with its number.
+    """
+    chunks, number = [], 0
+    for count in counts:
+        numbers = range(number, number + count)
+        lines = [f"{n:0{width - 1}d}\n".encode() for n in numbers]
+        chunks.append((b"".join(lines), array("q", [n * 1000000 for n in numbers])))
+        number += count
+    return chunks
+
+def test_parse_size():
+    """Test plain, binary and decimal size units."""
+    assert parse_size("4096") == 4096
+    assert parse_size("512k") == 512 * 1024
+    assert parse_size("256M") == parse_size("256MiB") == 256 << 20
+    assert parse_size("20GB") == 20 * 10 ** 9
+    assert parse_size("1.5G") == 3 << 29
+    for text in ("", "12Q", "-5M", "0", "M"):
+        with pytest.raises(ValueError):
+            parse_size(text)
+
+def test_parse_duration():
+    """Test duration units."""
+    assert parse_duration("30") == parse_duration("30s") == 30
+    assert parse_duration("1.5h") == 5400
+    assert parse_duration("1d") == 86400
+    with pytest.raises(ValueError):
+        parse_duration("5w")
+
+def test_limit_size():
+    """Test that a stream stops at the last whole line within the size."""
+    limited = list(limit_size(make_chunks([10, 10, 10]), 155))
+
+    assert [len(data) for data, _ in limited] == [100, 50]
+    assert list(limited[-1][1]) == [n * 1000000 for n in range(10, 15)]
+    capped = limit_size(make_chunks([10, 10, 10]), 200)
+    assert sum(len(data) for data, _ in capped) == 200
+
+def test_limit_size_stops_reading():
+    """Test that the input is not consumed past the chunk that fills the size."""
+    chunks = iter(make_chunks([10, 10, 10]))
+    assert len(list(limit_size(chunks, 100))) == 1
+    assert len(list(chunks)) == 2
+
+def test_file_paths():
+    """Test rotated file and manifest names, with and without a compression suffix."""
+    assert rotated_file_path("out/logs.json", 3) == Path("out/logs.00003.json")
+    assert rotated_file_path("out/logs.json.gz", 0) == Path("out/logs.00000.json")
+    assert manifest_path("out/logs.json.gz") == Path("out/logs.manifest.json")
+
+def test_rotate_size(tmp_path):
+    """Test that files fill up to the size at line boundaries, across chunks."""
+    files = write_rotated(make_chunks([7, 7, 7]), tmp_path / "logs.log", rotate_size=45)
+    data = b"".join(Path(rotated.path).read_bytes() for rotated in files)
+
+    assert [rotated.lines for rotated in files] == [4, 4, 4, 4, 4, 1]
+    assert all(rotated.bytes <= 45 for rotated in files)
+    assert data == b"".join(chunk for chunk, _ in make_chunks([21]))
+    assert (files[1].first_timestamp, files[1].last_timestamp) == (
+        "1970-01-01T00:00:04+00:00",
+        "1970-01-01T00:00:07+00:00",
+    )
+
+def test_rotate_lines_with_header(tmp_path):
+    """Test line-count rotation with a header starting every file."""
+    files = write_rotated(
+        make_chunks([25, 10]), tmp_path / "logs.csv", rotate_lines=10, header=b"a,b\n"
+    )
+
+    assert [rotated.lines for rotated in files] == [10, 10, 10, 5]
+    assert all(
+        Path(rotated.path).read_bytes().startswith(b"a,b\n") for rotated in files
+    )
+    assert files[-1].uncompressed_bytes == 4 + 50
+
+def test_rotate_oversized_line(tmp_path):
+    """Test that a line longer than the size limit gets a file of its own."""
+    files = write_rotated(
+        make_chunks([3], width=20), tmp_path / "logs.log", rotate_size=15
+    )
+
+    assert [rotated.lines for rotated in files] == [1, 1, 1]
+
+def test_rotate_time(tmp_path):
+    """Test rotation by file age, checked between chunks."""
+    now = [0.0]
+    def chunks():
+        for chunk in make_chunks([5, 5, 5, 5]):
+            yield chunk
+            now[0] += 4.0
+
+    files = write_rotated(
+        chunks(), tmp_path / "logs.log", rotate_time=7.5, clock=lambda: now[0]
+    )
+
+    assert [rotated.lines for rotated in files] == [10, 10]
+
+def test_rotate_compressed(tmp_path):
+    """Test background compression of finished files and the manifest."""
+    files = write_rotated(
+        make_chunks([50, 50]),
+        tmp_path / "logs.log.gz",
+        rotate_lines=30,
+        compression="gzip",
+        compress_threads=2,
+    )
+
+    names = [Path(rotated.path).name for rotated in files]
+    blobs = [Path(rotated.path).read_bytes() for rotated in files]
+    data = b"".join(gzip.decompress(blob) for blob in blobs)
+
+    assert names == [f"logs.{n:05d}.log.gz" for n in range(4)]
+    assert sorted(path.name for path in tmp_path.iterdir()) == names
+    assert data == b"".join(chunk for chunk, _ in make_chunks([100]))
+
+    write_manifest(files, tmp_path / "logs.manifest.json")
+    manifest = json.loads((tmp_path / "logs.manifest.json").read_text())
+    assert manifest["total_lines"] == 100 and manifest["total_files"] == 4
+    assert manifest["files"][0]["bytes"] == Path(files[0].path).stat().st_size
+
+def test_rotate_invalid(tmp_path):
+    """Test that bad limits and chunks without one line per timestamp are rejected."""
+    with pytest.raises(ValueError, match="positive"):
+        write_rotated([], tmp_path / "logs.log", rotate_lines=0)
+    with pytest.raises(ValueError, match="one line per row"):
+        write_rotated([(b"a\nb\n", [1])], tmp_path / "logs.log", rotate_lines=10)
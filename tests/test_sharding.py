@@ -0,0 +1,159 @@
+"""
+Test sharded multi-process generation.
+"""
+
+import pytest
+import gzip
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from generators.value_pool import configure_value_pools, disable_value_pools
+from generators.sharding import (
+    split_shards, shard_seed, generate_shard, csv_header,
+    iter_shards, shard_file_path, write_shard_files
+)
+
+START_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END_DATE = datetime(2024, 1, 31, tzinfo=timezone.utc)
+
+# Fields drawn from the Faker/random state that a shard seed controls
+SEEDED_FIELDS = [
+    "timestamp",
+    "log_level",
+    "source_ip",
+    "method",
+    "path",
+    "query_parameters",
+    "protocol",
+]
+
+def seeded_fields(data: bytes) -> list[dict]:
+    """Return the seed-controlled fields of every JSON line in data."""
+    entries = [json.loads(line) for line in data.decode("utf-8").splitlines()]
+    return [{field: entry[field] for field in SEEDED_FIELDS} for entry in entries]
+
+def test_split_shards():
+    """Test splitting a count into fixed-size shards."""
+    assert split_shards(25, 10) == [(0, 10), (1, 10), (2, 5)]
+    assert split_shards(20, 10) == [(0, 10), (1, 10)]
+    assert split_shards(0, 10) == []
+
+def test_split_shards_invalid_size():
+    """Test that a non-positive shard size is rejected."""
+    with pytest.raises(ValueError, match="shard_size"):
+        split_shards(10, 0)
+
+def test_shard_seed():
+    """Test that shard seeds are deterministic and independent."""
+    assert shard_seed(42, 0) == shard_seed(42, 0)
+    assert shard_seed(42, 0) != shard_seed(42, 1)
+    assert shard_seed(42, 0) != shard_seed(43, 0)
+    assert 0 <= shard_seed(42, 0) < 2 ** 64
+
+def test_generate_shard():
+    """Test generating one shard of formatted lines."""
+    data = generate_shard(0, 5, "json", seed=1)
+    lines = data.decode("utf-8").splitlines()
+
+    assert len(lines) == 5
+    assert data.endswith(b"\n")
+    for line in lines:
+        assert "log_level" in json.loads(line)
+
+def test_generate_shard_empty():
+    """Test that an empty shard produces no output."""
+    assert generate_shard(0, 0, "json", seed=1) == b""
+
+def test_generate_shard_reproducible():
+    """Test that the same seed and shard index give the same data."""
+    first = generate_shard(3, 5, "json", 7, START_DATE, END_DATE)
+    second = generate_shard(3, 5, "json", 7, START_DATE, END_DATE)
+    other = generate_shard(4, 5, "json", 7, START_DATE, END_DATE)
+
+    assert seeded_fields(first) == seeded_fields(second)
+    assert seeded_fields(first) != seeded_fields(other)
+
+def test_generate_shard_csv():
+    """Test that CSV shards hold data rows only, matching the header."""
+    header = csv_header().decode("utf-8").strip().split(",")
+    rows = generate_shard(0, 3, "csv", seed=1).decode("utf-8").splitlines()
+
+    assert header[0] == "timestamp"
+    assert len(rows) == 3
+    assert not rows[0].startswith("timestamp")
+
+def test_iter_shards_order_and_count():
+    """Test that shards come back in order and cover every entry."""
+    shards = list(iter_shards(25, "log", workers=1, seed=1, shard_size=10))
+
+    assert [len(shard.splitlines()) for shard in shards] == [10, 10, 5]
+
+def test_iter_shards_independent_of_workers():
+    """Test that a seeded run gives the same data for any worker count."""
+    single = b"".join(iter_shards(12, "json", 1, 5, 4, START_DATE, END_DATE))
+    parallel = b"".join(iter_shards(12, "json", 2, 5, 4, START_DATE, END_DATE))
+
+    assert seeded_fields(single) == seeded_fields(parallel)
+
+def test_iter_shards_pool_refresh_independent_of_workers():
+    """Test that pool refreshes do not make a seeded run depend on the worker count."""
+    configure_value_pools(size=20, refresh_after=7)
+    try:
+        runs = [
+            b"".join(iter_shards(30, "json", workers, 5, 10, START_DATE, END_DATE))
+            for workers in (1, 3)
+        ]
+    finally:
+        disable_value_pools()
+
+    single, parallel = (
+        [json.loads(line)["user_agent"] for line in run.splitlines()] for run in runs
+    )
+    assert single == parallel
+
+def test_iter_shards_invalid_workers():
+    """Test that a non-positive worker count is rejected."""
+    with pytest.raises(ValueError, match="workers"):
+        next(iter_shards(10, "json", workers=0))
+
+def test_shard_file_path():
+    """Test per-worker file naming."""
+    assert shard_file_path(Path("out/logs.json"), 3) == Path("out/logs.00003.json")
+    assert shard_file_path(Path("out/logs.json.gz"), 3) == Path(
+        "out/logs.00003.json.gz"
+    )
+
+def test_write_shard_files(tmp_path):
+    """Test writing one file per worker."""
+    paths = write_shard_files(
+        tmp_path / "logs.csv", 25, "csv", workers=2, seed=1, shard_size=10
+    )
+
+    assert [path.name for path in paths] == ["logs.00000.csv", "logs.00001.csv"]
+
+    row_counts = []
+    for path in paths:
+        lines = path.read_text().splitlines()
+        assert lines[0].startswith("timestamp,")
+        row_counts.append(len(lines) - 1)
+    assert row_counts == [20, 5]
+
+def test_write_shard_files_compressed(tmp_path):
+    """Test that every worker compresses its own file."""
+    paths = write_shard_files(
+        tmp_path / "logs.json.gz",
+        25,
+        "json",
+        workers=2,
+        seed=1,
+        shard_size=10,
+        start_date=START_DATE,
+        end_date=END_DATE,
+        compression="gzip",
+    )
+    plain = b"".join(iter_shards(25, "json", 1, 1, 10, START_DATE, END_DATE))
+    data = b"".join(gzip.decompress(path.read_bytes()) for path in paths)
+
+    assert [path.name for path in paths] == ["logs.00000.json.gz", "logs.00001.json.gz"]
+    assert data.count(b"\n") == 25
+    assert seeded_fields(data) == seeded_fields(plain)
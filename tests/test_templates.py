@@ -0,0 +1,146 @@
+"""
+Test compiled Apache, nginx and {field} line templates.
+"""
+
+import re
+import pytest
+from datetime import datetime, timezone
+from exporters.templates import (
+    TEMPLATE_PRESETS,
+    compile_template,
+    format_batch_with_template,
+    format_entries_with_template,
+    format_template_chunk,
+)
+from generators.core_generators import micros_to_timestamp
+from generators.log_batch import (
+    format_log_batch,
+    generate_log_batch,
+    iter_log_batch_rows,
+)
+from generators.log_entry_factory import format_log_entry_as_string, generate_log_entry
+
+START_DATE = datetime(2020, 1, 1, tzinfo=timezone.utc)
+END_DATE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+def sample_entry(**fields):
+    """Return a generated entry at a fixed timestamp with some fields overridden."""
+    timestamp = datetime(2026, 4, 28, 9, 56, 50, 123456, tzinfo=timezone.utc)
+    entry = generate_log_entry(timestamp=timestamp)
+    entry.update(fields)
+    return entry
+
+@pytest.mark.parametrize("preset", list(TEMPLATE_PRESETS))
+def test_batch_matches_entries(preset):
+    """Test that formatting a batch's columns gives the same lines as its rows."""
+    batch = generate_log_batch(500, START_DATE, END_DATE)
+    rows = list(iter_log_batch_rows(batch))
+
+    expected = format_entries_with_template(rows, preset)
+    assert format_batch_with_template(batch, preset) == expected
+
+def test_log_preset_matches_log_format():
+    """Test that the log preset reproduces the hard-coded log format."""
+    batch = generate_log_batch(500, START_DATE, END_DATE)
+    rows = list(iter_log_batch_rows(batch))
+
+    assert format_batch_with_template(batch, "log") == format_log_batch(batch, "log")
+    expected = [format_log_entry_as_string(row, "log") for row in rows]
+    assert format_entries_with_template(rows, "log") == expected
+
+def test_apache_combined():
+    """Test the Apache combined format of one entry."""
+    entry = sample_entry(
+        source_ip="10.0.0.1",
+        user_id=None,
+        method="GET",
+        path="/api/v1/users",
+        query_parameters="?limit=10",
+        protocol="HTTP/1.1",
+        status_code=200,
+        response_body='{"ok": true}',
+        referer=None,
+        user_agent="curl/8.0",
+    )
+    line = format_entries_with_template([entry], "combined")[0]
+
+    assert line == (
+        "10.0.0.1 - - [28/Apr/2026:09:56:50 +0000] "
+        '"GET /api/v1/users?limit=10 HTTP/1.1" 200 12 "-" "curl/8.0"'
+    )
+
+def test_apache_directives():
+    """Test header, time-format and empty-body Apache directives."""
+    entry = sample_entry(
+        request_headers={"X-Trace": "abc"}, response_body="", status_code=404
+    )
+    template = "%{X-Trace}i %{X-Missing}i %{%Y/%m/%d %H}t %b %B %>s %%"
+    line = format_entries_with_template([entry], template, "apache")[0]
+
+    assert line == "abc - 2026/04/28 09 - 0 404 %"
+
+def test_nginx_variables():
+    """Test plain and braced nginx variables."""
+    entry = sample_entry(
+        method="POST", path="/api/v1/posts", query_parameters="", status_code=201
+    )
+    template = "${request_method}:$uri?$args $status $time_iso8601 $msec"
+    line = format_entries_with_template([entry], template, "nginx")[0]
+
+    assert line == "POST:/api/v1/posts?- 201 2026-04-28T09:56:50+00:00 1777370210.123"
+
+def test_field_specs():
+    """Test timestamp strftime specs, format specs and fallback strftime directives."""
+    entry = sample_entry(status_code=200, response_time_ms=7, log_level="INFO")
+    template = (
+        "{timestamp:%d %b %Y %T.%f} {timestamp:%I%p} "
+        "{status_code:>5} {response_time_ms:04d} {log_level:<6}|"
+    )
+    line = format_entries_with_template([entry], template)[0]
+
+    assert line == "28 Apr 2026 09:56:50.123456 09AM   200 0007 INFO  |"
+
+def test_iso_timestamp():
+    """Test that a bare {timestamp} matches isoformat(), microseconds or not."""
+    for micros in (1777370210123456, 1777370210000000, 0):
+        timestamp = micros_to_timestamp(micros)
+        entry = sample_entry(timestamp=timestamp)
+        line = format_entries_with_template([entry], "{timestamp}")[0]
+
+        assert line == timestamp.isoformat()
+
+def test_literal_template():
+    """Test a template without placeholders, including escaped braces."""
+    batch = generate_log_batch(3, START_DATE, END_DATE)
+
+    assert compile_template("static {{line}}").fields == ()
+    assert format_batch_with_template(batch, "static {{line}}") == ["static {line}"] * 3
+
+def test_compiled_fields():
+    """Test that a template reads only the fields it uses."""
+    compiled = compile_template("{path} {timestamp:%H} {status_code}")
+
+    assert compiled.fields == ("timestamp", "path", "status_code")
+    # Compiled once
+    assert compile_template("{path} {timestamp:%H} {status_code}") is compiled
+
+def test_format_template_chunk():
+    """Test newline-terminated chunks and the empty batch."""
+    chunk = format_template_chunk(generate_log_batch(4, START_DATE, END_DATE), "common")
+
+    assert chunk.count(b"\n") == 4 and chunk.endswith(b"\n")
+    pattern = rb'\S+ - \S+ \[\d\d/\w{3}/\d{4}:\d\d:\d\d:\d\d \+0000\] "'
+    assert all(re.match(pattern, line) for line in chunk.splitlines())
+    empty = generate_log_batch(0, START_DATE, END_DATE)
+    assert format_template_chunk(empty, "common") == b""
+
+def test_invalid_templates():
+    """Test that unknown directives, variables, fields and syntaxes are rejected."""
+    with pytest.raises(ValueError, match="Apache directive"):
+        compile_template("%h %Z", "apache")
+    with pytest.raises(ValueError, match="nginx variable"):
+        compile_template("$remote_addr $upstream_addr", "nginx")
+    with pytest.raises(ValueError, match="Unknown field"):
+        compile_template("{nope}")
+    with pytest.raises(ValueError, match="syntax"):
+        compile_template("%h", "logstash")
@@ -0,0 +1,132 @@
+"""
+Test the non-homogeneous traffic model.
+"""
+
+import pytest
+import random
+from collections import Counter
+from datetime import date, datetime, timezone
+from generators import traffic_model
+from generators.traffic_model import (
+    DEFAULT_TRAFFIC_MODEL,
+    FLAT_TRAFFIC_MODEL,
+    HOURLY_TRAFFIC,
+    TrafficModel,
+    traffic_intensity,
+    iter_traffic_buckets,
+    iter_traffic_timestamp_micros,
+    generate_traffic_timestamps,
+)
+from generators.core_generators import _epoch_micros
+from generators.log_batch import iter_log_batches
+
+START_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)  # A Monday
+END_DATE = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+@pytest.fixture(params=["numpy", "stdlib"])
+def backend(request, monkeypatch):
+    """Run a test with the numpy backend (when installed) and the stdlib fallback."""
+    if request.param == "numpy":
+        if traffic_model.np is None:
+            pytest.skip("numpy is not installed")
+    else:
+        monkeypatch.setattr(traffic_model, "np", None)
+    return request.param
+
+def test_traffic_intensity():
+    """Test combining the hourly, weekly and special-day rates."""
+    weekly = (1, 1, 1, 1, 1, 0.5, 0.5)
+    model = TrafficModel(HOURLY_TRAFFIC, weekly, {date(2024, 1, 6): 3.0})
+    monday = datetime(2024, 1, 1, 10, tzinfo=timezone.utc)
+    saturday = datetime(2024, 1, 6, 10, tzinfo=timezone.utc)
+
+    assert traffic_intensity(model, monday) == HOURLY_TRAFFIC[10]
+    assert traffic_intensity(model, saturday) == HOURLY_TRAFFIC[10] * 0.5 * 3.0
+
+def test_iter_traffic_buckets():
+    """Test hour buckets, clipped to the range."""
+    start = _epoch_micros(datetime(2024, 1, 1, 10, 30, tzinfo=timezone.utc))
+    end = _epoch_micros(datetime(2024, 1, 1, 12, 15, tzinfo=timezone.utc))
+    buckets = list(iter_traffic_buckets(FLAT_TRAFFIC_MODEL, start, end))
+
+    assert [(b - a) // 60000000 for a, b, _ in buckets] == [30, 60, 15]
+    assert [weight for _, _, weight in buckets] == [0.5, 1.0, 0.25]
+
+def test_iter_traffic_buckets_invalid_model():
+    """Test that a model with the wrong number of rates is rejected."""
+    with pytest.raises(ValueError, match="24 hourly and 7 weekly"):
+        next(iter_traffic_buckets(TrafficModel((1.0,) * 23, (1.0,) * 7), 0, 1))
+
+def test_iter_traffic_timestamp_micros_sorted(backend):
+    """Test that batches cover the count in ascending order within the range."""
+    timestamps = []
+    for batch in iter_traffic_timestamp_micros(
+        25000, START_DATE, END_DATE, batch_size=1000
+    ):
+        assert len(batch) <= 1000
+        timestamps.extend(batch)
+
+    assert len(timestamps) == 25000
+    assert timestamps == sorted(timestamps)
+    assert _epoch_micros(START_DATE) <= timestamps[0]
+    assert timestamps[-1] < _epoch_micros(END_DATE)
+
+def test_iter_traffic_timestamp_micros_follows_curve(backend):
+    """Test that hourly and weekday counts follow the model."""
+    timestamps = generate_traffic_timestamps(
+        50000, START_DATE, END_DATE, DEFAULT_TRAFFIC_MODEL
+    )
+    hours = Counter(timestamp.hour for timestamp in timestamps)
+    weekdays = Counter(timestamp.weekday() for timestamp in timestamps)
+
+    assert hours[13] > 4 * hours[3]
+    assert weekdays[1] > 1.5 * weekdays[6]
+
+def test_iter_traffic_timestamp_micros_special_days(backend):
+    """Test that a special day multiplier shows up as a spike."""
+    model = TrafficModel((1.0,) * 24, (1.0,) * 7, {date(2024, 1, 10): 10.0})
+    end = datetime(2024, 1, 31, tzinfo=timezone.utc)
+    timestamps = generate_traffic_timestamps(20000, START_DATE, end, model)
+    days = Counter(timestamp.day for timestamp in timestamps)
+    assert days[10] > 5 * days[9]
+
+def test_iter_traffic_timestamp_micros_short_range(backend):
+    """Test many timestamps in a range shorter than one bucket."""
+    end = datetime(2024, 1, 1, 0, 0, 1, tzinfo=timezone.utc)
+    batches = iter_traffic_timestamp_micros(5000, START_DATE, end, batch_size=100)
+    timestamps = [ts for batch in batches for ts in batch]
+
+    assert len(timestamps) == 5000
+    assert timestamps == sorted(timestamps)
+
+def test_iter_traffic_timestamp_micros_reproducible(backend):
+    """Test that seeding the random module reproduces the timestamps."""
+    random.seed(3)
+    first = generate_traffic_timestamps(1000, START_DATE, END_DATE)
+    random.seed(3)
+    assert generate_traffic_timestamps(1000, START_DATE, END_DATE) == first
+
+def test_iter_traffic_timestamp_micros_edge_cases():
+    """Test empty counts, empty ranges and invalid arguments."""
+    assert list(iter_traffic_timestamp_micros(0, START_DATE, END_DATE)) == []
+    batches = iter_traffic_timestamp_micros(3, START_DATE, START_DATE)
+    assert [list(batch) for batch in batches] == [[_epoch_micros(START_DATE)] * 3]
+    with pytest.raises(ValueError, match="cannot be before"):
+        next(iter_traffic_timestamp_micros(1, END_DATE, START_DATE))
+    with pytest.raises(ValueError, match="zero intensity"):
+        silent = TrafficModel((0.0,) * 24, (1.0,) * 7)
+        next(iter_traffic_timestamp_micros(1, START_DATE, END_DATE, silent))
+
+def test_iter_log_batches_traffic_model():
+    """Test generating log batches with traffic-model timestamps."""
+    batches = list(
+        iter_log_batches(
+            300, 100, START_DATE, END_DATE, traffic_model=DEFAULT_TRAFFIC_MODEL
+        )
+    )
+    timestamps = [ts for batch in batches for ts in batch.timestamps]
+
+    assert [len(batch.timestamps) for batch in batches] == [100, 100, 100]
+    assert timestamps == sorted(timestamps)
+    with pytest.raises(ValueError, match="traffic_model requires a count"):
+        next(iter_log_batches(traffic_model=DEFAULT_TRAFFIC_MODEL))
@@ -0,0 +1,155 @@
+"""
+Test the pooled value cache.
+"""
+
+import pytest
+import json
+from collections import Counter
+import faker
+from generators.value_pool import (
+    POOL_KINDS, popularity_alias_table, build_pools, load_pool_cache,
+    save_pool_cache, configure_value_pools, disable_value_pools, pools_enabled,
+    get_pool_state, set_pool_state, restart_value_pools, pooled_value, pooled_values
+)
+from generators.client_generators import (
+    generate_user_agent, generate_user_agents, generate_referers, generate_user_ids
+)
+
+@pytest.fixture(autouse=True)
+def reset_pools():
+    """Make sure pooling is off before and after every test."""
+    disable_value_pools()
+    yield
+    disable_value_pools()
+
+def test_popularity_alias_table():
+    """Test that the alias table draws every rank with its Zipf probability."""
+    for size, skew in ((3, 1.0), (3, 0.0), (50, 1.2)):
+        probs, aliases = popularity_alias_table(size, skew)
+        drawn = list(probs)
+        for index, alias in enumerate(aliases):
+            if alias != index:
+                drawn[alias] += 1.0 - probs[index]
+
+        weights = [1.0 / rank ** skew for rank in range(1, size + 1)]
+        assert [p / size for p in drawn] == pytest.approx(
+            [w / sum(weights) for w in weights]
+        )
+
+def test_build_pools():
+    """Test that a pool of the requested size is built for every kind."""
+    pools = build_pools(20)
+
+    assert set(pools) == set(POOL_KINDS)
+    for values in pools.values():
+        assert len(values) == 20
+    assert all("@" in email for email in pools["email"])
+    assert all(url.startswith(("http://", "https://")) for url in pools["url"])
+
+def test_pools_disabled_by_default():
+    """Test that generators call Faker directly until pools are configured."""
+    assert not pools_enabled()
+    assert isinstance(generate_user_agent(), str)
+
+def test_configure_value_pools():
+    """Test that configured pools feed the client generators."""
+    configure_value_pools(size=50)
+    assert pools_enabled()
+
+    pool = set(get_pool_state()["pools"]["user_agent"])
+    assert set(generate_user_agents(200)) <= pool
+    assert generate_user_agent() in pool
+
+    urls = set(get_pool_state()["pools"]["url"])
+    assert {r for r in generate_referers(200) if r} <= urls
+
+    pools = get_pool_state()["pools"]
+    names = set(pools["username"]) | set(pools["email"])
+    user_ids = generate_user_ids(500)
+    assert {u for u in user_ids if u and "-" not in u} <= names
+
+def test_configure_value_pools_zero_disables():
+    """Test that a pool size of 0 turns pooling off."""
+    configure_value_pools(size=10)
+    configure_value_pools(size=0)
+    assert not pools_enabled()
+
+def test_configure_value_pools_invalid():
+    """Test that invalid settings are rejected."""
+    with pytest.raises(ValueError, match="size"):
+        configure_value_pools(size=-1)
+    with pytest.raises(ValueError, match="refresh_after"):
+        configure_value_pools(size=10, refresh_after=0)
+
+def test_popularity_skew():
+    """Test that the most popular value is drawn far more often than the least."""
+    configure_value_pools(size=100, skew=1.0)
+    pool = get_pool_state()["pools"]["user_agent"]
+    counter = Counter(pooled_values("user_agent", 20000))
+
+    assert counter[pool[0]] > 5 * max(counter[pool[-1]], 1)
+
+def test_refresh_after():
+    """Test that a pool is rebuilt after refresh_after draws."""
+    configure_value_pools(size=30, refresh_after=10)
+    before = set(get_pool_state()["pools"]["email"])
+
+    assert set(pooled_values("email", 10)) <= before
+    assert not set(pooled_values("email", 9)) <= before
+    assert set(get_pool_state()["pools"]["email"]) == before
+
+def test_restart_value_pools():
+    """Test that restarting brings back the configured pools and draw counts."""
+    configure_value_pools(size=30, refresh_after=10)
+    before = set(get_pool_state()["pools"]["email"])
+    pooled_values("email", 15)
+
+    restart_value_pools()
+    assert set(pooled_values("email", 9)) <= before
+    assert pooled_value("email") in before
+
+def test_pool_state_round_trip():
+    """Test handing pools to another process via get/set_pool_state."""
+    configure_value_pools(size=10)
+    state = get_pool_state()
+
+    disable_value_pools()
+    set_pool_state(state)
+    assert pools_enabled()
+    assert pooled_value("url") in state["pools"]["url"]
+
+def test_pool_cache_round_trip(tmp_path):
+    """Test that pools persisted to disk are reused by later runs."""
+    cache_path = str(tmp_path / "pools.json")
+    configure_value_pools(size=15, cache_path=cache_path)
+    saved = get_pool_state()["pools"]
+
+    disable_value_pools()
+    configure_value_pools(size=15, cache_path=cache_path)
+    assert get_pool_state()["pools"] == saved
+    assert load_pool_cache(cache_path, 15) == saved
+
+def test_pool_cache_invalidation(tmp_path):
+    """Test that caches from another Faker version, locale or size are ignored."""
+    cache_path = str(tmp_path / "pools.json")
+    save_pool_cache(cache_path, build_pools(5))
+
+    assert load_pool_cache(cache_path, 5) is not None
+    assert load_pool_cache(cache_path, 6) is None
+    assert load_pool_cache(cache_path, 5, locale="de_DE") is None
+
+    with open(cache_path) as f:
+        cache = json.load(f)
+    cache["faker_version"] = "0.0.0"
+    with open(cache_path, "w") as f:
+        json.dump(cache, f)
+    assert faker.VERSION != "0.0.0"
+    assert load_pool_cache(cache_path, 5) is None
+
+def test_pool_cache_missing_or_corrupt(tmp_path):
+    """Test that missing or unreadable caches are treated as stale."""
+    assert load_pool_cache(str(tmp_path / "missing.json"), 5) is None
+
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{not json")
+    assert load_pool_cache(str(corrupt), 5) is None